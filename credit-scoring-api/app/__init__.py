@@ -0,0 +1,7 @@
+import os
+
+# Import timing must be hooked before any other app module loads (see app.core.startup_profile)
+if os.getenv("STARTUP_PROFILE_IMPORTS", "").lower() in ("1", "true", "yes"):
+    from app.core.startup_profile import startup_profile
+
+    startup_profile.enable_import_profiling()
@@ -1,34 +1,159 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from app.services.model_loader import model_loader
 from app.services.student_prediction_service import student_prediction_service
 from app.services.student_application_logger import student_application_logger
+from app.services.decision_policy import decision_policy_audit, decision_policy_sync
+from app.services.monitoring_aggregates import monitoring_aggregator
+from app.services.model_registry import model_registry
+from app.services.artifact_loading import artifact_load_report
+from app.services.warmup import warmup
+from app.services.scoring_executor import scoring_executor
+from app.services.micro_batcher import prediction_batcher, student_batcher
+from app.services.scoring_cache import scoring_cache
+from app.auth.token_verifier import token_verifier
 from app.core.config import settings
 from app.core.security import verify_api_key
+from app.models.schemas import StudentDecisionPolicyUpdate
+from app.core.rate_limit import rate_limiter
+from app.core.startup_profile import startup_profile
+from app.core.metrics import MetricFamily, metrics_registry
+from app.core.tracing import span_exporter
 
 router = APIRouter()
 
 
 @router.get("/health")
 async def health_check():
-    """Check API health status"""
-    student_status = student_prediction_service.validate_runtime_assets(strict=False)
+    """Liveness: the process is up. In-memory state only; never loads or reads artifacts."""
+    student_status = student_prediction_service.runtime_status()
     return {
         "status": "healthy",
         "version": settings.VERSION,
-        "models_loaded": model_loader.lgbm_model is not None,
+        "ready": warmup.is_ready,
+        "models_loaded": model_loader.is_loaded(),
         "student_model_ready": student_status["ok"],
         "student_threshold": student_status["threshold"],
         "student_model_loaded": student_status["model_loaded"],
-        "student_calibrator_loaded": student_status.get("calibrator_loaded", False),
+        "student_calibrator_loaded": student_status["calibrator_loaded"],
     }
 
 
+@router.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once warm-up has completed, 503 until then (or if it failed)."""
+    body = {"status": "ready" if warmup.is_ready else "not_ready", "warmup": warmup.status()}
+    if not warmup.is_ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    body["student_preflight"] = warmup.preflight
+    return body
+
+
 @router.get("/ping")
 async def ping():
     """ Simple Ping Endpoint"""
     return {"message": "pong"}
 
 
+def _runtime_metrics():
+    """Gauges read from their owners at scrape time."""
+    executor = scoring_executor.stats()
+    yield MetricFamily("credit_api_executor_queue_depth", "Scoring tasks waiting for a worker.").add(
+        executor["queue_depth"], mode=executor["mode"]
+    )
+    yield MetricFamily("credit_api_executor_in_flight", "Scoring tasks admitted and not finished.").add(
+        executor["in_flight"], mode=executor["mode"]
+    )
+    yield MetricFamily("credit_api_executor_workers", "Scoring executor pool size.").add(
+        executor["workers"], mode=executor["mode"]
+    )
+    yield MetricFamily(
+        "credit_api_executor_rejected_total", "Scoring tasks rejected with 503 (queue full).", "counter"
+    ).add(executor["rejected"])
+
+    caches = {"scoring": scoring_cache.stats(), "auth_token": token_verifier.stats()}
+    lookups = MetricFamily("credit_api_cache_lookups_total", "Cache lookups by cache and result.", "counter")
+    hit_rate = MetricFamily("credit_api_cache_hit_ratio", "Cache hits / lookups since start.")
+    for name, cache in caches.items():
+        lookups.add(cache["hits"], cache=name, result="hit")
+        lookups.add(cache["misses"], cache=name, result="miss")
+        hit_rate.add(cache["hit_rate"], cache=name)
+    yield lookups
+    yield hit_rate
+
+    sink = student_application_logger.sink_stats()
+    if sink is not None:
+        yield MetricFamily("credit_api_firestore_queue_depth", "Application records waiting to be written.").add(
+            sink["queued"]
+        )
+
+    # Versions as labels on a constant 1; does not trigger model loading
+    models = MetricFamily("credit_api_model_info", "Served model version (1 while loaded).")
+    if model_loader.is_loaded():
+        models.add(
+            1,
+            model="regular",
+            version=model_loader.version,
+            fingerprint=model_loader.model_fingerprint,
+            active="xgboost" if settings.USE_XGBOOST else "lightgbm",
+        )
+    if student_prediction_service.artifacts_loaded:
+        models.add(
+            1,
+            model="student",
+            version=student_prediction_service.version,
+            fingerprint=student_prediction_service.fingerprint,
+            active="xgboost",
+        )
+    yield models
+    yield MetricFamily("credit_api_ready", "1 once warm-up has completed.").add(int(warmup.is_ready))
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text-format metrics: per-route and per-stage latency, queues, caches, models."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(
+        metrics_registry.render(_runtime_metrics()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/scoring/stats")
+async def scoring_stats(api_key: str = Depends(verify_api_key)):
+    """Scoring executor queue depth, wait time, micro-batching and cache counters."""
+    stats = scoring_executor.stats()
+    stats["micro_batching"] = {
+        "enabled": settings.MICRO_BATCH_ENABLED,
+        "prediction": prediction_batcher.stats(),
+        "student": student_batcher.stats(),
+    }
+    stats["cache"] = scoring_cache.stats()
+    stats["auth_token_cache"] = token_verifier.stats()
+    stats["application_log_sink"] = student_application_logger.sink_stats()
+    stats["monitoring_aggregates"] = monitoring_aggregator.stats()
+    stats["rate_limiter"] = rate_limiter.stats()
+    stats["model_registry"] = model_registry.stats()
+    stats["model_loading"] = {
+        **artifact_load_report.stats(),
+        "regular_models_loaded": model_loader.loaded_models(),
+    }
+    stats["startup"] = {"warmup": warmup.status(), **startup_profile.report()}
+    stats["span_export"] = span_exporter.stats()
+    return stats
+
+
+@router.post("/model/registry/check")
+async def model_registry_check(api_key: str = Depends(verify_api_key)):
+    """Poll the model registry now and hot-swap a newer version if one is ready."""
+    if not model_registry.enabled:
+        raise HTTPException(status_code=404, detail="Model registry is not configured")
+    swapped = await run_in_threadpool(model_registry.check_once)
+    return {"swapped": swapped, **model_registry.stats()}
+
+
 @router.get("/student/monitoring/summary")
 async def student_monitoring_summary(
     hours: int = Query(default=settings.STUDENT_MONITORING_WINDOW_HOURS, ge=1, le=720),
@@ -36,10 +161,64 @@ async def student_monitoring_summary(
 ):
     """Quick monitoring summary for student canary rollout KPIs."""
     try:
-        summary = student_application_logger.get_monitoring_summary(window_hours=hours)
-        summary["student_decision_policy"] = settings.STUDENT_DECISION_POLICY
-        summary["student_manual_review_margin"] = settings.STUDENT_MANUAL_REVIEW_MARGIN
-        summary["student_threshold"] = student_prediction_service.threshold
+        summary = await run_in_threadpool(
+            student_application_logger.get_monitoring_summary, window_hours=hours
+        )
+        policy = student_prediction_service.decision_policy
+        summary["student_decision_policy"] = policy.name
+        summary["student_manual_review_margin"] = policy.manual_review_margin
+        summary["student_threshold"] = policy.threshold
+        summary["student_decision_policy_revision"] = policy.revision
         return summary
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Student monitoring summary failed: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Student monitoring summary failed: {e}")
+
+
+@router.get("/student/decision-policy")
+async def student_decision_policy(
+    history: int = Query(default=20, ge=0, le=100),
+    api_key: str = Depends(verify_api_key),
+):
+    """Decision policy in force on this instance, with its cutoffs and recent changes."""
+    policy = await run_in_threadpool(lambda: student_prediction_service.decision_policy)
+    return {
+        **policy.describe(),
+        "sync": decision_policy_sync.stats(),
+        "audit": decision_policy_audit.entries(history),
+    }
+
+
+@router.put("/student/decision-policy")
+async def update_student_decision_policy(
+    update: StudentDecisionPolicyUpdate,
+    api_key: str = Depends(verify_api_key),
+):
+    """Swap the student decision policy at runtime on every instance; audited.
+
+    The change is stored first and served here once stored; other instances
+    pick it up on their next poll (STUDENT_POLICY_POLL_SECONDS).
+    """
+    changes = {}
+    if update.policy is not None:
+        changes["name"] = update.policy.value
+    if update.manual_review_margin is not None:
+        changes["manual_review_margin"] = update.manual_review_margin
+    if update.approval_threshold_override is not None:
+        changes["threshold_override"] = update.approval_threshold_override or None
+    if not changes:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Nothing to change: set policy, manual_review_margin or approval_threshold_override",
+        )
+
+    try:
+        previous, current = await run_in_threadpool(
+            decision_policy_sync.publish, changed_by=update.changed_by, reason=update.reason, **changes
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Decision policy could not be stored; policy unchanged: {e}",
+        )
+    entry = decision_policy_audit.record(previous, current, changed_by=update.changed_by, reason=update.reason)
+    return {**current.describe(), "previous": previous.describe(), "audit_id": entry.get("doc_id")}
@@ -33,7 +33,7 @@ async def get_model_info():
         return {
             "model_name": model_name,
             "version": "1.0",
-            "features_count": metadata.get('data_info', {}).get('n_features', 64) if settings.USE_XGBOOST else len(model_loader.lgbm_model.feature_name_),
+            "features_count": metadata.get('data_info', {}).get('n_features', 64) if settings.USE_XGBOOST else len(model_loader.feature_names),
             "threshold": float(model_info.get('threshold', settings.XGBOOST_THRESHOLD if settings.USE_XGBOOST else settings.LIGHTGBM_THRESHOLD)),
             "performance": {
                 "roc_auc": float(model_info.get('metrics', {}).get('roc_auc', 0)),
@@ -61,8 +61,7 @@ async def get_model_features():
     
     Returns list of all features used by the model
     """
-    active_model = model_loader.get_active_model()
-    feature_names = active_model.feature_names_in_ if hasattr(active_model, 'feature_names_in_') else model_loader.lgbm_model.feature_name_
+    feature_names = model_loader.feature_names
     return {
         "features": list(feature_names),
         "count": len(feature_names)
@@ -5,31 +5,115 @@ from app.models.schemas import (
     LoanLimitResponse, LoanTermsRequest, LoanTermsResponse,
     StudentLoanRequest, StudentLoanLimitResponse, StudentCreditScoreResponse,
 )
-from app.services.prediction_service import prediction_service
 from app.services.loan_offer_service import loan_offer_service
-from app.services.smart_loan_offer import SmartLoanOfferService
-from app.services.request_converter import request_converter
-from app.services.feature_engineering import FeatureEngineer
+from app.services.scoring_context import ScoringContext
 from app.services.loan_limit_calculator import loan_limit_calculator
 from app.services.loan_terms_calculator import loan_terms_calculator
-from app.services.score_mapper import probability_to_credit_score
 from app.services.student_prediction_service import student_prediction_service
 from app.services.student_application_logger import student_application_logger
+from app.services.scoring_executor import (
+    ScoringQueueFull, scoring_executor,
+    score_prediction, score_predictions, score_student, score_student_arrays, score_smart_offer,
+)
+from app.services.micro_batcher import prediction_batcher, student_batcher
+from app.services.scoring_cache import scoring_cache, prediction_cache_version, student_cache_version
 from app.core.security import verify_api_key
 from app.auth.firebase_auth import verify_firebase_token
 from app.core.config import settings
 import logging
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Import limiter from main app
-from slowapi import Limiter
-from app.core.security import get_client_ip
+# Shared limiter (also registered on the app in main.py)
+from app.core.rate_limit import rate_limiter as limiter
+
+
+async def _run_scoring(task, *args):
+    """Await a CPU-bound scoring task on the scoring executor (503 when saturated)"""
+    return await _capacity_guard(scoring_executor.run(task, *args))
+
+
+async def _predict_one(prediction_request: PredictionRequest) -> PredictionResponse:
+    """Score one request (cached; coalesced with concurrent requests when micro-batching is on)"""
+    payload = prediction_request.model_dump()
+    version = prediction_cache_version()
+    cached = scoring_cache.get("prediction", payload, version)
+    if cached is not None:
+        return cached
+
+    if settings.MICRO_BATCH_ENABLED:
+        result = await _capacity_guard(prediction_batcher.submit(prediction_request))
+    else:
+        result = await _run_scoring(score_prediction, prediction_request)
+    scoring_cache.put("prediction", payload, version, result)
+    return result
 
-limiter = Limiter(key_func=get_client_ip)
+
+async def _predict_student(raw: dict):
+    """Score one student (cached; coalesced with concurrent requests when micro-batching is on)"""
+    version = student_cache_version()
+    cached = scoring_cache.get("student", raw, version)
+    if cached is not None:
+        return cached
+
+    if settings.MICRO_BATCH_ENABLED:
+        result = await _capacity_guard(student_batcher.submit(raw))
+    else:
+        result = await _run_scoring(score_student, raw)
+    scoring_cache.put("student", raw, version, result)
+    return result
+
+
+STUDENT_HARD_GATE_MESSAGE = (
+    "Sinh viên năm nhất cần GPA ≥ 2.0 để đủ điều kiện vay. "
+    "Hãy cải thiện kết quả học tập và thử lại."
+)
+
+
+def _student_limit_outcome(
+    credit_score: int,
+    default_prob: float,
+    decision_band: str,
+    approved: bool,
+    loan_limit: float,
+    limit_reason: str,
+) -> Tuple[str, bool, float]:
+    """Message, approval and loan limit for a scored student, after the decision band"""
+    if decision_band == "manual_review":
+        message = (
+            f"Điểm tín dụng: {credit_score}. Xác suất rủi ro ({default_prob:.1%}) "
+            "nằm gần ngưỡng duyệt. Hồ sơ sẽ được thẩm định thủ công."
+        )
+        return message, False, 0.0
+    if not approved:
+        message = (
+            f"Điểm tín dụng: {credit_score}. Xác suất rủi ro ({default_prob:.1%}) "
+            f"vượt ngưỡng chấp nhận. Hạn mức: 0 VND."
+        )
+        return message, False, 0.0
+    message = (
+        f"Điểm tín dụng: {credit_score}. {limit_reason}. "
+        f"Hạn mức vay tối đa: {loan_limit:,.0f} VND."
+    )
+    return message, approved, loan_limit
+
+
+async def _capacity_guard(scoring):
+    """Await scoring work, mapping a saturated executor to 503"""
+    try:
+        return await scoring
+    except ScoringQueueFull as e:
+        logger.warning(f"Scoring rejected: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scoring capacity exhausted, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
 
 
 @router.post("/calculate-limit", response_model=LoanLimitResponse, status_code=status.HTTP_200_OK)
@@ -73,36 +157,16 @@ async def calculate_loan_limit(
     try:
         logger.info(f"Loan limit calculation for: {application.full_name}")
         
-        # Convert simple request to internal format
-        internal_request = request_converter.convert_simple_to_prediction(application)
+        # Convert simple request to internal format (single scoring pass)
+        context = ScoringContext.build(application)
         
         # Calculate annual income
-        annual_income_vnd = application.monthly_income * 12
-        
-        # Get ML model prediction (probability + risk level)
-        prediction_result = prediction_service.predict(internal_request)
-        risk_level = prediction_result.risk_level
-        
-        # Derive credit score from ML probability (non-linear)
-        credit_score = probability_to_credit_score(prediction_result.probability)
-        
-        # HARD CAPS (Business Rules)
-        # 1. Currently defaulting -> Auto reject, cap at 580 (Very Poor)
-        if application.currently_defaulting:
-            credit_score = min(credit_score, 580)
-            risk_level = "Very High"
-        # 2. Previous defaults -> Cap at 650 (Fair)
-        elif application.has_previous_defaults:
-            credit_score = min(credit_score, 650)
-        # 3. Young/Unemployed -> Cap at 680 (Fair)
-        elif application.age <= 22 or application.employment_status == "UNEMPLOYED":
-            credit_score = min(credit_score, 680)
-        # 4. New to credit -> Cap at 700 (Good)
-        elif application.years_credit_history == 0:
-            credit_score = min(credit_score, 700)
-        # 5. Low income (<10M) -> Cap at 720 (Good)
-        elif application.monthly_income < 10000000:
-            credit_score = min(credit_score, 720)
+        annual_income_vnd = context.annual_income_vnd
+        
+        # Get ML model prediction, derive credit score and apply HARD CAPS (Business Rules)
+        context.apply_prediction(await _predict_one(context.internal_request))
+        credit_score = context.credit_score
+        risk_level = context.risk_level
         
         # Check minimum credit score
         min_credit_score = 600
@@ -127,12 +191,12 @@ async def calculate_loan_limit(
         )
         
         # Check approval threshold (30% default probability)
-        approved = prediction_result.probability < 0.30
+        approved = context.probability < 0.30
         
         if not approved:
             message = (
                 f"Credit score: {credit_score}. Risk level: {risk_level}. "
-                f"Default probability ({prediction_result.probability:.1%}) exceeds acceptable threshold. "
+                f"Default probability ({context.probability:.1%}) exceeds acceptable threshold. "
                 f"Loan limit: 0 VND."
             )
             max_loan = 0.0
@@ -155,6 +219,8 @@ async def calculate_loan_limit(
             message=message
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Loan limit calculation error: {e}")
         raise HTTPException(
@@ -273,12 +339,14 @@ async def predict_loan(request: PredictionRequest):
         logger.info(f"Prediction request - Age: {request.person_age}, Income: {request.person_income}")
         
         # Get prediction
-        result = prediction_service.predict(request)
+        result = await _predict_one(request)
         
         logger.info(f"Prediction complete: {result.risk_level} risk (probability: {result.probability:.2%})")
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(
@@ -306,11 +374,8 @@ async def batch_predict(
     try:
         logger.info(f"Batch prediction request - {len(prediction_requests)} applications")
         
-        # Process all predictions
-        predictions = []
-        for pred_request in prediction_requests:
-            result = prediction_service.predict(pred_request)
-            predictions.append(result)
+        # Score all applications with a single model call
+        predictions = await _run_scoring(score_predictions, prediction_requests)
         
         # Calculate summary statistics
         high_risk_count = sum(1 for p in predictions if p.risk_level == "HIGH")
@@ -332,6 +397,8 @@ async def batch_predict(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
         raise HTTPException(
@@ -379,7 +446,7 @@ async def get_loan_offer(request: PredictionRequest):
         logger.info(f"Loan offer request - Age: {request.person_age}, Income: {request.person_income}, Loan: {request.loan_amnt}")
         
         # Get risk prediction first
-        prediction_result = prediction_service.predict(request)
+        prediction_result = await _predict_one(request)
         
         # Calculate loan offer
         offer = loan_offer_service.calculate_offer(
@@ -392,6 +459,8 @@ async def get_loan_offer(request: PredictionRequest):
         
         return offer
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Loan offer error: {e}")
         raise HTTPException(
@@ -420,16 +489,13 @@ async def batch_loan_offers(
     try:
         logger.info(f"Batch loan offers request - {len(prediction_requests)} applications")
         
-        # Process all loan offers
-        offers = []
-        for pred_request in prediction_requests:
-            prediction_result = prediction_service.predict(pred_request)
-            offer = loan_offer_service.calculate_offer(
-                request=pred_request,
-                probability=prediction_result.probability,
-                risk_level=prediction_result.risk_level,
-            )
-            offers.append(offer)
+        # Score all applications with a single model call, then price offers in one pass
+        prediction_results = await _run_scoring(score_predictions, prediction_requests)
+        offers = loan_offer_service.calculate_offers(
+            requests=prediction_requests,
+            probabilities=[p.probability for p in prediction_results],
+            risk_levels=[p.risk_level for p in prediction_results],
+        )
         
         logger.info(f"Batch loan offers complete: {len(offers)} results")
         
@@ -449,6 +515,8 @@ async def batch_loan_offers(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch loan offers error: {e}")
         raise HTTPException(
@@ -489,37 +557,21 @@ async def apply_for_loan(
     try:
         logger.info(f"Loan application from: {application.full_name}")
         
-        # Convert simple request to full internal format
-        internal_request = request_converter.convert_simple_to_prediction(application)
-        
-        # Get ML model prediction (probability + risk level)
-        prediction_result = prediction_service.predict(internal_request)
-        risk_level = prediction_result.risk_level
-        
-        # Get proper credit score
-        credit_score = probability_to_credit_score(prediction_result.probability)
-        
-        # EXACT SAME HARD CAPS AS /calculate-limit
-        if application.currently_defaulting:
-            credit_score = min(credit_score, 580)
-            risk_level = "Very High"
-        elif application.has_previous_defaults:
-            credit_score = min(credit_score, 650)
-        elif application.age <= 22 or application.employment_status == "UNEMPLOYED":
-            credit_score = min(credit_score, 680)
-        elif application.years_credit_history == 0:
-            credit_score = min(credit_score, 700)
-        elif application.monthly_income < 10000000:
-            credit_score = min(credit_score, 720)
+        # Convert simple request to full internal format (single scoring pass)
+        context = ScoringContext.build(application)
+        internal_request = context.internal_request
+        
+        # Get ML model prediction; EXACT SAME HARD CAPS AS /calculate-limit
+        context.apply_prediction(await _predict_one(internal_request))
+        credit_score = context.credit_score
         
         logger.info(f"Calculated credit score: {credit_score}")
         
         # Calculate annual income
-        annual_income_vnd = application.monthly_income * 12
+        annual_income_vnd = context.annual_income_vnd
         
         # Generate smart loan offer (without loan_purpose - only credit score and limit)
-        smart_service = SmartLoanOfferService()
-        offer = smart_service.generate_offer(
+        offer = await _run_scoring(score_smart_offer, dict(
             request_dict=internal_request.model_dump(),
             age=application.age,
             years_employed=application.years_employed,
@@ -529,7 +581,7 @@ async def apply_for_loan(
             annual_income_vnd=annual_income_vnd,
             monthly_income_vnd=application.monthly_income,
             credit_score=credit_score # Use the potentially capped credit score
-        )
+        ))
         
         # Return only credit score and loan limit
         response = SimpleLoanApplicationResponse(
@@ -544,6 +596,8 @@ async def apply_for_loan(
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Loan application error: {e}")
         raise HTTPException(
@@ -592,53 +646,26 @@ async def calculate_credit_score(
     try:
         logger.info(f"Credit score calculation for: {application.full_name}")
         
-        # For credit score calculation, use a standard 3-year personal loan as reference
-        reference_loan_amount = application.monthly_income * 12 * 2  # 2x annual income
-        
-        # Get detailed score breakdown
-        score_details = request_converter.calculate_credit_score_with_breakdown(
-            application.age,
-            application.monthly_income,
-            application.years_employed,
-            application.home_ownership,
-            application.years_credit_history,
-            application.employment_status,
-            application.has_previous_defaults,
-            application.currently_defaulting,
-            reference_loan_amount
-        )
-        
-        # ML Pipeline calculation
-        internal_request = request_converter.convert_simple_to_prediction(application)
-        prediction_result = prediction_service.predict(internal_request)
-        credit_score = probability_to_credit_score(prediction_result.probability)
-        risk_level = prediction_result.risk_level
-        
-        # EXACT SAME HARD CAPS AS /calculate-limit
-        if application.currently_defaulting:
-            credit_score = min(credit_score, 580)
-            risk_level = "Very High"
-        elif application.has_previous_defaults:
-            credit_score = min(credit_score, 650)
-        elif application.age <= 22 or application.employment_status == "UNEMPLOYED":
-            credit_score = min(credit_score, 680)
-        elif application.years_credit_history == 0:
-            credit_score = min(credit_score, 700)
-        elif application.monthly_income < 10000000:
-            credit_score = min(credit_score, 720)
+        # Breakdown, internal request and grade are computed once (reference loan = 2x annual income)
+        context = ScoringContext.build(application)
+        
+        # ML Pipeline calculation; EXACT SAME HARD CAPS AS /calculate-limit
+        context.apply_prediction(await _predict_one(context.internal_request))
         
         response = CreditScoreResponse(
             full_name=application.full_name,
-            credit_score=credit_score, # Use the potentially capped credit score
-            loan_grade=internal_request.loan_grade,
-            risk_level=risk_level, # Use the potentially updated risk_level
-            score_breakdown=score_details
+            credit_score=context.credit_score, # Use the potentially capped credit score
+            loan_grade=context.loan_grade,
+            risk_level=context.risk_level, # Use the potentially updated risk_level
+            score_breakdown=context.score_breakdown
         )
         
         logger.info(f"Credit score calculated: {response.credit_score} (Grade: {response.loan_grade})")
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Credit score calculation error: {e}")
         raise HTTPException(
@@ -671,6 +698,8 @@ async def student_credit_score(
 
     try:
         logger.info(f"Student credit score request — user: {user.get('uid', 'unknown')}")
+        # One policy read per request: bands and reported threshold share a revision
+        policy = student_prediction_service.decision_policy
 
         # Hard gate aligned with student loan policy
         if application.academic_year == 1 and application.gpa_latest < 2.0:
@@ -683,7 +712,7 @@ async def student_credit_score(
                     "Hãy cải thiện kết quả học tập và thử lại."
                 ),
                 default_probability=None,
-                approval_threshold=student_prediction_service.threshold,
+                approval_threshold=policy.threshold,
                 score_model="student_xgboost_phase1",
                 score_range="600-850",
                 decision_band="auto_reject",
@@ -694,9 +723,9 @@ async def student_credit_score(
         # Student score is evaluated at a fixed reference amount so limit does not
         # depend on requested loan input.
         raw["loan_amount"] = settings.STUDENT_SCORING_REFERENCE_LOAN_AMOUNT
-        default_prob, risk_level, credit_score = student_prediction_service.predict(raw)
+        default_prob, risk_level, credit_score = await _predict_student(raw)
         decision_band, approved, manual_review = student_prediction_service.classify_decision_band(
-            default_prob
+            default_prob, policy
         )
 
         if manual_review:
@@ -716,13 +745,15 @@ async def student_credit_score(
             approved=approved,
             message=message,
             default_probability=default_prob,
-            approval_threshold=student_prediction_service.threshold,
+            approval_threshold=policy.threshold,
             score_model="student_xgboost_phase1",
             score_range="600-850",
             decision_band=decision_band,
             manual_review=manual_review,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Student credit score calculation error: {e}")
         raise HTTPException(
@@ -759,6 +790,8 @@ async def student_calculate_limit(
     try:
         logger.info(f"Student loan request — user: {user.get('uid', 'unknown')}")
         user_id = user.get("uid", "unknown")
+        # One policy read per request: bands and reported threshold share a revision
+        policy = student_prediction_service.decision_policy
         raw = application.model_dump()
         # Student score is evaluated at a fixed reference amount so limit does not
         # depend on requested loan input.
@@ -789,12 +822,9 @@ async def student_calculate_limit(
                 loan_limit_vnd=0.0,
                 risk_level="Very High",
                 approved=False,
-                message=(
-                    "Sinh viên năm nhất cần GPA ≥ 2.0 để đủ điều kiện vay. "
-                    "Hãy cải thiện kết quả học tập và thử lại."
-                ),
+                message=STUDENT_HARD_GATE_MESSAGE,
                 default_probability=None,
-                approval_threshold=student_prediction_service.threshold,
+                approval_threshold=policy.threshold,
                 score_model="student_xgboost_phase1",
                 score_range="600-850",
                 decision_band="auto_reject",
@@ -802,7 +832,7 @@ async def student_calculate_limit(
             )
 
         # ── Model prediction ────────────────────────────────────────────────
-        default_prob, risk_level, credit_score = student_prediction_service.predict(raw)
+        default_prob, risk_level, credit_score = await _predict_student(raw)
 
         # ── Loan limit (5M–10M hard cap) ────────────────────────────────────
         loan_limit, limit_reason = loan_limit_calculator.calculate_student_loan(
@@ -812,27 +842,12 @@ async def student_calculate_limit(
 
         # ── Approval decision ───────────────────────────────────────────────
         decision_band, approved, manual_review = student_prediction_service.classify_decision_band(
-            default_prob
+            default_prob, policy
         )
 
-        if decision_band == "manual_review":
-            message = (
-                f"Điểm tín dụng: {credit_score}. Xác suất rủi ro ({default_prob:.1%}) "
-                "nằm gần ngưỡng duyệt. Hồ sơ sẽ được thẩm định thủ công."
-            )
-            approved = False
-            loan_limit = 0.0
-        elif not approved:
-            message = (
-                f"Điểm tín dụng: {credit_score}. Xác suất rủi ro ({default_prob:.1%}) "
-                f"vượt ngưỡng chấp nhận. Hạn mức: 0 VND."
-            )
-            loan_limit = 0.0
-        else:
-            message = (
-                f"Điểm tín dụng: {credit_score}. {limit_reason}. "
-                f"Hạn mức vay tối đa: {loan_limit:,.0f} VND."
-            )
+        message, approved, loan_limit = _student_limit_outcome(
+            credit_score, default_prob, decision_band, approved, loan_limit, limit_reason
+        )
 
         try:
             student_application_logger.log_application(
@@ -861,16 +876,161 @@ async def student_calculate_limit(
             approved=approved,
             message=message,
             default_probability=default_prob,
-            approval_threshold=student_prediction_service.threshold,
+            approval_threshold=policy.threshold,
             score_model="student_xgboost_phase1",
             score_range="600-850",
             decision_band=decision_band,
             manual_review=manual_review,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Student loan calculation error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Student loan calculation failed: {str(e)}",
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/student/batch-calculate-limit", status_code=status.HTTP_200_OK)
+@limiter.limit(f"{settings.RATE_LIMIT_BATCH}/minute")
+async def student_batch_calculate_limit(
+    request: Request,
+    applications: List[StudentLoanRequest],
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Batch Student Loan Limit Endpoint
+
+    Scores a cohort of students (e.g. a university partner's file) with one
+    model call. The year-1 low-GPA hard gate, feature engineering,
+    calibration, decision banding and loan limits run over the whole batch
+    as arrays; every row gets the same result as /student/calculate-limit.
+
+    *Returns:*
+    - results: One StudentLoanLimitResponse per application, in input order
+    - count: Number of applications
+    - summary: Approved / manual review / rejected / hard-gate counts
+    """
+    if not student_prediction_service.is_ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Student model not loaded. Please contact support.",
+        )
+    if len(applications) > settings.STUDENT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.STUDENT_BATCH_MAX_SIZE} applications per batch.",
+        )
+
+    try:
+        logger.info(f"Student batch loan request - {len(applications)} applications")
+        # One policy read for the whole batch: every row uses the same revision
+        policy = student_prediction_service.decision_policy
+        raws = [application.model_dump() for application in applications]
+        for raw in raws:
+            raw["loan_amount"] = settings.STUDENT_SCORING_REFERENCE_LOAN_AMOUNT
+
+        # ── Hard gate: Year-1 + low GPA ────────────────────────────────────
+        academic_year = np.fromiter((a.academic_year for a in applications), dtype=np.int64, count=len(applications))
+        gpa = np.fromiter((a.gpa_latest for a in applications), dtype=np.float64, count=len(applications))
+        gated = (academic_year == 1) & (gpa < 2.0)
+        scored_rows = np.flatnonzero(~gated)
+
+        # ── Model prediction, loan limits and decision bands ───────────────
+        default_probs, risk_levels, credit_scores = await _run_scoring(
+            score_student_arrays, [raws[i] for i in scored_rows]
+        )
+        loan_limits, limit_reasons = loan_limit_calculator.calculate_student_loans(
+            credit_scores, risk_levels
+        )
+        decision_bands, approved, manual_review = student_prediction_service.classify_decision_bands(
+            default_probs, policy
+        )
+
+        threshold = policy.threshold
+        results: List[StudentLoanLimitResponse] = [None] * len(applications)
+        log_records = []
+        for i in np.flatnonzero(gated).tolist():
+            results[i] = StudentLoanLimitResponse(
+                credit_score=600,
+                loan_limit_vnd=0.0,
+                risk_level="Very High",
+                approved=False,
+                message=STUDENT_HARD_GATE_MESSAGE,
+                default_probability=None,
+                approval_threshold=threshold,
+                score_model="student_xgboost_phase1",
+                score_range="600-850",
+                decision_band="auto_reject",
+                manual_review=False,
+            )
+            log_records.append(dict(
+                request_payload=raws[i],
+                credit_score=600,
+                loan_limit_vnd=0.0,
+                risk_level="Very High",
+                approved=False,
+                model_score=None,
+                status="rejected",
+                reason="hard_gate_year1_low_gpa",
+                manual_review=False,
+            ))
+
+        rows = zip(
+            scored_rows.tolist(), default_probs.tolist(), risk_levels.tolist(), credit_scores.tolist(),
+            loan_limits.tolist(), limit_reasons, decision_bands.tolist(), approved.tolist(),
+            manual_review.tolist(),
+        )
+        for i, default_prob, risk_level, credit_score, loan_limit, limit_reason, band, is_approved, review in rows:
+            message, is_approved, loan_limit = _student_limit_outcome(
+                credit_score, default_prob, band, is_approved, loan_limit, limit_reason
+            )
+            results[i] = StudentLoanLimitResponse(
+                credit_score=credit_score,
+                loan_limit_vnd=loan_limit,
+                risk_level=risk_level,
+                approved=is_approved,
+                message=message,
+                default_probability=default_prob,
+                approval_threshold=threshold,
+                score_model="student_xgboost_phase1",
+                score_range="600-850",
+                decision_band=band,
+                manual_review=review,
+            )
+            log_records.append(dict(
+                request_payload=raws[i],
+                credit_score=credit_score,
+                loan_limit_vnd=loan_limit,
+                risk_level=risk_level,
+                approved=is_approved,
+                model_score=default_prob,
+                status="scored",
+                manual_review=review,
+            ))
+
+        try:
+            student_application_logger.log_applications("api_batch", log_records)
+        except Exception as log_error:
+            logger.warning("Student batch application logging failed: %s", log_error)
+
+        summary = {
+            "approved": int(approved.sum()),
+            "manual_review": int(manual_review.sum()),
+            "rejected": len(applications) - int(approved.sum()) - int(manual_review.sum()),
+            "hard_gate_rejected": int(gated.sum()),
+        }
+        logger.info(f"Student batch loan calculation complete - {summary}")
+
+        return {"results": results, "count": len(results), "summary": summary}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Student batch loan calculation error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Student batch loan calculation failed: {str(e)}",
+        )
@@ -1,16 +1,9 @@
-import firebase_admin
-from firebase_admin import auth
 from fastapi import HTTPException, Security
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.auth.token_verifier import InvalidTokenError, TokenExpiredError, token_verifier
 from app.core.config import settings
 
-# Initialize once at startup — specify projectId so SDK knows which Firebase project
-# to verify tokens against. Uses GCP Application Default Credentials on Cloud Run.
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(options={
-        'projectId': 'creditscore-c560f'
-    })
-
 security = HTTPBearer(auto_error=False)
 
 
@@ -23,7 +16,8 @@ async def verify_firebase_token(
     Usage in route:
         user: dict = Depends(verify_firebase_token)
 
-    Returns decoded token payload (uid, email, etc.) on success.
+    Returns decoded token payload (uid, email, etc.) on success. Verified
+    tokens are cached until they expire (see app.auth.token_verifier).
     """
     # Demo bypass is only permitted in non-production environments and must be
     # explicitly enabled with DEMO_AUTH_BYPASS_ENABLED=true.
@@ -41,14 +35,17 @@ async def verify_firebase_token(
     if credentials is None:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    try:
-        decoded = auth.verify_id_token(credentials.credentials)
+    # Fast path: a token verified earlier and not yet expired
+    decoded = token_verifier.cached(credentials.credentials)
+    if decoded is not None:
         return decoded
-    except auth.ExpiredIdTokenError:
+
+    try:
+        # Signature check (and a certificate fetch, if none are cached) off the loop
+        return await run_in_threadpool(token_verifier.verify, credentials.credentials)
+    except TokenExpiredError:
         raise HTTPException(status_code=401, detail="Token expired")
-    except auth.RevokedIdTokenError:
-        raise HTTPException(status_code=401, detail="Token has been revoked")
-    except auth.InvalidIdTokenError:
+    except InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
@@ -0,0 +1,327 @@
+"""
+Firebase ID Token Verifier
+
+Verifies Firebase ID tokens locally against Google's signing certificates
+and caches the decoded claims, so the request path normally costs one
+SHA-256 and a dict lookup instead of an RSA verification (and sometimes
+an HTTP certificate fetch).
+
+- Decoded tokens live in a bounded LRU keyed by the token's SHA-256
+  digest and are served only until the token's ``exp``.
+- Certificates are prefetched at startup and refreshed by a background
+  thread shortly before their Cache-Control max-age runs out.
+- A token naming an unknown ``kid`` forces a refresh (keys rotate), at most
+  once per CERT_FORCED_REFRESH_INTERVAL_SECONDS; other unknown kids are
+  rejected against the current set, so unsigned tokens cannot make every
+  request fetch certificates.
+- FIREBASE_CERTS_FILE points the store at a local {kid: PEM} JSON key set
+  for offline development and tests.
+
+Checks mirror firebase_admin.auth.verify_id_token (without revocation,
+which the API never requested): RS256 + kid header, audience = project
+id, issuer, non-empty subject (<= 128 chars), iat / exp.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from google.auth import jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FIREBASE_CERT_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+ISSUER_PREFIX = "https://securetoken.google.com/"
+
+# Used when the certificate response carries no max-age
+DEFAULT_CERT_TTL_SECONDS = 3600
+# Refresh this long before the certificates expire
+CERT_REFRESH_MARGIN_SECONDS = 300
+# Retry delay after a failed background refresh
+CERT_RETRY_SECONDS = 30
+# At most one refresh per this interval for tokens naming an unknown kid
+CERT_FORCED_REFRESH_INTERVAL_SECONDS = 60
+
+CertificateFetcher = Callable[[], Tuple[Dict[str, str], Optional[float]]]
+
+
+class TokenVerificationError(Exception):
+    """Token could not be verified."""
+
+
+class TokenExpiredError(TokenVerificationError):
+    """Token signature is fine but ``exp`` has passed."""
+
+
+class InvalidTokenError(TokenVerificationError):
+    """Malformed token, wrong project, bad signature or unknown key."""
+
+
+# ── Certificates ─────────────────────────────────────────────────────────────
+
+
+def fetch_google_certificates(url: str = FIREBASE_CERT_URL, timeout: float = 5.0):
+    """Download the {kid: PEM} map and its Cache-Control max-age."""
+    import requests
+
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    max_age = None
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    if match:
+        max_age = float(match.group(1))
+    return response.json(), max_age
+
+
+def local_certificate_fetcher(path: Path) -> CertificateFetcher:
+    """Fetcher for a local {kid: PEM} JSON key set (offline dev / tests)."""
+    def fetch():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f), None
+    return fetch
+
+
+class CertificateStore:
+    """Signing certificates with background refresh before expiry."""
+
+    def __init__(self, fetcher: Optional[CertificateFetcher] = None) -> None:
+        self._fetcher = fetcher
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fetches = 0
+        self._fetch_errors = 0
+        self._last_forced_refresh = float("-inf")
+        self._forced_refreshes_skipped = 0
+
+    def _fetch(self) -> Tuple[Dict[str, str], Optional[float]]:
+        if self._fetcher is not None:
+            return self._fetcher()
+        if settings.FIREBASE_CERTS_FILE:
+            return local_certificate_fetcher(Path(settings.FIREBASE_CERTS_FILE))()
+        return fetch_google_certificates()
+
+    def refresh(self) -> bool:
+        """Fetch certificates now; keeps the previous set on failure."""
+        try:
+            certs, max_age = self._fetch()
+        except Exception as e:
+            with self._lock:
+                self._fetch_errors += 1
+            logger.warning("Firebase certificate refresh failed: %s", e)
+            return False
+
+        ttl = max_age if max_age is not None else DEFAULT_CERT_TTL_SECONDS
+        with self._lock:
+            self._certs = dict(certs)
+            self._expires_at = time.time() + ttl
+            self._fetches += 1
+        logger.info("Firebase signing certificates refreshed (%d keys, ttl %.0fs)", len(certs), ttl)
+        return True
+
+    def refresh_for_unknown_key(self) -> bool:
+        """Forced refresh for a kid missing from the current set, rate limited.
+
+        Returns False without fetching when another forced refresh started
+        less than CERT_FORCED_REFRESH_INTERVAL_SECONDS ago.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_forced_refresh < CERT_FORCED_REFRESH_INTERVAL_SECONDS:
+                self._forced_refreshes_skipped += 1
+                return False
+            self._last_forced_refresh = now
+        return self.refresh()
+
+    def is_fresh(self) -> bool:
+        with self._lock:
+            return bool(self._certs) and time.time() < self._expires_at
+
+    def certificates(self) -> Dict[str, str]:
+        """Current certificates; fetches synchronously only when none are usable."""
+        if not self.is_fresh():
+            self.refresh()
+        with self._lock:
+            return self._certs
+
+    def _seconds_until_refresh(self) -> float:
+        with self._lock:
+            if not self._certs:
+                return CERT_RETRY_SECONDS
+            return max(CERT_RETRY_SECONDS, self._expires_at - time.time() - CERT_REFRESH_MARGIN_SECONDS)
+
+    def _refresh_loop(self) -> None:
+        self.refresh()
+        while not self._stop.wait(self._seconds_until_refresh()):
+            self.refresh()
+
+    def start_background_refresh(self) -> None:
+        """Prefetch now and keep certificates fresh from a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, name="firebase-cert-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self._certs),
+                "expires_in_seconds": max(0.0, round(self._expires_at - time.time(), 1)),
+                "fetches": self._fetches,
+                "fetch_errors": self._fetch_errors,
+                "forced_refreshes_skipped": self._forced_refreshes_skipped,
+            }
+
+
+# ── Verifier ─────────────────────────────────────────────────────────────────
+
+
+class FirebaseTokenVerifier:
+    """Verify Firebase ID tokens and cache decoded claims until ``exp``."""
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        certificates: Optional[CertificateStore] = None,
+        cache_size: Optional[int] = None,
+        clock_skew_seconds: int = 0,
+    ) -> None:
+        self.project_id = project_id or settings.FIREBASE_PROJECT_ID
+        self.certificates = certificates or CertificateStore()
+        self.cache_size = max(0, int(settings.FIREBASE_TOKEN_CACHE_SIZE if cache_size is None else cache_size))
+        self.clock_skew_seconds = clock_skew_seconds
+
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def cached(self, token: str) -> Optional[Dict[str, Any]]:
+        """Decoded claims of a previously verified, unexpired token (or None)."""
+        if not self.cache_size:
+            return None
+        key = self._digest(token)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._cache[key]
+                self._misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return dict(entry[1])
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Verify ``token``; may fetch certificates, so call it off the event loop.
+
+        Raises:
+            TokenExpiredError: token has expired
+            InvalidTokenError: any other verification failure
+        """
+        cached = self.cached(token)
+        if cached is not None:
+            return cached
+
+        claims = self._verify_uncached(token)
+        if self.cache_size:
+            with self._lock:
+                self._cache[self._digest(token)] = (float(claims["exp"]), claims)
+                self._cache.move_to_end(self._digest(token))
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return dict(claims)
+
+    def _verify_uncached(self, token: str) -> Dict[str, Any]:
+        if not isinstance(token, str) or not token:
+            raise InvalidTokenError("ID token must be a non-empty string")
+
+        try:
+            header, payload, _, _ = jwt._unverified_decode(token)
+        except Exception as e:
+            raise InvalidTokenError(f"Malformed ID token: {e}") from e
+
+        if not header.get("kid"):
+            raise InvalidTokenError('ID token has no "kid" header')
+        if header.get("alg") != "RS256":
+            raise InvalidTokenError(f'ID token has incorrect algorithm {header.get("alg")!r}')
+        if payload.get("aud") != self.project_id:
+            raise InvalidTokenError("ID token has incorrect audience")
+        if payload.get("iss") != ISSUER_PREFIX + self.project_id:
+            raise InvalidTokenError("ID token has incorrect issuer")
+        subject = payload.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise InvalidTokenError("ID token has an invalid subject")
+        try:
+            expires_at = float(payload["exp"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidTokenError("ID token has no valid exp claim") from e
+        if time.time() > expires_at + self.clock_skew_seconds:
+            raise TokenExpiredError("ID token has expired")
+
+        certs = self.certificates.certificates()
+        if header["kid"] not in certs:
+            # Keys rotate; one rate-limited forced refresh before rejecting
+            if self.certificates.refresh_for_unknown_key():
+                certs = self.certificates.certificates()
+        if header["kid"] not in certs:
+            raise InvalidTokenError("ID token signed by an unknown key")
+
+        try:
+            claims = jwt.decode(
+                token,
+                certs=certs,
+                audience=self.project_id,
+                clock_skew_in_seconds=self.clock_skew_seconds,
+            )
+        except Exception as e:
+            raise InvalidTokenError(f"ID token verification failed: {e}") from e
+
+        claims["uid"] = claims["sub"]
+        return claims
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "cached_tokens": len(self._cache),
+                "max_tokens": self.cache_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "certificates": self.certificates.stats(),
+            }
+
+
+# Singleton instance
+token_verifier = FirebaseTokenVerifier()
@@ -20,6 +20,11 @@ class Settings(BaseSettings):
     DEMO_AUTH_BYPASS_ENABLED: bool = False
     DEMO_AUTH_BYPASS_USER_ID: str = "demo-user"
     DEMO_AUTH_BYPASS_EMAIL: str = "demo@example.com"
+
+    # Firebase ID token verification
+    FIREBASE_PROJECT_ID: str = "creditscore-c560f"
+    FIREBASE_TOKEN_CACHE_SIZE: int = 10_000  # verified tokens kept until exp; 0 disables
+    FIREBASE_CERTS_FILE: str = ""  # local {kid: PEM} JSON key set (offline dev/tests)
     
     # CORS - Restrict to specific origins (NO wildcard in production)
     # Can be comma-separated string in .env: "http://localhost:3000,http://localhost:5173"
@@ -68,21 +73,91 @@ class Settings(BaseSettings):
     USE_XGBOOST: bool = True  # Set to False to use LightGBM
     XGBOOST_THRESHOLD: float = 0.86  # Optimized threshold for XGBoost
     LIGHTGBM_THRESHOLD: float = 0.12  # Optimized threshold for LightGBM
+    USE_TREE_TABLES: bool = False  # Serve from exported NumPy node tables when present
+    USE_NATIVE_MODELS: bool = True  # Load native booster files + JSON manifests over pickles when present
+    MODEL_EAGER_LOAD_ALL: bool = False  # False: the non-active regular model loads on first use
+    MODEL_LOAD_WORKERS: int = 4  # threads loading independent artifacts side by side
+
+    # Startup: models and Firebase load lazily; the warm-up phase loads them ahead of traffic
+    STARTUP_WARMUP_MODE: str = "background"  # background (port binds first) | blocking | off
+    STARTUP_PROFILE_IMPORTS: bool = False  # read in app/__init__.py, before settings exist
+
+    @property
+    def TREE_TABLE_DIR(self) -> Path:
+        table_dir = os.getenv("TREE_TABLE_DIR", "models/tree_tables")
+        if Path(table_dir).is_absolute():
+            return Path(table_dir)
+        return self.BASE_DIR / table_dir
+
+    def tree_table_path(self, artifact_path: Path) -> Path:
+        """Node-table directory exported from a model artifact"""
+        return self.TREE_TABLE_DIR / Path(artifact_path).stem
     
+    # Scoring executor (CPU-bound scoring runs off the event loop)
+    SCORING_EXECUTOR_MODE: str = "thread"  # thread | process
+    SCORING_EXECUTOR_WORKERS: int = 4
+    SCORING_EXECUTOR_MAX_QUEUE: int = 64  # waiting tasks beyond this get 503
+
+    # Micro-batching of concurrent single-row scoring calls
+    MICRO_BATCH_ENABLED: bool = False
+    MICRO_BATCH_MAX_WAIT_MS: float = 2.0  # how long the first row waits for company
+    MICRO_BATCH_MAX_ROWS: int = 64
+    MICRO_BATCH_TARGET_LATENCY_MS: float = 15.0  # batch size shrinks above this
+
+    # Scoring result cache (repeat submissions skip feature engineering and the model)
+    SCORING_CACHE_ENABLED: bool = True
+    SCORING_CACHE_MAX_ENTRIES: int = 10_000
+    SCORING_CACHE_TTL_SECONDS: float = 300.0
+
+    # Model registry / hot reload (empty URL disables; local dir or gs://bucket/prefix)
+    MODEL_REGISTRY_URL: str = ""
+    MODEL_REGISTRY_POLL_SECONDS: float = 30.0
+
+    # Metrics (Prometheus text format at /api/metrics; per-route and per-stage latency)
+    METRICS_ENABLED: bool = True
+
+    # Request tracing (per-stage spans; see app/core/tracing.py)
+    TRACE_SERVER_TIMING: str = "on_request"  # off | on_request (X-Server-Timing: 1) | always
+    TRACE_SAMPLE_RATE: float = 0.0  # share of requests appended to TRACE_EXPORT_PATH
+    # Also export requests whose traceparent has the sampled flag (always on when TRACE_SAMPLE_RATE > 0)
+    TRACE_RESPECT_PARENT_SAMPLED: bool = False
+    TRACE_EXPORT_PATH: str = "logs/traces.jsonl"  # OTLP/JSON, one resourceSpans document per line
+    TRACE_EXPORT_QUEUE_SIZE: int = 10_000  # traces beyond this are dropped and counted
+    TRACE_EXPORT_MAX_BYTES: int = 64 * 1024 * 1024  # file size cap; later traces are dropped and counted
+
     # Rate Limiting
     RATE_LIMIT_CALCULATE_LIMIT: int = 10  # requests per minute
     RATE_LIMIT_CALCULATE_TERMS: int = 10
     RATE_LIMIT_APPLY: int = 5
     RATE_LIMIT_BATCH: int = 2
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory | shared_memory | redis
+    RATE_LIMIT_KEY_BY_UID: bool = False  # key authenticated routes by Firebase uid instead of IP
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # bucket bound (memory LRU / shared-memory slots)
+    RATE_LIMIT_SHARED_MEMORY_NAME: str = "credit_scoring_rate_limit"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
 
     # Student application logging
     STUDENT_APP_LOGGING_ENABLED: bool = True
     STUDENT_APPLICATIONS_COLLECTION: str = "student_applications"
+    STUDENT_APP_LOG_QUEUE_SIZE: int = 10_000  # records beyond this are dropped and counted
+    STUDENT_APP_LOG_BATCH_SIZE: int = 500  # Firestore write-batch limit
+    STUDENT_APP_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    STUDENT_APP_LOG_DRAIN_TIMEOUT_SECONDS: float = 10.0  # shutdown drain budget
     STUDENT_DECISION_POLICY: str = "balanced"  # safe | balanced | aggressive
     STUDENT_MANUAL_REVIEW_MARGIN: float = 0.05
     STUDENT_APPROVAL_THRESHOLD_OVERRIDE: float = 0.0  # 0 disables override
+    STUDENT_POLICY_AUDIT_COLLECTION: str = "student_decision_policy_audit"
+    STUDENT_POLICY_AUDIT_FIRESTORE_ENABLED: bool = True  # runtime policy changes also go to Firestore
+    STUDENT_POLICY_SYNC_ENABLED: bool = True  # runtime policy changes are stored and polled by every instance
+    STUDENT_POLICY_COLLECTION: str = "student_decision_policy"
+    STUDENT_POLICY_POLL_SECONDS: float = 15.0
     STUDENT_MONITORING_WINDOW_HOURS: int = 24
+    STUDENT_MONITORING_AGGREGATES_ENABLED: bool = True  # False -> Firestore count() queries
+    STUDENT_MONITORING_AGGREGATES_COLLECTION: str = "student_monitoring_hourly"
+    STUDENT_MONITORING_PERSIST_INTERVAL_SECONDS: float = 10.0
     STUDENT_SCORING_REFERENCE_LOAN_AMOUNT: int = 5_000_000
+    STUDENT_BATCH_MAX_SIZE: int = 1000  # applications per /student/batch-calculate-limit call
     STUDENT_CALIBRATION_ENABLED: bool = True
     STUDENT_CALIBRATOR_FILENAME: str = "student_calibrator_isotonic.pkl"
     STUDENT_STARTUP_STRICT_PREFLIGHT: bool = False
@@ -0,0 +1,32 @@
+"""
+Firebase app initialization
+
+firebase_admin (and the Firestore client behind it) is imported and
+initialized on first use rather than at import time, so importing the
+API does not pay for it. Token verification does not need the app at
+all (see app.auth.token_verifier); Firestore writers call
+ensure_firebase_app() before creating a client.
+"""
+import logging
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+def ensure_firebase_app():
+    """Initialize the default Firebase app once; returns it."""
+    import firebase_admin
+
+    with _lock:
+        if not firebase_admin._apps:
+            # Specify projectId so the SDK knows which Firebase project to use.
+            # Uses GCP Application Default Credentials on Cloud Run.
+            firebase_admin.initialize_app(options={
+                'projectId': settings.FIREBASE_PROJECT_ID
+            })
+            logger.info("Firebase app initialized for project %s", settings.FIREBASE_PROJECT_ID)
+        return firebase_admin.get_app()
@@ -0,0 +1,357 @@
+"""
+Metrics
+
+In-process counters and histograms exported in the Prometheus text format
+at GET /api/metrics, without a client-library dependency.
+
+Scoring code marks its stages with ``stage()``:
+
+    with stage("feature_engineering"):
+        features = feature_engineer.transform_request(request)
+
+Inside a request the stage becomes a span of the request's trace
+(app.core.tracing; the context is copied into scoring-executor threads)
+and ``MetricsMiddleware`` records it once the response is sent, labelled
+with the route template, so labels stay bounded. Outside a request (background
+Firestore writer, warm-up) they are recorded straight away under
+``endpoint="background"``. With SCORING_EXECUTOR_MODE=process, stages
+that run inside worker processes are not visible to this registry; the
+route-level stages still are.
+
+Recording is a perf_counter pair, a bisect and a few additions under a
+lock; gauges (executor queue depth, cache hit rates, model versions) are
+read from the owning objects only when /metrics is scraped.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.tracing import begin_trace, current_trace, end_trace, enter_span, exit_span, span_exporter
+
+# Seconds; tuned for millisecond-scale scoring stages and sub-second requests
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+BACKGROUND = "background"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricFamily:
+    """One metric and its samples, as written in the exposition format."""
+
+    def __init__(self, name: str, documentation: str, kind: str = "gauge") -> None:
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.samples: List[Tuple[str, Dict[str, Any], float]] = []
+
+    def add(self, value: float, suffix: str = "", **labels: Any) -> "MetricFamily":
+        self.samples.append((self.name + suffix, labels, float(value)))
+        return self
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0.0)
+
+    def collect(self) -> MetricFamily:
+        # Text format 0.0.4 has no suffix convention: the family is named *_total
+        family = MetricFamily(self.name + "_total", self.documentation, self.kind)
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            family.add(value, **dict(zip(self.labelnames, labelvalues)))
+        return family
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._children: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(labelvalues)
+            if child is None:
+                child = self._children[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            child[0][index] += 1
+            child[1] += value
+            child[2] += 1
+
+    def snapshot(self, *labelvalues: str) -> Optional[Dict[str, Any]]:
+        """Count, sum and cumulative bucket counts for one label set."""
+        with self._lock:
+            child = self._children.get(labelvalues)
+            if child is None:
+                return None
+            counts, total, count = list(child[0]), child[1], child[2]
+        cumulative, running = [], 0
+        for upper, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            cumulative.append((upper, running))
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.documentation, self.kind)
+        with self._lock:
+            keys = sorted(self._children)
+        for labelvalues in keys:
+            labels = dict(zip(self.labelnames, labelvalues))
+            snap = self.snapshot(*labelvalues)
+            for upper, running in snap["buckets"]:
+                family.add(running, "_bucket", **labels, le=_format_value(upper))
+            family.add(snap["sum"], "_sum", **labels)
+            family.add(snap["count"], "_count", **labels)
+        return family
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+
+class MetricsRegistry:
+    """Named counters and histograms, rendered together with scrape-time gauges."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Any) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, extra: Iterable[MetricFamily] = ()) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        families = [metric.collect() for metric in metrics] + list(extra)
+        return "\n".join(family.render() for family in families) + "\n"
+
+    def clear(self) -> None:
+        """Drop every recorded value (tests)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+# Singleton instance
+metrics_registry = MetricsRegistry()
+
+REQUEST_SECONDS = metrics_registry.histogram(
+    "credit_api_request_duration_seconds",
+    "HTTP request latency by route template, method and status code.",
+    ("endpoint", "method", "status"),
+)
+STAGE_SECONDS = metrics_registry.histogram(
+    "credit_api_stage_duration_seconds",
+    "Latency of each scoring stage by route template.",
+    ("endpoint", "stage"),
+)
+STAGE_ERRORS = metrics_registry.counter(
+    "credit_api_stage_errors",
+    "Scoring stages that raised, by stage.",
+    ("stage",),
+)
+
+
+# ── Stage timing ─────────────────────────────────────────────────────────────
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record a stage that ran outside any request."""
+    if settings.METRICS_ENABLED:
+        STAGE_SECONDS.observe(seconds, BACKGROUND, name)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as scoring stage ``name`` (a span of the current request)."""
+    trace = current_trace()
+    if trace is None and not settings.METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    if trace is None:
+        try:
+            yield
+        except BaseException:
+            STAGE_ERRORS.inc(name)
+            raise
+        finally:
+            record_stage(name, time.perf_counter() - started)
+        return
+
+    span_id, parent_id, token = enter_span(trace)
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        STAGE_ERRORS.inc(name)
+        raise
+    finally:
+        exit_span(token)
+        trace.add(span_id, parent_id, name, started, time.perf_counter() - started, error)
+
+
+def timed_stage(name: str) -> Callable[[Callable], Callable]:
+    """Decorator form of ``stage()`` for methods that are a stage in themselves."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ── ASGI middleware ──────────────────────────────────────────────────────────
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"  # 404s and mounts: raw paths would be unbounded labels
+    return path
+
+
+def _tracing_enabled() -> bool:
+    return settings.TRACE_SERVER_TIMING in ("on_request", "always") or settings.TRACE_SAMPLE_RATE > 0
+
+
+class MetricsMiddleware:
+    """Traces each request's stages; records them as metrics, Server-Timing and sampled spans."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not (settings.METRICS_ENABLED or _tracing_enabled()):
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = begin_trace(scope.get("headers") or [])
+        status_code = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trace.timing_requested or trace.has_trace_id:
+                    headers = list(message.get("headers", []))
+                    if trace.timing_requested:
+                        elapsed = time.perf_counter() - trace.started
+                        headers.append((b"server-timing", trace.server_timing(elapsed).encode("latin-1")))
+                    headers.append((b"x-trace-id", trace.trace_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - trace.started
+            end_trace(token)
+            endpoint = _route_template(scope)
+            if settings.METRICS_ENABLED:
+                REQUEST_SECONDS.observe(elapsed, endpoint, scope["method"], str(status_code))
+                for _, _, name, _, seconds, _ in trace.spans:
+                    STAGE_SECONDS.observe(seconds, endpoint, name)
+            if trace.sampled:
+                span_exporter.submit(
+                    trace,
+                    f"{scope['method']} {endpoint}",
+                    {
+                        "http.request.method": scope["method"],
+                        "http.route": endpoint,
+                        "http.response.status_code": status_code,
+                    },
+                    elapsed,
+                    status_code >= 500,
+                )
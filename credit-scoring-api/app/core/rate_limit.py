@@ -0,0 +1,540 @@
+"""
+Rate Limiting
+
+One limiter for every rate-limited route. Each (route, client) pair gets a
+token bucket: ``capacity`` tokens refilled at ``capacity / period``
+tokens per second, one token per request, so every check is O(1) and a
+full bucket carries no information (it can be forgotten). Clients are
+keyed by IP, or by Firebase uid when RATE_LIMIT_KEY_BY_UID is set.
+
+Backends (RATE_LIMIT_BACKEND):
+- memory: per-process LRU of buckets, bounded by RATE_LIMIT_MAX_KEYS;
+  buckets that have refilled completely are dropped first.
+- shared_memory: a fixed-size bucket table in POSIX shared memory, shared
+  by every worker on the host (e.g. ``uvicorn --workers 4``).
+- redis: buckets in Redis, updated atomically by a Lua script over the
+  plain RESP protocol; keys expire once refilled.
+
+Backend errors fail open (the request is allowed) and are counted, as are
+checks, rejections and the limiter's own time per check.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import math
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.security import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``capacity`` requests per ``period`` seconds."""
+
+    capacity: int
+    period: int
+    text: str
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse slowapi-style strings such as ``10/minute``."""
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*", value)
+        if not match:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        capacity, unit = int(match.group(1)), match.group(2)
+        return cls(capacity=capacity, period=_PERIODS[unit], text=f"{capacity} per 1 {unit}")
+
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, limit: RateLimit, retry_after: float) -> None:
+        self.limit = limit
+        super().__init__(
+            status_code=429,
+            detail=limit.text,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    """Same body as slowapi's handler so clients see no change."""
+    return JSONResponse(
+        {"error": f"Rate limit exceeded: {exc.detail}"},
+        status_code=429,
+        headers=exc.headers,
+    )
+
+
+def _refill(tokens: float, last: float, now: float, limit: RateLimit) -> float:
+    return min(float(limit.capacity), tokens + max(0.0, now - last) * limit.refill_per_second)
+
+
+def _take(tokens: float, limit: RateLimit) -> Tuple[bool, float, float]:
+    """(allowed, tokens_left, retry_after_seconds) for one request."""
+    if tokens >= 1.0:
+        return True, tokens - 1.0, 0.0
+    return False, tokens, (1.0 - tokens) / limit.refill_per_second
+
+
+# ── Backends ─────────────────────────────────────────────────────────────────
+
+
+class MemoryBucketStore:
+    """Per-process buckets in an LRU bounded by ``max_keys``."""
+
+    blocking_io = False
+
+    def __init__(self, max_keys: Optional[int] = None) -> None:
+        self.max_keys = max(1, int(settings.RATE_LIMIT_MAX_KEYS if max_keys is None else max_keys))
+        # key -> [tokens, last_refill, full_at]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._expired = 0
+        self._evicted = 0
+
+    def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = float(limit.capacity) if bucket is None else _refill(bucket[0], bucket[1], now, limit)
+            allowed, tokens, retry_after = _take(tokens, limit)
+            full_at = now + (limit.capacity - tokens) / limit.refill_per_second
+            if bucket is None:
+                self._buckets[key] = [tokens, now, full_at]
+            else:
+                bucket[0], bucket[1], bucket[2] = tokens, now, full_at
+                self._buckets.move_to_end(key)
+            self._trim(now)
+        return allowed, retry_after
+
+    def _trim(self, now: float) -> None:
+        """Drop refilled buckets from the LRU end, then enforce the bound (lock held)."""
+        for _ in range(2):
+            if not self._buckets:
+                break
+            oldest_key = next(iter(self._buckets))
+            if self._buckets[oldest_key][2] > now:
+                break
+            del self._buckets[oldest_key]
+            self._expired += 1
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self._evicted += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "keys": len(self._buckets),
+                "max_keys": self.max_keys,
+                "expired": self._expired,
+                "evicted": self._evicted,
+            }
+
+
+class SharedMemoryBucketStore:
+    """Fixed-size open-addressing bucket table shared by all local workers.
+
+    Each slot holds (key hash, tokens, last refill, full_at); a bucket is
+    placed in one of ``PROBES`` slots after its hash and, when all are
+    taken, replaces the slot that refills soonest. Updates are serialized
+    with ``flock`` on a lock file next to the segment. The segment outlives
+    individual workers on purpose; ``unlink()`` removes it.
+    """
+
+    blocking_io = False
+    PROBES = 8
+
+    def __init__(self, name: Optional[str] = None, max_keys: Optional[int] = None) -> None:
+        import numpy as np
+        from multiprocessing import resource_tracker, shared_memory
+
+        self.name = name or settings.RATE_LIMIT_SHARED_MEMORY_NAME
+        self.slots = max(self.PROBES, int(settings.RATE_LIMIT_MAX_KEYS if max_keys is None else max_keys))
+        self._dtype = np.dtype([("key", "<u8"), ("tokens", "<f8"), ("last", "<f8"), ("full_at", "<f8")])
+        size = self._dtype.itemsize * self.slots
+
+        try:
+            # New POSIX segments are zero-filled: every slot starts empty
+            self._shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+            if self._shm.size < size:
+                raise ValueError(
+                    f"Shared rate-limit table {self.name} holds fewer than {self.slots} slots"
+                )
+        # Keep the segment when this worker exits; other workers still use it
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        self._table = np.ndarray((self.slots,), dtype=self._dtype, buffer=self._shm.buf)
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+        self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._thread_lock = threading.Lock()
+        self._evicted = 0
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1  # 0 marks an empty slot
+
+    def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        import fcntl
+
+        key_hash = self._hash(key)
+        start = key_hash % self.slots
+        now = time.time()
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                table = self._table
+                slot, victim, victim_full_at = -1, start, math.inf
+                for probe in range(self.PROBES):
+                    index = (start + probe) % self.slots
+                    stored = int(table["key"][index])
+                    if stored == key_hash:
+                        slot = index
+                        break
+                    full_at = 0.0 if stored == 0 else float(table["full_at"][index])
+                    if full_at < victim_full_at:
+                        victim, victim_full_at = index, full_at
+
+                if slot >= 0:
+                    tokens = _refill(float(table["tokens"][slot]), float(table["last"][slot]), now, limit)
+                else:
+                    slot = victim
+                    if victim_full_at > now:
+                        self._evicted += 1
+                    tokens = float(limit.capacity)
+
+                allowed, tokens, retry_after = _take(tokens, limit)
+                table["key"][slot] = key_hash
+                table["tokens"][slot] = tokens
+                table["last"][slot] = now
+                table["full_at"][slot] = now + (limit.capacity - tokens) / limit.refill_per_second
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        return allowed, retry_after
+
+    def reset(self) -> None:
+        with self._thread_lock:
+            self._table["key"][:] = 0
+
+    def close(self) -> None:
+        self._table = None
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self) -> None:
+        from multiprocessing import shared_memory
+
+        self.close()
+        try:
+            segment = shared_memory.SharedMemory(name=self.name)
+            segment.close()
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._thread_lock:
+            occupied = int((self._table["key"] != 0).sum())
+            live = int(((self._table["key"] != 0) & (self._table["full_at"] > time.time())).sum())
+        return {
+            "backend": "shared_memory",
+            "name": self.name,
+            "slots": self.slots,
+            "occupied_slots": occupied,
+            "live_buckets": live,
+            "evicted": self._evicted,
+        }
+
+
+# Token bucket update executed atomically inside Redis. Uses the server
+# clock so all API instances agree; the key expires once it has refilled.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+TOKEN_BUCKET_SHA = hashlib.sha1(TOKEN_BUCKET_LUA.encode("utf-8")).hexdigest()
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RespConnection:
+    """Minimal blocking RESP2 client (one socket, used under a lock)."""
+
+    def __init__(self, url: str, timeout: float = 0.5) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", self.db)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._reader = None
+
+    def execute(self, *args: Any) -> Any:
+        if self._sock is None:
+            self._connect()
+        try:
+            return self._roundtrip(*args)
+        except (OSError, EOFError):
+            self.close()
+            raise
+
+    def _roundtrip(self, *args: Any) -> Any:
+        self._sock.sendall(encode_command(args))
+        return read_reply(self._reader)
+
+
+def encode_command(args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def read_reply(reader) -> Any:
+    line = reader.readline()
+    if not line:
+        raise EOFError("Connection closed by server")
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b"+":
+        return body.decode("utf-8")
+    if prefix == b"-":
+        raise RespError(body.decode("utf-8"))
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2].decode("utf-8")
+    if prefix == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [read_reply(reader) for _ in range(length)]
+    raise RespError(f"Unexpected reply prefix {prefix!r}")
+
+
+class RedisBucketStore:
+    """Buckets in Redis (or anything speaking its protocol), one round-trip per check."""
+
+    blocking_io = True
+
+    def __init__(self, url: Optional[str] = None, key_prefix: str = "ratelimit:") -> None:
+        self.url = url or settings.RATE_LIMIT_REDIS_URL
+        self.key_prefix = key_prefix
+        self._conn = RespConnection(self.url)
+        self._lock = threading.Lock()
+        self._round_trips = 0
+
+    def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        args = (1, self.key_prefix + key, limit.capacity, repr(limit.refill_per_second))
+        with self._lock:
+            try:
+                reply = self._conn.execute("EVALSHA", TOKEN_BUCKET_SHA, *args)
+            except RespError as e:
+                if not str(e).startswith("NOSCRIPT"):
+                    raise
+                reply = self._conn.execute("EVAL", TOKEN_BUCKET_LUA, *args)
+                self._round_trips += 1
+            self._round_trips += 1
+        allowed, retry_after = reply
+        return int(allowed) == 1, float(retry_after)
+
+    def reset(self) -> None:
+        """Buckets expire on their own in Redis; nothing to clear locally."""
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        parsed = urlparse(self.url)
+        return {
+            "backend": "redis",
+            "server": f"{parsed.hostname}:{parsed.port or 6379}",
+            "round_trips": self._round_trips,
+        }
+
+
+# ── Limiter ──────────────────────────────────────────────────────────────────
+
+
+def create_bucket_store(backend: Optional[str] = None):
+    backend = (backend or settings.RATE_LIMIT_BACKEND).lower()
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "shared_memory":
+        return SharedMemoryBucketStore()
+    if backend == "redis":
+        return RedisBucketStore()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
+
+
+class RateLimiter:
+    """Decorator-based limiter shared by all routes (slowapi-compatible usage)."""
+
+    def __init__(self, store: Optional[Any] = None, key_by_uid: Optional[bool] = None) -> None:
+        self._store = store
+        self._key_by_uid = key_by_uid
+        self._store_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._checks = 0
+        self._rejected = 0
+        self._backend_errors = 0
+        self._overhead_ns = 0
+        self._overhead_ns_max = 0
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = create_bucket_store()
+        return self._store
+
+    @property
+    def key_by_uid(self) -> bool:
+        return settings.RATE_LIMIT_KEY_BY_UID if self._key_by_uid is None else self._key_by_uid
+
+    def client_key(self, request: Request, user: Optional[dict] = None) -> str:
+        """Firebase uid when enabled and known, otherwise the client IP."""
+        if self.key_by_uid and isinstance(user, dict) and user.get("uid"):
+            return f"uid:{user['uid']}"
+        return f"ip:{get_client_ip(request)}"
+
+    def check(self, scope: str, identity: str, limit: RateLimit) -> None:
+        """Consume one token; raises RateLimitExceeded when the bucket is empty."""
+        started = time.perf_counter_ns()
+        allowed, retry_after = True, 0.0
+        try:
+            allowed, retry_after = self.store.hit(f"{scope}:{identity}", limit)
+        except Exception as e:
+            with self._counter_lock:
+                self._backend_errors += 1
+            logger.warning("Rate limit backend error (failing open): %s", e)
+        elapsed = time.perf_counter_ns() - started
+        with self._counter_lock:
+            self._checks += 1
+            self._overhead_ns += elapsed
+            self._overhead_ns_max = max(self._overhead_ns_max, elapsed)
+            if not allowed:
+                self._rejected += 1
+        if not allowed:
+            raise RateLimitExceeded(limit, retry_after)
+
+    def limit(self, limit_value: str) -> Callable:
+        """Route decorator; the route must take ``request: Request``."""
+        limit = RateLimit.parse(limit_value)
+
+        def decorator(func: Callable) -> Callable:
+            scope = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if settings.RATE_LIMIT_ENABLED:
+                    request = kwargs.get("request")
+                    if not isinstance(request, Request):
+                        raise RuntimeError(f"{scope} needs a 'request: Request' parameter to be rate limited")
+                    identity = self.client_key(request, kwargs.get("user"))
+                    if self.store.blocking_io:
+                        await run_in_threadpool(self.check, scope, identity, limit)
+                    else:
+                        self.check(scope, identity, limit)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self) -> None:
+        """Forget all buckets (tests)."""
+        self.store.reset()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            checks = self._checks
+            stats = {
+                "enabled": settings.RATE_LIMIT_ENABLED,
+                "key_by_uid": self.key_by_uid,
+                "checks": checks,
+                "rejected": self._rejected,
+                "backend_errors": self._backend_errors,
+                "overhead_us_avg": round(self._overhead_ns / checks / 1000, 2) if checks else 0.0,
+                "overhead_us_max": round(self._overhead_ns_max / 1000, 2),
+            }
+        stats["store"] = self.store.stats()
+        return stats
+
+
+# Singleton instance
+rate_limiter = RateLimiter()
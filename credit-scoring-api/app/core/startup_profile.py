@@ -0,0 +1,194 @@
+"""
+Startup Profile
+
+Where the API process spends its time before it can serve: the import
+cost of each module and the cost of each initialization phase (model
+loading, Firebase, warm-up scoring).
+
+Import timing needs a hook installed before ``app`` modules are imported.
+Set STARTUP_PROFILE_IMPORTS=1 (checked in ``app/__init__.py``) or run
+``python scripts/profile_startup.py``, which installs the hook, imports
+app.main, runs the warm-up and prints the report. Initialization phases
+are always recorded; the report is logged once warm-up finishes and is
+returned under ``startup`` in /scoring/stats.
+"""
+from __future__ import annotations
+
+import importlib.abc
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module loader and times exec_module."""
+
+    def __init__(self, loader: Any, profiler: "ImportProfiler") -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        with self._profiler.timing(module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Meta-path finder that records inclusive and self import time per module.
+
+    Every module imported while installed is timed (so third-party cost
+    shows up under the app module that pulled it in); nested imports are
+    subtracted to get each module's self time.
+    """
+
+    def __init__(self) -> None:
+        self.inclusive: Dict[str, float] = {}
+        self.self_time: Dict[str, float] = {}
+        self.order: List[str] = []
+        self._local = threading.local()
+        self._installed_at: Optional[float] = None
+
+    def install(self) -> "ImportProfiler":
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+            self._installed_at = time.perf_counter()
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    @contextmanager
+    def timing(self, name: str) -> Iterator[None]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # children's inclusive time
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.inclusive[name] = elapsed
+            self.self_time[name] = max(elapsed - children, 0.0)
+            self.order.append(name)
+
+    def top(self, limit: int = 25, prefixes: Sequence[str] = ()) -> List[Tuple[str, float, float]]:
+        """(module, inclusive s, self s), most expensive first."""
+        rows = [
+            (name, self.inclusive[name], self.self_time[name])
+            for name in self.order
+            if not prefixes or name.split(".")[0] in prefixes
+        ]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:limit]
+
+    def by_package(self) -> Dict[str, float]:
+        """Self time summed per top-level package."""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.self_time.items():
+            package = name.split(".")[0]
+            totals[package] = totals.get(package, 0.0) + seconds
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+class StartupProfile:
+    """Collects import timings (when profiled) and initialization phases."""
+
+    def __init__(self) -> None:
+        self.process_started = time.perf_counter()
+        self.imports: Optional[ImportProfiler] = None
+        self._phases: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def enable_import_profiling(self) -> ImportProfiler:
+        if self.imports is None:
+            self.imports = ImportProfiler().install()
+        return self.imports
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time one initialization step (runs on whichever thread does the work)."""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record = {
+                "name": name,
+                "seconds": round(time.perf_counter() - started, 4),
+                "started_after_seconds": round(started - self.process_started, 4),
+                "thread": threading.current_thread().name,
+                "error": error,
+            }
+            with self._lock:
+                self._phases.append(record)
+            logger.info("Startup phase %s took %.3fs", name, record["seconds"])
+
+    def phases(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._phases)
+
+    def report(self, limit: int = 25) -> Dict[str, Any]:
+        report: Dict[str, Any] = {"phases": self.phases(), "imports": None}
+        if self.imports is not None:
+            report["imports"] = {
+                "modules_timed": len(self.imports.order),
+                "by_package_self_seconds": {
+                    package: round(seconds, 4)
+                    for package, seconds in list(self.imports.by_package().items())[:limit]
+                },
+                "app_modules": [
+                    {"module": name, "inclusive_seconds": round(incl, 4), "self_seconds": round(own, 4)}
+                    for name, incl, own in self.imports.top(limit, prefixes=("app",))
+                ],
+            }
+        return report
+
+    def format_table(self, limit: int = 25) -> str:
+        """Plain-text report for logs and the profiling script."""
+        lines = []
+        if self.imports is not None:
+            lines.append(f"{'module':<48} {'inclusive s':>12} {'self s':>10}")
+            for name, incl, own in self.imports.top(limit, prefixes=("app",)):
+                lines.append(f"{name:<48} {incl:>12.3f} {own:>10.3f}")
+            lines.append("")
+            lines.append(f"{'package (self time)':<48} {'seconds':>12}")
+            for package, seconds in list(self.imports.by_package().items())[:limit]:
+                lines.append(f"{package:<48} {seconds:>12.3f}")
+            lines.append("")
+        lines.append(f"{'phase':<48} {'seconds':>12} {'at s':>10}")
+        for phase in self.phases():
+            lines.append(f"{phase['name']:<48} {phase['seconds']:>12.3f} {phase['started_after_seconds']:>10.3f}")
+        return "\n".join(lines)
+
+
+# Singleton instance
+startup_profile = StartupProfile()
@@ -0,0 +1,310 @@
+"""
+Request Tracing
+
+Every HTTP request carries a ``RequestTrace``: the spans of the scoring
+stages it ran (``app.core.metrics.stage``), nested by the stage that was
+open when each one started. The context, and with it the trace, is copied
+into scoring-executor threads. A micro-batch is traced on the request that
+opened it.
+
+The trace is used three ways:
+
+- metrics: ``MetricsMiddleware`` feeds each span into the stage histograms
+- Server-Timing: with TRACE_SERVER_TIMING=on_request the response carries
+  ``Server-Timing: feature_engineering;dur=0.41, predict_proba;dur=1.2, ...``
+  when the request sends ``X-Server-Timing: 1`` (``always`` sends it on
+  every response); X-Trace-Id names the trace
+- span export: sampled requests are appended to TRACE_EXPORT_PATH as one
+  OTLP/JSON ``resourceSpans`` document per line, the format the
+  OpenTelemetry Collector's otlpjsonfile receiver reads. TRACE_SAMPLE_RATE
+  samples requests; an incoming W3C ``traceparent`` with the sampled flag
+  is only honoured once the operator opts in (TRACE_SAMPLE_RATE > 0 or
+  TRACE_RESPECT_PARENT_SAMPLED), since any caller can set it
+
+Clients that send ``traceparent`` get their trace id reused, so a slow
+session in the app can be matched to the server's stages. Export runs on
+a background thread behind a bounded queue; a full queue, or a file that
+has reached TRACE_EXPORT_MAX_BYTES, drops traces and counts them.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TIMING_REQUEST_HEADER = b"x-server-timing"
+TRACEPARENT_HEADER = b"traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# (span id, parent span id, name, start offset seconds, duration seconds, error)
+Span = Tuple[int, int, str, float, float, bool]
+
+ROOT_SPAN = 0
+
+
+class RequestTrace:
+    """Stage spans recorded while one request is handled."""
+
+    __slots__ = (
+        "started", "started_ns", "spans", "sampled", "timing_requested",
+        "parent_trace_id", "parent_span_id", "_trace_id", "_ids",
+    )
+
+    def __init__(
+        self,
+        sampled: bool = False,
+        timing_requested: bool = False,
+        parent_trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+    ) -> None:
+        self.started = time.perf_counter()
+        self.started_ns = time.time_ns()
+        self.spans: List[Span] = []
+        self.sampled = sampled
+        self.timing_requested = timing_requested
+        self.parent_trace_id = parent_trace_id
+        self.parent_span_id = parent_span_id
+        self._trace_id: Optional[str] = parent_trace_id
+        self._ids = itertools.count(ROOT_SPAN + 1)
+
+    @property
+    def trace_id(self) -> str:
+        """W3C trace id: the caller's, or generated on first use."""
+        if self._trace_id is None:
+            self._trace_id = secrets.token_hex(16)
+        return self._trace_id
+
+    @property
+    def has_trace_id(self) -> bool:
+        return self._trace_id is not None
+
+    def next_span_id(self) -> int:
+        return next(self._ids)  # count.__next__ is atomic across threads
+
+    def add(self, span_id: int, parent_id: int, name: str, started: float, seconds: float, error: bool) -> None:
+        self.spans.append((span_id, parent_id, name, started - self.started, seconds, error))
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing value: milliseconds per stage name (repeats summed), then total."""
+        durations: Dict[str, float] = {}
+        for _, _, name, _, seconds, _ in self.spans:
+            durations[name] = durations.get(name, 0.0) + seconds
+        durations["total"] = total_seconds
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in durations.items())
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+_current_span: ContextVar[int] = ContextVar("request_span", default=ROOT_SPAN)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def begin_trace(headers: List[Tuple[bytes, bytes]]) -> Tuple[RequestTrace, Any]:
+    """Start the trace for a request from its raw ASGI headers; returns (trace, reset token)."""
+    timing_mode = settings.TRACE_SERVER_TIMING
+    timing_requested = timing_mode == "always"
+    parent_trace_id = parent_span_id = None
+    parent_sampled = False
+    for key, value in headers:
+        if key == TIMING_REQUEST_HEADER and timing_mode == "on_request":
+            timing_requested = value.strip() not in (b"", b"0", b"false")
+        elif key == TRACEPARENT_HEADER:
+            match = _TRACEPARENT.match(value.decode("latin-1").strip().lower())
+            if match and match.group(1) != "0" * 32:
+                parent_trace_id, parent_span_id = match.group(1), match.group(2)
+                parent_sampled = bool(int(match.group(3), 16) & 0x01)
+
+    rate = settings.TRACE_SAMPLE_RATE
+    # The sampled flag is caller-controlled: follow it only when exporting is enabled
+    respect_parent = rate > 0 or settings.TRACE_RESPECT_PARENT_SAMPLED
+    sampled = (parent_sampled and respect_parent) or (rate > 0 and random.random() < rate)
+    trace = RequestTrace(sampled, timing_requested, parent_trace_id, parent_span_id)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token: Any) -> None:
+    _current_trace.reset(token)
+
+
+def enter_span(trace: RequestTrace) -> Tuple[int, int, Any]:
+    """Open a child of the current span; returns (span id, parent id, reset token)."""
+    span_id = trace.next_span_id()
+    parent_id = _current_span.get()
+    return span_id, parent_id, _current_span.set(span_id)
+
+
+def exit_span(token: Any) -> None:
+    _current_span.reset(token)
+
+
+# ── OTLP/JSON export ─────────────────────────────────────────────────────────
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp(trace: RequestTrace, name: str, attributes: Dict[str, Any], seconds: float, error: bool) -> Dict[str, Any]:
+    """One request as an OTLP/JSON ExportTraceServiceRequest document."""
+    trace_id = trace.trace_id
+    span_ids = {ROOT_SPAN: secrets.token_hex(8)}
+    for span in trace.spans:
+        span_ids[span[0]] = secrets.token_hex(8)
+
+    root = {
+        "traceId": trace_id,
+        "spanId": span_ids[ROOT_SPAN],
+        "name": name,
+        "kind": "SPAN_KIND_SERVER",
+        "startTimeUnixNano": str(trace.started_ns),
+        "endTimeUnixNano": str(trace.started_ns + int(seconds * 1e9)),
+        "attributes": [_attribute(k, v) for k, v in attributes.items()],
+        "status": {"code": "STATUS_CODE_ERROR" if error else "STATUS_CODE_UNSET"},
+    }
+    if trace.parent_span_id:
+        root["parentSpanId"] = trace.parent_span_id
+
+    spans = [root]
+    for span_id, parent_id, stage_name, offset, duration, failed in trace.spans:
+        start_ns = trace.started_ns + int(offset * 1e9)
+        spans.append({
+            "traceId": trace_id,
+            "spanId": span_ids[span_id],
+            "parentSpanId": span_ids.get(parent_id, span_ids[ROOT_SPAN]),
+            "name": stage_name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(duration * 1e9)),
+            "status": {"code": "STATUS_CODE_ERROR" if failed else "STATUS_CODE_UNSET"},
+        })
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                _attribute("service.name", settings.PROJECT_NAME),
+                _attribute("service.version", settings.VERSION),
+                _attribute("deployment.environment", settings.ENVIRONMENT),
+                _attribute("process.pid", os.getpid()),
+            ]},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class SpanExporter:
+    """Appends traces to a JSONL file from a background thread."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_queue: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.path = Path(path or settings.TRACE_EXPORT_PATH)
+        if not self.path.is_absolute():
+            self.path = settings.BASE_DIR / self.path
+        self._queue: "queue.Queue[Optional[Tuple]]" = queue.Queue(
+            maxsize=max(1, int(max_queue or settings.TRACE_EXPORT_QUEUE_SIZE))
+        )
+        self.max_bytes = max(0, int(settings.TRACE_EXPORT_MAX_BYTES if max_bytes is None else max_bytes))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._exported = 0
+        self._dropped = 0
+        self._dropped_size = 0
+        self._errors = 0
+
+    def submit(self, trace: RequestTrace, name: str, attributes: Dict[str, Any], seconds: float, error: bool) -> bool:
+        """Queue a finished request for export; False (and counted) when the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((trace, name, attributes, seconds, error))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = self.path.stat().st_size if self.path.exists() else 0
+        with open(self.path, "a", encoding="utf-8") as out:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    out.flush()
+                    return
+                try:
+                    line = json.dumps(to_otlp(*item), separators=(",", ":")) + "\n"
+                    if size + len(line) > self.max_bytes:
+                        # The file may live in memory (Cloud Run); never grow it past the cap
+                        with self._lock:
+                            self._dropped_size += 1
+                            first = self._dropped_size == 1
+                        if first:
+                            logger.warning("Trace export file reached %d bytes; dropping traces", self.max_bytes)
+                    else:
+                        out.write(line)  # ASCII only (json.dumps escapes), so len() is the byte count
+                        size += len(line)
+                        with self._lock:
+                            self._exported += 1
+                except Exception as e:
+                    with self._lock:
+                        self._errors += 1
+                    logger.warning("Span export failed: %s", e)
+                if self._queue.empty():
+                    out.flush()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "sample_rate": settings.TRACE_SAMPLE_RATE,
+                "queued": self._queue.qsize(),
+                "exported": self._exported,
+                "dropped_queue_full": self._dropped,
+                "dropped_size_cap": self._dropped_size,
+                "max_bytes": self.max_bytes,
+                "errors": self._errors,
+            }
+
+
+# Singleton instance
+span_exporter = SpanExporter()
@@ -1,13 +1,18 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from starlette.concurrency import run_in_threadpool
 from app.api.routes import router as api_router
+from app.auth.token_verifier import token_verifier
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.core.security import get_client_ip
-from app.services.student_prediction_service import student_prediction_service
+from app.core.metrics import MetricsMiddleware
+from app.core.tracing import span_exporter
+from app.core.rate_limit import RateLimitExceeded, rate_limit_exceeded_handler, rate_limiter
+from app.services.scoring_executor import scoring_executor
+from app.services.student_application_logger import student_application_logger
+from app.services.decision_policy import decision_policy_audit, decision_policy_sync
+from app.services.model_registry import model_registry
+from app.services.warmup import warmup
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,9 +20,6 @@ logger = logging.getLogger(__name__)
 # Setup logging
 setup_logging()
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_client_ip)
-
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
@@ -27,8 +29,8 @@ app = FastAPI(
 )
 
 # Add rate limiter to app state
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.state.limiter = rate_limiter
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
 # CORS middleware - Now with restricted origins
 app.add_middleware(
@@ -39,6 +41,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request and scoring-stage latency metrics, Server-Timing and sampled span export
+app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
@@ -69,20 +74,39 @@ async def startup_event():
         settings.STUDENT_DECISION_POLICY,
         settings.STUDENT_MANUAL_REVIEW_MARGIN,
     )
-    strict_student_preflight = settings.STUDENT_STARTUP_STRICT_PREFLIGHT
-    student_preflight = student_prediction_service.validate_runtime_assets(
-        strict=strict_student_preflight
+    logger.info(
+        "Rate limiting: %s (backend=%s, key=%s)",
+        "Enabled" if settings.RATE_LIMIT_ENABLED else "Disabled",
+        settings.RATE_LIMIT_BACKEND,
+        "uid" if settings.RATE_LIMIT_KEY_BY_UID else "ip",
     )
-    if student_preflight["ok"]:
-        logger.info("Student model preflight: OK")
-    else:
-        logger.warning(
-            "Student model preflight issues: %s",
-            student_preflight["issues"],
-        )
-    if student_preflight["warnings"]:
-        logger.warning(
-            "Student model preflight warnings: %s",
-            student_preflight["warnings"],
-        )
-    logger.info(f"Rate limiting: Enabled")
\ No newline at end of file
+    logger.info(
+        "Scoring executor: mode=%s workers=%d max_queue=%d",
+        scoring_executor.mode,
+        scoring_executor.workers,
+        scoring_executor.max_queue,
+    )
+    # Models load lazily; warm them up ahead of traffic (see app.services.warmup)
+    if warmup.mode == "blocking":
+        await run_in_threadpool(warmup.run)
+    elif warmup.mode == "background":
+        warmup.start_background()
+    # Prefetch Firebase signing certificates and keep them fresh off the request path
+    token_verifier.certificates.start_background_refresh()
+    # Hot-reload new model versions from the registry without restarting
+    model_registry.start()
+    # Serve the stored student decision policy and follow changes made on other instances
+    decision_policy_sync.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    model_registry.stop()
+    decision_policy_sync.stop()
+    scoring_executor.shutdown()
+    token_verifier.certificates.stop()
+    span_exporter.close()
+    # Drain queued student application logs and policy audit records to Firestore
+    student_application_logger.close()
+    decision_policy_audit.close()
@@ -482,6 +482,36 @@ class StudentCreditScoreResponse(BaseModel):
         }
 
 
+class StudentDecisionPolicyName(str, Enum):
+    SAFE = "safe"
+    BALANCED = "balanced"
+    AGGRESSIVE = "aggressive"
+
+
+class StudentDecisionPolicyUpdate(BaseModel):
+    """Request for PUT /api/student/decision-policy; omitted fields keep their current value."""
+
+    policy: Optional[StudentDecisionPolicyName] = Field(None, description="Decision policy profile")
+    manual_review_margin: Optional[float] = Field(
+        None, description="Manual review window width", ge=0, le=0.25
+    )
+    approval_threshold_override: Optional[float] = Field(
+        None, description="Approval threshold replacing the model's own; 0 removes the override", ge=0, lt=1
+    )
+    changed_by: Optional[str] = Field(None, description="Who made the change (audit log)", max_length=200)
+    reason: Optional[str] = Field(None, description="Why the change was made (audit log)", max_length=500)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "policy": "safe",
+                "manual_review_margin": 0.10,
+                "changed_by": "risk-team",
+                "reason": "Canary at 10%: widen manual review",
+            }
+        }
+
+
 class ModelInfoResponse(BaseModel):
 
     """Response schema for model information"""
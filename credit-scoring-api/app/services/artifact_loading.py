@@ -0,0 +1,174 @@
+"""
+Artifact Loading
+
+Loads independent model artifacts (model pickles, metadata, thresholds,
+calibrators) concurrently on a small thread pool and records how long
+each one took and how much resident memory it added. The records form
+the startup report logged once the API is up and returned under
+``model_loading`` in /scoring/stats; registry hot reloads and lazily
+loaded fallback models are recorded the same way.
+
+RSS deltas are process-wide: artifacts loading side by side share the
+growth between them, so treat the per-artifact figure as approximate and
+the total as exact.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass(frozen=True)
+class ArtifactLoadRecord:
+    """Timing and memory cost of loading one artifact."""
+
+    name: str
+    group: str
+    path: str
+    seconds: float
+    rss_delta_mb: float
+    lazy: bool = False
+    error: Optional[str] = None
+
+
+class ArtifactLoadReport:
+    """Runs artifact loaders (optionally in parallel) and keeps their records."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_records: int = 200) -> None:
+        self.max_workers = max(1, int(settings.MODEL_LOAD_WORKERS if max_workers is None else max_workers))
+        self._records: Deque[ArtifactLoadRecord] = deque(maxlen=max_records)
+        self._groups: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def timed(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        group: str = "startup",
+        path: Any = "",
+        lazy: bool = False,
+    ) -> Any:
+        """Run ``loader`` and record its wall time and RSS growth."""
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        error = None
+        try:
+            return loader()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record = ArtifactLoadRecord(
+                name=name,
+                group=group,
+                path=str(path),
+                seconds=round(time.perf_counter() - started, 4),
+                rss_delta_mb=round((current_rss_bytes() - rss_before) / 1e6, 2),
+                lazy=lazy,
+                error=error,
+            )
+            with self._lock:
+                self._records.append(record)
+            logger.info(
+                "Loaded %s/%s in %.3fs (RSS %+.1f MB)%s",
+                group,
+                name,
+                record.seconds,
+                record.rss_delta_mb,
+                " [lazy]" if lazy else "",
+            )
+
+    def load_concurrently(
+        self,
+        loaders: Dict[str, Callable[[], Any]],
+        group: str = "startup",
+        paths: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run independent loaders side by side; returns name -> result.
+
+        The first loader to fail re-raises after the others have finished,
+        so a broken artifact never leaves a half-loaded set behind.
+        """
+        paths = paths or {}
+        started = time.perf_counter()
+        workers = min(self.max_workers, len(loaders))
+        if workers <= 1:
+            results = {
+                name: self.timed(name, loader, group, paths.get(name, ""))
+                for name, loader in loaders.items()
+            }
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifact-load") as pool:
+                futures = {
+                    name: pool.submit(self.timed, name, loader, group, paths.get(name, ""))
+                    for name, loader in loaders.items()
+                }
+            results = {name: future.result() for name, future in futures.items()}
+        with self._lock:
+            elapsed = time.perf_counter() - started
+            self._groups[group] = round(self._groups.get(group, 0.0) + elapsed, 4)
+        return results
+
+    def records(self, group: Optional[str] = None) -> List[ArtifactLoadRecord]:
+        with self._lock:
+            return [r for r in self._records if group is None or r.group == group]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            records = list(self._records)
+            groups = dict(self._groups)
+        return {
+            "workers": self.max_workers,
+            "group_wall_seconds": groups,
+            "artifact_seconds_total": round(sum(r.seconds for r in records), 4),
+            "rss_mb": round(current_rss_bytes() / 1e6, 1),
+            "artifacts": [asdict(r) for r in records],
+        }
+
+    def log_summary(self, group: str = "startup") -> None:
+        """One line per artifact, slowest first."""
+        records = sorted(self.records(group), key=lambda r: r.seconds, reverse=True)
+        with self._lock:
+            wall = self._groups.get(group)
+        logger.info(
+            "Artifact load report (%s): %d artifacts, %.3fs summed, %s wall, RSS now %.1f MB",
+            group,
+            len(records),
+            sum(r.seconds for r in records),
+            f"{wall:.3f}s" if wall is not None else "n/a",
+            current_rss_bytes() / 1e6,
+        )
+        for r in records:
+            logger.info("  %-28s %8.3fs %+8.1f MB %s", r.name, r.seconds, r.rss_delta_mb, r.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._groups.clear()
+
+
+# Singleton instance
+artifact_load_report = ArtifactLoadReport()
@@ -0,0 +1,157 @@
+"""
+Compiled Probability Calibration
+
+The student calibrator artifact is a pickled sklearn IsotonicRegression.
+Its predict() validates input, clips and calls a scipy interp1d, which
+costs far more than the piecewise-linear lookup it performs when mapping
+one probability per request.
+
+compile_calibrator() reduces a fitted IsotonicRegression to its breakpoint
+arrays (X_thresholds_, y_thresholds_) at load time:
+
+- predict(probabilities)  np.interp over the breakpoints, whole batches
+- predict_one(probability) the same interpolation on Python floats
+  (bisect + one slope), for single requests
+
+np.interp holds the end values outside the breakpoints, which is exactly
+out_of_bounds="clip"; other out_of_bounds modes and other calibrator types
+are returned unchanged. Like sklearn, inputs are first cast to the dtype
+the calibrator was fitted in (float32 for the current artifact) and
+results are returned at that precision; the interpolation itself runs in
+float64, so results differ from sklearn's float32 arithmetic by at most
+about one float32 ulp.
+
+Every compilation is checked against the sklearn object on a dense grid
+(every breakpoint, its neighbouring floats and a uniform grid over
+[0, 1]); if any value differs by more than the tolerance (one machine
+epsilon of the fitted dtype, at least COMPILED_CALIBRATION_TOLERANCE) the
+original calibrator is kept. Non-finite input raises ValueError, as
+sklearn's validation does.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from bisect import bisect_right
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Minimum max |compiled - sklearn| accepted on the verification grid
+COMPILED_CALIBRATION_TOLERANCE = 1e-9
+# Uniform points over [0, 1] in the verification grid (plus breakpoints)
+VERIFICATION_GRID_POINTS = 20_001
+
+
+class CompiledIsotonicCalibrator:
+    """Piecewise-linear calibrator from an IsotonicRegression's breakpoints."""
+
+    kind = "isotonic_interp"
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, source: Any = None) -> None:
+        # Precision the calibrator was fitted in; inputs and outputs are rounded to it
+        self.dtype = np.result_type(np.asarray(x).dtype, np.asarray(y).dtype, np.float32)
+        self.x = np.ascontiguousarray(x, dtype=np.float64)
+        self.y = np.ascontiguousarray(y, dtype=np.float64)
+        self.x.setflags(write=False)
+        self.y.setflags(write=False)
+        self.source = source
+        self._xs = self.x.tolist()
+        self._ys = self.y.tolist()
+        self._round = None if self.dtype == np.float64 else self.dtype.type
+
+    @property
+    def breakpoints(self) -> int:
+        return len(self._xs)
+
+    @property
+    def tolerance(self) -> float:
+        """Deviation from sklearn accepted when verifying this calibrator."""
+        return max(COMPILED_CALIBRATION_TOLERANCE, float(np.finfo(self.dtype).eps))
+
+    def predict(self, probabilities) -> np.ndarray:
+        """Calibrated probabilities for an array, as float64."""
+        values = np.asarray(probabilities, dtype=np.float64).reshape(-1)
+        if not np.isfinite(values).all():
+            raise ValueError("Input contains NaN or infinity.")
+        if self._round is not None:
+            values = values.astype(self.dtype).astype(np.float64)
+            return np.interp(values, self.x, self.y).astype(self.dtype).astype(np.float64)
+        return np.interp(values, self.x, self.y)
+
+    def predict_one(self, probability: float) -> float:
+        """Calibrated probability for one value, without NumPy array overhead."""
+        if not math.isfinite(probability):
+            raise ValueError("Input contains NaN or infinity.")
+        if self._round is not None:
+            return float(self._round(self._interp(float(self._round(probability)))))
+        return self._interp(probability)
+
+    def _interp(self, value: float) -> float:
+        """np.interp for one float: same branches and arithmetic."""
+        xs, ys = self._xs, self._ys
+        if value >= xs[-1]:
+            return ys[-1]
+        if value < xs[0]:
+            return ys[0]
+        j = bisect_right(xs, value) - 1
+        if value == xs[j]:
+            return ys[j]
+        slope = (ys[j + 1] - ys[j]) / (xs[j + 1] - xs[j])
+        return slope * (value - xs[j]) + ys[j]
+
+
+def verification_grid(x: np.ndarray, points: int = VERIFICATION_GRID_POINTS) -> np.ndarray:
+    """Uniform grid over [0, 1] plus every breakpoint and the floats either side of it."""
+    x = np.asarray(x, dtype=np.float64)
+    return np.unique(np.concatenate([
+        np.linspace(0.0, 1.0, points),
+        x,
+        np.nextafter(x, -np.inf),
+        np.nextafter(x, np.inf),
+    ]))
+
+
+def max_calibration_error(compiled: CompiledIsotonicCalibrator, reference: Any, grid: np.ndarray) -> float:
+    """Largest |compiled - reference| over ``grid``, batch and single-value paths."""
+    expected = np.asarray(reference.predict(grid), dtype=np.float64)
+    batch = compiled.predict(grid)
+    single = np.fromiter((compiled.predict_one(p) for p in grid.tolist()), dtype=np.float64, count=len(grid))
+    return float(max(np.max(np.abs(batch - expected)), np.max(np.abs(single - expected))))
+
+
+def compile_calibrator(calibrator: Any) -> Any:
+    """Compiled form of ``calibrator`` when it is a verified clip-mode IsotonicRegression.
+
+    Anything else (no calibrator, other types, other out_of_bounds modes,
+    a failed verification) is returned unchanged.
+    """
+    if calibrator is None or isinstance(calibrator, CompiledIsotonicCalibrator):
+        return calibrator
+
+    x: Optional[np.ndarray] = getattr(calibrator, "X_thresholds_", None)
+    y: Optional[np.ndarray] = getattr(calibrator, "y_thresholds_", None)
+    if x is None or y is None or getattr(calibrator, "out_of_bounds", None) != "clip":
+        return calibrator
+    if len(x) < 2 or np.any(np.diff(x) <= 0):
+        return calibrator
+
+    compiled = CompiledIsotonicCalibrator(x, y, source=calibrator)
+    try:
+        error = max_calibration_error(compiled, calibrator, verification_grid(compiled.x))
+    except Exception as exc:
+        logger.warning("Calibrator compilation check failed, keeping sklearn calibrator: %s", exc)
+        return calibrator
+
+    if error > compiled.tolerance:
+        logger.warning(
+            "Compiled calibrator deviates from sklearn by %.3g (> %.3g); keeping sklearn calibrator",
+            error,
+            compiled.tolerance,
+        )
+        return calibrator
+
+    logger.info("Student calibrator compiled: %d breakpoints, max deviation %.3g", compiled.breakpoints, error)
+    return compiled
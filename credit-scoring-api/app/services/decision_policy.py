@@ -0,0 +1,490 @@
+"""
+Student Decision Policy
+
+An immutable DecisionPolicy turns a calibrated default probability into a
+decision band. Its cutoffs are computed once, when the policy is built, from:
+
+- name                    safe | balanced | aggressive
+- manual_review_margin    review window width (clamped to 0.00-0.25)
+- threshold_override      replaces the model's approval threshold (None = off)
+- model_threshold         threshold shipped with the loaded model artifact
+
+Bands (p = default probability):
+    p <  approve_below                    auto_approve
+    approve_below <= p <= review_up_to    manual_review
+    p >  review_up_to                     auto_reject
+
+The initial policy comes from STUDENT_DECISION_POLICY,
+STUDENT_MANUAL_REVIEW_MARGIN and STUDENT_APPROVAL_THRESHOLD_OVERRIDE.
+StudentPredictionService holds the current policy as a single reference, so
+a change replaces it atomically and every request classifies with one
+consistent policy. A model hot swap rebinds the policy to the new artifact
+threshold.
+
+Runtime changes (PUT /api/student/decision-policy) are shared by every
+instance through DecisionPolicySync:
+
+- The policy in force is one document (STUDENT_POLICY_COLLECTION/current).
+  A change is applied to the stored policy in a Firestore transaction, so
+  concurrent changes on different instances get consecutive revisions and
+  neither is lost. The receiving instance switches only once the write has
+  committed.
+- Every instance reads the document as soon as it starts and polls it every
+  STUDENT_POLICY_POLL_SECONDS from a background thread, the way
+  model_registry polls model versions. New and restarted instances switch to
+  the stored policy on that first read; the environment variables only apply
+  until then, or until a policy has been stored.
+
+With STUDENT_POLICY_SYNC_ENABLED=false changes stay on the receiving instance
+until it restarts. Each change is recorded by DecisionPolicyAuditLog: a log
+line, an in-memory history and a Firestore audit record written through a
+BatchedFirestoreSink.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.firebase import ensure_firebase_app
+from app.services.firestore_sink import BatchedFirestoreSink
+
+logger = logging.getLogger(__name__)
+
+DECISION_POLICIES = ("safe", "balanced", "aggressive")
+MAX_MANUAL_REVIEW_MARGIN = 0.25
+
+
+def _normalize_override(value: Optional[float]) -> Optional[float]:
+    """Override as a probability in (0, 1); anything else disables it."""
+    if value is None:
+        return None
+    value = float(value)
+    return value if 0.0 < value < 1.0 else None
+
+
+@dataclass(frozen=True)
+class DecisionPolicy:
+    """Precompiled decision bands for one policy and approval threshold."""
+
+    name: str = "balanced"
+    manual_review_margin: float = 0.05
+    model_threshold: float = 0.5
+    threshold_override: Optional[float] = None
+    revision: int = 0
+    source: str = "settings"
+
+    threshold: float = field(init=False)
+    approve_below: float = field(init=False)
+    review_up_to: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        name = str(self.name or "balanced").strip().lower()
+        if name not in DECISION_POLICIES:
+            raise ValueError(f"Unknown decision policy {self.name!r}; choose from {DECISION_POLICIES}")
+        base_margin = max(0.0, min(float(self.manual_review_margin), MAX_MANUAL_REVIEW_MARGIN))
+        override = _normalize_override(self.threshold_override)
+        threshold = float(self.model_threshold) if override is None else override
+
+        if name == "safe":
+            # Wider review window for safer launch.
+            margin = max(base_margin, 0.10)
+            approve_below = max(0.0, threshold - margin)
+        elif name == "aggressive":
+            # Narrow review window and slightly higher approve cutoff.
+            margin = min(base_margin, 0.03)
+            approve_below = min(1.0, threshold + margin)
+        else:
+            # Balanced default: approve below threshold, review near reject side.
+            margin = base_margin
+            approve_below = threshold
+
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "manual_review_margin", base_margin)
+        object.__setattr__(self, "threshold_override", override)
+        object.__setattr__(self, "threshold", threshold)
+        object.__setattr__(self, "approve_below", approve_below)
+        object.__setattr__(self, "review_up_to", min(1.0, threshold + margin))
+
+    @classmethod
+    def from_settings(cls, model_threshold: float) -> "DecisionPolicy":
+        """Policy configured by environment; unknown names fall back to balanced."""
+        name = str(settings.STUDENT_DECISION_POLICY or "balanced").strip().lower()
+        if name not in DECISION_POLICIES:
+            logger.warning("Unknown STUDENT_DECISION_POLICY %r; using balanced", settings.STUDENT_DECISION_POLICY)
+            name = "balanced"
+        policy = cls(
+            name=name,
+            manual_review_margin=settings.STUDENT_MANUAL_REVIEW_MARGIN,
+            model_threshold=model_threshold,
+            threshold_override=settings.STUDENT_APPROVAL_THRESHOLD_OVERRIDE,
+        )
+        if policy.threshold_override is not None:
+            logger.warning(
+                "Student threshold override active: %.4f (artifact threshold %.4f)",
+                policy.threshold_override,
+                policy.model_threshold,
+            )
+        return policy
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any], model_threshold: Optional[float] = None) -> "DecisionPolicy":
+        """Policy stored by DecisionPolicySync.
+
+        Without ``model_threshold`` the policy is left unbound;
+        StudentPredictionService binds it to the loaded model on first use.
+        """
+        fields: Dict[str, Any] = dict(
+            name=doc.get("policy", "balanced"),
+            manual_review_margin=float(doc.get("manual_review_margin", 0.05)),
+            threshold_override=doc.get("threshold_override"),
+            revision=int(doc.get("revision", 0)),
+            source=str(doc.get("source", "store")),
+        )
+        if model_threshold is not None:
+            fields["model_threshold"] = float(model_threshold)
+        return cls(**fields)
+
+    def to_document(self) -> Dict[str, Any]:
+        """Fields that define the policy independently of the model (see from_document)."""
+        return {
+            "policy": self.name,
+            "manual_review_margin": self.manual_review_margin,
+            "threshold_override": self.threshold_override,
+            "revision": self.revision,
+            "source": self.source,
+        }
+
+    def with_model_threshold(self, model_threshold: float) -> "DecisionPolicy":
+        """Same policy rebound to a newly loaded model's threshold."""
+        return replace(self, model_threshold=float(model_threshold))
+
+    def updated(self, source: str = "admin", **changes: Any) -> "DecisionPolicy":
+        """Next revision with ``changes`` applied (name, manual_review_margin, threshold_override)."""
+        return replace(self, revision=self.revision + 1, source=source, **changes)
+
+    @property
+    def key(self) -> Tuple[str, float, float, float]:
+        """What decides the bands (scoring cache version)."""
+        return (self.name, self.manual_review_margin, self.approve_below, self.review_up_to)
+
+    def classify(self, probability: float) -> Tuple[str, bool, bool]:
+        """(decision_band, approved, manual_review) for one probability."""
+        if probability < self.approve_below:
+            return "auto_approve", True, False
+        if probability <= self.review_up_to:
+            return "manual_review", False, True
+        return "auto_reject", False, False
+
+    def classify_many(self, probabilities: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized classify: (decision_band as object array, approved, manual_review)."""
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        approved = probabilities < self.approve_below
+        manual_review = ~approved & (probabilities <= self.review_up_to)
+        bands = np.full(probabilities.shape, "auto_reject", dtype=object)
+        bands[approved] = "auto_approve"
+        bands[manual_review] = "manual_review"
+        return bands, approved, manual_review
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "policy": self.name,
+            "manual_review_margin": self.manual_review_margin,
+            "threshold_override": self.threshold_override,
+            "model_threshold": self.model_threshold,
+            "threshold": self.threshold,
+            "cutoffs": {
+                "approve_below": self.approve_below,
+                "review_up_to": self.review_up_to,
+                "reject_above": self.review_up_to,
+            },
+            "revision": self.revision,
+            "source": self.source,
+        }
+
+
+class DecisionPolicyAuditLog:
+    """Record of runtime decision policy changes (log line, recent history, Firestore)."""
+
+    def __init__(self, backend: Optional[Any] = None, max_entries: int = 100) -> None:
+        self._backend = backend
+        self._sink: Optional[BatchedFirestoreSink] = None
+        self._lock = threading.Lock()
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+
+    def _get_sink(self) -> BatchedFirestoreSink:
+        if self._sink is None:
+            with self._lock:
+                if self._sink is None:
+                    self._sink = BatchedFirestoreSink(
+                        collection=settings.STUDENT_POLICY_AUDIT_COLLECTION,
+                        backend=self._backend,
+                    )
+        return self._sink
+
+    def record(
+        self,
+        previous: DecisionPolicy,
+        current: DecisionPolicy,
+        changed_by: Optional[str] = None,
+        reason: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Append one change; the Firestore write is queued, never awaited."""
+        entry = {
+            "revision": current.revision,
+            "previous": previous.describe(),
+            "current": current.describe(),
+            "changed_by": changed_by,
+            "reason": reason,
+            "changedAt": datetime.utcnow(),
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+        logger.warning(
+            "Student decision policy changed (revision %d, by %s): %s margin=%.3f threshold=%.4f -> "
+            "%s margin=%.3f threshold=%.4f; reason: %s",
+            current.revision,
+            changed_by or "unknown",
+            previous.name,
+            previous.manual_review_margin,
+            previous.threshold,
+            current.name,
+            current.manual_review_margin,
+            current.threshold,
+            reason or "-",
+        )
+
+        if settings.STUDENT_POLICY_AUDIT_FIRESTORE_ENABLED:
+            try:
+                entry["doc_id"] = self._get_sink().enqueue(dict(entry))
+            except Exception as e:
+                logger.warning("Decision policy audit write failed: %s", e)
+        return entry
+
+    def entries(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent changes first."""
+        with self._lock:
+            recent = list(self._entries)[-limit:] if limit > 0 else []
+        return list(reversed(recent))
+
+    def close(self) -> bool:
+        """Drain queued audit records (application shutdown)."""
+        return self._sink.close() if self._sink is not None else True
+
+
+class InMemoryPolicyDocument:
+    """Test / single-process stand-in for the stored policy document."""
+
+    def __init__(self, doc: Optional[Dict[str, Any]] = None) -> None:
+        self.doc = dict(doc) if doc else None
+        self._lock = threading.Lock()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return dict(self.doc) if self.doc else None
+
+    def update(self, build: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            self.doc = dict(build(dict(self.doc) if self.doc else None))
+            return dict(self.doc)
+
+
+class FirestorePolicyDocument:
+    """Current policy as one Firestore document, changed in transactions."""
+
+    def __init__(self, collection: Optional[str] = None, document_id: str = "current") -> None:
+        self.collection = collection or settings.STUDENT_POLICY_COLLECTION
+        self.document_id = document_id
+        self._db: Optional[Any] = None
+
+    def _get_db(self):
+        if self._db is None:
+            from firebase_admin import firestore
+
+            ensure_firebase_app()
+            self._db = firestore.client()
+        return self._db
+
+    def _ref(self):
+        return self._get_db().collection(self.collection).document(self.document_id)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        snapshot = self._ref().get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def update(self, build: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Replace the document with build(current document) atomically (retried on contention)."""
+        from firebase_admin import firestore
+
+        ref = self._ref()
+
+        @firestore.transactional
+        def apply(transaction):
+            snapshot = ref.get(transaction=transaction)
+            doc = build(snapshot.to_dict() if snapshot.exists else None)
+            transaction.set(ref, doc)
+            return doc
+
+        return apply(self._get_db().transaction())
+
+
+class DecisionPolicySync:
+    """Shares runtime policy changes between instances through a stored document."""
+
+    def __init__(self, document: Optional[Any] = None, poll_interval_seconds: Optional[float] = None) -> None:
+        self._document = document
+        self.poll_interval = float(
+            settings.STUDENT_POLICY_POLL_SECONDS if poll_interval_seconds is None else poll_interval_seconds
+        )
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._adopted = 0
+        self._published = 0
+        self._last_check: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    @property
+    def document(self):
+        if self._document is None:
+            self._document = FirestorePolicyDocument()
+        return self._document
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.STUDENT_POLICY_SYNC_ENABLED)
+
+    def publish(
+        self,
+        changed_by: Optional[str] = None,
+        reason: Optional[str] = None,
+        **changes: Any,
+    ) -> Tuple[DecisionPolicy, DecisionPolicy]:
+        """Apply ``changes`` to the stored policy, then serve it here.
+
+        The next revision is built from the stored policy (this instance's
+        own when nothing is stored yet). If the write fails the exception
+        propagates and nothing changes.
+
+        Returns:
+            (previous policy, new policy)
+        """
+        from app.services.student_prediction_service import student_prediction_service
+
+        if not self.enabled:
+            return student_prediction_service.update_decision_policy(**changes)
+
+        with self._lock:
+            local = student_prediction_service.decision_policy
+            built: Dict[str, DecisionPolicy] = {}
+
+            def build(stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+                base = DecisionPolicy.from_document(stored, local.model_threshold) if stored else local
+                policy = base.updated(source="admin", **changes)
+                built.update(previous=base, current=policy)
+                return {
+                    **policy.to_document(),
+                    "changed_by": changed_by,
+                    "reason": reason,
+                    "updatedAt": datetime.utcnow(),
+                }
+
+            self.document.update(build)
+            student_prediction_service.adopt_decision_policy(built["current"])
+            self._published += 1
+        return built["previous"], student_prediction_service.decision_policy
+
+    def check_once(self) -> bool:
+        """Serve the stored policy if it differs from ours; True if it was adopted."""
+        from app.services.student_prediction_service import student_prediction_service
+
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._last_check = time.time()
+            try:
+                doc = self.document.read()
+            except Exception as e:
+                error = f"read failed: {e}"
+                # Warn once per distinct failure, not on every poll (e.g. no credentials)
+                log = logger.debug if error == self._last_error else logger.warning
+                self._last_error = error
+                log("Decision policy store read failed; keeping current policy: %s", e)
+                return False
+            self._last_error = None
+            if not doc:
+                return False
+
+            # Compare and adopt unbound: polling must never load the student model
+            current = student_prediction_service.decision_policy_unbound
+            if int(doc.get("revision", 0)) == (current.revision if current is not None else 0):
+                return False
+            try:
+                policy = DecisionPolicy.from_document(doc)
+            except (TypeError, ValueError) as e:
+                self._last_error = f"invalid stored policy: {e}"
+                logger.error("Stored decision policy is invalid; keeping current policy: %s", e)
+                return False
+
+            student_prediction_service.adopt_decision_policy(policy)
+            self._adopted += 1
+        logger.info(
+            "Student decision policy revision %d adopted from store: %s (margin %.2f, threshold override %s)",
+            policy.revision,
+            policy.name,
+            policy.manual_review_margin,
+            policy.threshold_override,
+        )
+        return True
+
+    # ── Background polling ───────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.check_once()
+            except Exception:
+                logger.exception("Decision policy poll failed")
+            if self._stop.wait(self.poll_interval):
+                return
+
+    def start(self) -> None:
+        """Poll the stored policy from a daemon thread, starting with an immediate read.
+
+        Returns at once: startup never waits on Firestore or the student model.
+        """
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="decision-policy-sync", daemon=True)
+        self._thread.start()
+        logger.info("Decision policy sync polling every %.0fs", self.poll_interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "poll_interval_seconds": self.poll_interval,
+            "published": self._published,
+            "adopted": self._adopted,
+            "last_check": self._last_check,
+            "last_error": self._last_error,
+        }
+
+
+# Singleton instances
+decision_policy_audit = DecisionPolicyAuditLog()
+decision_policy_sync = DecisionPolicySync()
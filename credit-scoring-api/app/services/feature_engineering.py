@@ -1,167 +1,294 @@
-import pandas as pd
+from __future__ import annotations
+
 import numpy as np
-from typing import Dict, List, Optional
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 from app.services.model_loader import model_loader
 import logging
 
+if TYPE_CHECKING:
+    # pandas is only needed by the DataFrame entry points; request scoring never imports it
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Raw numeric inputs and the defaults used when a column is absent
+NUMERIC_INPUT_DEFAULTS: Dict[str, float] = {
+    'person_age': 30,
+    'person_income': 50000,
+    'person_emp_length': 5,
+    'loan_amnt': 10000,
+    'loan_int_rate': 10,
+    'loan_percent_income': 0.2,
+    'credit_score': 700,
+    'cb_person_cred_hist_length': 10,
+}
+
+# Raw Y/N flags (absent column -> 'N')
+FLAG_INPUTS: List[str] = [
+    'cb_person_default_on_file',
+    'previous_loan_defaults_on_file',
+]
+
 
 class FeatureEngineer:
     """Handle feature engineering for predictions"""
-    
+
     def __init__(self):
-        self.feature_columns = None
+        self._feature_columns = None
         self.categorical_encodings = {}
-        self._load_metadata()
-    
-    def _load_metadata(self):
-        """Load feature metadata from model"""
+        self._column_index: Dict[str, int] = {}
+        self._buffers = threading.local()
+        # Feature names come from the model, so read them on first use
+        self._metadata_loaded = False
+        self._metadata_lock = threading.Lock()
+
+    @property
+    def feature_columns(self) -> Optional[List[str]]:
+        if not self._metadata_loaded:
+            with self._metadata_lock:
+                if not self._metadata_loaded:
+                    # A failed read is retried on the next access rather than latched
+                    self._metadata_loaded = self._load_metadata()
+        return self._feature_columns
+
+    def _load_metadata(self) -> bool:
+        """Load feature metadata from model; True once feature names are known"""
         try:
-            if model_loader.lgbm_model:
-                # Get feature names directly from the model
-                self.feature_columns = model_loader.lgbm_model.feature_name_
-                logger.info(f"Loaded {len(self.feature_columns)} feature columns from model")
+            feature_names = model_loader.feature_names
+            if feature_names:
+                # Get feature names directly from the active model
+                self._column_index = {name: i for i, name in enumerate(feature_names)}
+                self._feature_columns = feature_names
+                logger.info(f"Loaded {len(feature_names)} feature columns from model")
+                return True
+            logger.warning("Active model records no feature names")
         except Exception as e:
             logger.warning(f"Could not load feature names from model: {e}")
-    
+        return False
+
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """Transform input data to match model expectations
-        
+
         The model expects 64 features from the Home Credit dataset.
         Since we only have basic loan application data, we'll map what we can
         and fill the rest with reasonable defaults.
         """
-        
-        # Create a copy to avoid modifying original
-        data = df.copy()
-        
-        # Get expected features from model
+        matrix = self.transform_array(df)
+        import pandas as pd
+
+        return pd.DataFrame(matrix, index=df.index, columns=self.feature_columns)
+
+    def transform_array(self, df: pd.DataFrame, dtype=np.float64) -> np.ndarray:
+        """Transform an N-row input frame into an (N, n_features) matrix.
+
+        Columns follow the model's feature order. Every row is engineered
+        independently in a single columnar pass.
+        """
         if not self.feature_columns:
             raise ValueError("Model feature names not available")
-        
-        # Create dataframe with all expected features, filled with defaults
-        aligned_data = pd.DataFrame(0.0, index=data.index, columns=self.feature_columns)
-        
-        # Map available fields to model features with intelligent defaults
-        feature_mapping = self._create_feature_mapping(data)
-        
-        for model_feature, value in feature_mapping.items():
-            if model_feature in aligned_data.columns:
-                aligned_data[model_feature] = value
-        
-        return aligned_data
-    
-    def _create_feature_mapping(self, data: pd.DataFrame) -> Dict[str, float]:
-        """Map input data to model features with reasonable defaults"""
-        
-        mapping = {}
-        
-        # Extract input values
-        row = data.iloc[0] if len(data) > 0 else {}
-        
+
+        inputs = self._extract_inputs(df)
+        out = np.zeros((len(df), len(self.feature_columns)), dtype=dtype)
+        self._fill_features(inputs, out)
+        return out
+
+    def transform_requests(
+        self,
+        requests: Sequence[Any],
+        out: Optional[np.ndarray] = None,
+        dtype=np.float32,
+    ) -> np.ndarray:
+        """Engineer features straight from request objects (or dicts), without pandas.
+
+        Args:
+            requests: PredictionRequest instances or dicts with the same fields
+            out: Optional preallocated (N, n_features) array to fill
+            dtype: dtype of the allocated matrix when ``out`` is not given
+
+        Returns:
+            (N, n_features) contiguous matrix in model feature order
+        """
+        if not self.feature_columns:
+            raise ValueError("Model feature names not available")
+
+        if out is None:
+            out = np.zeros((len(requests), len(self.feature_columns)), dtype=dtype)
+        self._fill_features(self._extract_request_inputs(requests), out)
+        return out
+
+    def transform_request(self, request: Any) -> np.ndarray:
+        """Single-request hot path: fill this thread's preallocated float32 row.
+
+        The returned (1, n_features) array is reused by the next call on the
+        same thread, so pass it to the model before engineering another request.
+        """
+        if not self.feature_columns:
+            raise ValueError("Model feature names not available")
+
+        buffer = getattr(self._buffers, "row", None)
+        if buffer is None:
+            buffer = np.zeros((1, len(self.feature_columns)), dtype=np.float32)
+            self._buffers.row = buffer
+        return self.transform_requests((request,), out=buffer)
+
+    def _extract_request_inputs(self, requests: Sequence[Any]) -> Dict[str, np.ndarray]:
+        """Pull raw input fields from request objects or dicts as float64 arrays"""
+        n = len(requests)
+
+        def field(request, name, default):
+            if isinstance(request, Mapping):
+                return request.get(name, default)
+            return getattr(request, name, default)
+
+        inputs: Dict[str, np.ndarray] = {}
+        for column, default in NUMERIC_INPUT_DEFAULTS.items():
+            inputs[column] = np.fromiter(
+                (field(r, column, default) for r in requests), dtype=np.float64, count=n
+            )
+        for column in FLAG_INPUTS:
+            inputs[column] = np.fromiter(
+                (field(r, column, 'N') == 'Y' for r in requests), dtype=np.float64, count=n
+            )
+        return inputs
+
+    def _extract_inputs(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Pull raw input columns as float64 arrays, applying defaults for missing ones"""
+        n = len(data)
+        inputs: Dict[str, np.ndarray] = {}
+
+        for column, default in NUMERIC_INPUT_DEFAULTS.items():
+            if column in data.columns:
+                inputs[column] = data[column].to_numpy(dtype=np.float64)
+            else:
+                inputs[column] = np.full(n, float(default))
+
+        for column in FLAG_INPUTS:
+            if column in data.columns:
+                inputs[column] = (data[column].to_numpy() == 'Y').astype(np.float64)
+            else:
+                inputs[column] = np.zeros(n)
+
+        return inputs
+
+    def _fill_features(self, inputs: Dict[str, np.ndarray], out: np.ndarray) -> None:
+        """Map input columns to model features, writing into ``out`` in place"""
+        index = self._column_index
+
+        def put(name: str, values) -> None:
+            col = index.get(name)
+            if col is not None:
+                out[:, col] = values
+
         # Basic demographics
-        age = row.get('person_age', 30)
-        income = row.get('person_income', 50000)
-        emp_length = row.get('person_emp_length', 5)
-        
+        age = inputs['person_age']
+        income = inputs['person_income']
+        emp_length = inputs['person_emp_length']
+
         # Loan information
-        loan_amount = row.get('loan_amnt', 10000)
-        loan_rate = row.get('loan_int_rate', 10) / 100
-        loan_pct_income = row.get('loan_percent_income', 0.2)
-        credit_score = row.get('credit_score', 700)
-        cred_hist_length = row.get('cb_person_cred_hist_length', 10)
-        
-        # Default indicators
-        has_default = 1 if row.get('cb_person_default_on_file', 'N') == 'Y' else 0
-        prev_default = 1 if row.get('previous_loan_defaults_on_file', 'N') == 'Y' else 0
-        
-        # Map to model features
+        loan_amount = inputs['loan_amnt']
+        loan_rate = inputs['loan_int_rate'] / 100
+        loan_pct_income = inputs['loan_percent_income']
+        credit_score = inputs['credit_score']
+        cred_hist_length = inputs['cb_person_cred_hist_length']
+
+        # Default indicators (1.0 / 0.0)
+        has_default = inputs['cb_person_default_on_file']
+        prev_default = inputs['previous_loan_defaults_on_file']
+
+        safe_income = np.maximum(income, 1)
+        has_job = emp_length > 0
+
         # Basic demographics
-        mapping['age_years'] = age
-        mapping['employment_years'] = emp_length
-        
+        put('age_years', age)
+        put('employment_years', emp_length)
+
         # Income ratios (simulated from loan data)
-        mapping['annuity_income_ratio'] = min(loan_pct_income, 1.0)
-        mapping['credit_income_ratio'] = loan_amount / max(income, 1)
-        mapping['goods_income_ratio'] = (loan_amount * 0.8) / max(income, 1)  # Assume goods = 80% of loan
-        mapping['income_per_person'] = income  # Assume single person
-        
+        put('annuity_income_ratio', np.minimum(loan_pct_income, 1.0))
+        put('credit_income_ratio', loan_amount / safe_income)
+        put('goods_income_ratio', (loan_amount * 0.8) / safe_income)  # Assume goods = 80% of loan
+        put('income_per_person', income)  # Assume single person
+
         # Employment flags
-        mapping['has_job_flag'] = 1 if emp_length > 0 else 0
-        
+        put('has_job_flag', has_job)
+
         # Raw application data
-        mapping['raw_income_total'] = income
-        mapping['raw_credit_amt'] = loan_amount
-        mapping['raw_annuity_amt'] = loan_amount * loan_pct_income / 12  # Monthly payment estimate
-        mapping['raw_goods_price'] = loan_amount * 0.8
-        mapping['raw_cnt_fam_members'] = 1  # Assume single
-        mapping['raw_days_employed'] = -emp_length * 365 if emp_length > 0 else 0
-        
+        put('raw_income_total', income)
+        put('raw_credit_amt', loan_amount)
+        put('raw_annuity_amt', loan_amount * loan_pct_income / 12)  # Monthly payment estimate
+        put('raw_goods_price', loan_amount * 0.8)
+        put('raw_cnt_fam_members', 1)  # Assume single
+        put('raw_days_employed', np.where(has_job, -emp_length * 365, 0))
+
         # Missing flags
-        mapping['app_missing_income_flag'] = 0
-        mapping['app_missing_credit_flag'] = 0
-        mapping['app_missing_annuity_flag'] = 0
-        mapping['app_missing_goods_flag'] = 0
-        
+        put('app_missing_income_flag', 0)
+        put('app_missing_credit_flag', 0)
+        put('app_missing_annuity_flag', 0)
+        put('app_missing_goods_flag', 0)
+
         # Bureau features (credit history)
         # Use credit score and history length to estimate
         credit_quality = (credit_score - 300) / 550  # Normalize 300-850 to 0-1
-        
-        mapping['total_credit_sum'] = loan_amount * (1 + cred_hist_length * 0.5)
-        mapping['total_credit_debt'] = loan_amount * (0.3 - credit_quality * 0.2)  # Lower debt for higher scores
-        mapping['total_utilization'] = 0.3 - credit_quality * 0.2
-        mapping['active_loans_count'] = 1 + prev_default  # More loans if had defaults
-        mapping['closed_loans_count'] = max(0, cred_hist_length - 2)
-        mapping['max_overdue_ratio'] = has_default * 0.5
-        mapping['raw_bureau_records'] = cred_hist_length
-        mapping['bur_raw_total_credit_sum'] = mapping['total_credit_sum']
-        mapping['bur_raw_total_credit_debt'] = mapping['total_credit_debt']
-        mapping['raw_total_overdue_amount'] = has_default * loan_amount * 0.1
-        mapping['raw_overdue_loans_count'] = has_default
-        mapping['raw_has_overdue_flag'] = has_default
-        
+        total_credit_sum = loan_amount * (1 + cred_hist_length * 0.5)
+        total_credit_debt = loan_amount * (0.3 - credit_quality * 0.2)  # Lower debt for higher scores
+
+        put('total_credit_sum', total_credit_sum)
+        put('total_credit_debt', total_credit_debt)
+        put('total_utilization', 0.3 - credit_quality * 0.2)
+        put('active_loans_count', 1 + prev_default)  # More loans if had defaults
+        put('closed_loans_count', np.maximum(0, cred_hist_length - 2))
+        put('max_overdue_ratio', has_default * 0.5)
+        put('raw_bureau_records', cred_hist_length)
+        put('bur_raw_total_credit_sum', total_credit_sum)
+        put('bur_raw_total_credit_debt', total_credit_debt)
+        put('raw_total_overdue_amount', has_default * loan_amount * 0.1)
+        put('raw_overdue_loans_count', has_default)
+        put('raw_has_overdue_flag', has_default)
+
         # Credit card features
-        mapping['cc_avg_utilization'] = 0.3 - credit_quality * 0.2
-        mapping['cc_max_utilization'] = 0.5 - credit_quality * 0.3
-        mapping['cc_payment_ratio'] = 1.0 - has_default * 0.3
-        mapping['cc_total_months'] = cred_hist_length * 12
-        mapping['cc_active_month_ratio'] = 0.8
-        mapping['cc_has_overdue_flag'] = has_default
-        mapping['raw_cc_records'] = min(cred_hist_length, 24)
-        mapping['cc_raw_limit_avg'] = income * 0.3
-        mapping['cc_raw_balance_avg'] = income * 0.1
-        mapping['cc_raw_total_payment'] = income * 0.05 * cred_hist_length
-        mapping['cc_raw_total_drawings'] = income * 0.04 * cred_hist_length
-        mapping['cc_raw_overdue_months'] = has_default * 3
-        mapping['cc_raw_max_dpd'] = has_default * 30
-        mapping['cc_raw_invalid_limit_flag'] = 0
-        
+        put('cc_avg_utilization', 0.3 - credit_quality * 0.2)
+        put('cc_max_utilization', 0.5 - credit_quality * 0.3)
+        put('cc_payment_ratio', 1.0 - has_default * 0.3)
+        put('cc_total_months', cred_hist_length * 12)
+        put('cc_active_month_ratio', 0.8)
+        put('cc_has_overdue_flag', has_default)
+        put('raw_cc_records', np.minimum(cred_hist_length, 24))
+        put('cc_raw_limit_avg', income * 0.3)
+        put('cc_raw_balance_avg', income * 0.1)
+        put('cc_raw_total_payment', income * 0.05 * cred_hist_length)
+        put('cc_raw_total_drawings', income * 0.04 * cred_hist_length)
+        put('cc_raw_overdue_months', has_default * 3)
+        put('cc_raw_max_dpd', has_default * 30)
+        put('cc_raw_invalid_limit_flag', 0)
+
         # Days past due features
-        mapping['dpd_mean'] = has_default * 5
-        mapping['dpd_max'] = has_default * 30
-        mapping['on_time_ratio'] = 1.0 - has_default * 0.2
-        mapping['num_payments'] = cred_hist_length * 12
-        mapping['dpd_gt30_flag'] = has_default
-        
+        put('dpd_mean', has_default * 5)
+        put('dpd_max', has_default * 30)
+        put('on_time_ratio', 1.0 - has_default * 0.2)
+        put('num_payments', cred_hist_length * 12)
+        put('dpd_gt30_flag', has_default)
+
         # Installment features
-        mapping['ins_payment_ratio'] = 1.0 - has_default * 0.2
-        mapping['ins_payment_variance'] = has_default * 0.1
-        mapping['ins_early_ratio'] = (1.0 - has_default) * 0.3
-        mapping['raw_instalments_count'] = cred_hist_length * 12
-        mapping['raw_payments_count'] = cred_hist_length * 12
-        mapping['ins_raw_total_instalment'] = loan_amount * cred_hist_length
-        mapping['ins_raw_total_payment'] = loan_amount * cred_hist_length * (1 + loan_rate)
-        mapping['ins_raw_on_time_count'] = int(cred_hist_length * 12 * (1 - has_default * 0.2))
-        mapping['ins_raw_late_count'] = int(cred_hist_length * 12 * has_default * 0.2)
-        mapping['ins_raw_max_dpd'] = has_default * 30
-        mapping['ins_raw_missing_amount_flag'] = 0
-        mapping['ins_raw_missing_days_flag'] = 0
-        
+        put('ins_payment_ratio', 1.0 - has_default * 0.2)
+        put('ins_payment_variance', has_default * 0.1)
+        put('ins_early_ratio', (1.0 - has_default) * 0.3)
+        put('raw_instalments_count', cred_hist_length * 12)
+        put('raw_payments_count', cred_hist_length * 12)
+        put('ins_raw_total_instalment', loan_amount * cred_hist_length)
+        put('ins_raw_total_payment', loan_amount * cred_hist_length * (1 + loan_rate))
+        put('ins_raw_on_time_count', np.trunc(cred_hist_length * 12 * (1 - has_default * 0.2)))
+        put('ins_raw_late_count', np.trunc(cred_hist_length * 12 * has_default * 0.2))
+        put('ins_raw_max_dpd', has_default * 30)
+        put('ins_raw_missing_amount_flag', 0)
+        put('ins_raw_missing_days_flag', 0)
+
         # Missing data flags
-        mapping['missing_income_flag'] = 0
-        mapping['missing_bureau_flag'] = 0
-        mapping['missing_cc_flag'] = 0
-        mapping['missing_installment_flag'] = 0
-        
-        return mapping
\ No newline at end of file
+        put('missing_income_flag', 0)
+        put('missing_bureau_flag', 0)
+        put('missing_cc_flag', 0)
+        put('missing_installment_flag', 0)
+
+
+# Singleton instance shared by the prediction and smart-offer services
+feature_engineer = FeatureEngineer()
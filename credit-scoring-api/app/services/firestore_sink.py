@@ -0,0 +1,321 @@
+"""
+Batched Firestore Sink
+
+Background writer for append-only Firestore records (student application
+logs). Request handlers enqueue a document and return immediately; a
+daemon thread commits queued documents in Firestore write batches (at most
+500 writes each, the Firestore limit) when a batch fills up or the flush
+interval passes, so request latency never includes a Firestore round-trip.
+
+- The queue is bounded; when it is full new records are dropped and
+  counted rather than growing memory or blocking the request.
+- Document ids are generated client-side (same alphabet and length as
+  Firestore auto-ids), so callers still get the id synchronously.
+- enqueue_many() queues a whole batch of records under one lock
+  acquisition (batch endpoints).
+- close() drains everything still queued (bounded by a timeout).
+- InMemoryFirestoreBackend is a stand-in for tests and local runs.
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import secrets
+import string
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.firebase import ensure_firebase_app
+from app.core.metrics import timed_stage
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects write batches with more than 500 operations
+FIRESTORE_MAX_BATCH_WRITES = 500
+# Attempts per batch before its records are counted as failed
+MAX_COMMIT_ATTEMPTS = 3
+
+_AUTO_ID_ALPHABET = string.ascii_letters + string.digits
+
+# (document_id, document, enqueued_at monotonic)
+QueuedWrite = Tuple[str, Dict[str, Any], float]
+
+
+def generate_document_id() -> str:
+    """20-character random id, like Firestore's client-side auto-ids."""
+    return "".join(secrets.choice(_AUTO_ID_ALPHABET) for _ in range(20))
+
+
+class FirestoreBackend:
+    """Commits documents with firebase_admin Firestore write batches."""
+
+    def __init__(self) -> None:
+        self._db: Optional[Any] = None
+
+    def _get_db(self):
+        if self._db is None:
+            from firebase_admin import firestore
+
+            ensure_firebase_app()
+            self._db = firestore.client()
+        return self._db
+
+    def commit(self, collection: str, writes: List[Tuple[str, Dict[str, Any]]]) -> None:
+        db = self._get_db()
+        batch = db.batch()
+        for doc_id, doc in writes:
+            batch.set(db.collection(collection).document(doc_id), doc)
+        batch.commit()
+
+
+class InMemoryFirestoreBackend:
+    """Test stand-in: keeps committed documents per collection in memory."""
+
+    def __init__(self) -> None:
+        self.collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.batch_sizes: List[int] = []
+        self._lock = threading.Lock()
+
+    def commit(self, collection: str, writes: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if len(writes) > FIRESTORE_MAX_BATCH_WRITES:
+            raise ValueError(f"Write batch exceeds {FIRESTORE_MAX_BATCH_WRITES} operations")
+        with self._lock:
+            docs = self.collections.setdefault(collection, {})
+            for doc_id, doc in writes:
+                docs[doc_id] = dict(doc)
+            self.batch_sizes.append(len(writes))
+
+    def documents(self, collection: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.collections.get(collection, {}).values())
+
+
+class BatchedFirestoreSink:
+    """Bounded in-memory queue flushed to one collection by a background thread."""
+
+    def __init__(
+        self,
+        collection: str,
+        backend: Optional[Any] = None,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_seconds: Optional[float] = None,
+    ) -> None:
+        self.collection = collection
+        self.backend = backend or FirestoreBackend()
+        self.max_queue = max(1, int(settings.STUDENT_APP_LOG_QUEUE_SIZE if max_queue is None else max_queue))
+        requested_batch = settings.STUDENT_APP_LOG_BATCH_SIZE if batch_size is None else batch_size
+        self.batch_size = max(1, min(int(requested_batch), FIRESTORE_MAX_BATCH_WRITES))
+        self.flush_interval = float(
+            settings.STUDENT_APP_LOG_FLUSH_INTERVAL_SECONDS
+            if flush_interval_seconds is None
+            else flush_interval_seconds
+        )
+
+        self._queue: Deque[QueuedWrite] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._flush_requested = False
+        self._committing = 0
+
+        self._enqueued = 0
+        self._written = 0
+        self._batches = 0
+        self._dropped_full = 0
+        self._dropped_failed = 0
+        self._commit_errors = 0
+        self._lag_ms_last = 0.0
+        self._lag_ms_max = 0.0
+
+    # ── Producer side ────────────────────────────────────────────────────────
+
+    def enqueue(self, doc: Dict[str, Any], doc_id: Optional[str] = None) -> Optional[str]:
+        """Queue ``doc`` for writing; returns its id, or None if it was dropped."""
+        doc_id = doc_id or generate_document_id()
+        with self._cond:
+            if self._closing:
+                self._dropped_full += 1
+                logger.warning("Firestore sink %s is closed; record dropped", self.collection)
+                return None
+            if len(self._queue) >= self.max_queue:
+                self._dropped_full += 1
+                if self._dropped_full == 1 or self._dropped_full % 1000 == 0:
+                    logger.warning(
+                        "Firestore sink %s queue full (%d); %d records dropped so far",
+                        self.collection,
+                        self.max_queue,
+                        self._dropped_full,
+                    )
+                return None
+            self._queue.append((doc_id, doc, time.monotonic()))
+            self._enqueued += 1
+            self._ensure_started()
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        return doc_id
+
+    def enqueue_many(self, docs: Sequence[Dict[str, Any]]) -> List[Optional[str]]:
+        """Queue several records under one lock; ids in order, None where dropped."""
+        doc_ids: List[Optional[str]] = [generate_document_id() for _ in docs]
+        with self._cond:
+            if self._closing:
+                self._dropped_full += len(docs)
+                logger.warning("Firestore sink %s is closed; %d records dropped", self.collection, len(docs))
+                return [None] * len(docs)
+            accepted = min(len(docs), max(0, self.max_queue - len(self._queue)))
+            now = time.monotonic()
+            self._queue.extend(zip(doc_ids[:accepted], docs[:accepted], itertools.repeat(now)))
+            self._enqueued += accepted
+            if accepted < len(docs):
+                self._dropped_full += len(docs) - accepted
+                logger.warning(
+                    "Firestore sink %s queue full (%d); %d of %d records dropped",
+                    self.collection,
+                    self.max_queue,
+                    len(docs) - accepted,
+                    len(docs),
+                )
+                doc_ids[accepted:] = [None] * (len(docs) - accepted)
+            if accepted:
+                self._ensure_started()
+                if len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+        return doc_ids
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread (caller holds the condition lock)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=f"firestore-sink-{self.collection}", daemon=True
+            )
+            self._thread.start()
+
+    # ── Writer side ──────────────────────────────────────────────────────────
+
+    def _next_batch(self) -> Optional[List[QueuedWrite]]:
+        """Block until a batch is due; None once closed and drained."""
+        with self._cond:
+            while True:
+                if self._queue:
+                    due = (
+                        len(self._queue) >= self.batch_size
+                        or self._closing
+                        or self._flush_requested
+                        or time.monotonic() - self._queue[0][2] >= self.flush_interval
+                    )
+                    if due:
+                        count = min(self.batch_size, len(self._queue))
+                        batch = [self._queue.popleft() for _ in range(count)]
+                        self._committing += 1
+                        return batch
+                    timeout = self.flush_interval - (time.monotonic() - self._queue[0][2])
+                else:
+                    self._flush_requested = False
+                    self._cond.notify_all()
+                    if self._closing:
+                        return None
+                    timeout = None
+                self._cond.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._commit(batch)
+            finally:
+                with self._cond:
+                    self._committing -= 1
+                    self._cond.notify_all()
+
+    @timed_stage("firestore_commit")
+    def _commit(self, batch: List[QueuedWrite]) -> None:
+        writes = [(doc_id, doc) for doc_id, doc, _ in batch]
+        for attempt in range(1, MAX_COMMIT_ATTEMPTS + 1):
+            try:
+                self.backend.commit(self.collection, writes)
+                break
+            except Exception as e:
+                with self._cond:
+                    self._commit_errors += 1
+                logger.warning(
+                    "Firestore batch commit failed (collection=%s size=%d attempt=%d): %s",
+                    self.collection,
+                    len(writes),
+                    attempt,
+                    e,
+                )
+                if attempt == MAX_COMMIT_ATTEMPTS:
+                    with self._cond:
+                        self._dropped_failed += len(writes)
+                    return
+                time.sleep(min(2.0, 0.1 * 2 ** attempt))
+
+        lag_ms = (time.monotonic() - batch[0][2]) * 1000.0
+        with self._cond:
+            self._written += len(writes)
+            self._batches += 1
+            self._lag_ms_last = lag_ms
+            self._lag_ms_max = max(self._lag_ms_max, lag_ms)
+
+    # ── Control ──────────────────────────────────────────────────────────────
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Commit everything queued now; True if the queue drained in time."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if not self._queue and not self._committing:
+                return True
+            self._ensure_started()
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._queue or self._committing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting records and drain the queue (used on shutdown)."""
+        timeout = settings.STUDENT_APP_LOG_DRAIN_TIMEOUT_SECONDS if timeout is None else timeout
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            drained = not self._queue and not self._committing
+            if not drained:
+                logger.warning(
+                    "Firestore sink %s closed with %d records unwritten",
+                    self.collection,
+                    len(self._queue),
+                )
+            return drained
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            oldest_ms = (time.monotonic() - self._queue[0][2]) * 1000.0 if self._queue else 0.0
+            return {
+                "collection": self.collection,
+                "queued": len(self._queue),
+                "max_queue": self.max_queue,
+                "batch_size": self.batch_size,
+                "flush_interval_seconds": self.flush_interval,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "batches": self._batches,
+                "dropped_queue_full": self._dropped_full,
+                "dropped_write_failed": self._dropped_failed,
+                "commit_errors": self._commit_errors,
+                "lag_ms_last": round(self._lag_ms_last, 1),
+                "lag_ms_max": round(self._lag_ms_max, 1),
+                "oldest_pending_ms": round(oldest_ms, 1),
+            }
@@ -10,7 +10,11 @@ Calculates maximum loan amount based on:
 Replaces the complex tier-based system with a simpler credit score-based approach.
 """
 import logging
-from typing import Tuple
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.core.metrics import timed_stage
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,15 @@ class LoanLimitCalculator:
     # Student (alternative model) loan caps in VND
     STUDENT_LOAN_MIN = 5_000_000   # 5M VND
     STUDENT_LOAN_MAX = 10_000_000  # 10M VND
+
+    # calculate_student_loan score tiers (>= 720, >= 680, >= 650, below)
+    _STUDENT_TIER_AMOUNTS = np.array([10_000_000, 8_000_000, 6_000_000, 5_000_000], dtype=np.float64)
+    _STUDENT_TIER_NAMES = (
+        "excellent student profile",
+        "good student profile",
+        "fair student profile",
+        "minimum student tier",
+    )
     
     def __init__(self):
         # DTI limits by risk level
@@ -61,6 +74,7 @@ class LoanLimitCalculator:
         else:
             return 1.5, "very poor credit (<600)"
     
+    @timed_stage("loan_limit")
     def calculate_max_loan(
         self,
         credit_score: int,
@@ -129,6 +143,7 @@ class LoanLimitCalculator:
         
         return adjusted_loan, reason
     
+    @timed_stage("loan_limit")
     def calculate_student_loan(
         self,
         credit_score: int,
@@ -176,6 +191,36 @@ class LoanLimitCalculator:
         )
         return float(amount), reason
     
+    @timed_stage("loan_limit")
+    def calculate_student_loans(
+        self,
+        credit_scores: Sequence[int],
+        risk_levels: Sequence[str],
+    ) -> Tuple[np.ndarray, List[str]]:
+        """Vectorized calculate_student_loan for a batch (same tiers and reasons).
+
+        Returns:
+            (loan amounts in VND as float64, reasons)
+        """
+        credit_scores = np.asarray(credit_scores)
+        tier = np.select(
+            [credit_scores >= 720, credit_scores >= 680, credit_scores >= 650],
+            [0, 1, 2],
+            default=3,
+        )
+        capped = np.isin(np.asarray(risk_levels, dtype=object), ("High", "Very High"))
+        amounts = np.where(capped, float(self.STUDENT_LOAN_MIN), self._STUDENT_TIER_AMOUNTS[tier])
+
+        loan_range = (
+            f"student loan range "
+            f"{self.STUDENT_LOAN_MIN/1e6:.0f}M–{self.STUDENT_LOAN_MAX/1e6:.0f}M VND"
+        )
+        reasons = [
+            f"{self._STUDENT_TIER_NAMES[t]}{' (capped due to risk level)' if c else ''} — {loan_range}"
+            for t, c in zip(tier.tolist(), capped.tolist())
+        ]
+        return amounts, reasons
+
     def calculate_dti_ratio(
         self,
         monthly_payment: float,
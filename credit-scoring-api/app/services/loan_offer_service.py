@@ -1,4 +1,6 @@
 import logging
+import numpy as np
+from typing import List, Sequence
 from app.models.schemas import PredictionRequest, LoanOfferResponse
 
 logger = logging.getLogger(__name__)
@@ -40,23 +42,38 @@ class LoanOfferService:
         risk_level: str
     ) -> LoanOfferResponse:
         """Calculate loan offer based on risk assessment"""
+        return self.calculate_offers([request], [probability], [risk_level])[0]
+    
+    def calculate_offers(
+        self,
+        requests: List[PredictionRequest],
+        probabilities: Sequence[float],
+        risk_levels: Sequence[str]
+    ) -> List[LoanOfferResponse]:
+        """Calculate loan offers for a batch of risk assessments in one vectorized pass"""
+        if not requests:
+            return []
+        
+        probabilities = np.asarray(probabilities, dtype=float)
+        risk_levels = np.array(risk_levels, dtype=object)
         
         # Convert USD to VND
-        requested_amount_vnd = request.loan_amnt * USD_TO_VND
-        income_vnd = request.person_income * USD_TO_VND
+        requested_amount_vnd = np.array([r.loan_amnt for r in requests], dtype=float) * USD_TO_VND
+        income_vnd = np.array([r.person_income for r in requests], dtype=float) * USD_TO_VND
         monthly_income_vnd = income_vnd / 12
         
         # Calculate DTI ratio for the requested loan
         estimated_monthly_payment = requested_amount_vnd / self.default_loan_term
-        dti_ratio = estimated_monthly_payment / monthly_income_vnd if monthly_income_vnd > 0 else 999
+        has_income = monthly_income_vnd > 0
+        dti_ratio = np.full(len(requests), 999.0)
+        np.divide(estimated_monthly_payment, monthly_income_vnd, out=dti_ratio, where=has_income)
         
         # HARD REJECTION: DTI > 50% is unacceptable (can't pay loan with income)
-        if dti_ratio > 0.50:
-            approved = False
-            risk_level = "Very High"  # Override risk level
-        else:
-            # Determine approval based on default probability
-            approved = probability < self.approval_threshold
+        dti_rejected = dti_ratio > 0.50
+        risk_levels[dti_rejected] = "Very High"  # Override risk level
+        
+        # Determine approval based on default probability
+        approved = ~dti_rejected & (probabilities < self.approval_threshold)
         
         # Calculate max eligible amount based on income, DTI, and risk
         # Rule 1: Max loan = 5x annual income
@@ -65,54 +82,49 @@ class LoanOfferService:
         income_based_max = income_vnd * 5
         dti_based_max = monthly_income_vnd * 0.43 * self.default_loan_term  # 43% DTI limit
         
-        base_max_amount = min(income_based_max, dti_based_max)
-        risk_factor = self.loan_amount_factors.get(risk_level, 0.5)
+        base_max_amount = np.minimum(income_based_max, dti_based_max)
+        risk_factor = np.array([self.loan_amount_factors.get(r, 0.5) for r in risk_levels])
         max_amount_vnd = base_max_amount * risk_factor
         
-        # Calculate approved amount
-        if approved:
-            # Approve up to requested amount, but not more than max eligible
-            approved_amount_vnd = min(requested_amount_vnd, max_amount_vnd)
-        else:
-            approved_amount_vnd = 0
+        # Approve up to requested amount, but not more than max eligible
+        approved_amount_vnd = np.where(
+            approved, np.minimum(requested_amount_vnd, max_amount_vnd), 0.0
+        )
         
         # Get interest rate based on risk
-        interest_rate = self.interest_rates.get(risk_level, 20.0)
-        
-        # Calculate monthly payment if approved
-        monthly_payment_vnd = None
-        loan_term_months = None
-        
-        if approved and approved_amount_vnd > 0:
-            loan_term_months = self.default_loan_term
-            monthly_payment_vnd = self._calculate_monthly_payment(
-                approved_amount_vnd, 
-                interest_rate, 
-                loan_term_months
-            )
-        
-        # Generate approval message
-        approval_message = self._generate_message(
-            approved, 
-            risk_level, 
-            probability, 
+        interest_rate = np.array([self.interest_rates.get(r, 20.0) for r in risk_levels])
+        
+        # Calculate monthly payment where approved
+        has_payment = approved & (approved_amount_vnd > 0)
+        monthly_payment_vnd = self._calculate_monthly_payments(
             approved_amount_vnd,
-            requested_amount_vnd
+            interest_rate,
+            self.default_loan_term
         )
         
-        return LoanOfferResponse(
-            approved=approved,
-            loan_amount_vnd=approved_amount_vnd,
-            max_amount_vnd=max_amount_vnd,
-            interest_rate=interest_rate,
-            monthly_payment_vnd=monthly_payment_vnd,
-            loan_term_months=loan_term_months,
-            credit_score=request.credit_score,
-            risk_level=risk_level,
-            approval_message=approval_message,
-            loan_tier="LEGACY",
-            tier_reason="Using legacy /loan-offer endpoint"
-        )
+        offers = []
+        for i, request in enumerate(requests):
+            offers.append(LoanOfferResponse(
+                approved=bool(approved[i]),
+                loan_amount_vnd=float(approved_amount_vnd[i]),
+                max_amount_vnd=float(max_amount_vnd[i]),
+                interest_rate=float(interest_rate[i]),
+                monthly_payment_vnd=round(float(monthly_payment_vnd[i]), 2) if has_payment[i] else None,
+                loan_term_months=self.default_loan_term if has_payment[i] else None,
+                credit_score=request.credit_score,
+                risk_level=risk_levels[i],
+                approval_message=self._generate_message(
+                    bool(approved[i]),
+                    risk_levels[i],
+                    float(probabilities[i]),
+                    float(approved_amount_vnd[i]),
+                    float(requested_amount_vnd[i])
+                ),
+                loan_tier="LEGACY",
+                tier_reason="Using legacy /loan-offer endpoint"
+            ))
+        
+        return offers
     
     def _calculate_monthly_payment(
         self, 
@@ -133,6 +145,19 @@ class LoanOfferService:
         
         return round(payment, 2)
     
+    def _calculate_monthly_payments(
+        self,
+        principals: np.ndarray,
+        annual_rates: np.ndarray,
+        months: int
+    ) -> np.ndarray:
+        """Vectorized _calculate_monthly_payment (unrounded)"""
+        monthly_rate = annual_rates / 100 / 12
+        growth = (1 + monthly_rate) ** months
+        with np.errstate(divide="ignore", invalid="ignore"):
+            payment = principals * (monthly_rate * growth) / (growth - 1)
+        return np.where(annual_rates == 0, principals / months, payment)
+    
     def _generate_message(
         self, 
         approved: bool, 
@@ -12,6 +12,8 @@ import logging
 import math
 from typing import Tuple, Dict
 
+from app.core.metrics import timed_stage
+
 logger = logging.getLogger(__name__)
 
 
@@ -234,6 +236,7 @@ class LoanTermsCalculator:
         """
         return total_payment - principal
     
+    @timed_stage("loan_terms")
     def calculate_loan_terms(
         self,
         loan_amount: float,
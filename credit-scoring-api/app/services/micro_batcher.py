@@ -0,0 +1,173 @@
+"""
+Micro-Batching Scheduler
+
+Coalesces concurrent one-row scoring calls into a single batched model
+call. Requests arriving within MICRO_BATCH_MAX_WAIT_MS of each other (or
+until the current batch size is reached) are scored together on the
+scoring executor, and each waiting request gets its own row back.
+
+Batch size adapts to observed latency: it doubles while full batches
+finish well inside MICRO_BATCH_TARGET_LATENCY_MS and halves when the
+smoothed batch latency exceeds it, bounded by MICRO_BATCH_MAX_ROWS.
+
+State is kept per event loop, so the batcher is safe to share between
+loops (e.g. TestClient runs every request on a fresh loop).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.scoring_executor import ScoringExecutor, scoring_executor, score_predictions, score_students
+
+logger = logging.getLogger(__name__)
+
+# Smoothing factor for the batch latency moving average
+_LATENCY_EWMA_ALPHA = 0.2
+
+
+class _LoopState:
+    """Pending rows and in-flight batches for one event loop."""
+
+    def __init__(self) -> None:
+        self.pending: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+
+class MicroBatcher:
+    """Collects single-row scoring calls and runs them as one batch."""
+
+    def __init__(
+        self,
+        name: str,
+        batch_task: Callable[[List[Any]], List[Any]],
+        max_wait_ms: Optional[float] = None,
+        max_rows: Optional[int] = None,
+        target_latency_ms: Optional[float] = None,
+        executor: Optional[ScoringExecutor] = None,
+    ) -> None:
+        self.name = name
+        self._batch_task = batch_task
+        self._executor = executor
+        self.max_wait = max(0.0, float(
+            settings.MICRO_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        )) / 1000
+        self.max_rows = max(1, int(settings.MICRO_BATCH_MAX_ROWS if max_rows is None else max_rows))
+        self.target_latency = float(
+            settings.MICRO_BATCH_TARGET_LATENCY_MS if target_latency_ms is None else target_latency_ms
+        ) / 1000
+
+        self.batch_size = min(self.max_rows, 8)
+        self._latency_ewma: Optional[float] = None
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._max_batch_seen = 0
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one row and wait for its result from the next batch."""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops.setdefault(loop, _LoopState())
+
+        future = loop.create_future()
+        state.pending.append((item, future))
+
+        if len(state.pending) >= self.batch_size:
+            self._flush(loop, state)
+        elif state.timer is None:
+            state.timer = loop.call_later(self.max_wait, self._flush, loop, state)
+
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "batch_size": self.batch_size,
+                "max_rows": self.max_rows,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "target_latency_ms": round(self.target_latency * 1000, 3),
+                "batches": self._batches,
+                "rows": self._rows,
+                "avg_batch_rows": round(self._rows / self._batches, 3) if self._batches else 0.0,
+                "max_batch_rows": self._max_batch_seen,
+                "latency_ms_ewma": (
+                    round(self._latency_ewma * 1000, 3) if self._latency_ewma is not None else None
+                ),
+            }
+
+    # ── Scheduling ───────────────────────────────────────────────────────────
+
+    def _flush(self, loop: asyncio.AbstractEventLoop, state: _LoopState) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+
+        batch, state.pending = state.pending, []
+        if not batch:
+            return
+
+        task = loop.create_task(self._run_batch(batch))
+        state.tasks.add(task)
+        task.add_done_callback(state.tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        executor = self._executor or scoring_executor
+        items = [item for item, _ in batch]
+
+        started = time.perf_counter()
+        try:
+            results = await executor.run(self._batch_task, items)
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+
+        self._observe(len(batch), time.perf_counter() - started)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _observe(self, rows: int, elapsed: float) -> None:
+        """Update counters and adapt the batch size to the smoothed latency."""
+        with self._lock:
+            self._batches += 1
+            self._rows += rows
+            self._max_batch_seen = max(self._max_batch_seen, rows)
+
+            if self._latency_ewma is None:
+                self._latency_ewma = elapsed
+            else:
+                self._latency_ewma += _LATENCY_EWMA_ALPHA * (elapsed - self._latency_ewma)
+
+            if self._latency_ewma > self.target_latency and self.batch_size > 1:
+                self.batch_size = max(1, self.batch_size // 2)
+                logger.debug("Micro-batcher %s shrinking batch to %d", self.name, self.batch_size)
+            elif (
+                rows >= self.batch_size
+                and self._latency_ewma < self.target_latency / 2
+                and self.batch_size < self.max_rows
+            ):
+                self.batch_size = min(self.max_rows, self.batch_size * 2)
+                logger.debug("Micro-batcher %s growing batch to %d", self.name, self.batch_size)
+
+
+# Singleton instances (one per model)
+prediction_batcher = MicroBatcher("prediction", score_predictions)
+student_batcher = MicroBatcher("student", score_students)
@@ -1,55 +1,259 @@
 import joblib
 import logging
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, List, Optional
 from app.core.config import settings
+from app.services.artifact_loading import artifact_load_report
+from app.services.model_runtime import model_feature_names
+from app.services.native_models import (
+    artifact_exists,
+    artifact_sha256,
+    load_for_artifact as load_native_for_artifact,
+    load_metadata as load_native_metadata,
+)
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ModelBundle:
+    """One loaded version of the regular models; swapped as a whole on reload.
+
+    The model not selected by USE_XGBOOST may still be None here: it is
+    loaded from its path the first time something asks for it.
+    """
+
+    xgb_model: Any = None
+    lgbm_model: Any = None
+    metadata: Any = None
+    model_fingerprint: str = ""
+    version: str = "startup"
+    xgb_path: Optional[Path] = None
+    lgbm_path: Optional[Path] = None
+
+
 class ModelLoader:
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.lgbm_model = None
-            cls._instance.xgb_model = None
-            cls._instance.metadata = None
-            cls._instance._load_models()
+            # Nothing is read from disk until first use or the startup warm-up
+            cls._instance._bundle = None
+            cls._instance._load_lock = threading.Lock()
+            cls._instance._lazy_lock = threading.Lock()
+            # Guards replacing _bundle (swap and lazy fill-in), never held while loading
+            cls._instance._swap_lock = threading.Lock()
         return cls._instance
-    
-    def _load_models(self):
+
+    def _load_models(self) -> ModelBundle:
         """Load models from disk"""
         try:
-            # Load XGBoost model
-            logger.info(f"Loading XGBoost model from {settings.XGB_MODEL_PATH}")
-            self.xgb_model = joblib.load(settings.XGB_MODEL_PATH)
-            
-            # Load LightGBM model (keep for fallback)
-            logger.info(f"Loading LGBM model from {settings.LGBM_MODEL_PATH}")
-            self.lgbm_model = joblib.load(settings.LGBM_MODEL_PATH)
-            
-            logger.info(f"Loading metadata from {settings.METADATA_PATH}")
-            self.metadata = joblib.load(settings.METADATA_PATH)
-            
+            bundle = self.load_bundle(
+                settings.XGB_MODEL_PATH, settings.LGBM_MODEL_PATH, settings.METADATA_PATH
+            )
             logger.info(f"Models loaded successfully. Using: {'XGBoost' if settings.USE_XGBOOST else 'LightGBM'}")
+            return bundle
         except Exception as e:
             logger.error(f"Error loading models: {str(e)}")
             raise
-    
+
+    def _current(self) -> ModelBundle:
+        """Served bundle, loading the startup models on first use"""
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle
+        with self._load_lock:
+            if self._bundle is None:
+                from app.core.startup_profile import startup_profile
+
+                with startup_profile.phase("regular_models"):
+                    self._bundle = self._load_models()
+            return self._bundle
+
+    def warm(self) -> ModelBundle:
+        """Load the startup models now (explicit warm-up phase)"""
+        return self._current()
+
+    def load_bundle(
+        self,
+        xgb_path: Path,
+        lgbm_path: Path,
+        metadata_path: Path,
+        version: str = "startup",
+        eager_all: Optional[bool] = None,
+    ) -> ModelBundle:
+        """Load a set of regular-model artifacts without touching the served one
+
+        The active model, the metadata and the artifact fingerprint load side
+        by side; the other model joins them only with MODEL_EAGER_LOAD_ALL.
+        """
+        eager_all = settings.MODEL_EAGER_LOAD_ALL if eager_all is None else eager_all
+        loaders = {
+            "fingerprint": lambda: self._fingerprint_artifacts(xgb_path, lgbm_path),
+            "metadata": lambda: self._load_metadata(metadata_path),
+        }
+        paths = {"metadata": metadata_path}
+        if settings.USE_XGBOOST or eager_all:
+            loaders["xgb_model"] = lambda: self._load_model(xgb_path, "XGBoost")
+            paths["xgb_model"] = xgb_path
+        if not settings.USE_XGBOOST or eager_all:
+            loaders["lgbm_model"] = lambda: self._load_model(lgbm_path, "LightGBM")
+            paths["lgbm_model"] = lgbm_path
+
+        loaded = artifact_load_report.load_concurrently(loaders, group=f"regular:{version}", paths=paths)
+        return ModelBundle(
+            xgb_model=loaded.get("xgb_model"),
+            lgbm_model=loaded.get("lgbm_model"),
+            metadata=loaded["metadata"],
+            model_fingerprint=loaded["fingerprint"],
+            version=version,
+            xgb_path=Path(xgb_path),
+            lgbm_path=Path(lgbm_path),
+        )
+
+    def swap(self, bundle: ModelBundle) -> ModelBundle:
+        """Serve ``bundle`` from now on; returns the previous one.
+
+        A single reference assignment: requests that already fetched the old
+        models keep using them until they finish.
+        """
+        self._current()  # startup models first, so there is always a previous bundle
+        with self._swap_lock:
+            previous, self._bundle = self._bundle, bundle
+        logger.info(
+            "Regular models swapped: %s (%s) -> %s (%s)",
+            previous.version,
+            previous.model_fingerprint,
+            bundle.version,
+            bundle.model_fingerprint,
+        )
+        return previous
+
+    @staticmethod
+    def _fingerprint_artifacts(xgb_path: Path, lgbm_path: Path) -> str:
+        """Short content hash of the served model artifacts (changes on retrain)"""
+        digests = [(artifact_sha256(path) or "missing")[:12] for path in (xgb_path, lgbm_path)]
+        return "-".join(digests)
+
+    @staticmethod
+    def _load_metadata(metadata_path: Path):
+        """JSON export when enabled and current, otherwise the pickle"""
+        if settings.USE_NATIVE_MODELS:
+            metadata = load_native_metadata(metadata_path)
+            if metadata is not None:
+                return metadata
+        return joblib.load(metadata_path)
+
+    @staticmethod
+    def _load_model(path: Path, label: str):
+        """Exported node table when enabled and fresh, otherwise the pickle"""
+        if settings.USE_TREE_TABLES:
+            from app.services.tree_ensemble import load_for_artifact
+
+            table = load_for_artifact(settings.tree_table_path(path), path)
+            if table is not None:
+                logger.info(f"{label} model loaded from tree table ({table.n_trees} trees)")
+                return table
+            logger.warning(
+                f"Tree table for {path} missing or stale under {settings.TREE_TABLE_DIR}; "
+                "loading pickled model instead"
+            )
+
+        if settings.USE_NATIVE_MODELS:
+            native = load_native_for_artifact(path)
+            if native is not None:
+                logger.info(f"{label} model loaded from native {native.manifest['model_file']}")
+                return native
+
+        logger.info(f"Loading {label} model from {path}")
+        return joblib.load(path)
+
+    def _model(self, attribute: str, path_attribute: str, label: str):
+        """Model from the served bundle, loading it on first use if it was deferred"""
+        model = getattr(self._current(), attribute)
+        if model is not None:
+            return model
+
+        with self._lazy_lock:
+            bundle = self._current()
+            model = getattr(bundle, attribute)
+            path = getattr(bundle, path_attribute)
+            if model is not None or path is None or not artifact_exists(path):
+                return model
+            model = artifact_load_report.timed(
+                attribute,
+                lambda: self._load_model(path, label),
+                group=f"regular:{bundle.version}",
+                path=path,
+                lazy=True,
+            )
+            # A registry swap may have happened meanwhile; only fill in the bundle we loaded for
+            with self._swap_lock:
+                if self._bundle is bundle:
+                    self._bundle = replace(bundle, **{attribute: model})
+            return model
+
+    @property
+    def bundle(self) -> ModelBundle:
+        return self._current()
+
+    @property
+    def xgb_model(self):
+        return self._model("xgb_model", "xgb_path", "XGBoost")
+
+    @property
+    def lgbm_model(self):
+        return self._model("lgbm_model", "lgbm_path", "LightGBM")
+
+    @property
+    def metadata(self):
+        return self._current().metadata
+
+    @property
+    def model_fingerprint(self) -> str:
+        return self._current().model_fingerprint
+
+    @property
+    def version(self) -> str:
+        return self._current().version
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Feature order of the active model (both regular models share it)"""
+        return model_feature_names(self.get_active_model())
+
+    def loaded_models(self) -> List[str]:
+        """Regular models currently in memory (without triggering lazy loads)"""
+        bundle = self._bundle
+        if bundle is None:
+            return []
+        return [
+            name
+            for name, model in (("xgboost", bundle.xgb_model), ("lightgbm", bundle.lgbm_model))
+            if model is not None
+        ]
+
     def is_loaded(self) -> bool:
         """Check if models are loaded"""
-        return (self.xgb_model is not None or self.lgbm_model is not None) and self.metadata is not None
-    
+        bundle = self._bundle
+        if bundle is None:
+            return False
+        active = bundle.xgb_model if settings.USE_XGBOOST else bundle.lgbm_model
+        return active is not None and bundle.metadata is not None
+
     def get_metadata(self):
         """Get model metadata"""
         return self.metadata
-    
+
     def get_active_model(self):
         """Get the currently active model based on settings"""
         if settings.USE_XGBOOST:
             return self.xgb_model
         return self.lgbm_model
-    
+
     def get_threshold(self) -> float:
         """Get the optimal threshold for the active model"""
         if settings.USE_XGBOOST:
@@ -58,4 +262,4 @@ class ModelLoader:
 
 
 # Singleton instance
-model_loader = ModelLoader()
\ No newline at end of file
+model_loader = ModelLoader()
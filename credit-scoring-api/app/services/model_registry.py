@@ -0,0 +1,366 @@
+"""
+Model Registry
+
+Versioned model artifacts with zero-downtime hot reload. A registry root
+(local directory, or ``gs://bucket/prefix``) holds one sub-directory per
+version; a version is complete once its READY marker exists:
+
+    <root>/20261017T120000Z/best_model_phase1.pkl
+    <root>/20261017T120000Z/best_threshold_phase1.pkl
+    <root>/20261017T120000Z/student_calibrator_isotonic.pkl
+    <root>/20261017T120000Z/READY
+
+A version may carry the student artifacts, the regular-model artifacts
+(xgboost / LightGBM / metadata, under the file names of XGB_MODEL_PATH,
+LGBM_MODEL_PATH and METADATA_PATH), or both. Each model may be a pickle,
+a native export (``<stem>.manifest.json`` plus its booster file, see
+app.services.native_models) or both. A background thread polls
+the root; when a newer complete version appears it is downloaded, loaded
+and warmed next to the serving models and then swapped in with a single
+reference assignment, so in-flight requests finish on the old version and
+the API never restarts. A version that fails to load is skipped and the
+current models keep serving.
+
+Pipelines publish with publish_version(); LocalObjectStore stands in for
+GCS in tests and local runs. Hot reload applies to in-process scoring; in
+SCORING_EXECUTOR_MODE=process the worker processes keep their startup models.
+"""
+from __future__ import annotations
+
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+READY_MARKER = "READY"
+
+
+def new_version_id() -> str:
+    """Sortable UTC timestamp id, e.g. 20261017T120000Z."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+# ── Sources ──────────────────────────────────────────────────────────────────
+
+
+class LocalDirectorySource:
+    """Registry root on the local filesystem (or a mounted volume)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def list_ready_versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            entry.name
+            for entry in self.root.iterdir()
+            if entry.is_dir() and (entry / READY_MARKER).exists()
+        )
+
+    def fetch(self, version: str) -> Path:
+        return self.root / version
+
+    def publish(self, version: str, artifacts: Dict[str, Path]) -> None:
+        target = self.root / version
+        target.mkdir(parents=True, exist_ok=False)
+        for name, path in artifacts.items():
+            shutil.copy2(path, target / name)
+        # Marker last: readers never see a partially copied version
+        (target / READY_MARKER).write_text(new_version_id())
+
+
+class LocalObjectStore:
+    """Flat-key object store backed by a directory; stands in for a GCS bucket."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def list(self, prefix: str) -> List[str]:
+        return sorted(
+            path.relative_to(self.root).as_posix()
+            for path in self.root.rglob("*")
+            if path.is_file() and path.relative_to(self.root).as_posix().startswith(prefix)
+        )
+
+    def download(self, key: str, destination: Path) -> None:
+        shutil.copyfile(self.root / key, destination)
+
+    def upload(self, source: Path, key: str) -> None:
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+
+
+class GCSObjectStore:
+    """google-cloud-storage bucket with the LocalObjectStore interface."""
+
+    def __init__(self, bucket: str) -> None:
+        from google.cloud import storage
+
+        self._bucket = storage.Client().bucket(bucket)
+
+    def list(self, prefix: str) -> List[str]:
+        return sorted(blob.name for blob in self._bucket.list_blobs(prefix=prefix))
+
+    def download(self, key: str, destination: Path) -> None:
+        self._bucket.blob(key).download_to_filename(str(destination))
+
+    def upload(self, source: Path, key: str) -> None:
+        self._bucket.blob(key).upload_from_filename(str(source))
+
+
+class ObjectStoreSource:
+    """Registry root in an object store; versions are downloaded to a local cache."""
+
+    def __init__(self, store: Any, prefix: str = "", cache_dir: Optional[Path] = None) -> None:
+        self.store = store
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.cache_dir = Path(cache_dir or tempfile.mkdtemp(prefix="model-registry-"))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def list_ready_versions(self) -> List[str]:
+        versions = set()
+        for key in self.store.list(self.prefix):
+            parts = key[len(self.prefix):].split("/")
+            if len(parts) == 2 and parts[1] == READY_MARKER:
+                versions.add(parts[0])
+        return sorted(versions)
+
+    def fetch(self, version: str) -> Path:
+        target = self.cache_dir / version
+        if (target / READY_MARKER).exists():
+            return target
+        staging = Path(tempfile.mkdtemp(prefix=f"{version}-", dir=self.cache_dir))
+        version_prefix = f"{self.prefix}{version}/"
+        for key in self.store.list(version_prefix):
+            name = key[len(version_prefix):]
+            if name and "/" not in name:
+                self.store.download(key, staging / name)
+        shutil.rmtree(target, ignore_errors=True)
+        staging.rename(target)
+        return target
+
+    def publish(self, version: str, artifacts: Dict[str, Path]) -> None:
+        for name, path in artifacts.items():
+            self.store.upload(Path(path), f"{self.prefix}{version}/{name}")
+        with tempfile.NamedTemporaryFile("w", suffix=".ready", delete=False) as marker:
+            marker.write(new_version_id())
+        try:
+            self.store.upload(Path(marker.name), f"{self.prefix}{version}/{READY_MARKER}")
+        finally:
+            Path(marker.name).unlink(missing_ok=True)
+
+
+def source_from_url(url: str):
+    """``gs://bucket/prefix`` -> GCS object store; anything else is a local directory."""
+    if url.startswith("gs://"):
+        bucket, _, prefix = url[len("gs://"):].partition("/")
+        return ObjectStoreSource(GCSObjectStore(bucket), prefix)
+    return LocalDirectorySource(Path(url))
+
+
+def publish_version(url: str, artifacts: Dict[str, Path], version: Optional[str] = None) -> str:
+    """Publish artifact files (registry file name -> local path) as a new version."""
+    version = version or new_version_id()
+    source_from_url(url).publish(version, artifacts)
+    logger.info("Published model version %s to %s", version, url)
+    return version
+
+
+# ── Registry ─────────────────────────────────────────────────────────────────
+
+
+class ModelRegistry:
+    """Polls a registry source and hot-swaps the served models."""
+
+    def __init__(self, source: Any = None, poll_interval_seconds: Optional[float] = None) -> None:
+        self._source = source
+        self.poll_interval = float(
+            settings.MODEL_REGISTRY_POLL_SECONDS if poll_interval_seconds is None else poll_interval_seconds
+        )
+        self.current_version: Optional[str] = None
+        self._failed_versions: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._swaps = 0
+        self._last_check: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._last_load_seconds: Optional[float] = None
+
+    @property
+    def source(self):
+        if self._source is None and settings.MODEL_REGISTRY_URL:
+            self._source = source_from_url(settings.MODEL_REGISTRY_URL)
+        return self._source
+
+    @property
+    def enabled(self) -> bool:
+        return self.source is not None
+
+    def check_once(self) -> bool:
+        """Load and swap the newest complete version if it is new; True if swapped."""
+        if self.source is None:
+            return False
+        with self._lock:
+            self._last_check = time.time()
+            try:
+                versions = self.source.list_ready_versions()
+            except Exception as e:
+                self._last_error = f"list failed: {e}"
+                logger.warning("Model registry listing failed: %s", e)
+                return False
+
+            candidates = [v for v in versions if v not in self._failed_versions]
+            if not candidates:
+                return False
+            latest = candidates[-1]
+            if self.current_version is not None and latest <= self.current_version:
+                return False
+
+            started = time.perf_counter()
+            try:
+                self._activate(latest, self.source.fetch(latest))
+            except Exception as e:
+                self._failed_versions.add(latest)
+                self._last_error = f"{latest}: {e}"
+                logger.error("Model version %s failed to load; keeping current models: %s", latest, e)
+                return False
+
+            self._last_load_seconds = round(time.perf_counter() - started, 3)
+            self.current_version = latest
+            self._swaps += 1
+            self._last_error = None
+            return True
+
+    def _activate(self, version: str, directory: Path) -> None:
+        """Load and warm everything first, then swap both services."""
+        from app.services.model_loader import model_loader
+        from app.services.native_models import artifact_exists, metadata_json_path
+        from app.services.student_prediction_service import student_prediction_service
+
+        regular = None
+        xgb_file = directory / settings.XGB_MODEL_PATH.name
+        lgbm_file = directory / settings.LGBM_MODEL_PATH.name
+        metadata_file = directory / settings.METADATA_PATH.name
+        if (
+            artifact_exists(xgb_file)
+            and artifact_exists(lgbm_file)
+            and (metadata_file.exists() or metadata_json_path(metadata_file).exists())
+        ):
+            regular = model_loader.load_bundle(xgb_file, lgbm_file, metadata_file, version=version)
+            self._check_regular_feature_order(regular)
+            self._warm_regular(regular)
+
+        student = None
+        student_model = directory / settings.STUDENT_MODEL_PATH.name
+        if artifact_exists(student_model):
+            student = student_prediction_service.load_artifacts(
+                student_model,
+                directory / settings.STUDENT_THRESHOLD_PATH.name,
+                directory / settings.STUDENT_CALIBRATOR_FILENAME,
+                version=version,
+            )
+            student_prediction_service.check_feature_order(student.model)
+            student_prediction_service.warm(student)
+
+        if regular is None and student is None:
+            raise ValueError(f"version {version} contains no known model artifacts")
+
+        if regular is not None:
+            model_loader.swap(regular)
+        if student is not None:
+            student_prediction_service.swap(student)
+        logger.info(
+            "Model version %s active (regular=%s, student=%s)",
+            version,
+            regular is not None,
+            student is not None,
+        )
+
+    @staticmethod
+    def _check_regular_feature_order(bundle) -> None:
+        """Reject a bundle whose active model expects another feature order.
+
+        Request rows are built in the order the FeatureEngineer read from the
+        startup model and are scored without feature validation, so a model
+        with reordered or different columns would be silently mis-scored.
+        """
+        from app.services.model_runtime import model_feature_names
+        from app.services.prediction_service import prediction_service
+
+        served = prediction_service.feature_engineer.feature_columns
+        model = bundle.xgb_model if settings.USE_XGBOOST else bundle.lgbm_model
+        expected = model_feature_names(model)
+        if served is None or list(expected) != list(served):
+            raise ValueError(
+                f"regular model feature order does not match the served order "
+                f"({len(expected)} vs {len(served or [])} features)"
+            )
+
+    @staticmethod
+    def _warm_regular(bundle) -> None:
+        """Score the PredictionRequest schema example with the new active model."""
+        from app.models.schemas import PredictionRequest
+        from app.services.model_runtime import positive_class_probability
+        from app.services.prediction_service import prediction_service
+
+        example = PredictionRequest(**PredictionRequest.model_config["json_schema_extra"]["example"])
+        features = prediction_service.feature_engineer.transform_request(example)
+        model = bundle.xgb_model if settings.USE_XGBOOST else bundle.lgbm_model
+        positive_class_probability(model, features)
+
+    # ── Background polling ───────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.check_once()
+            except Exception:
+                logger.exception("Model registry poll failed")
+            if self._stop.wait(self.poll_interval):
+                return
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-registry", daemon=True)
+        self._thread.start()
+        logger.info("Model registry watching %s every %.0fs", settings.MODEL_REGISTRY_URL, self.poll_interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        from app.services.model_loader import model_loader
+        from app.services.student_prediction_service import student_prediction_service
+
+        return {
+            "enabled": self.enabled,
+            "current_version": self.current_version,
+            "regular_model_version": model_loader.version,
+            "student_model_version": student_prediction_service.version,
+            "swaps": self._swaps,
+            "failed_versions": sorted(self._failed_versions),
+            "last_check": self._last_check,
+            "last_error": self._last_error,
+            "last_load_seconds": self._last_load_seconds,
+        }
+
+
+# Singleton instance
+model_registry = ModelRegistry()
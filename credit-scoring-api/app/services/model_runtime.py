@@ -0,0 +1,63 @@
+"""
+Model Runtime Helpers
+
+Call the underlying XGBoost / LightGBM booster (or an exported
+TreeEnsemble node table) directly on a contiguous feature matrix. This skips the sklearn wrapper's input validation and
+DataFrame handling, which dominates latency when scoring a single row.
+"""
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services.native_models import NativeModel
+from app.services.tree_ensemble import TreeEnsemble
+
+logger = logging.getLogger(__name__)
+
+
+def _xgb_iteration_range(model) -> Tuple[int, int]:
+    """Same tree range XGBClassifier.predict_proba uses (honours early stopping)."""
+    try:
+        return 0, int(model.best_iteration) + 1
+    except AttributeError:
+        return 0, 0
+
+
+def positive_class_probability(model, features: np.ndarray) -> np.ndarray:
+    """Return P(class 1) for each row of ``features``.
+
+    Args:
+        model: Fitted XGBClassifier, LGBMClassifier, TreeEnsemble, NativeModel or any
+            estimator with predict_proba
+        features: (N, n_features) array in the model's feature order
+
+    Returns:
+        (N,) array of default probabilities
+    """
+    if isinstance(model, (TreeEnsemble, NativeModel)):
+        return model.predict_positive(features)
+
+    if hasattr(model, "get_booster"):
+        if model.get_xgb_params().get("objective") == "binary:logistic":
+            return model.get_booster().inplace_predict(
+                features,
+                iteration_range=_xgb_iteration_range(model),
+                validate_features=False,
+            )
+    elif hasattr(model, "booster_"):
+        if model.booster_.params.get("objective", "binary") == "binary":
+            return model.booster_.predict(features)
+
+    return model.predict_proba(features)[:, 1]
+
+
+def model_feature_names(model) -> List[str]:
+    """Feature order a fitted model expects (empty when it does not record one)."""
+    if isinstance(model, (TreeEnsemble, NativeModel)):
+        return list(model.feature_names)
+    if hasattr(model, "get_booster"):
+        return list(model.get_booster().feature_names or [])
+    if hasattr(model, "feature_name_"):
+        return list(model.feature_name_)
+    return list(getattr(model, "feature_names_in_", []))
@@ -0,0 +1,316 @@
+"""
+Student Monitoring Aggregates
+
+Hourly decision counters behind /student/monitoring/summary. Every logged
+student application bumps an in-process bucket (approved / rejected /
+manual_review / total, keyed by its UTC hour); a background thread adds
+those deltas to a durable per-hour document every few seconds. Summaries
+read at most one document per hour of the window instead of streaming
+every application, so their cost no longer grows with volume.
+
+Deltas are written with Firestore Increment transforms, so any number of
+API instances can persist into the same hourly documents.
+
+The store also keeps its coverage start: the earliest application any
+instance has counted (each instance reports its first one with its first
+persist; the store keeps the minimum). Applications before that moment
+(e.g. logged before aggregates were deployed) are in no bucket, so
+summaries count that part of their window with count queries instead.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from app.core.config import settings
+from app.core.firebase import ensure_firebase_app
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("total", "approved", "rejected", "manual_review")
+# Document (in the aggregates collection) holding the coverage start
+COVERAGE_DOCUMENT_ID = "coverage"
+
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def hour_key(moment: datetime) -> str:
+    """Document id of an hourly bucket, e.g. 2026101714."""
+    return moment.strftime("%Y%m%d%H")
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """Firestore returns aware UTC datetimes; the service works in naive UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {name: 0 for name in COUNTERS}
+
+
+def sum_counts(buckets: Iterable[Dict[str, int]]) -> Dict[str, int]:
+    totals = _empty_counts()
+    for bucket in buckets:
+        for name in COUNTERS:
+            totals[name] += int(bucket.get(name, 0) or 0)
+    return totals
+
+
+class InMemoryAggregateStore:
+    """Test / single-process stand-in for the durable hourly store."""
+
+    def __init__(self) -> None:
+        self.buckets: Dict[datetime, Dict[str, int]] = {}
+        self.coverage: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def add(self, deltas: Dict[datetime, Dict[str, int]]) -> None:
+        with self._lock:
+            for start, counts in deltas.items():
+                bucket = self.buckets.setdefault(start, _empty_counts())
+                for name, value in counts.items():
+                    bucket[name] += value
+
+    def read(self, since: datetime) -> List[Dict[str, int]]:
+        with self._lock:
+            return [dict(counts) for start, counts in self.buckets.items() if start >= since]
+
+    def mark_coverage(self, start: datetime) -> None:
+        with self._lock:
+            if self.coverage is None or start < self.coverage:
+                self.coverage = start
+
+    def coverage_start(self) -> Optional[datetime]:
+        with self._lock:
+            return self.coverage
+
+
+class FirestoreAggregateStore:
+    """One document per hour in STUDENT_MONITORING_AGGREGATES_COLLECTION."""
+
+    def __init__(self, collection: Optional[str] = None) -> None:
+        self.collection = collection or settings.STUDENT_MONITORING_AGGREGATES_COLLECTION
+        self._db: Optional[Any] = None
+
+    def _get_db(self):
+        if self._db is None:
+            from firebase_admin import firestore
+
+            ensure_firebase_app()
+            self._db = firestore.client()
+        return self._db
+
+    def add(self, deltas: Dict[datetime, Dict[str, int]]) -> None:
+        from google.cloud.firestore import Increment
+
+        db = self._get_db()
+        batch = db.batch()
+        for start, counts in deltas.items():
+            doc = {"hourStart": start}
+            doc.update({name: Increment(value) for name, value in counts.items() if value})
+            batch.set(db.collection(self.collection).document(hour_key(start)), doc, merge=True)
+        batch.commit()
+
+    def read(self, since: datetime) -> List[Dict[str, int]]:
+        db = self._get_db()
+        query = db.collection(self.collection).where("hourStart", ">=", since)
+        return [doc.to_dict() or {} for doc in query.stream()]
+
+    def mark_coverage(self, start: datetime) -> None:
+        """Lower the stored coverage start to ``start`` (transaction; instances race)."""
+        from firebase_admin import firestore
+
+        db = self._get_db()
+        ref = db.collection(self.collection).document(COVERAGE_DOCUMENT_ID)
+
+        @firestore.transactional
+        def apply(transaction):
+            snapshot = ref.get(transaction=transaction)
+            current = (snapshot.to_dict() or {}).get("since") if snapshot.exists else None
+            if current is None or start < _naive_utc(current):
+                transaction.set(ref, {"since": start})
+
+        apply(db.transaction())
+
+    def coverage_start(self) -> Optional[datetime]:
+        snapshot = self._get_db().collection(self.collection).document(COVERAGE_DOCUMENT_ID).get()
+        since = (snapshot.to_dict() or {}).get("since") if snapshot.exists else None
+        return _naive_utc(since) if since is not None else None
+
+
+class MonitoringAggregator:
+    """In-process hourly deltas, persisted periodically to a durable store."""
+
+    def __init__(self, store: Optional[Any] = None, persist_interval_seconds: Optional[float] = None) -> None:
+        self._store = store
+        self.persist_interval = float(
+            settings.STUDENT_MONITORING_PERSIST_INTERVAL_SECONDS
+            if persist_interval_seconds is None
+            else persist_interval_seconds
+        )
+        self._pending: Dict[datetime, Dict[str, int]] = {}
+        # First application this process counted, until reported to the store
+        self._unmarked_since: Optional[datetime] = None
+        self._coverage_marked = False
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._persist_errors = 0
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = FirestoreAggregateStore()
+        return self._store
+
+    # ── Scoring path ─────────────────────────────────────────────────────────
+
+    def record(self, approved: bool, manual_review: bool, at: Optional[datetime] = None) -> None:
+        """Count one decision in its hourly bucket (no I/O)."""
+        at = at or datetime.utcnow()
+        start = hour_start(at)
+        with self._lock:
+            self._note_first(at)
+            bucket = self._pending.setdefault(start, _empty_counts())
+            bucket["total"] += 1
+            bucket["approved" if approved else "rejected"] += 1
+            if manual_review:
+                bucket["manual_review"] += 1
+            self._ensure_started()
+
+    def record_many(
+        self,
+        approved: Sequence[bool],
+        manual_review: Sequence[bool],
+        at: Optional[datetime] = None,
+    ) -> None:
+        """Count a batch of decisions made at the same moment in one bucket update."""
+        if not len(approved):
+            return
+        approved_count = sum(bool(a) for a in approved)
+        at = at or datetime.utcnow()
+        start = hour_start(at)
+        with self._lock:
+            self._note_first(at)
+            bucket = self._pending.setdefault(start, _empty_counts())
+            bucket["total"] += len(approved)
+            bucket["approved"] += approved_count
+            bucket["rejected"] += len(approved) - approved_count
+            bucket["manual_review"] += sum(bool(m) for m in manual_review)
+            self._ensure_started()
+
+    def _note_first(self, at: datetime) -> None:
+        """Remember the earliest decision until the coverage start is stored (caller holds the lock)."""
+        if not self._coverage_marked and (self._unmarked_since is None or at < self._unmarked_since):
+            self._unmarked_since = at
+
+    def _ensure_started(self) -> None:
+        """Start the persistence thread (caller holds the lock)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="monitoring-aggregates", daemon=True
+            )
+            self._thread.start()
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def persist(self) -> bool:
+        """Add pending deltas to the durable store; they are kept on failure."""
+        with self._persist_lock:
+            with self._lock:
+                deltas, self._pending = self._pending, {}
+                first = None if self._coverage_marked else self._unmarked_since
+            if not deltas:
+                return True
+            try:
+                if first is not None:
+                    # Before the buckets: the store never covers less than it holds
+                    self.store.mark_coverage(first)
+                    with self._lock:
+                        self._coverage_marked = True
+                self.store.add(deltas)
+                return True
+            except Exception as e:
+                with self._lock:
+                    self._persist_errors += 1
+                    for start, counts in deltas.items():
+                        bucket = self._pending.setdefault(start, _empty_counts())
+                        for name, value in counts.items():
+                            bucket[name] += value
+                logger.warning("Monitoring aggregate persistence failed: %s", e)
+                return False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.persist_interval):
+            self.persist()
+
+    def close(self) -> bool:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        return self.persist()
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def window_counts(self, since: datetime) -> Dict[str, int]:
+        """Totals of all buckets from ``since`` (an hour start) onward."""
+        self.persist()
+        totals = sum_counts(self.store.read(since))
+        with self._lock:
+            # Deltas that could not be persisted yet
+            for start, counts in self._pending.items():
+                if start >= since:
+                    for name in COUNTERS:
+                        totals[name] += counts[name]
+        return totals
+
+    def coverage_start(self) -> Optional[datetime]:
+        """Earliest application counted in the durable buckets (None: nothing persisted yet)."""
+        return self.store.coverage_start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending_hours": len(self._pending),
+                "persist_interval_seconds": self.persist_interval,
+                "persist_errors": self._persist_errors,
+            }
+
+
+def count_window_with_aggregation_queries(
+    db: Any, collection: str, since: datetime, until: Optional[datetime] = None
+) -> Dict[str, int]:
+    """Server-side Firestore count() aggregations over the raw collection.
+
+    Counts applications created in [since, until) (until now when omitted).
+    """
+    base = db.collection(collection).where("createdAt", ">=", since)
+    if until is not None:
+        base = base.where("createdAt", "<", until)
+
+    def _count(query) -> int:
+        results = query.count(alias="n").get()
+        return int(results[0][0].value) if results else 0
+
+    total = _count(base)
+    approved = _count(base.where("approved", "==", True))
+    manual_review = _count(base.where("manual_review", "==", True))
+    return {
+        "total": total,
+        "approved": approved,
+        "rejected": total - approved,
+        "manual_review": manual_review,
+    }
+
+
+# Singleton instance
+monitoring_aggregator = MonitoringAggregator()
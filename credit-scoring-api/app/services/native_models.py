@@ -0,0 +1,374 @@
+"""
+Native Model Artifacts
+
+Boosters stored in their own file formats instead of pickles:
+
+    models/xgboost_final.ubj                  XGBoost UBJSON (or .json)
+    models/xgboost_final.manifest.json        manifest (see below)
+    models/lgb_model_optimized.txt            LightGBM text model
+    models/lgb_model_optimized.manifest.json
+    models/ensemble_comparison_metadata.json  model metadata as JSON
+
+A manifest sits next to the pickle it was exported from (same stem), so
+model directories and registry versions carry both side by side:
+
+    {
+      "format": "credit-scoring-native/1",
+      "kind": "xgboost" | "lightgbm",
+      "model_file": "xgboost_final.ubj",
+      "model_sha256": "...",
+      "feature_names": [...],          # model input order
+      "threshold": 0.3623,             # decision threshold, when the model has one
+      "best_iteration": 210,           # XGBoost early-stopping cut-off
+      "objective": "binary:logistic",
+      "library_version": "2.0.3",
+      "source": "xgboost_final.pkl",
+      "source_sha256": "..."           # pickle it was exported from
+    }
+
+Native files are parsed by the boosters' own C++ readers straight from
+disk, with no sklearn wrapper to unpickle and no dependence on the
+library version that wrote the pickle. Manifests and metadata are read
+through mmap. A manifest whose source_sha256 no longer matches the pickle
+next to it is stale and ignored; without a pickle the native files are
+authoritative. The flat node tables in app.services.tree_ensemble remain
+the fully memory-mapped option.
+
+This module only needs numpy plus the booster library being loaded, so
+the retrain pipelines can use it outside the API.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NATIVE_FORMAT = "credit-scoring-native/1"
+MANIFEST_SUFFIX = ".manifest.json"
+METADATA_SUFFIX = ".json"
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    """Parse a JSON file through a read-only memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return json.loads(mapped[:])
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write next to ``path`` and rename, so readers never see half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def manifest_path(artifact_path: Path) -> Path:
+    """Manifest exported from ``artifact_path`` (xgboost_final.pkl -> xgboost_final.manifest.json)."""
+    artifact_path = Path(artifact_path)
+    return artifact_path.with_name(artifact_path.stem + MANIFEST_SUFFIX)
+
+
+def metadata_json_path(metadata_path: Path) -> Path:
+    metadata_path = Path(metadata_path)
+    return metadata_path.with_name(metadata_path.stem + METADATA_SUFFIX)
+
+
+# ── Loaded model ─────────────────────────────────────────────────────────────
+
+
+class NativeModel:
+    """A booster loaded from its native file, with the sklearn-ish surface the API uses."""
+
+    def __init__(self, kind: str, booster: Any, manifest: Dict[str, Any]) -> None:
+        self.kind = kind
+        self.booster = booster
+        self.manifest = manifest
+        self.feature_names: List[str] = list(manifest.get("feature_names") or [])
+        best_iteration = manifest.get("best_iteration")
+        self._iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+
+    @property
+    def feature_name_(self) -> List[str]:
+        return list(self.feature_names)
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:
+        return np.asarray(self.feature_names, dtype=object)
+
+    @property
+    def n_features_in_(self) -> int:
+        return len(self.feature_names)
+
+    @property
+    def threshold(self) -> Optional[float]:
+        threshold = self.manifest.get("threshold")
+        return float(threshold) if threshold is not None else None
+
+    def predict_positive(self, X) -> np.ndarray:
+        """P(class 1) for each row."""
+        X = np.asarray(X)
+        if self.kind == "xgboost":
+            return self.booster.inplace_predict(
+                X, iteration_range=self._iteration_range, validate_features=False
+            )
+        return self.booster.predict(X)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """(N, 2) class probabilities, like the sklearn wrappers."""
+        positive = np.asarray(self.predict_positive(X), dtype=np.float64)
+        return np.column_stack([1.0 - positive, positive])
+
+
+# ── Export ───────────────────────────────────────────────────────────────────
+
+
+def _booster_of(model: Any):
+    """(kind, native booster, best_iteration, objective) for a fitted model."""
+    if hasattr(model, "get_booster"):  # XGBClassifier
+        booster = model.get_booster()
+        try:
+            best_iteration = int(model.best_iteration)
+        except AttributeError:
+            best_iteration = None
+        return "xgboost", booster, best_iteration, model.get_xgb_params().get("objective")
+    if hasattr(model, "booster_"):  # LGBMClassifier
+        return "lightgbm", model.booster_, None, model.booster_.params.get("objective", "binary")
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        best = model.attr("best_iteration")
+        return "xgboost", model, int(best) if best is not None else None, None
+    if module.startswith("lightgbm"):
+        return "lightgbm", model, None, model.params.get("objective", "binary")
+    raise TypeError(f"Cannot export {type(model).__name__} to a native format")
+
+
+def _strip_lightgbm_parameters(model_text: str) -> str:
+    """Drop the training-parameter block from a LightGBM text model.
+
+    Prediction does not use it, and a block written by a newer LightGBM
+    (unknown keys) stops older releases from loading the model at all.
+    """
+    return re.sub(r"\nparameters:\n.*?\nend of parameters\n", "\n", model_text, flags=re.S)
+
+
+def export_native(
+    model: Any,
+    artifact_path: Path,
+    threshold: Optional[float] = None,
+    xgb_format: str = "ubj",
+    extra: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Write the booster and manifest next to ``artifact_path``; returns the manifest path.
+
+    ``artifact_path`` names the pickle this export stands in for. If that
+    pickle exists its hash is recorded, so a later retrain that only
+    rewrites the pickle makes this export stale instead of silently served.
+    """
+    artifact_path = Path(artifact_path)
+    kind, booster, best_iteration, objective = _booster_of(model)
+    if objective not in (None, "binary:logistic", "binary"):
+        raise ValueError(f"Unsupported objective {objective!r}; expected a binary probability model")
+
+    if kind == "xgboost":
+        import xgboost
+
+        if xgb_format not in ("ubj", "json"):
+            raise ValueError("xgb_format must be 'ubj' or 'json'")
+        model_file = artifact_path.with_name(f"{artifact_path.stem}.{xgb_format}")
+        data = booster.save_raw(raw_format=xgb_format)
+        feature_names = list(booster.feature_names or [])
+        library_version = xgboost.__version__
+    else:
+        import lightgbm
+
+        model_file = artifact_path.with_name(f"{artifact_path.stem}.txt")
+        data = _strip_lightgbm_parameters(booster.model_to_string()).encode("utf-8")
+        feature_names = list(booster.feature_name())
+        library_version = lightgbm.__version__
+
+    _write_atomic(model_file, bytes(data))
+    manifest = {
+        "format": NATIVE_FORMAT,
+        "kind": kind,
+        "model_file": model_file.name,
+        "model_sha256": _sha256(model_file),
+        "feature_names": feature_names,
+        "threshold": float(threshold) if threshold is not None else None,
+        "best_iteration": best_iteration,
+        "objective": objective,
+        "library_version": library_version,
+        "source": artifact_path.name,
+        "source_sha256": _sha256(artifact_path) if artifact_path.exists() else None,
+        **(extra or {}),
+    }
+    target = manifest_path(artifact_path)
+    # Manifest last: it is what marks the export complete
+    _write_atomic(target, json.dumps(manifest, indent=2, default=_json_default).encode("utf-8"))
+    return target
+
+
+def export_metadata(metadata: Dict[str, Any], metadata_path: Path) -> Path:
+    """Write pickled model metadata as JSON next to ``metadata_path``."""
+    metadata_path = Path(metadata_path)
+    document = {
+        "format": NATIVE_FORMAT,
+        "source": metadata_path.name,
+        "source_sha256": _sha256(metadata_path) if metadata_path.exists() else None,
+        "metadata": metadata,
+    }
+    target = metadata_json_path(metadata_path)
+    _write_atomic(target, json.dumps(document, indent=2, default=_json_default).encode("utf-8"))
+    return target
+
+
+# ── Load ─────────────────────────────────────────────────────────────────────
+
+
+def read_manifest(path: Path) -> Dict[str, Any]:
+    manifest = _read_json(Path(path))
+    if manifest.get("format") != NATIVE_FORMAT:
+        raise ValueError(f"{path}: unsupported format {manifest.get('format')!r}")
+    return manifest
+
+
+def _is_current(document: Dict[str, Any], source_path: Path, label: Path) -> bool:
+    """False when the pickle next to it changed after the export."""
+    source_sha256 = document.get("source_sha256")
+    if source_path.exists() and source_sha256 and _sha256(source_path) != source_sha256:
+        logger.warning(f"{label} was exported from an older {source_path.name}; ignoring it")
+        return False
+    return True
+
+
+def load_native(path: Path, verify: bool = True) -> NativeModel:
+    """Load the booster a manifest describes."""
+    path = Path(path)
+    manifest = read_manifest(path)
+    model_file = path.parent / manifest["model_file"]
+    if verify and _sha256(model_file) != manifest["model_sha256"]:
+        raise ValueError(f"{model_file} does not match the hash in {path.name}")
+
+    if manifest["kind"] == "xgboost":
+        import xgboost
+
+        booster = xgboost.Booster()
+        booster.load_model(str(model_file))
+        names = list(booster.feature_names or [])
+    elif manifest["kind"] == "lightgbm":
+        import lightgbm
+
+        booster = lightgbm.Booster(model_file=str(model_file))
+        names = list(booster.feature_name())
+    else:
+        raise ValueError(f"{path}: unknown model kind {manifest['kind']!r}")
+
+    if names and manifest.get("feature_names") and names != manifest["feature_names"]:
+        raise ValueError(f"{path}: booster feature order differs from the manifest")
+    return NativeModel(manifest["kind"], booster, manifest)
+
+
+def load_for_artifact(artifact_path: Path) -> Optional[NativeModel]:
+    """Native model exported from ``artifact_path``, or None when absent or stale."""
+    artifact_path = Path(artifact_path)
+    path = manifest_path(artifact_path)
+    if not path.exists():
+        return None
+    if not _is_current(read_manifest(path), artifact_path, path):
+        return None
+    return load_native(path)
+
+
+def native_threshold(artifact_path: Path) -> Optional[float]:
+    """Threshold recorded in the current manifest for ``artifact_path``, if any."""
+    artifact_path = Path(artifact_path)
+    path = manifest_path(artifact_path)
+    if not path.exists():
+        return None
+    manifest = read_manifest(path)
+    if manifest.get("threshold") is None or not _is_current(manifest, artifact_path, path):
+        return None
+    return float(manifest["threshold"])
+
+
+def load_metadata(metadata_path: Path) -> Optional[Dict[str, Any]]:
+    """JSON metadata exported from ``metadata_path``, or None when absent or stale."""
+    metadata_path = Path(metadata_path)
+    path = metadata_json_path(metadata_path)
+    if not path.exists():
+        return None
+    document = _read_json(path)
+    if document.get("format") != NATIVE_FORMAT or not _is_current(document, metadata_path, path):
+        return None
+    return document["metadata"]
+
+
+def native_files(artifact_path: Path) -> Dict[str, Path]:
+    """Registry file name -> path for the native export of ``artifact_path`` (empty if none)."""
+    path = manifest_path(artifact_path)
+    if not path.exists():
+        return {}
+    manifest = read_manifest(path)
+    model_file = path.parent / manifest["model_file"]
+    return {path.name: path, model_file.name: model_file}
+
+
+def artifact_sha256(artifact_path: Path) -> Optional[str]:
+    """Content hash identifying a model artifact: the pickle's, else its native export's."""
+    artifact_path = Path(artifact_path)
+    if artifact_path.exists():
+        return _sha256(artifact_path)
+    path = manifest_path(artifact_path)
+    if path.exists():
+        return read_manifest(path)["model_sha256"]
+    return None
+
+
+def artifact_exists(artifact_path: Path) -> bool:
+    """The pickle or a native export of it is present."""
+    artifact_path = Path(artifact_path)
+    return artifact_path.exists() or manifest_path(artifact_path).exists()
+
+
+def load_model_artifact(artifact_path: Path) -> Any:
+    """Native export of ``artifact_path`` when present and current, otherwise the pickle itself."""
+    native = load_for_artifact(artifact_path)
+    if native is not None:
+        return native
+    with open(artifact_path, "rb") as f:
+        return pickle.load(f)
@@ -1,56 +1,95 @@
 import numpy as np
-import pandas as pd
 import logging
+from typing import List
+from app.core.metrics import stage, timed_stage
 from app.models.schemas import PredictionRequest, PredictionResponse
 from app.services.model_loader import model_loader
-from app.services.feature_engineering import FeatureEngineer
+from app.services.feature_engineering import feature_engineer
+from app.services.model_runtime import positive_class_probability
 
 logger = logging.getLogger(__name__)
 
+# Upper probability bounds for Low / Medium / High (anything above is Very High)
+RISK_LEVEL_BINS = np.array([0.25, 0.50, 0.75])
+RISK_LEVELS = np.array(["Low", "Medium", "High", "Very High"], dtype=object)
+
 
 class PredictionService:
     """Service for making credit score predictions"""
-    
+
     def __init__(self):
-        self.feature_engineer = FeatureEngineer()
-    
+        self.feature_engineer = feature_engineer
+
+    @timed_stage("prediction")
     def predict(self, request: PredictionRequest) -> PredictionResponse:
-        """Make prediction from request data"""
+        """Make prediction from request data (pandas-free single-row path)"""
+        try:
+            # Fill this thread's preallocated float32 feature row
+            with stage("feature_engineering"):
+                features = self.feature_engineer.transform_request(request)
+
+            # Get active model and threshold
+            model = model_loader.get_active_model()
+            threshold = model_loader.get_threshold()
+
+            with stage("predict_proba"):
+                probabilities = positive_class_probability(model, features)
+            with stage("decision_banding"):
+                return self._build_responses(probabilities, threshold)[0]
+
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}")
+            raise
+
+    @timed_stage("prediction")
+    def predict_many(self, requests: List[PredictionRequest]) -> List[PredictionResponse]:
+        """Score a list of requests with a single model call"""
+        if not requests:
+            return []
+
         try:
-            # Convert request to DataFrame
-            input_data = pd.DataFrame([request.model_dump()])
-            
-            # Apply feature engineering
-            processed_data = self.feature_engineer.transform(input_data)
-            
+            # Engineer all rows at once into one contiguous matrix
+            with stage("feature_engineering"):
+                features = self.feature_engineer.transform_requests(requests)
+
             # Get active model and threshold
             model = model_loader.get_active_model()
             threshold = model_loader.get_threshold()
-            
-            # Make prediction with probability
-            probability = model.predict_proba(processed_data)[0][1]
-            
-            # Apply optimized threshold
-            prediction = 1 if probability >= threshold else 0
-            
-            # Determine risk level
-            risk_level = self._get_risk_level(probability)
-            
-            # Calculate confidence (distance from decision boundary)
-            confidence = abs(probability - threshold) / max(threshold, 1 - threshold)
-            
-            return PredictionResponse(
+
+            # One model call for the whole batch
+            with stage("predict_proba"):
+                probabilities = positive_class_probability(model, features)
+            with stage("decision_banding"):
+                return self._build_responses(probabilities, threshold)
+
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}")
+            raise
+
+    def _build_responses(self, probabilities: np.ndarray, threshold: float) -> List[PredictionResponse]:
+        """Vectorized thresholding, risk banding and confidence for a batch of probabilities"""
+        # Apply optimized threshold
+        predictions = (probabilities >= threshold).astype(int)
+
+        # Determine risk levels
+        risk_levels = self._get_risk_levels(probabilities)
+
+        # Calculate confidence (distance from decision boundary)
+        confidences = np.abs(probabilities - threshold) / max(threshold, 1 - threshold)
+
+        return [
+            PredictionResponse(
                 prediction=int(prediction),
                 probability=float(probability),
                 risk_level=risk_level,
                 confidence=float(confidence),
                 message=self._get_message(risk_level, probability)
             )
-            
-        except Exception as e:
-            logger.error(f"Prediction error: {str(e)}")
-            raise
-    
+            for prediction, probability, risk_level, confidence in zip(
+                predictions, probabilities, risk_levels, confidences
+            )
+        ]
+
     def _get_risk_level(self, probability: float) -> str:
         """Determine risk level from probability"""
         if probability < 0.25:
@@ -61,7 +100,11 @@ class PredictionService:
             return "High"
         else:
             return "Very High"
-    
+
+    def _get_risk_levels(self, probabilities: np.ndarray) -> np.ndarray:
+        """Vectorized _get_risk_level"""
+        return RISK_LEVELS[np.digitize(probabilities, RISK_LEVEL_BINS)]
+
     def _get_message(self, risk_level: str, probability: float) -> str:
         """Generate message based on risk level"""
         messages = {
@@ -74,4 +117,4 @@ class PredictionService:
 
 
 # Singleton instance
-prediction_service = PredictionService()
\ No newline at end of file
+prediction_service = PredictionService()
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 from app.models.schemas import SimpleLoanRequest, PredictionRequest
 
 logger = logging.getLogger(__name__)
@@ -10,18 +11,29 @@ VND_TO_USD = 1 / 25000
 class RequestConverter:
     """Convert customer-friendly requests to internal prediction format"""
     
-    def convert_simple_to_prediction(self, simple_req: SimpleLoanRequest) -> PredictionRequest:
-        """Convert SimpleLoanRequest to PredictionRequest with calculated fields"""
+    def convert_simple_to_prediction(
+        self,
+        simple_req: SimpleLoanRequest,
+        credit_score: Optional[int] = None,
+    ) -> PredictionRequest:
+        """Convert SimpleLoanRequest to PredictionRequest with calculated fields
+
+        Args:
+            simple_req: Customer-friendly request
+            credit_score: Heuristic score already computed for this request
+                (``final_score`` of its breakdown); recomputed when omitted
+        """
         
         # Convert VND to USD for internal processing
         annual_income_usd = (simple_req.monthly_income * 12) * VND_TO_USD
         
         # Use a reference loan amount (2x annual income) since we calculate max loan separately
-        reference_loan_amount_vnd = simple_req.monthly_income * 12 * 2
+        reference_loan_amount_vnd = self.reference_loan_amount(simple_req)
         loan_amount_usd = reference_loan_amount_vnd * VND_TO_USD
         
         # Calculate credit score based on customer profile
-        credit_score = self._calculate_credit_score(simple_req, reference_loan_amount_vnd)
+        if credit_score is None:
+            credit_score = self._calculate_credit_score(simple_req, reference_loan_amount_vnd)
         
         # Map employment status
         home_ownership_map = {
@@ -74,6 +86,10 @@ class RequestConverter:
             previous_loan_defaults_on_file="Y" if simple_req.has_previous_defaults else "N"
         )
     
+    def reference_loan_amount(self, simple_req: SimpleLoanRequest) -> float:
+        """Reference loan amount in VND (2x annual income) used for scoring"""
+        return simple_req.monthly_income * 12 * 2
+
     def calculate_credit_score_with_breakdown(
         self, 
         age: int,
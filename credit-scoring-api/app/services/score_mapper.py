@@ -12,6 +12,7 @@ Two independent, non-conflicting score mappers:
 Keeping them separate prevents any calibration change on one model
 from accidentally affecting the other.
 """
+import numpy as np
 
 
 def probability_to_credit_score(probability: float) -> int:
@@ -53,6 +54,13 @@ def student_probability_to_credit_score(probability: float) -> int:
     return max(600, min(850, score))
 
 
+def student_probabilities_to_credit_scores(probabilities: np.ndarray) -> np.ndarray:
+    """Array form of student_probability_to_credit_score (identical results, int64)."""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    scores = 850 - np.trunc(np.power(probabilities, 0.6) * 250).astype(np.int64)
+    return np.clip(scores, 600, 850)
+
+
 def credit_score_to_rating(credit_score: int) -> str:
     """
     Map credit score to a human-readable rating label.
@@ -0,0 +1,162 @@
+"""
+Scoring Result Cache
+
+In-process LRU + TTL cache for model scoring results. Mobile clients
+re-submit identical applications while users move between screens; a
+repeat call is answered from here without feature engineering or a model
+call.
+
+Keys are content addresses: a SHA-256 over the canonical JSON of the
+scoring-relevant fields (the internal PredictionRequest, or the student
+payload at the reference loan amount; names never reach either) plus a
+version tuple of model fingerprint, threshold and decision policy. When
+any part of the version changes, the namespace is purged so stale results
+are never served and their memory is released at once.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_digest(payload: Dict[str, Any]) -> str:
+    """Stable hash of a JSON-like payload (key order and whitespace independent)."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ScoringCache:
+    """Thread-safe LRU cache with per-entry TTL and per-namespace versions."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self.max_entries = max(1, int(settings.SCORING_CACHE_MAX_ENTRIES if max_entries is None else max_entries))
+        self.ttl = float(settings.SCORING_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        self._enabled = enabled
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SCORING_CACHE_ENABLED if self._enabled is None else self._enabled
+
+    # ── Lookup / store ───────────────────────────────────────────────────────
+
+    def get(self, namespace: str, payload: Dict[str, Any], version: Tuple) -> Optional[Any]:
+        """Cached result for ``payload`` under ``version``, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        key = (namespace, canonical_digest(payload))
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(namespace, version)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, namespace: str, payload: Dict[str, Any], version: Tuple, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        key = (namespace, canonical_digest(payload))
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._check_version(namespace, version)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _check_version(self, namespace: str, version: Tuple) -> None:
+        """Drop a namespace's entries when its model/threshold/policy version changes."""
+        previous = self._versions.get(namespace)
+        if previous == version:
+            return
+        if previous is not None:
+            stale = [key for key in self._entries if key[0] == namespace]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += 1
+            logger.info(
+                "Scoring cache namespace %s invalidated (%d entries): version changed",
+                namespace,
+                len(stale),
+            )
+        self._versions[namespace] = version
+
+    # ── Maintenance ──────────────────────────────────────────────────────────
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+def prediction_cache_version() -> Tuple:
+    """Version of regular-model results: artifacts, active model and threshold."""
+    from app.services.model_loader import model_loader
+
+    return (
+        model_loader.model_fingerprint,
+        settings.USE_XGBOOST,
+        model_loader.get_threshold(),
+    )
+
+
+def student_cache_version() -> Tuple:
+    """Version of student results: artifacts, threshold, calibration and decision policy."""
+    from app.services.student_prediction_service import student_prediction_service
+
+    policy = student_prediction_service.decision_policy
+    return (
+        student_prediction_service.fingerprint,
+        policy.threshold,
+        settings.STUDENT_CALIBRATION_ENABLED,
+        policy.key,
+    )
+
+
+# Singleton instance
+scoring_cache = ScoringCache()
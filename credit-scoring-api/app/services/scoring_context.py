@@ -0,0 +1,109 @@
+"""
+Scoring Context
+
+Per-request state for the SimpleLoanRequest endpoints (/calculate-limit,
+/apply, /credit-score). The heuristic score breakdown, the internal
+PredictionRequest (and its loan grade) and the model result are computed
+once and every later step reads them from here, together with the shared
+hard-cap business rules.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.metrics import timed_stage
+from app.models.schemas import PredictionRequest, PredictionResponse, SimpleLoanRequest
+from app.services.request_converter import request_converter
+from app.services.score_mapper import probability_to_credit_score
+
+
+def apply_hard_caps(
+    application: SimpleLoanRequest,
+    credit_score: int,
+    risk_level: str,
+) -> Tuple[int, str]:
+    """HARD CAPS (Business Rules) applied on top of the model credit score.
+
+    Returns:
+        (capped_credit_score, risk_level)
+    """
+    # 1. Currently defaulting -> Auto reject, cap at 580 (Very Poor)
+    if application.currently_defaulting:
+        credit_score = min(credit_score, 580)
+        risk_level = "Very High"
+    # 2. Previous defaults -> Cap at 650 (Fair)
+    elif application.has_previous_defaults:
+        credit_score = min(credit_score, 650)
+    # 3. Young/Unemployed -> Cap at 680 (Fair)
+    elif application.age <= 22 or application.employment_status == "UNEMPLOYED":
+        credit_score = min(credit_score, 680)
+    # 4. New to credit -> Cap at 700 (Good)
+    elif application.years_credit_history == 0:
+        credit_score = min(credit_score, 700)
+    # 5. Low income (<10M) -> Cap at 720 (Good)
+    elif application.monthly_income < 10000000:
+        credit_score = min(credit_score, 720)
+    return credit_score, risk_level
+
+
+@dataclass
+class ScoringContext:
+    """Everything derived from one SimpleLoanRequest, computed once."""
+
+    application: SimpleLoanRequest
+    reference_loan_amount_vnd: float
+    score_breakdown: Dict[str, Any]
+    internal_request: PredictionRequest
+    prediction: Optional[PredictionResponse] = None
+    credit_score: Optional[int] = None
+    risk_level: Optional[str] = None
+
+    @classmethod
+    @timed_stage("request_conversion")
+    def build(cls, application: SimpleLoanRequest) -> "ScoringContext":
+        """Compute the heuristic breakdown and the internal request in one pass"""
+        reference_loan_amount = request_converter.reference_loan_amount(application)
+        breakdown = request_converter.calculate_credit_score_with_breakdown(
+            application.age,
+            application.monthly_income,
+            application.years_employed,
+            application.home_ownership,
+            application.years_credit_history,
+            application.employment_status,
+            application.has_previous_defaults,
+            application.currently_defaulting,
+            reference_loan_amount,
+        )
+        internal_request = request_converter.convert_simple_to_prediction(
+            application, credit_score=breakdown["final_score"]
+        )
+        return cls(
+            application=application,
+            reference_loan_amount_vnd=reference_loan_amount,
+            score_breakdown=breakdown,
+            internal_request=internal_request,
+        )
+
+    @property
+    def loan_grade(self) -> str:
+        return self.internal_request.loan_grade
+
+    @property
+    def annual_income_vnd(self) -> float:
+        return self.application.monthly_income * 12
+
+    @property
+    def probability(self) -> float:
+        if self.prediction is None:
+            raise RuntimeError("Scoring context has no model prediction yet")
+        return self.prediction.probability
+
+    def apply_prediction(self, prediction: PredictionResponse) -> "ScoringContext":
+        """Record the model result and derive the capped credit score and risk level"""
+        self.prediction = prediction
+        # Derive credit score from ML probability (non-linear), then cap it
+        self.credit_score, self.risk_level = apply_hard_caps(
+            self.application,
+            probability_to_credit_score(prediction.probability),
+            prediction.risk_level,
+        )
+        return self
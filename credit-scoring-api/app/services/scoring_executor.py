@@ -0,0 +1,257 @@
+"""
+Scoring Executor
+
+Runs CPU-bound scoring (feature engineering + model inference) off the
+asyncio event loop so one slow request does not stall every other
+connection on the worker.
+
+Modes (SCORING_EXECUTOR_MODE):
+    thread   Thread pool in this process. Models are shared with the API.
+    process  Process pool; every child loads the models once at start-up
+             and keeps them resident for all later tasks.
+
+Admission is bounded: at most SCORING_EXECUTOR_WORKERS tasks run and at
+most SCORING_EXECUTOR_MAX_QUEUE more wait. Anything beyond that fails
+fast with ScoringQueueFull so the route can answer 503 instead of piling
+up latency. A slot is held until the pool is done with the task, so work
+left behind by disconnected clients still counts against the bound.
+
+Tasks are module-level functions (picklable by reference) that look the
+service singletons up at call time, so the same task runs in either mode.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("thread", "process")
+
+
+class ScoringQueueFull(RuntimeError):
+    """Raised when the scoring queue is at capacity."""
+
+
+# ── Tasks ────────────────────────────────────────────────────────────────────
+
+
+def score_prediction(request):
+    """PredictionRequest -> PredictionResponse"""
+    from app.services.prediction_service import prediction_service
+
+    return prediction_service.predict(request)
+
+
+def score_predictions(requests):
+    """List[PredictionRequest] -> List[PredictionResponse] (one model call)"""
+    from app.services.prediction_service import prediction_service
+
+    return prediction_service.predict_many(requests)
+
+
+def score_student(raw: Dict[str, Any]):
+    """Student request dict -> (default_probability, risk_level, credit_score)"""
+    from app.services.student_prediction_service import student_prediction_service
+
+    return student_prediction_service.predict(raw)
+
+
+def score_students(raws: List[Dict[str, Any]]):
+    """List of student request dicts -> list of predict() tuples (one model call)"""
+    from app.services.student_prediction_service import student_prediction_service
+
+    return student_prediction_service.predict_many(raws)
+
+
+def score_student_arrays(raws: List[Dict[str, Any]]):
+    """List of student request dicts -> (probabilities, risk levels, credit scores) arrays"""
+    from app.services.student_prediction_service import student_prediction_service
+
+    return student_prediction_service.predict_arrays(raws)
+
+
+def score_smart_offer(offer_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments of SmartLoanOfferService.generate_offer -> offer dict"""
+    from app.services.smart_loan_offer import smart_loan_offer_service
+
+    with stage("loan_offer"):
+        return smart_loan_offer_service.generate_offer(**offer_kwargs)
+
+
+def _load_resident_models() -> None:
+    """Process-pool initializer: load every model once per child process."""
+    from app.services.warmup import warmup
+
+    warmup.load_models()
+
+    logger.info("Scoring worker ready (pid=%s)", multiprocessing.current_process().pid)
+
+
+def _timed_call(fn: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[float, Any]:
+    """Run ``fn`` and report when it started (monotonic clock is system-wide)."""
+    started_at = time.monotonic()
+    return started_at, fn(*args, **kwargs)
+
+
+# ── Executor ─────────────────────────────────────────────────────────────────
+
+
+class ScoringExecutor:
+    """Bounded thread/process pool for scoring work, awaited by the routes."""
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ) -> None:
+        self.mode = str(mode or settings.SCORING_EXECUTOR_MODE).strip().lower()
+        if self.mode not in EXECUTOR_MODES:
+            raise ValueError(
+                f"Unknown scoring executor mode {self.mode!r}; expected one of {EXECUTOR_MODES}"
+            )
+        self.workers = max(1, int(workers or settings.SCORING_EXECUTOR_WORKERS))
+        self.max_queue = max(0, int(settings.SCORING_EXECUTOR_MAX_QUEUE if max_queue is None else max_queue))
+
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = set()  # futures admitted and not yet finished
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    # ── Pool lifecycle ───────────────────────────────────────────────────────
+
+    def _get_pool(self) -> Executor:
+        """Start the pool on first use (caller holds ``self._lock``)."""
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_load_resident_models,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="scoring",
+                )
+            logger.info(
+                "Scoring executor started: mode=%s workers=%d max_queue=%d",
+                self.mode,
+                self.workers,
+                self.max_queue,
+            )
+        return self._pool
+
+    def prestart(self) -> None:
+        """Start the pool and every worker now instead of on the first request.
+
+        Process workers load all models in their initializer, so calling this
+        from the warm-up phase moves that cost ahead of traffic.
+        """
+        with self._lock:
+            pool = self._get_pool()
+        futures = [pool.submit(os.getpid) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+            logger.info("Scoring executor stopped")
+
+    # ── Submission ───────────────────────────────────────────────────────────
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        Raises:
+            ScoringQueueFull: when workers + max_queue tasks are already admitted
+        """
+        with self._lock:
+            if len(self._pending) >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise ScoringQueueFull(
+                    f"Scoring queue is full ({self.max_queue} waiting, {self.workers} running)"
+                )
+            pool = self._get_pool()
+            submitted_at = time.monotonic()
+            if self.mode == "thread":
+                # Carry request-scoped context (logging, tracing) into the worker thread
+                context = contextvars.copy_context()
+                future = pool.submit(context.run, _timed_call, fn, args, kwargs)
+            else:
+                future = pool.submit(_timed_call, fn, args, kwargs)
+            self._pending.add(future)
+        # Release the slot when the pool is done with the task, not when the
+        # caller stops waiting: a cancelled request's task may still be running.
+        # (Outside the lock: the callback runs inline if the task already finished.)
+        future.add_done_callback(lambda done: self._finish(done, submitted_at))
+
+        _, result = await asyncio.wrap_future(future)
+        return result
+
+    def _finish(self, future, submitted_at: float) -> None:
+        """Done callback: free the admission slot and record the outcome."""
+        with self._lock:
+            self._pending.discard(future)
+            if future.cancelled():
+                # Cancelled before a worker picked it up; it never ran
+                self._cancelled += 1
+            elif future.exception() is not None:
+                self._failed += 1
+            else:
+                started_at, _ = future.result()
+                wait = max(0.0, started_at - submitted_at)
+                self._completed += 1
+                self._wait_last = wait
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+    # ── Introspection ────────────────────────────────────────────────────────
+
+    def queue_depth(self) -> int:
+        """Tasks admitted but not yet picked up by a worker."""
+        with self._lock:
+            return sum(1 for f in self._pending if not f.running() and not f.done())
+
+    def stats(self) -> Dict[str, Any]:
+        queue_depth = self.queue_depth()
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "started": self._pool is not None,
+                "in_flight": len(self._pending),
+                "queue_depth": queue_depth,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+                "wait_ms_last": round(self._wait_last * 1000, 3),
+                "wait_ms_avg": round(self._wait_total / max(1, self._completed) * 1000, 3),
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+            }
+
+
+# Singleton instance
+scoring_executor = ScoringExecutor()
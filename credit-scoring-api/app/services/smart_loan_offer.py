@@ -1,11 +1,11 @@
 import logging
 import math
-import pandas as pd
 from typing import Dict, Any, Optional
 from app.services.loan_limit_calculator import loan_limit_calculator
 from app.services.loan_terms_calculator import loan_terms_calculator
-from app.services.feature_engineering import FeatureEngineer
+from app.services.feature_engineering import feature_engineer
 from app.services.model_loader import model_loader
+from app.services.model_runtime import positive_class_probability
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,7 @@ class SmartLoanOfferService:
     """Generate smart loan offers based on credit score and ML risk assessment."""
     
     def __init__(self):
-        self.feature_engineer = FeatureEngineer()
+        self.feature_engineer = feature_engineer
         self.approval_threshold = 0.30  # 30% default probability threshold
         self.min_credit_score = 600  # Minimum credit score for approval
     
@@ -61,12 +61,10 @@ class SmartLoanOfferService:
             }
         
         # Step 2: Engineer features for ML prediction
-        df = pd.DataFrame([request_dict])
-        features_df = self.feature_engineer.transform(df)
+        features = self.feature_engineer.transform_request(request_dict)
         
         # Step 3: Get ML model prediction
-        prediction_proba = model_loader.lgbm_model.predict_proba(features_df)[0]
-        probability = float(prediction_proba[1])  # Probability of default (class 1)
+        probability = float(positive_class_probability(model_loader.lgbm_model, features)[0])  # Probability of default (class 1)
         
         # Determine risk level
         if probability < 0.15:
@@ -151,3 +149,7 @@ class SmartLoanOfferService:
                     f"Please improve your credit profile and reapply."
                 )
             }
+
+
+# Singleton instance
+smart_loan_offer_service = SmartLoanOfferService()
@@ -2,18 +2,29 @@
 Student Application Logger
 
 Persists student scoring requests/results to Firestore for monitoring
-and downstream labeling/retraining.
+and downstream labeling/retraining. Records are queued and written in
+batches by a background BatchedFirestoreSink, so logging never waits on
+Firestore inside a request.
 """
 
 from __future__ import annotations
 
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
-
-from firebase_admin import firestore
+from typing import Any, Dict, List, Optional, Sequence
 
 from app.core.config import settings
+from app.core.firebase import ensure_firebase_app
+from app.core.metrics import timed_stage
+from app.services.firestore_sink import BatchedFirestoreSink
+from app.services.monitoring_aggregates import (
+    MonitoringAggregator,
+    count_window_with_aggregation_queries,
+    hour_start,
+    monitoring_aggregator,
+    sum_counts,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,16 +32,37 @@ logger = logging.getLogger(__name__)
 class StudentApplicationLogger:
     """Firestore logger for student scoring applications."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        backend: Optional[Any] = None,
+        aggregator: Optional[MonitoringAggregator] = None,
+    ) -> None:
         self._db: Optional[Any] = None
+        self._backend = backend
+        self._aggregator = aggregator or monitoring_aggregator
+        self._sink: Optional[BatchedFirestoreSink] = None
+        self._sink_lock = threading.Lock()
 
     def _get_db(self):
         if self._db is None:
+            from firebase_admin import firestore
+
+            ensure_firebase_app()
             self._db = firestore.client()
         return self._db
 
-    def log_application(
-        self,
+    def _get_sink(self) -> BatchedFirestoreSink:
+        if self._sink is None:
+            with self._sink_lock:
+                if self._sink is None:
+                    self._sink = BatchedFirestoreSink(
+                        collection=settings.STUDENT_APPLICATIONS_COLLECTION,
+                        backend=self._backend,
+                    )
+        return self._sink
+
+    @staticmethod
+    def _application_doc(
         user_id: str,
         request_payload: Dict[str, Any],
         *,
@@ -42,20 +74,12 @@ class StudentApplicationLogger:
         status: str,
         reason: Optional[str] = None,
         manual_review: Optional[bool] = None,
-    ) -> Optional[str]:
-        """Write a student application record and return document id."""
-        if not settings.STUDENT_APP_LOGGING_ENABLED:
-            return None
-
-        db = self._get_db()
-        if db is None:
-            raise RuntimeError("Firestore client is not available")
-        collection = settings.STUDENT_APPLICATIONS_COLLECTION
-
+        created_at: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
         if manual_review is None:
             manual_review = model_score is not None and 0.35 <= model_score <= 0.55
 
-        doc = {
+        return {
             "userId": user_id,
             "age": request_payload.get("age"),
             "gpa_latest": request_payload.get("gpa_latest"),
@@ -78,48 +102,154 @@ class StudentApplicationLogger:
             "manual_review": manual_review,
             "repayment_status": None,
             "label": None,
-            "createdAt": datetime.utcnow(),
+            "createdAt": created_at or datetime.utcnow(),
         }
 
-        ref = db.collection(collection).document()
-        ref.set(doc)
+    @timed_stage("firestore_logging")
+    def log_application(
+        self,
+        user_id: str,
+        request_payload: Dict[str, Any],
+        *,
+        credit_score: int,
+        loan_limit_vnd: float,
+        risk_level: str,
+        approved: bool,
+        model_score: Optional[float],
+        status: str,
+        reason: Optional[str] = None,
+        manual_review: Optional[bool] = None,
+    ) -> Optional[str]:
+        """Queue a student application record and return its document id.
+
+        Returns None when logging is disabled or the write queue is full.
+        """
+        if not settings.STUDENT_APP_LOGGING_ENABLED:
+            return None
+
+        doc = self._application_doc(
+            user_id,
+            request_payload,
+            credit_score=credit_score,
+            loan_limit_vnd=loan_limit_vnd,
+            risk_level=risk_level,
+            approved=approved,
+            model_score=model_score,
+            status=status,
+            reason=reason,
+            manual_review=manual_review,
+        )
+
+        sink = self._get_sink()
+        doc_id = sink.enqueue(doc)
+        if doc_id is not None:
+            # Dropped records (queue full / closed) are never stored, so they are not counted either
+            self._aggregator.record(approved=approved, manual_review=bool(doc["manual_review"]), at=doc["createdAt"])
 
         logger.info(
-            "Student application logged: collection=%s doc=%s approved=%s score=%s",
-            collection,
-            ref.id,
+            "Student application queued: collection=%s doc=%s approved=%s score=%s",
+            sink.collection,
+            doc_id,
             approved,
             credit_score,
         )
-        return ref.id
+        return doc_id
+
+    @timed_stage("firestore_logging")
+    def log_applications(self, user_id: str, applications: Sequence[Dict[str, Any]]) -> List[Optional[str]]:
+        """Queue a batch of student application records in one sink call.
+
+        Each item holds ``request_payload`` plus the keyword arguments of
+        log_application. Returns one document id per item (None where dropped);
+        an empty list when logging is disabled.
+        """
+        if not settings.STUDENT_APP_LOGGING_ENABLED or not applications:
+            return []
+
+        created_at = datetime.utcnow()
+        docs = [
+            self._application_doc(user_id, created_at=created_at, **application)
+            for application in applications
+        ]
+
+        sink = self._get_sink()
+        doc_ids = sink.enqueue_many(docs)
+        stored = [doc for doc, doc_id in zip(docs, doc_ids) if doc_id is not None]
+        self._aggregator.record_many(
+            approved=[doc["approved"] for doc in stored],
+            manual_review=[doc["manual_review"] for doc in stored],
+            at=created_at,
+        )
+
+        logger.info(
+            "Student applications queued: collection=%s count=%d dropped=%d",
+            sink.collection,
+            len(docs),
+            doc_ids.count(None),
+        )
+        return doc_ids
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Write all queued records now."""
+        return self._sink.flush(timeout) if self._sink is not None else True
+
+    def close(self) -> bool:
+        """Drain queued records, persist aggregates and stop the writers (application shutdown)."""
+        aggregates_saved = self._aggregator.close()
+        return (self._sink.close() if self._sink is not None else True) and aggregates_saved
+
+    def sink_stats(self) -> Optional[Dict[str, Any]]:
+        """Queue depth, drops and write lag of the background writer."""
+        return self._sink.stats() if self._sink is not None else None
 
     def get_monitoring_summary(self, window_hours: int = 24) -> Dict[str, Any]:
-        """Return quick canary metrics from recent student applications."""
-        db = self._get_db()
-        if db is None:
-            raise RuntimeError("Firestore client is not available")
+        """Return quick canary metrics from recent student applications.
 
+        Reads the hourly aggregates (the window starts at the top of its
+        first hour). The part of the window before the aggregates' coverage
+        start (e.g. history from before they were deployed) is counted with
+        Firestore count() aggregations over the applications collection,
+        which also serve the whole window when aggregates are disabled or
+        unreadable.
+        """
         collection = settings.STUDENT_APPLICATIONS_COLLECTION
         now = datetime.utcnow()
         safe_hours = max(1, int(window_hours))
         since = now - timedelta(hours=safe_hours)
 
-        query = db.collection(collection).where("createdAt", ">=", since)
-        docs = list(query.stream())
+        counts = None
+        source = "hourly_aggregates"
+        covered_from = None
+        if settings.STUDENT_MONITORING_AGGREGATES_ENABLED:
+            try:
+                since = hour_start(since)
+                counts = self._aggregator.window_counts(since)
+                covered_from = self._aggregator.coverage_start()
+                if covered_from is None:
+                    # Nothing aggregated yet: the raw collection has everything
+                    counts = None
+                elif covered_from > since:
+                    older = count_window_with_aggregation_queries(
+                        self._get_db(), collection, since, until=covered_from
+                    )
+                    counts = sum_counts([counts, older])
+                    source = "hourly_aggregates+count_aggregation"
+            except Exception as e:
+                counts = None
+                logger.warning("Monitoring aggregates unavailable, using count queries: %s", e)
 
-        total = len(docs)
-        approved_count = 0
-        manual_review_count = 0
-        rejected_count = 0
+        if counts is None:
+            db = self._get_db()
+            if db is None:
+                raise RuntimeError("Firestore client is not available")
+            counts = count_window_with_aggregation_queries(db, collection, since)
+            source = "count_aggregation"
+            covered_from = None
 
-        for doc in docs:
-            item = doc.to_dict() or {}
-            if bool(item.get("approved", False)):
-                approved_count += 1
-            else:
-                rejected_count += 1
-            if bool(item.get("manual_review", False)):
-                manual_review_count += 1
+        total = counts["total"]
+        approved_count = counts["approved"]
+        rejected_count = counts["rejected"]
+        manual_review_count = counts["manual_review"]
 
         def _ratio(count: int) -> float:
             return float(count / total) if total > 0 else 0.0
@@ -129,6 +259,8 @@ class StudentApplicationLogger:
             "from_utc": since.isoformat() + "Z",
             "to_utc": now.isoformat() + "Z",
             "collection": collection,
+            "source": source,
+            "aggregates_from_utc": covered_from.isoformat() + "Z" if covered_from else None,
             "total_applications": total,
             "approved_count": approved_count,
             "rejected_count": rejected_count,
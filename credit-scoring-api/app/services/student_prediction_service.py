@@ -2,47 +2,142 @@
 Student Prediction Service
 
 Loads the Phase 1 XGBoost alternative model and engineers
-the 25 features expected by that model from a StudentLoanRequest.
+the 25 features expected by that model from a StudentLoanRequest
+(app.services.student_features, shared with the retraining pipeline).
 
 Model path (local dev): output/alternative_model/best_model_phase1.pkl
 Threshold:              output/alternative_model/best_threshold_phase1.pkl
 """
+from __future__ import annotations
+
 import pickle
 import logging
-import pandas as pd
+import threading
 import numpy as np
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-from app.services.score_mapper import student_probability_to_credit_score
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from app.services.artifact_loading import artifact_load_report
+from app.services.model_runtime import model_feature_names, positive_class_probability
+from app.services.native_models import (
+    artifact_exists,
+    artifact_sha256,
+    load_for_artifact as load_native_for_artifact,
+    native_threshold,
+)
+from app.services.calibration import CompiledIsotonicCalibrator, compile_calibrator
+from app.services.decision_policy import DecisionPolicy
+from app.services.score_mapper import (
+    student_probabilities_to_credit_scores,
+    student_probability_to_credit_score,
+)
 from app.core.config import settings
-from app.services.student_feature_contract import (
-    LIVING_MAP,
-    MAJOR_INCOME_MAP,
-    MATURITY_MAP,
-    STUDENT_MODEL_FEATURE_ORDER,
+from app.core.metrics import stage, timed_stage
+from app.services.student_feature_contract import STUDENT_MODEL_FEATURE_ORDER
+from app.services.student_features import (
+    engineer_student_features,
+    fill_student_row,
+    request_inputs,
+    request_values,
+    student_features_frame,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 # Default threshold if pkl not found
 DEFAULT_THRESHOLD = 0.3623
 
+# Representative applicant used to warm a freshly loaded model before it serves
+WARMUP_STUDENT = {
+    "age": 21,
+    "gpa_latest": 3.2,
+    "academic_year": 3,
+    "major": "technology",
+    "program_level": "undergraduate",
+    "living_status": "dormitory",
+    "loan_amount": 5_000_000,
+    "has_buffer": True,
+    "support_sources": ["family"],
+    "monthly_income": 3_000_000,
+    "monthly_expenses": 2_000_000,
+}
+
+
+@dataclass(frozen=True)
+class StudentModelArtifacts:
+    """One loaded version of the student model, threshold and calibrator."""
+
+    model: Any = None
+    calibrator: Any = None
+    threshold: float = DEFAULT_THRESHOLD
+    model_path: Optional[Path] = None
+    threshold_path: Optional[Path] = None
+    calibrator_path: Optional[Path] = None
+    fingerprint: str = ""
+    version: str = "startup"
+
 
 class StudentPredictionService:
     """Predict default probability for student loan applicants."""
 
     def __init__(self):
-        self._model = None
-        self._calibrator = None
-        self._threshold: float = DEFAULT_THRESHOLD
-        self._model_path: Path | None = None
-        self._threshold_path: Path | None = None
-        self._calibrator_path: Path | None = None
-        self._load()
+        # Loaded on first use or by the startup warm-up, not at import time
+        self._loaded: Optional[StudentModelArtifacts] = None
+        self._load_lock = threading.Lock()
+        self._buffers = threading.local()
+        # Current decision policy; replaced as a whole by update_decision_policy() / adopt_decision_policy()
+        self._policy: Optional[DecisionPolicy] = None
+        self._policy_lock = threading.Lock()
+
+    # Current artifact version; replaced as a whole by swap()
+    @property
+    def _artifacts(self) -> StudentModelArtifacts:
+        artifacts = self._loaded
+        if artifacts is not None:
+            return artifacts
+        with self._load_lock:
+            if self._loaded is None:
+                from app.core.startup_profile import startup_profile
+
+                with startup_profile.phase("student_models"):
+                    self._loaded = self._load()
+            return self._loaded
+
+    @property
+    def _model(self):
+        return self._artifacts.model
+
+    @property
+    def _calibrator(self):
+        return self._artifacts.calibrator
+
+    @property
+    def _threshold(self) -> float:
+        return self._artifacts.threshold
+
+    @property
+    def _model_path(self) -> Optional[Path]:
+        return self._artifacts.model_path
+
+    @property
+    def _threshold_path(self) -> Optional[Path]:
+        return self._artifacts.threshold_path
+
+    @property
+    def _calibrator_path(self) -> Optional[Path]:
+        return self._artifacts.calibrator_path
 
     # ── Loading ──────────────────────────────────────────────────────────────
 
-    def _load(self):
+    @property
+    def artifacts_loaded(self) -> bool:
+        """Whether artifacts have been read yet (does not trigger a load)."""
+        return self._loaded is not None
+
+    def _load(self) -> StudentModelArtifacts:
         # __file__ = .../credit-scoring-api/app/services/student_prediction_service.py
         # parent x3 = credit-scoring-api/
         # parent x4 = project root (Credit-Scoring/)
@@ -65,60 +160,162 @@ class StudentPredictionService:
             api_root / "models" / settings.STUDENT_CALIBRATOR_FILENAME,
         ]
 
-        model_path = next((p for p in model_candidates if p.exists()), model_candidates[0])
+        model_path = next((p for p in model_candidates if artifact_exists(p)), model_candidates[0])
         threshold_path = next((p for p in threshold_candidates if p.exists()), threshold_candidates[0])
         calibrator_path = next((p for p in calibrator_candidates if p.exists()), calibrator_candidates[0])
-        self._model_path = model_path
-        self._threshold_path = threshold_path
-        self._calibrator_path = calibrator_path
 
-        if not model_path.exists():
+        if not artifact_exists(model_path):
             logger.warning(
                 f"Student model not found at {model_path}. "
                 "Endpoint will return 503 until model is available."
             )
-            return
+            return StudentModelArtifacts(
+                model_path=model_path,
+                threshold_path=threshold_path,
+                calibrator_path=calibrator_path,
+            )
+
+        return self.load_artifacts(model_path, threshold_path, calibrator_path)
 
-        with open(model_path, "rb") as f:
-            self._model = pickle.load(f)
-        logger.info(f"Student model loaded from {model_path}")
+    def load_artifacts(
+        self,
+        model_path: Path,
+        threshold_path: Path,
+        calibrator_path: Path,
+        version: str = "startup",
+    ) -> StudentModelArtifacts:
+        """Load one artifact version without touching the one being served.
 
-        if threshold_path.exists():
+        Model, threshold, calibrator and fingerprint are independent files
+        and load side by side.
+        """
+        loaded = artifact_load_report.load_concurrently(
+            {
+                "student_model": lambda: self._load_model(model_path),
+                "student_threshold": lambda: self._load_threshold(threshold_path, model_path),
+                "student_calibrator": lambda: self._load_calibrator(calibrator_path),
+                "student_fingerprint": lambda: "-".join(
+                    digest[:12]
+                    for digest in (artifact_sha256(model_path), artifact_sha256(calibrator_path))
+                    if digest
+                ),
+            },
+            group=f"student:{version}",
+            paths={
+                "student_model": model_path,
+                "student_threshold": threshold_path,
+                "student_calibrator": calibrator_path,
+            },
+        )
+        return StudentModelArtifacts(
+            model=loaded["student_model"],
+            calibrator=loaded["student_calibrator"],
+            threshold=loaded["student_threshold"],
+            model_path=model_path,
+            threshold_path=threshold_path,
+            calibrator_path=calibrator_path,
+            fingerprint=loaded["student_fingerprint"],
+            version=version,
+        )
+
+    @staticmethod
+    def _load_model(model_path: Path):
+        model = None
+        if settings.USE_TREE_TABLES:
+            from app.services.tree_ensemble import load_for_artifact
+
+            model = load_for_artifact(settings.tree_table_path(model_path), model_path)
+            if model is not None:
+                logger.info(f"Student model loaded from tree table for {model_path}")
+
+        if model is None and settings.USE_NATIVE_MODELS:
+            model = load_native_for_artifact(model_path)
+            if model is not None:
+                logger.info(f"Student model loaded from native {model.manifest['model_file']}")
+
+        if model is None:
+            with open(model_path, "rb") as f:
+                model = pickle.load(f)
+            logger.info(f"Student model loaded from {model_path}")
+        return model
+
+    @staticmethod
+    def _load_threshold(threshold_path: Path, model_path: Optional[Path] = None) -> float:
+        threshold = DEFAULT_THRESHOLD
+        manifest_threshold = (
+            native_threshold(model_path)
+            if settings.USE_NATIVE_MODELS and model_path is not None
+            else None
+        )
+        if manifest_threshold is not None:
+            threshold = manifest_threshold
+            logger.info(f"Student threshold loaded from model manifest: {threshold:.4f}")
+        elif threshold_path.exists():
             with open(threshold_path, "rb") as f:
-                self._threshold = float(pickle.load(f))
-            logger.info(f"Student threshold loaded: {self._threshold:.4f}")
+                threshold = float(pickle.load(f))
+            logger.info(f"Student threshold loaded: {threshold:.4f}")
         else:
             logger.warning(f"Threshold file not found, using default {DEFAULT_THRESHOLD}")
+        # STUDENT_APPROVAL_THRESHOLD_OVERRIDE is applied by the DecisionPolicy
+        return threshold
 
-        # Optional runtime override for fast policy tuning in production.
-        override = float(settings.STUDENT_APPROVAL_THRESHOLD_OVERRIDE)
-        if 0.0 < override < 1.0:
-            logger.warning(
-                "Student threshold override active: %.4f (artifact threshold %.4f)",
-                override,
-                self._threshold,
-            )
-            self._threshold = override
-
+    @staticmethod
+    def _load_calibrator(calibrator_path: Path):
+        calibrator = None
         if settings.STUDENT_CALIBRATION_ENABLED and calibrator_path.exists():
             with open(calibrator_path, "rb") as f:
-                self._calibrator = pickle.load(f)
+                calibrator = compile_calibrator(pickle.load(f))
             logger.info(f"Student calibrator loaded from {calibrator_path}")
         elif settings.STUDENT_CALIBRATION_ENABLED:
             logger.warning(
                 "Student calibrator not found at %s. Using raw model probabilities.",
                 calibrator_path,
             )
+        return calibrator
+
+    def warm(self, artifacts: StudentModelArtifacts) -> Tuple[float, str, int]:
+        """Score WARMUP_STUDENT with ``artifacts`` so first requests after a swap are not cold."""
+        return self._predict_with(artifacts, WARMUP_STUDENT)
+
+    def swap(self, artifacts: StudentModelArtifacts) -> StudentModelArtifacts:
+        """Serve ``artifacts`` from now on; returns the previous version.
+
+        predict() reads the artifacts once per call, so requests already
+        running finish on the version they started with.
+        """
+        previous, self._loaded = self._artifacts, artifacts
+        logger.info(
+            "Student model swapped: %s (%s) -> %s (%s)",
+            previous.version,
+            previous.fingerprint,
+            artifacts.version,
+            artifacts.fingerprint,
+        )
+        return previous
+
+    @staticmethod
+    def check_feature_order(model) -> None:
+        """Raise ValueError if ``model`` records a feature order other than the contract's."""
+        feature_names = model_feature_names(model)
+        if feature_names and feature_names != STUDENT_MODEL_FEATURE_ORDER:
+            raise ValueError(
+                f"student model expects features {feature_names}, "
+                f"serving builds {STUDENT_MODEL_FEATURE_ORDER}"
+            )
 
     def validate_runtime_assets(self, strict: bool = False) -> Dict[str, Any]:
         """Validate model artifacts and model-feature compatibility."""
         issues: List[str] = []
         warnings: List[str] = []
 
-        if self._model_path is None or not self._model_path.exists():
+        if self._model_path is None or not artifact_exists(self._model_path):
             issues.append("student_model_artifact_missing")
 
-        if self._threshold_path is None or not self._threshold_path.exists():
+        if (self._threshold_path is None or not self._threshold_path.exists()) and (
+            not settings.USE_NATIVE_MODELS
+            or self._model_path is None
+            or native_threshold(self._model_path) is None
+        ):
             warnings.append("student_threshold_artifact_missing_using_default")
 
         if settings.STUDENT_CALIBRATION_ENABLED:
@@ -134,9 +331,9 @@ class StudentPredictionService:
             issues.append("student_model_not_loaded")
         else:
             try:
-                feature_names = list(self._model.get_booster().feature_names or [])
-                if feature_names and feature_names != STUDENT_MODEL_FEATURE_ORDER:
-                    issues.append("student_model_feature_mismatch")
+                self.check_feature_order(self._model)
+            except ValueError:
+                issues.append("student_model_feature_mismatch")
             except Exception:
                 warnings.append("student_model_feature_names_unavailable")
 
@@ -147,9 +344,10 @@ class StudentPredictionService:
             "model_path": str(self._model_path) if self._model_path else "",
             "threshold_path": str(self._threshold_path) if self._threshold_path else "",
             "calibrator_path": str(self._calibrator_path) if self._calibrator_path else "",
-            "threshold": float(self._threshold),
+            "threshold": float(self.threshold),
             "model_loaded": self._model is not None,
             "calibrator_loaded": self._calibrator is not None,
+            "calibrator_compiled": isinstance(self._calibrator, CompiledIsotonicCalibrator),
         }
 
         if strict and issues:
@@ -159,205 +357,261 @@ class StudentPredictionService:
 
         return status
 
+    def runtime_status(self) -> Dict[str, Any]:
+        """What is loaded right now; no filesystem access and never triggers a load."""
+        artifacts = self._loaded
+        if artifacts is None:
+            return {
+                "ok": False,
+                "loaded": False,
+                "threshold": None,
+                "model_loaded": False,
+                "calibrator_loaded": False,
+                "calibrator_compiled": False,
+            }
+        return {
+            "ok": artifacts.model is not None and 0.0 < float(artifacts.threshold) < 1.0,
+            "loaded": True,
+            "threshold": float(self._policy_for(artifacts).threshold),
+            "model_loaded": artifacts.model is not None,
+            "calibrator_loaded": artifacts.calibrator is not None,
+            "calibrator_compiled": isinstance(artifacts.calibrator, CompiledIsotonicCalibrator),
+        }
+
     @property
     def is_ready(self) -> bool:
         return self._model is not None
 
     @property
     def threshold(self) -> float:
-        return self._threshold
+        """Approval threshold in force: the policy's override or the model's own."""
+        return self.decision_policy.threshold
 
-    def classify_decision_band(self, probability: float) -> Tuple[str, bool, bool]:
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the loaded model (and calibrator) artifacts."""
+        return self._artifacts.fingerprint
+
+    @property
+    def version(self) -> str:
+        return self._artifacts.version
+
+    # ── Decision policy ──────────────────────────────────────────────────────
+
+    @property
+    def decision_policy(self) -> DecisionPolicy:
+        """Current policy, compiled against the loaded model's threshold."""
+        return self._policy_for(self._artifacts)
+
+    @property
+    def decision_policy_unbound(self) -> Optional[DecisionPolicy]:
+        """Policy last set or adopted, as stored (None before the first); never loads the model."""
+        return self._policy
+
+    def _policy_for(self, artifacts: StudentModelArtifacts) -> DecisionPolicy:
+        policy = self._policy
+        if policy is not None and policy.model_threshold == artifacts.threshold:
+            return policy
+        with self._policy_lock:
+            policy = self._policy
+            if policy is None:
+                policy = DecisionPolicy.from_settings(artifacts.threshold)
+            elif policy.model_threshold != artifacts.threshold:
+                # A model swap brought a new threshold; keep the policy, move the cutoffs
+                policy = policy.with_model_threshold(artifacts.threshold)
+            self._policy = policy
+            return policy
+
+    def update_decision_policy(self, source: str = "admin", **changes: Any) -> Tuple[DecisionPolicy, DecisionPolicy]:
+        """Replace the policy with its next revision carrying ``changes``.
+
+        ``changes`` are DecisionPolicy fields (name, manual_review_margin,
+        threshold_override). The new policy is published with one reference
+        assignment, so concurrent requests classify with either the old or
+        the new cutoffs, never a mix.
+
+        Returns:
+            (previous policy, new policy)
+        """
+        artifacts = self._artifacts
+        self._policy_for(artifacts)
+        with self._policy_lock:
+            previous = self._policy.with_model_threshold(artifacts.threshold)
+            policy = previous.updated(source=source, **changes)
+            self._policy = policy
+        logger.info(
+            "Student decision policy set: %s (approve < %.4f, review <= %.4f, revision %d)",
+            policy.name,
+            policy.approve_below,
+            policy.review_up_to,
+            policy.revision,
+        )
+        return previous, policy
+
+    def adopt_decision_policy(self, policy: DecisionPolicy) -> DecisionPolicy:
+        """Serve ``policy`` (e.g. one stored by another instance); returns the previous one.
+
+        The policy is stored as given and bound to the model threshold on first
+        use (see _policy_for), so adopting never loads the model.
+        """
+        with self._policy_lock:
+            previous, self._policy = self._policy, policy
+        return previous if previous is not None else policy
+
+    @timed_stage("decision_banding")
+    def classify_decision_band(
+        self, probability: float, policy: Optional[DecisionPolicy] = None
+    ) -> Tuple[str, bool, bool]:
         """Classify probability into decision policy bands.
 
+        Pass the ``policy`` a request already read so its bands and reported
+        threshold come from the same revision.
+
         Returns:
             (decision_band, approved, manual_review)
         """
-        base_margin = max(0.0, min(settings.STUDENT_MANUAL_REVIEW_MARGIN, 0.25))
-        policy = str(settings.STUDENT_DECISION_POLICY or "balanced").strip().lower()
-
-        if policy == "safe":
-            # Wider review window for safer launch.
-            margin = max(base_margin, 0.10)
-            approve_cutoff = max(0.0, self._threshold - margin)
-        elif policy == "aggressive":
-            # Narrow review window and slightly higher approve cutoff.
-            margin = min(base_margin, 0.03)
-            approve_cutoff = min(1.0, self._threshold + margin)
-        else:
-            # Balanced default: approve below threshold, review near reject side.
-            margin = base_margin
-            approve_cutoff = self._threshold
+        return (policy or self.decision_policy).classify(probability)
 
-        upper = min(1.0, self._threshold + margin)
+    @timed_stage("decision_banding")
+    def classify_decision_bands(
+        self, probabilities: np.ndarray, policy: Optional[DecisionPolicy] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized classify_decision_band.
 
-        if probability < approve_cutoff:
-            return "auto_approve", True, False
-        if probability <= upper:
-            return "manual_review", False, True
-        return "auto_reject", False, False
+        Returns:
+            (decision_band as object array, approved, manual_review)
+        """
+        return (policy or self.decision_policy).classify_many(probabilities)
 
-    def _calibrate_probability(self, probability: float) -> float:
+    def _calibrate_probability(self, probability: float, calibrator: Any = None) -> float:
         """Apply optional probability calibration artifact."""
-        if self._calibrator is None:
+        if calibrator is None:
             return probability
 
         try:
-            calibrated = self._calibrator.predict(np.array([probability], dtype=float))[0]
+            if isinstance(calibrator, CompiledIsotonicCalibrator):
+                calibrated = calibrator.predict_one(probability)
+            else:
+                calibrated = calibrator.predict(np.array([probability], dtype=float))[0]
         except Exception as exc:
             logger.warning("Student probability calibration failed: %s", exc)
             return probability
 
         return float(max(0.0, min(1.0, calibrated)))
 
+    def _calibrate_probabilities(self, probabilities: np.ndarray, calibrator: Any = None) -> np.ndarray:
+        """Calibrate a batch in one calibrator call; raw probabilities if it fails."""
+        if calibrator is None:
+            return probabilities
+
+        try:
+            calibrated = np.asarray(calibrator.predict(probabilities), dtype=np.float64)
+        except Exception as exc:
+            logger.warning("Student probability calibration failed: %s", exc)
+            return probabilities
+
+        return np.clip(calibrated, 0.0, 1.0)
+
     # ── Feature Engineering ──────────────────────────────────────────────────
 
-    def _engineer(self, raw: dict) -> pd.DataFrame:
-        """Build the 25-feature DataFrame from raw student request fields."""
-        d = {}
-
-        # User-supplied fields
-        d["age"]                    = int(raw["age"])
-        d["program_level"]          = 1 if raw.get("program_level", "undergraduate") == "postgraduate" else 0
-        d["living_status"]          = LIVING_MAP.get(raw.get("living_status", "dormitory"), 0)
-        d["gpa_latest"]             = raw["gpa_latest"]
-        d["academic_year"]          = raw["academic_year"]
-        loan_amount = raw.get("loan_amount")
-        if loan_amount is None:
-            loan_amount = settings.STUDENT_SCORING_REFERENCE_LOAN_AMOUNT
-        d["loan_amount"]            = float(loan_amount)
-        d["has_buffer"]             = int(raw["has_buffer"])
-
-        # Derived: major income potential
-        d["major_income_potential"] = MAJOR_INCOME_MAP.get(
-            raw.get("major", "other"), 0.6
-        )
+    @staticmethod
+    def _inputs(raws: List[dict]) -> Dict[str, np.ndarray]:
+        return request_inputs(raws, settings.STUDENT_SCORING_REFERENCE_LOAN_AMOUNT)
 
-        # Normalize optional financial inputs to avoid None arithmetic.
-        raw_monthly_income = raw.get("monthly_income")
-        monthly_income_val = (
-            float(raw_monthly_income) if raw_monthly_income is not None else 0.0
-        )
-        raw_monthly_expenses = raw.get("monthly_expenses")
-        monthly_expenses_val = (
-            float(raw_monthly_expenses)
-            if raw_monthly_expenses is not None
-            else 2_000_000.0
-        )
+    def _engineer(self, raw: dict) -> pd.DataFrame:
+        """Build the 25-feature DataFrame from raw student request fields.
 
-        # Derived: living / support
-        living_code = d["living_status"]
-        d["support_numeric"]        = max(0.1, monthly_income_val / 5_000_000)
-
-        # Derived: maturity score from year
-        d["maturity_score"]         = MATURITY_MAP.get(raw["academic_year"], 0.4)
-
-        # Derived: debt ratio (monthly expenses vs income)
-        monthly_expenses = max(monthly_expenses_val, 0.0)
-        monthly_income   = max(monthly_income_val, 1.0)
-        d["debt_ratio"]             = min(monthly_expenses / (monthly_income + monthly_expenses), 0.99)
-
-        # Behavioral signals inferred from current profile.
-        # Keep values in conservative ranges close to training scale.
-        support_sources = raw.get("support_sources") or []
-        if not isinstance(support_sources, list):
-            support_sources = []
-        support_count = len([s for s in support_sources if isinstance(s, str) and s.strip()])
-        has_family_support = any(
-            isinstance(s, str) and s.strip().lower() == "family"
-            for s in support_sources
-        )
+        Debugging view only; scoring uses _engineer_vector.
+        """
+        return student_features_frame(self._inputs([raw]))
 
-        gpa = float(d["gpa_latest"])
-        academic_year = int(d["academic_year"])
-        has_buffer = bool(d["has_buffer"])
-
-        # Allow negative values: GPA > 3.2 or year > 3 actively reduces risk score
-        gpa_signal  = min(1.0, (3.2 - gpa) / 2.2)                    # [-0.36 (GPA 4.0) … +1.0 (GPA 0)]
-        year_signal = min(1.0, (3.0 - float(academic_year)) / 2.0)   # [-1.0 (yr 5) … +1.0 (yr 1)]
-        support_gap = max(0.0, 1.0 - min(1.0, d["support_numeric"]))
-        expense_pressure = min(1.0, monthly_expenses / max(monthly_income + monthly_expenses, 1.0))
-        living_risk = 1.0 if living_code == 2 else (0.35 if living_code == 1 else 0.2)
-
-        behavior_risk_score = (
-            4.6
-            + 1.6 * expense_pressure
-            + 1.0 * gpa_signal
-            + 0.8 * support_gap
-            + 0.6 * year_signal
-            + 0.5 * living_risk
-            - 0.8 * (1.0 if has_buffer else 0.0)
-            - 0.25 * min(2, support_count)
-            - (0.4 if has_family_support else 0.0)
-        )
-        d["behavior_risk_score"] = float(max(2.5, min(8.5, behavior_risk_score)))
-
-        volatility = (
-            0.22
-            + 0.18 * expense_pressure
-            + 0.10 * support_gap
-            + 0.10 * year_signal
-            + (0.05 if support_count == 0 else 0.0)
-            - (0.04 if has_buffer else 0.0)
-        )
-        d["behavior_volatility"] = float(max(0.12, min(0.65, volatility)))
-
-        pressure = (
-            4.6
-            + 1.5 * expense_pressure
-            + 0.8 * support_gap
-            + (0.6 if living_code == 2 else 0.0)
-            + (0.5 if not has_buffer else 0.0)
-            + 0.4 * year_signal
-        )
-        d["behavior_under_pressure"] = float(max(2.0, min(8.5, pressure)))
-
-        shock_vulnerability = (
-            0.38
-            + 0.28 * support_gap
-            + 0.20 * expense_pressure
-            + (0.12 if not has_buffer else -0.08)
-            + (0.08 if support_count == 0 else 0.0)
-        )
-        d["shock_vulnerability"] = float(max(0.05, min(0.95, shock_vulnerability)))
+    def _engineer_vector(self, raw: dict, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Fill a contiguous (1, 25) float32 row in model feature order.
 
-        # Binary flags
-        d["severe_behavior_flag"]   = int(
-            d["debt_ratio"] > 0.75 and (not has_buffer) and d["support_numeric"] < 0.5
-        )
-        d["thin_support_flag"]      = 1 if d["support_numeric"] < 0.3 else 0
-        d["high_pressure_flag"]     = 1 if living_code == 2 else 0
-
-        # Interaction features expected by training schema
-        d["debt_x_behavior"]        = d["debt_ratio"] * d["behavior_risk_score"]
-        d["debt_x_support"]         = d["debt_ratio"] * d["support_numeric"]
-        d["debt_x_living"]          = d["debt_ratio"] * living_code
-
-        # Engineered interaction features (Phase 1)
-        d["financial_stress_index"] = d["debt_ratio"] * d["behavior_volatility"]
-        d["academic_resilience"]    = d["gpa_latest"] * d["support_numeric"]
-        d["risk_compounding"]       = (
-            d["severe_behavior_flag"] + d["thin_support_flag"] + d["high_pressure_flag"]
+        Without ``out`` the row is this thread's preallocated buffer, which the
+        next call on the same thread overwrites.
+        """
+        if out is None:
+            out = getattr(self._buffers, "row", None)
+            if out is None:
+                out = np.zeros((1, len(STUDENT_MODEL_FEATURE_ORDER)), dtype=np.float32)
+                self._buffers.row = out
+        return fill_student_row(
+            request_values(raw, settings.STUDENT_SCORING_REFERENCE_LOAN_AMOUNT), out
         )
-        d["loan_to_maturity_ratio"] = d["loan_amount"] / (d["maturity_score"] + 0.1)
 
-        df = pd.DataFrame([d])
-        return df[STUDENT_MODEL_FEATURE_ORDER]
+    def _engineer_matrix(self, raws: List[dict]) -> np.ndarray:
+        """(N, 25) float32 feature matrix for a batch, in one columnar pass."""
+        return engineer_student_features(self._inputs(raws))
 
     # ── Prediction ───────────────────────────────────────────────────────────
 
+    @timed_stage("student_prediction")
     def predict(self, raw: dict) -> Tuple[float, str, int]:
         """
         Returns:
             (default_probability, risk_level, credit_score)
         """
-        if self._model is None:
+        return self._predict_with(self._artifacts, raw)
+
+    def _predict_with(self, artifacts: StudentModelArtifacts, raw: dict) -> Tuple[float, str, int]:
+        if artifacts.model is None:
             raise RuntimeError("Student model is not loaded")
 
-        model = self._model
-        features = self._engineer(raw)
-        raw_prob = float(model.predict_proba(features)[0][1])
-        prob = self._calibrate_probability(raw_prob)
+        with stage("feature_engineering"):
+            features = self._engineer_vector(raw)
+        with stage("predict_proba"):
+            raw_prob = float(positive_class_probability(artifacts.model, features)[0])
+        return self._score_probability(raw_prob, artifacts.calibrator)
+
+    def predict_many(self, raws: List[dict]) -> List[Tuple[float, str, int]]:
+        """Score several students with a single model call.
+
+        Returns:
+            One (default_probability, risk_level, credit_score) tuple per input
+        """
+        probs, risks, scores = self.predict_arrays(raws)
+        return list(zip(probs.tolist(), risks.tolist(), scores.tolist()))
+
+    @timed_stage("student_prediction")
+    def predict_arrays(self, raws: List[dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Columnar predict_many for batch endpoints.
+
+        Returns:
+            (default_probability as float64, risk_level as object, credit_score as int64)
+        """
+        artifacts = self._artifacts
+        if artifacts.model is None:
+            raise RuntimeError("Student model is not loaded")
+        if not raws:
+            return np.zeros(0), np.zeros(0, dtype=object), np.zeros(0, dtype=np.int64)
+
+        with stage("feature_engineering"):
+            features = self._engineer_matrix(raws)
+
+        with stage("predict_proba"):
+            raw_probs = positive_class_probability(artifacts.model, features)
+        return self._score_probabilities(raw_probs, artifacts.calibrator)
+
+    def _score_probabilities(
+        self, raw_probs: np.ndarray, calibrator: Any = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized _score_probability: (probabilities, risk levels, credit scores)."""
+        raw_probs = np.asarray(raw_probs, dtype=np.float64)
+        with stage("calibration"):
+            probs = self._calibrate_probabilities(raw_probs, calibrator)
+
+        risks = np.select(
+            [probs < 0.25, probs < 0.45, probs < 0.65],
+            ["Low", "Medium", "High"],
+            default="Very High",
+        ).astype(object)
+        return probs, risks, student_probabilities_to_credit_scores(probs)
+
+    def _score_probability(self, raw_prob: float, calibrator: Any = None) -> Tuple[float, str, int]:
+        """Calibrate a raw model probability and derive risk level and credit score."""
+        with stage("calibration"):
+            prob = self._calibrate_probability(raw_prob, calibrator)
 
         if prob < 0.25:
             risk = "Low"
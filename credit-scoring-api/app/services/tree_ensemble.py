@@ -0,0 +1,420 @@
+"""
+Array-backed Tree Ensemble
+
+Flattens fitted XGBoost / LightGBM binary classifiers into one node table
+of NumPy arrays (feature index, threshold, left, right, leaf value) and
+scores batches level by level with vectorized gathers. Serving from these
+tables does not need the xgboost / lightgbm runtimes.
+
+Table layout on disk (one directory per model, every array a plain .npy
+so it can be memory-mapped):
+
+    <name>/meta.json       feature names, base margin, split rule, depth
+    <name>/feature.npy     int32   split feature per node (0 for leaves)
+    <name>/threshold.npy   float64 split threshold per node
+    <name>/left.npy        int32   left child (leaves point at themselves)
+    <name>/right.npy       int32   right child (leaves point at themselves)
+    <name>/value.npy       float64 leaf value (0 for internal nodes)
+    <name>/default_left.npy bool   direction taken by missing values
+    <name>/missing_type.npy int8   0 = none, 1 = zero, 2 = NaN
+    <name>/roots.npy       int32   root node of each tree
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMAT_VERSION = 1
+
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+
+# LightGBM treats |x| <= kZeroThreshold as zero
+_LIGHTGBM_ZERO_THRESHOLD = 1e-35
+
+# Rows scored per chunk; bounds the (rows x trees) index matrix
+_ROW_CHUNK = 4096
+
+_ARRAY_FIELDS = (
+    "feature",
+    "threshold",
+    "left",
+    "right",
+    "value",
+    "default_left",
+    "missing_type",
+    "roots",
+)
+
+
+@dataclass(frozen=True)
+class TreeEnsemble:
+    """Binary-logistic tree ensemble stored as flat node arrays."""
+
+    feature_names: List[str]
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    default_left: np.ndarray
+    missing_type: np.ndarray
+    roots: np.ndarray
+    max_depth: int
+    base_margin: float
+    split_rule: str  # "lt" (XGBoost: x < t goes left) or "le" (LightGBM: x <= t)
+    float32_inputs: bool  # XGBoost compares float32 features to float32 thresholds
+    source: str
+    source_sha256: str = ""
+
+    # ── sklearn-compatible surface ──────────────────────────────────────────
+
+    @property
+    def feature_name_(self) -> List[str]:
+        return list(self.feature_names)
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:
+        return np.asarray(self.feature_names, dtype=object)
+
+    @property
+    def n_features_in_(self) -> int:
+        return len(self.feature_names)
+
+    @property
+    def n_trees(self) -> int:
+        return int(len(self.roots))
+
+    def predict_proba(self, X) -> np.ndarray:
+        """(N, 2) class probabilities, like the sklearn wrappers."""
+        positive = self.predict_positive(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    # ── Scoring ──────────────────────────────────────────────────────────────
+
+    def predict_positive(self, X) -> np.ndarray:
+        """P(class 1) for each row."""
+        margin = self.predict_margin(X)
+        return 1.0 / (1.0 + np.exp(-margin))
+
+    def predict_margin(self, X) -> np.ndarray:
+        """Raw margin (sum of leaf values + base margin) for each row."""
+        X = np.asarray(X, dtype=np.float32 if self.float32_inputs else np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected (N, {len(self.feature_names)}) features, got {X.shape}"
+            )
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], _ROW_CHUNK):
+            chunk = X[start:start + _ROW_CHUNK]
+            out[start:start + len(chunk)] = self._margin_chunk(chunk)
+        return out
+
+    def _margin_chunk(self, X: np.ndarray) -> np.ndarray:
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        threshold = self.threshold.astype(X.dtype, copy=False)
+        less_equal = self.split_rule == "le"
+
+        # Every tree advances one level per step; leaves loop onto themselves.
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            missing_type = self.missing_type[node]
+            is_nan = np.isnan(x)
+
+            if less_equal:
+                # LightGBM: NaN counts as zero unless the split tracks NaN
+                x = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, x)
+                is_missing = (
+                    ((missing_type == MISSING_ZERO) & (np.abs(x) <= _LIGHTGBM_ZERO_THRESHOLD))
+                    | ((missing_type == MISSING_NAN) & is_nan)
+                )
+                go_left = x <= threshold[node]
+            else:
+                is_missing = is_nan
+                go_left = x < threshold[node]
+
+            go_left = np.where(is_missing, self.default_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.value[node].sum(axis=1) + self.base_margin
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def save(self, directory: Path) -> Path:
+        """Write the node table as one .npy per array plus meta.json."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for field in _ARRAY_FIELDS:
+            np.save(directory / f"{field}.npy", np.ascontiguousarray(getattr(self, field)))
+
+        meta = {
+            "format_version": TABLE_FORMAT_VERSION,
+            "feature_names": list(self.feature_names),
+            "max_depth": int(self.max_depth),
+            "base_margin": float(self.base_margin),
+            "split_rule": self.split_rule,
+            "float32_inputs": bool(self.float32_inputs),
+            "n_trees": self.n_trees,
+            "n_nodes": int(len(self.feature)),
+            "source": self.source,
+            "source_sha256": self.source_sha256,
+        }
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "TreeEnsemble":
+        """Load a node table; arrays are memory-mapped read-only by default."""
+        directory = Path(directory)
+        with open(directory / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != TABLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported tree table format {meta.get('format_version')} in {directory}"
+            )
+
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            field: np.load(directory / f"{field}.npy", mmap_mode=mmap_mode)
+            for field in _ARRAY_FIELDS
+        }
+        return cls(
+            feature_names=list(meta["feature_names"]),
+            max_depth=int(meta["max_depth"]),
+            base_margin=float(meta["base_margin"]),
+            split_rule=meta["split_rule"],
+            float32_inputs=bool(meta["float32_inputs"]),
+            source=meta.get("source", ""),
+            source_sha256=meta.get("source_sha256", ""),
+            **arrays,
+        )
+
+
+# ── Exporters ────────────────────────────────────────────────────────────────
+
+
+class _TableBuilder:
+    """Accumulates nodes of successive trees into flat arrays."""
+
+    def __init__(self) -> None:
+        self.feature: List[int] = []
+        self.threshold: List[float] = []
+        self.left: List[int] = []
+        self.right: List[int] = []
+        self.value: List[float] = []
+        self.default_left: List[bool] = []
+        self.missing_type: List[int] = []
+        self.roots: List[int] = []
+        self.max_depth = 0
+
+    def add_leaf(self, value: float) -> int:
+        idx = len(self.feature)
+        self.feature.append(0)
+        self.threshold.append(0.0)
+        self.left.append(idx)
+        self.right.append(idx)
+        self.value.append(float(value))
+        self.default_left.append(True)
+        self.missing_type.append(MISSING_NONE)
+        return idx
+
+    def add_split(self, feature: int, threshold: float, default_left: bool, missing_type: int) -> int:
+        idx = len(self.feature)
+        self.feature.append(int(feature))
+        self.threshold.append(float(threshold))
+        self.left.append(-1)
+        self.right.append(-1)
+        self.value.append(0.0)
+        self.default_left.append(bool(default_left))
+        self.missing_type.append(int(missing_type))
+        return idx
+
+    def build(self, **meta: Any) -> TreeEnsemble:
+        return TreeEnsemble(
+            feature=np.asarray(self.feature, dtype=np.int32),
+            threshold=np.asarray(self.threshold, dtype=np.float64),
+            left=np.asarray(self.left, dtype=np.int32),
+            right=np.asarray(self.right, dtype=np.int32),
+            value=np.asarray(self.value, dtype=np.float64),
+            default_left=np.asarray(self.default_left, dtype=bool),
+            missing_type=np.asarray(self.missing_type, dtype=np.int8),
+            roots=np.asarray(self.roots, dtype=np.int32),
+            max_depth=self.max_depth,
+            **meta,
+        )
+
+
+def from_xgboost(model, source: str = "", source_sha256: str = "") -> TreeEnsemble:
+    """Flatten a fitted binary:logistic XGBClassifier (honours best_iteration)."""
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw("json"))
+    learner = dump["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Only binary:logistic models can be exported, got {objective}")
+
+    gbtree = learner["gradient_booster"]
+    if gbtree.get("name") != "gbtree":
+        raise ValueError(f"Only gbtree boosters can be exported, got {gbtree.get('name')}")
+    trees = gbtree["model"]["trees"]
+    if int(gbtree["model"]["gbtree_model_param"].get("num_parallel_tree", "1")) != 1:
+        raise ValueError("Boosted random forests (num_parallel_tree > 1) are not supported")
+
+    try:
+        trees = trees[: int(model.best_iteration) + 1]
+    except AttributeError:
+        pass
+
+    base_score = float(learner["learner_model_param"]["base_score"])
+    base_margin = float(np.log(base_score / (1.0 - base_score)))
+
+    builder = _TableBuilder()
+    for tree in trees:
+        if any(int(t) != 0 for t in tree.get("split_type", [])):
+            raise ValueError("Categorical splits are not supported")
+
+        lefts = tree["left_children"]
+        rights = tree["right_children"]
+        offset = len(builder.feature)
+        depth = {0: 0}
+        for i in range(len(lefts)):
+            if lefts[i] == -1:
+                builder.add_leaf(float(np.float32(tree["split_conditions"][i])))
+            else:
+                node = builder.add_split(
+                    tree["split_indices"][i],
+                    float(np.float32(tree["split_conditions"][i])),
+                    bool(tree["default_left"][i]),
+                    MISSING_NAN,
+                )
+                builder.left[node] = offset + lefts[i]
+                builder.right[node] = offset + rights[i]
+                depth[lefts[i]] = depth[i] + 1
+                depth[rights[i]] = depth[i] + 1
+        builder.roots.append(offset)
+        builder.max_depth = max(builder.max_depth, max(depth.values()))
+
+    feature_names = list(booster.feature_names or [f"f{i}" for i in range(model.n_features_in_)])
+    return builder.build(
+        feature_names=feature_names,
+        base_margin=base_margin,
+        split_rule="lt",
+        float32_inputs=True,
+        source=source,
+        source_sha256=source_sha256,
+    )
+
+
+def from_lightgbm(model, source: str = "", source_sha256: str = "") -> TreeEnsemble:
+    """Flatten a fitted binary LGBMClassifier (honours best_iteration)."""
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    dump = booster.dump_model()
+
+    if not str(dump.get("objective", "")).startswith("binary"):
+        raise ValueError(f"Only binary models can be exported, got {dump.get('objective')}")
+    if dump.get("average_output"):
+        raise ValueError("Random-forest mode (average_output) is not supported")
+
+    missing_codes = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+    builder = _TableBuilder()
+
+    for info in dump["tree_info"]:
+        if info.get("num_cat", 0):
+            raise ValueError("Categorical splits are not supported")
+
+        # Depth-first walk with an explicit stack: (node dict, depth, parent, is_left)
+        stack = [(info["tree_structure"], 0, -1, False)]
+        root: Optional[int] = None
+        while stack:
+            node, depth, parent, is_left = stack.pop()
+            if "leaf_value" in node or "split_feature" not in node:
+                idx = builder.add_leaf(node.get("leaf_value", 0.0))
+                builder.max_depth = max(builder.max_depth, depth)
+            else:
+                if node.get("decision_type", "<=") != "<=":
+                    raise ValueError(f"Unsupported decision type {node.get('decision_type')}")
+                idx = builder.add_split(
+                    node["split_feature"],
+                    node["threshold"],
+                    node.get("default_left", True),
+                    missing_codes.get(node.get("missing_type", "None"), MISSING_NONE),
+                )
+                stack.append((node["right_child"], depth + 1, idx, False))
+                stack.append((node["left_child"], depth + 1, idx, True))
+
+            if parent == -1:
+                root = idx
+            elif is_left:
+                builder.left[parent] = idx
+            else:
+                builder.right[parent] = idx
+        builder.roots.append(root)
+
+    return builder.build(
+        feature_names=list(dump["feature_names"]),
+        base_margin=0.0,
+        split_rule="le",
+        float32_inputs=False,
+        source=source,
+        source_sha256=source_sha256,
+    )
+
+
+def from_model(model, source: str = "", source_sha256: str = "") -> TreeEnsemble:
+    """Dispatch to the right exporter for a fitted XGBoost / LightGBM classifier."""
+    if hasattr(model, "get_booster"):
+        return from_xgboost(model, source=source, source_sha256=source_sha256)
+    if hasattr(model, "booster_") or hasattr(model, "dump_model"):
+        return from_lightgbm(model, source=source, source_sha256=source_sha256)
+    raise TypeError(f"Cannot export {type(model).__name__} to a tree table")
+
+
+def file_sha256(path: Path) -> str:
+    """Hex digest of a file, used to tie a table to the artifact it came from."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_for_artifact(table_dir: Path, artifact_path: Path) -> Optional[TreeEnsemble]:
+    """Load the table exported from ``artifact_path`` if present and not stale."""
+    table_dir = Path(table_dir)
+    if not (table_dir / "meta.json").exists():
+        return None
+
+    ensemble = TreeEnsemble.load(table_dir)
+    if Path(artifact_path).exists() and ensemble.source_sha256:
+        if file_sha256(Path(artifact_path)) != ensemble.source_sha256:
+            logger.warning(
+                "Tree table %s is stale for %s (hash mismatch); ignoring it",
+                table_dir,
+                artifact_path,
+            )
+            return None
+    return ensemble
+
+
+def describe(ensemble: TreeEnsemble) -> Dict[str, Any]:
+    return {
+        "source": ensemble.source,
+        "n_trees": ensemble.n_trees,
+        "n_nodes": int(len(ensemble.feature)),
+        "max_depth": ensemble.max_depth,
+        "n_features": ensemble.n_features_in_,
+    }
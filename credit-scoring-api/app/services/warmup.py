@@ -0,0 +1,218 @@
+"""
+Startup Warm-up
+
+Importing the API no longer loads models or initializes Firebase; every
+expensive singleton loads itself on first use. This module is the
+explicit warm-up phase that loads them ahead of traffic:
+
+1. regular models, student artifacts, the Firebase app and the scoring
+   executor's workers load side by side
+2. synthetic requests run through each endpoint's scoring path (regular
+   score and loan offer, loan terms, student model + calibrator), single-row
+   and batched, so the first real request does not pay for deferred
+   imports, buffer allocation or the boosters' first-call setup
+3. the student preflight runs and the artifact / startup reports are logged
+
+STARTUP_WARMUP_MODE=background (default) runs this on a thread after the
+startup hook returns, so uvicorn binds its port immediately; requests that
+arrive first simply wait on the loading lock. ``blocking`` finishes warm-up
+before the port opens, and ``off`` leaves everything to first use.
+STUDENT_STARTUP_STRICT_PREFLIGHT forces ``blocking`` so a bad artifact
+still stops the process from starting.
+
+``is_ready`` backs the /ready probe: traffic should only be routed to an
+instance once warm-up has completed (always, with ``off``).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.startup_profile import startup_profile
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Runs the warm-up phase once and reports its progress."""
+
+    def __init__(self) -> None:
+        self.state = "pending"  # pending | running | complete | failed
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.seconds: Optional[float] = None
+        self.preflight: Optional[Dict[str, Any]] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def mode(self) -> str:
+        if settings.STUDENT_STARTUP_STRICT_PREFLIGHT:
+            return "blocking"
+        return settings.STARTUP_WARMUP_MODE
+
+    @property
+    def is_complete(self) -> bool:
+        return self.state == "complete"
+
+    @property
+    def is_ready(self) -> bool:
+        return self.mode == "off" or self.is_complete
+
+    @staticmethod
+    def load_models() -> None:
+        """Load regular and student artifacts side by side (no Firebase)."""
+        from app.services.model_loader import model_loader
+        from app.services.student_prediction_service import student_prediction_service
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="warmup") as pool:
+            futures = [
+                pool.submit(model_loader.warm),
+                pool.submit(lambda: student_prediction_service.is_ready),
+            ]
+        for future in futures:
+            future.result()
+
+    @staticmethod
+    def _init_firebase() -> None:
+        from app.core.firebase import ensure_firebase_app
+
+        with startup_profile.phase("firebase_app"):
+            ensure_firebase_app()
+
+    @staticmethod
+    def prime() -> None:
+        """Run every endpoint's scoring path once on synthetic input.
+
+        Uses the task functions the routes hand to the scoring executor,
+        single-row and batched, plus the loan-terms and decision-band steps
+        that run after scoring.
+        """
+        from app.models.schemas import LoanTermsRequest, SimpleLoanRequest
+        from app.services.loan_terms_calculator import loan_terms_calculator
+        from app.services.scoring_context import ScoringContext
+        from app.services.scoring_executor import (
+            score_prediction,
+            score_predictions,
+            score_smart_offer,
+            score_student,
+            score_students,
+        )
+        from app.services.student_prediction_service import WARMUP_STUDENT, student_prediction_service
+
+        with startup_profile.phase("prime_regular"):
+            application = SimpleLoanRequest(**SimpleLoanRequest.model_config["json_schema_extra"]["example"])
+            context = ScoringContext.build(application)
+            context.apply_prediction(score_prediction(context.internal_request))
+            score_predictions([context.internal_request] * 2)
+            score_smart_offer(dict(
+                request_dict=context.internal_request.model_dump(),
+                age=application.age,
+                years_employed=application.years_employed,
+                employment_status=application.employment_status,
+                home_ownership=application.home_ownership,
+                loan_purpose=None,
+                annual_income_vnd=context.annual_income_vnd,
+                monthly_income_vnd=application.monthly_income,
+                credit_score=context.credit_score,
+            ))
+        with startup_profile.phase("prime_loan_terms"):
+            terms = LoanTermsRequest.model_config["json_schema_extra"]["example"]
+            loan_terms_calculator.calculate_loan_terms(**terms)
+        if student_prediction_service.is_ready:
+            # predict() runs the model, the calibrator and the risk mapping
+            with startup_profile.phase("prime_student"):
+                probability, _, _ = score_student(WARMUP_STUDENT)
+                score_students([WARMUP_STUDENT] * 2)
+                student_prediction_service.classify_decision_band(probability)
+
+    def run(self) -> bool:
+        """Load, prime and preflight; True once warm-up has completed."""
+        with self._lock:
+            if self.state in ("running", "complete"):
+                return self.state == "complete"
+            self.state = "running"
+            self.started_at = time.time()
+
+        from app.services.artifact_loading import artifact_load_report
+        from app.services.scoring_executor import scoring_executor
+        from app.services.student_prediction_service import student_prediction_service
+
+        started = time.perf_counter()
+        try:
+            with startup_profile.phase("warmup"):
+                with ThreadPoolExecutor(max_workers=3, thread_name_prefix="warmup") as pool:
+                    models = pool.submit(self.load_models)
+                    firebase = pool.submit(self._init_firebase)
+                    workers = pool.submit(scoring_executor.prestart)
+                models.result()
+                workers.result()
+                try:
+                    firebase.result()
+                except Exception as e:
+                    # Firestore logging retries on first write; scoring does not need it
+                    logger.warning("Firebase app initialization failed during warm-up: %s", e)
+                self.prime()
+                self.preflight = student_prediction_service.validate_runtime_assets(
+                    strict=settings.STUDENT_STARTUP_STRICT_PREFLIGHT
+                )
+        except Exception as e:
+            self.state = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+            self.seconds = round(time.perf_counter() - started, 3)
+            self._done.set()
+            logger.exception("Warm-up failed")
+            raise
+
+        self.seconds = round(time.perf_counter() - started, 3)
+        self.state = "complete"
+        self._done.set()
+        self._log_preflight()
+        artifact_load_report.log_summary("regular:startup")
+        artifact_load_report.log_summary("student:startup")
+        logger.info("Warm-up complete in %.3fs\n%s", self.seconds, startup_profile.format_table())
+        return True
+
+    def _log_preflight(self) -> None:
+        preflight = self.preflight or {}
+        if preflight.get("ok"):
+            logger.info("Student model preflight: OK")
+        else:
+            logger.warning("Student model preflight issues: %s", preflight.get("issues"))
+        if preflight.get("warnings"):
+            logger.warning("Student model preflight warnings: %s", preflight["warnings"])
+
+    def _run_quietly(self) -> None:
+        try:
+            self.run()
+        except Exception:
+            pass  # already logged; state is "failed"
+
+    def start_background(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run_quietly, name="warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up has finished (either way); True if it completed."""
+        self._done.wait(timeout)
+        return self.is_complete
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "state": self.state,
+            "ready": self.is_ready,
+            "seconds": self.seconds,
+            "error": self.error,
+        }
+
+
+# Singleton instance
+warmup = Warmup()
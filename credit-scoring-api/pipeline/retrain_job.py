@@ -18,6 +18,7 @@ from sklearn.metrics import (
 from datetime import datetime
 from feature_engineering import engineer_features, validate_features
 from email_notifier import send_email_notification
+import hashlib
 import json
 import os
 import sys
@@ -232,6 +233,45 @@ def compare_with_production(new_model, X_test, y_test):
     return should_promote, new_metrics, prod_metrics
 
 
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def export_native(model, pickle_path):
+    """
+    Write the booster as UBJSON plus the manifest the API loads instead of the pickle
+    (same layout as app/services/native_models.py, which this image does not ship).
+    Named for the production files, since that is where the manifest is read.
+    """
+    booster = model.get_booster()
+    native_path = '/tmp/retrained_model.ubj'
+    with open(native_path, 'wb') as f:
+        f.write(bytes(booster.save_raw(raw_format='ubj')))
+
+    best_iteration = getattr(model, 'best_iteration', None)
+    manifest = {
+        'format': 'credit-scoring-native/1',
+        'kind': 'xgboost',
+        'model_file': 'xgboost_final.ubj',
+        'model_sha256': _sha256(native_path),
+        'feature_names': list(booster.feature_names or []),
+        'threshold': PROMOTION_THRESHOLD,
+        'best_iteration': int(best_iteration) if best_iteration is not None else None,
+        'objective': model.get_params().get('objective'),
+        'library_version': xgb.__version__,
+        'source': 'xgboost_final.pkl',
+        'source_sha256': _sha256(pickle_path),
+    }
+    manifest_path = '/tmp/retrained_model.manifest.json'
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return native_path, manifest_path
+
+
 def save_to_staging(model, metrics, feature_names):
     """Save model and metadata to GCS staging area"""
     log("Saving model to staging")
@@ -249,6 +289,12 @@ def save_to_staging(model, metrics, feature_names):
     model_blob.upload_from_filename(local_path)
     log(f"Model saved: gs://{ACTIVE_GCS_BUCKET}/models/staging/xgb_retrained_{timestamp}.pkl")
 
+    # Native booster + manifest (the API prefers these over the pickle)
+    native_path, manifest_path = export_native(model, local_path)
+    bucket.blob(f'models/staging/xgb_retrained_{timestamp}.ubj').upload_from_filename(native_path)
+    bucket.blob(f'models/staging/xgb_retrained_{timestamp}.manifest.json').upload_from_filename(manifest_path)
+    log(f"Native model saved: gs://{ACTIVE_GCS_BUCKET}/models/staging/xgb_retrained_{timestamp}.ubj")
+
     # Save metadata
     metadata = {
         'timestamp': timestamp,
@@ -284,6 +330,10 @@ def promote_to_production(timestamp):
     # Copy staging to production
     staging_blob = bucket.blob(f'models/staging/xgb_retrained_{timestamp}.pkl')
     bucket.copy_blob(staging_blob, bucket, 'models/production/xgboost_final.pkl')
+    for suffix in ('ubj', 'manifest.json'):
+        native_blob = bucket.blob(f'models/staging/xgb_retrained_{timestamp}.{suffix}')
+        if native_blob.exists():
+            bucket.copy_blob(native_blob, bucket, f'models/production/xgboost_final.{suffix}')
     log("Model promoted to production!")
 
     # Copy metadata
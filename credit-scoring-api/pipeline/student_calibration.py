@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import pickle
+import sys
 from pathlib import Path
 from typing import Dict
 
@@ -13,6 +14,12 @@ from sklearn.isotonic import IsotonicRegression
 from sklearn.metrics import brier_score_loss, roc_auc_score
 
 
+API_ROOT = Path(__file__).resolve().parent.parent  # credit-scoring-api/
+sys.path.insert(0, str(API_ROOT))
+from app.services.model_runtime import model_feature_names  # noqa: E402
+from app.services.native_models import load_model_artifact  # noqa: E402
+
+
 def _project_root() -> Path:
     return Path(__file__).resolve().parent.parent.parent
 
@@ -58,10 +65,9 @@ def _metrics(y: np.ndarray, p: np.ndarray) -> Dict[str, float]:
 def fit_isotonic_calibrator() -> Dict[str, object]:
     artifact_dir = _artifact_dir()
 
-    with open(artifact_dir / "best_model_phase1.pkl", "rb") as f:
-        model = pickle.load(f)
+    model = load_model_artifact(artifact_dir / "best_model_phase1.pkl")
 
-    feature_names = list(model.get_booster().feature_names or [])
+    feature_names = model_feature_names(model)
 
     x_val, y_val = _load_xy("val", feature_names)
     x_test, y_test = _load_xy("test", feature_names)
@@ -1,8 +1,9 @@
 """
 Student Model Retraining Script (Phase 1)
 
-Re-engineers features from raw CSVs using the SAME formula as
-student_prediction_service._engineer(), then retrains the XGBoost model.
+Re-engineers features from raw CSVs with the same columnar feature engine
+the API scores with (app.services.student_features), then retrains the
+XGBoost model.
 
 Usage:
     cd credit-scoring-api
@@ -11,9 +12,16 @@ Usage:
 Outputs:
     output/alternative_model/best_model_phase1.pkl
     output/alternative_model/best_threshold_phase1.pkl
+    output/alternative_model/best_model_phase1.ubj + .manifest.json
+        (native booster + manifest carrying the threshold; what the API loads)
+
+With MODEL_REGISTRY_URL set (local directory or gs://bucket/prefix) the
+artifacts are also published as a new registry version, which running API
+instances load and hot-swap without a restart.
 """
 from __future__ import annotations
 
+import os
 import pickle
 import sys
 from pathlib import Path
@@ -35,14 +43,10 @@ OUT_DIR   = PROJECT_ROOT / "output" / "alternative_model"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 sys.path.insert(0, str(API_ROOT))
-from app.services.student_feature_contract import (
-    LIVING_MAP,
-    MAJOR_INCOME_MAP,
-    MATURITY_MAP,
-    STUDENT_MODEL_FEATURE_ORDER,
-)
+from app.services.native_models import export_native, native_files
+from app.services.student_features import student_features_frame
 
-# ── Constants (mirrors student_prediction_service.py) ────────────────────────
+# ── Raw CSV encodings → feature engine inputs ────────────────────────────────
 
 PARENTAL_SUPPORT_MAP = {"none": 0.0, "low": 0.25, "medium": 0.5, "high": 1.0}
 SAVING_ASSET_TO_BUFFER = {0: False, 1: True}  # saving_asset_status → has_buffer
@@ -52,6 +56,9 @@ DEMO_LIVING_MAP = {"dorm": 0, "family": 1, "rent": 2}
 
 PROGRAM_LEVEL_MAP = {"university": 0, "college": 0, "postgraduate": 1}
 
+# Raw major_income_potential (low/medium/high) → MAJOR_INCOME_MAP scale
+MAJOR_POT_MAP = {"low": 0.45, "medium": 0.65, "high": 0.875}
+
 
 # ── Load & merge raw data ─────────────────────────────────────────────────────
 
@@ -69,159 +76,69 @@ def load_raw() -> pd.DataFrame:
     return df
 
 
-# ── Feature engineering (mirrors _engineer in student_prediction_service.py) ─
+# ── Feature engineering (app.services.student_features, shared with the API) ─
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index)
+
 
-def _derive_monthly_from_loan(row: pd.Series) -> tuple[float, float]:
+def _derive_monthly_from_loan(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
     """
     Raw data doesn't have monthly_income/expenses directly.
     Derive from debt_ratio (monthly_expenses / (income + expenses))
     and expected_income (annual → monthly / 12).
     """
-    annual_income  = float(row["expected_income"])
-    monthly_income = annual_income / 12.0
-    dr = float(row["debt_ratio"])             # = expenses / (income + expenses)
+    monthly_income = df["expected_income"].to_numpy(dtype=np.float64) / 12.0
+    dr = df["debt_ratio"].to_numpy(dtype=np.float64)   # = expenses / (income + expenses)
     # dr = e / (m + e)  →  e = dr * m / (1 - dr)
-    monthly_expenses = (dr * monthly_income) / max(1.0 - dr, 0.01)
+    monthly_expenses = (dr * monthly_income) / np.maximum(1.0 - dr, 0.01)
     return monthly_income, monthly_expenses
 
 
-def _derive_support_sources(row: pd.Series) -> list[str]:
-    """Infer support_sources list from financial CSV categorical columns."""
-    sources: list[str] = []
-    if row.get("parental_support", "none") not in ("none", ""):
-        sources.append("family")
+def _derive_support_sources(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Infer support sources from financial CSV categorical columns."""
+    family = ~_column(df, "parental_support", "none").isin(["none", ""]).to_numpy()
     # bnpl_repayment_hist being 'good' or 'average' implies part-time ability
-    if row.get("bnpl_repayment_hist", "poor") in ("good", "average"):
-        sources.append("part_time")
+    part_time = _column(df, "bnpl_repayment_hist", "poor").isin(["good", "average"]).to_numpy()
     # saving_asset_status = 1 implies scholarship / savings
-    if int(row.get("saving_asset_status", 0)) == 1:
-        sources.append("scholarship")
-    return sources
+    scholarship = _column(df, "saving_asset_status", 0).astype(int).to_numpy() == 1
+    return {
+        "support_count": family.astype(np.float64) + part_time + scholarship,
+        "has_family_support": family.astype(np.float64),
+    }
+
+
+def raw_inputs(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Map merged raw CSV columns onto the feature engine's base inputs."""
+    monthly_income, monthly_expenses = _derive_monthly_from_loan(df)
+
+    def mapped(name: str, default_raw: str, mapping: dict, default: float, lower: bool = False) -> np.ndarray:
+        values = _column(df, name, default_raw).astype(str)
+        if lower:
+            values = values.str.lower()
+        return values.map(mapping).fillna(default).to_numpy(dtype=np.float64)
+
+    return {
+        "age": _column(df, "age", 21).astype(int).to_numpy(dtype=np.float64),
+        "program_level": mapped("program_level", "university", PROGRAM_LEVEL_MAP, 0),
+        "living_status": mapped("living_status", "dorm", DEMO_LIVING_MAP, 0),
+        "academic_year": _column(df, "academic_year", 1).astype(int).to_numpy(dtype=np.float64),
+        "gpa_latest": _column(df, "gpa_latest", 2.0).to_numpy(dtype=np.float64),
+        # major_income_potential in academic CSV is low/medium/high
+        "major_income_potential": mapped("major_income_potential", "low", MAJOR_POT_MAP, 0.6, lower=True),
+        "loan_amount": _column(df, "loan_amount", 20_000_000).to_numpy(dtype=np.float64),
+        "monthly_income": monthly_income,
+        "monthly_expenses": monthly_expenses,
+        "has_buffer": (_column(df, "saving_asset_status", 0).astype(int).to_numpy() != 0).astype(np.float64),
+        **_derive_support_sources(df),
+    }
 
 
 def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
     """Build the 25-feature design matrix from raw merged data."""
-    records = []
-
-    for _, row in df.iterrows():
-        d: dict = {}
-
-        # ── Base fields ───────────────────────────────────────────────────────
-        d["age"]          = int(row["age"])
-        d["program_level"] = PROGRAM_LEVEL_MAP.get(str(row.get("program_level", "university")), 0)
-
-        living_raw        = str(row.get("living_status", "dorm"))
-        living_code       = DEMO_LIVING_MAP.get(living_raw, 0)
-        d["living_status"] = living_code
-
-        academic_year     = int(row.get("academic_year", 1))
-        d["academic_year"] = academic_year
-
-        d["maturity_score"] = MATURITY_MAP.get(academic_year, 0.4)
-
-        gpa = float(row.get("gpa_latest", 2.0))
-        d["gpa_latest"] = gpa
-
-        major_raw         = str(row.get("major_income_potential", "low"))
-        # major_income_potential in academic CSV is low/medium/high ; need to map to numeric
-        MAJOR_POT_MAP = {"low": 0.45, "medium": 0.65, "high": 0.875}
-        d["major_income_potential"] = MAJOR_POT_MAP.get(major_raw.lower(), 0.6)
-
-        d["loan_amount"]  = float(row.get("loan_amount", 20_000_000))
-
-        # ── Derived monthly financials ────────────────────────────────────────
-        monthly_income, monthly_expenses = _derive_monthly_from_loan(row)
-
-        # ensure minimum ≥ 1 to avoid div/0
-        monthly_income_c   = max(monthly_income, 1.0)
-        monthly_expenses_c = max(monthly_expenses, 0.0)
-
-        d["debt_ratio"]    = min(
-            monthly_expenses_c / (monthly_income_c + monthly_expenses_c), 0.99
-        )
-
-        # ── Support / buffer ─────────────────────────────────────────────────
-        has_buffer   = bool(int(row.get("saving_asset_status", 0)))
-        d["has_buffer"] = int(has_buffer)
-
-        support_sources   = _derive_support_sources(row)
-        support_count     = len(support_sources)
-        has_family_support = "family" in support_sources
-
-        d["support_numeric"] = max(0.1, monthly_income / 5_000_000)
-
-        # ── Behavioral signals (EXACT formula from _engineer) ─────────────────
-        gpa_signal  = min(1.0, (3.2 - gpa) / 2.2)
-        year_signal = min(1.0, (3.0 - float(academic_year)) / 2.0)
-        support_gap = max(0.0, 1.0 - min(1.0, d["support_numeric"]))
-        expense_pressure = min(1.0, monthly_expenses_c / max(monthly_income_c + monthly_expenses_c, 1.0))
-        living_risk = 1.0 if living_code == 2 else (0.35 if living_code == 1 else 0.2)
-
-        behavior_risk_score = (
-            4.6
-            + 1.6 * expense_pressure
-            + 1.0 * gpa_signal
-            + 0.8 * support_gap
-            + 0.6 * year_signal
-            + 0.5 * living_risk
-            - 0.8 * (1.0 if has_buffer else 0.0)
-            - 0.25 * min(2, support_count)
-            - (0.4 if has_family_support else 0.0)
-        )
-        d["behavior_risk_score"] = float(max(2.5, min(8.5, behavior_risk_score)))
-
-        volatility = (
-            0.22
-            + 0.18 * expense_pressure
-            + 0.10 * support_gap
-            + 0.10 * year_signal
-            + (0.05 if support_count == 0 else 0.0)
-            - (0.04 if has_buffer else 0.0)
-        )
-        d["behavior_volatility"] = float(max(0.12, min(0.65, volatility)))
-
-        pressure = (
-            4.6
-            + 1.5 * expense_pressure
-            + 0.8 * support_gap
-            + (0.6 if living_code == 2 else 0.0)
-            + (0.5 if not has_buffer else 0.0)
-            + 0.4 * year_signal
-        )
-        d["behavior_under_pressure"] = float(max(2.0, min(8.5, pressure)))
-
-        shock_vulnerability = (
-            0.38
-            + 0.28 * support_gap
-            + 0.20 * expense_pressure
-            + (0.12 if not has_buffer else -0.08)
-            + (0.08 if support_count == 0 else 0.0)
-        )
-        d["shock_vulnerability"] = float(max(0.05, min(0.95, shock_vulnerability)))
-
-        # ── Binary flags ─────────────────────────────────────────────────────
-        d["severe_behavior_flag"] = int(
-            d["debt_ratio"] > 0.75 and (not has_buffer) and d["support_numeric"] < 0.5
-        )
-        d["thin_support_flag"] = 1 if d["support_numeric"] < 0.3 else 0
-        d["high_pressure_flag"] = 1 if living_code == 2 else 0
-
-        # ── Interaction features ─────────────────────────────────────────────
-        d["debt_x_behavior"] = d["debt_ratio"] * d["behavior_risk_score"]
-        d["debt_x_support"]  = d["debt_ratio"] * d["support_numeric"]
-        d["debt_x_living"]   = d["debt_ratio"] * living_code
-
-        d["financial_stress_index"] = d["debt_ratio"] * d["behavior_volatility"]
-        d["academic_resilience"]    = d["gpa_latest"] * d["support_numeric"]
-        d["risk_compounding"]       = (
-            d["severe_behavior_flag"] + d["thin_support_flag"] + d["high_pressure_flag"]
-        )
-        d["loan_to_maturity_ratio"] = d["loan_amount"] / (d["maturity_score"] + 0.1)
-
-        records.append(d)
-
-    X = pd.DataFrame(records)[STUDENT_MODEL_FEATURE_ORDER]
-    return X
+    return student_features_frame(raw_inputs(df), index=df.index)
 
 
 # ── Training ─────────────────────────────────────────────────────────────────
@@ -280,10 +197,29 @@ def train(df: pd.DataFrame) -> None:
         pickle.dump(model, f)
     with open(thresh_path, "wb") as f:
         pickle.dump(best_thresh, f)
+    manifest_path = export_native(model, model_path, threshold=best_thresh)
 
     print(f"\n[save] Model   → {model_path}")
     print(f"[save] Threshold → {thresh_path}")
-    print("\n✅  Retraining complete. Restart the API server to load the new model.")
+    print(f"[save] Native  → {manifest_path}")
+
+    registry_url = os.getenv("MODEL_REGISTRY_URL", "")
+    if registry_url:
+        from app.services.model_registry import publish_version
+
+        artifacts = {model_path.name: model_path, thresh_path.name: thresh_path}
+        artifacts.update(native_files(model_path))
+        calibrator_path = OUT_DIR / "student_calibrator_isotonic.pkl"
+        if calibrator_path.exists():
+            artifacts[calibrator_path.name] = calibrator_path
+        version = publish_version(registry_url, artifacts)
+        print(f"[publish] Version {version} → {registry_url}")
+        print("\n✅  Retraining complete. API instances watching the registry will hot-swap to it.")
+    else:
+        print(
+            "\n✅  Retraining complete. Set MODEL_REGISTRY_URL to publish a version the API "
+            "hot-reloads, or restart the API server to load the new model."
+        )
 
 
 # ── Entry point ───────────────────────────────────────────────────────────────
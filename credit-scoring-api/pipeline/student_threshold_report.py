@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import pickle
+import sys
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Dict, List
@@ -18,6 +19,12 @@ from sklearn.metrics import (
 )
 
 
+API_ROOT = Path(__file__).resolve().parent.parent  # credit-scoring-api/
+sys.path.insert(0, str(API_ROOT))
+from app.services.model_runtime import model_feature_names  # noqa: E402
+from app.services.native_models import load_model_artifact, native_threshold  # noqa: E402
+
+
 @dataclass
 class ThresholdMetrics:
     threshold: float
@@ -89,14 +96,15 @@ def generate_report() -> Dict[str, object]:
     x_test = pd.read_csv(artifact_dir / "X_test.csv")
     y_test = pd.read_csv(artifact_dir / "y_test.csv").iloc[:, 0].to_numpy()
 
-    with open(artifact_dir / "best_model_phase1.pkl", "rb") as f:
-        model = pickle.load(f)
+    model = load_model_artifact(artifact_dir / "best_model_phase1.pkl")
 
-    with open(artifact_dir / "best_threshold_phase1.pkl", "rb") as f:
-        current_threshold = float(pickle.load(f))
+    current_threshold = native_threshold(artifact_dir / "best_model_phase1.pkl")
+    if current_threshold is None:
+        with open(artifact_dir / "best_threshold_phase1.pkl", "rb") as f:
+            current_threshold = float(pickle.load(f))
 
     x_test = _add_missing_phase1_features(x_test)
-    model_features = list(model.get_booster().feature_names or [])
+    model_features = model_feature_names(model)
     x_test = x_test[model_features]
 
     prob_default = model.predict_proba(x_test)[:, 1]
@@ -0,0 +1,468 @@
+"""
+Micro-benchmarks for the scoring hot paths.
+
+Usage (from credit-scoring-api/):
+    python scripts/benchmark_scoring.py
+    python scripts/benchmark_scoring.py --filter student --batch-sizes 1,64
+    python scripts/benchmark_scoring.py --output bench.json --baseline benchmarks/baseline.json
+    python scripts/benchmark_scoring.py --save-baseline
+
+Every benchmark runs at batch sizes 1, 64 and 4096 on deterministic
+synthetic inputs. Functions with a batch API (FeatureEngineer.transform,
+predict_many, ...) get the whole batch in one call; single-row functions
+are called once per row, so per-row cost is comparable across sizes.
+Each case repeats until --min-time has elapsed (at least --min-runs
+times) and reports the median time per batch and per row.
+
+Results are written as JSON with the environment they were measured in.
+With --baseline (default benchmarks/baseline.json when it exists) each
+case's median is compared with the baseline's; any case slower by more
+than --threshold (default 15%) and by more than --min-delta-us (default
+5 us, below which timer noise dominates) is a regression and the exit
+status is 1.
+Baselines are only comparable on the same machine: refresh it with
+--save-baseline after an intentional change or a hardware move.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+API_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_ROOT))
+
+DEFAULT_BATCH_SIZES = (1, 64, 4096)
+DEFAULT_BASELINE = API_ROOT / "benchmarks" / "baseline.json"
+FORMAT = "credit-scoring-benchmark/1"
+
+
+@dataclass
+class Benchmark:
+    """``setup(rows)`` builds the inputs and returns the callable that is timed."""
+
+    name: str
+    setup: Callable[[int], Callable[[], Any]]
+    needs_models: bool = False
+
+
+# ── Inputs ───────────────────────────────────────────────────────────────────
+
+
+def _simple_requests(rows: int, seed: int = 0) -> List[Any]:
+    from app.models.schemas import SimpleLoanRequest
+
+    rng = np.random.default_rng(seed)
+    employment = ["EMPLOYED", "SELF_EMPLOYED", "UNEMPLOYED"]
+    ownership = ["RENT", "OWN", "MORTGAGE", "LIVING_WITH_PARENTS"]
+    return [
+        SimpleLoanRequest(
+            full_name="Bench User",
+            age=int(rng.integers(18, 70)),
+            monthly_income=float(rng.integers(3, 120) * 1_000_000),
+            employment_status=employment[int(rng.integers(len(employment)))],
+            years_employed=float(rng.integers(0, 30)),
+            home_ownership=ownership[int(rng.integers(len(ownership)))],
+            years_credit_history=int(rng.integers(0, 20)),
+            has_previous_defaults=bool(rng.random() < 0.1),
+            currently_defaulting=bool(rng.random() < 0.03),
+        )
+        for _ in range(rows)
+    ]
+
+
+def _prediction_requests(rows: int, seed: int = 0) -> List[Any]:
+    from app.services.request_converter import request_converter
+
+    return [request_converter.convert_simple_to_prediction(r) for r in _simple_requests(rows, seed)]
+
+
+def _students(rows: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    majors = ["technology", "engineering", "medicine", "business", "finance", "law", "education", "arts", "other"]
+    living = ["dormitory", "with_parents", "renting"]
+    sources = ["family", "scholarship", "part_time"]
+    return [
+        {
+            "age": int(rng.integers(17, 30)),
+            "gpa_latest": round(float(rng.uniform(1.0, 4.0)), 2),
+            "academic_year": int(rng.integers(1, 6)),
+            "major": majors[int(rng.integers(len(majors)))],
+            "program_level": "postgraduate" if rng.random() < 0.15 else "undergraduate",
+            "living_status": living[int(rng.integers(len(living)))],
+            "loan_amount": 5_000_000,
+            "has_buffer": bool(rng.random() < 0.4),
+            "support_sources": [s for s in sources if rng.random() < 0.4],
+            "monthly_income": float(rng.integers(0, 10) * 1_000_000),
+            "monthly_expenses": float(rng.integers(1, 8) * 1_000_000),
+        }
+        for _ in range(rows)
+    ]
+
+
+def _probabilities(rows: int, seed: int = 0) -> List[float]:
+    return [float(p) for p in np.random.default_rng(seed).uniform(0.0, 1.0, rows)]
+
+
+def _scores(rows: int, seed: int = 0) -> List[int]:
+    return [int(s) for s in np.random.default_rng(seed).integers(300, 851, rows)]
+
+
+# ── Benchmarks ───────────────────────────────────────────────────────────────
+
+
+def _feature_engineer_transform(rows: int):
+    import pandas as pd
+    from app.services.feature_engineering import feature_engineer
+
+    df = pd.DataFrame([r.model_dump() for r in _prediction_requests(rows)])
+    return lambda: feature_engineer.transform(df)
+
+
+def _feature_engineer_transform_requests(rows: int):
+    from app.services.feature_engineering import feature_engineer
+
+    requests = _prediction_requests(rows)
+    if rows == 1:
+        return lambda: feature_engineer.transform_request(requests[0])
+    return lambda: feature_engineer.transform_requests(requests)
+
+
+def _prediction_predict(rows: int):
+    from app.services.prediction_service import prediction_service
+
+    requests = _prediction_requests(rows)
+    if rows == 1:
+        return lambda: prediction_service.predict(requests[0])
+    return lambda: prediction_service.predict_many(requests)
+
+
+def _student_engineer(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    raws = _students(rows)
+    return lambda: [student_prediction_service._engineer(raw) for raw in raws]
+
+
+def _student_engineer_vector(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    raws = _students(rows)
+    return lambda: [student_prediction_service._engineer_vector(raw) for raw in raws]
+
+
+def _student_engineer_matrix(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    raws = _students(rows)
+    return lambda: student_prediction_service._engineer_matrix(raws)
+
+
+def _student_predict(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    raws = _students(rows)
+    if rows == 1:
+        return lambda: student_prediction_service.predict(raws[0])
+    return lambda: student_prediction_service.predict_many(raws)
+
+
+def _student_calibrate(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    calibrator = student_prediction_service._calibrator
+    probabilities = _probabilities(rows)
+    return lambda: [student_prediction_service._calibrate_probability(p, calibrator) for p in probabilities]
+
+
+def _student_calibrate_batch(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    calibrator = student_prediction_service._calibrator
+    probabilities = np.array(_probabilities(rows))
+    return lambda: student_prediction_service._calibrate_probabilities(probabilities, calibrator)
+
+
+def _student_decision_band(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    probabilities = _probabilities(rows)
+    return lambda: [student_prediction_service.classify_decision_band(p) for p in probabilities]
+
+
+def _student_decision_bands(rows: int):
+    from app.services.student_prediction_service import student_prediction_service
+
+    probabilities = np.array(_probabilities(rows))
+    return lambda: student_prediction_service.classify_decision_bands(probabilities)
+
+
+def _convert_simple_to_prediction(rows: int):
+    from app.services.request_converter import request_converter
+
+    requests = _simple_requests(rows)
+    return lambda: [request_converter.convert_simple_to_prediction(r) for r in requests]
+
+
+def _loan_limit_max_loan(rows: int):
+    from app.services.loan_limit_calculator import loan_limit_calculator
+
+    scores = _scores(rows)
+    incomes = [r.monthly_income for r in _simple_requests(rows)]
+    risks = ["Low", "Medium", "High", "Very High"]
+    cases = [(s, m * 12, m, risks[i % 4]) for i, (s, m) in enumerate(zip(scores, incomes))]
+    return lambda: [
+        loan_limit_calculator.calculate_max_loan(
+            credit_score=s, annual_income_vnd=a, monthly_income_vnd=m, risk_level=r
+        )
+        for s, a, m, r in cases
+    ]
+
+
+def _loan_limit_student(rows: int):
+    from app.services.loan_limit_calculator import loan_limit_calculator
+
+    risks = ["Low", "Medium", "High", "Very High"]
+    cases = [(600 + s % 251, risks[i % 4]) for i, s in enumerate(_scores(rows))]
+    return lambda: [
+        loan_limit_calculator.calculate_student_loan(credit_score=s, risk_level=r) for s, r in cases
+    ]
+
+
+def _loan_limit_students(rows: int):
+    from app.services.loan_limit_calculator import loan_limit_calculator
+
+    risks = ["Low", "Medium", "High", "Very High"]
+    scores = np.array([600 + s % 251 for s in _scores(rows)])
+    risk_levels = np.array([risks[i % 4] for i in range(rows)], dtype=object)
+    return lambda: loan_limit_calculator.calculate_student_loans(scores, risk_levels)
+
+
+def _loan_terms(rows: int):
+    from app.services.loan_terms_calculator import loan_terms_calculator
+
+    purposes = ["HOME", "CAR", "BUSINESS", "EDUCATION", "PERSONAL", "MEDICAL"]
+    rng = np.random.default_rng(0)
+    cases = [
+        (float(rng.integers(10, 2000) * 1_000_000), purposes[i % len(purposes)], s)
+        for i, s in enumerate(_scores(rows))
+    ]
+    return lambda: [
+        loan_terms_calculator.calculate_loan_terms(loan_amount=a, loan_purpose=p, credit_score=s)
+        for a, p, s in cases
+    ]
+
+
+def _score_mappers(rows: int):
+    from app.services.score_mapper import (
+        credit_score_to_rating,
+        probability_to_credit_score,
+        student_probability_to_credit_score,
+    )
+
+    probabilities = _probabilities(rows)
+
+    def run():
+        for p in probabilities:
+            credit_score_to_rating(probability_to_credit_score(p))
+            student_probability_to_credit_score(p)
+
+    return run
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("feature_engineer.transform", _feature_engineer_transform, needs_models=True),
+    Benchmark("feature_engineer.transform_requests", _feature_engineer_transform_requests, needs_models=True),
+    Benchmark("prediction_service.predict", _prediction_predict, needs_models=True),
+    Benchmark("student._engineer", _student_engineer),
+    Benchmark("student._engineer_vector", _student_engineer_vector),
+    Benchmark("student._engineer_matrix", _student_engineer_matrix),
+    Benchmark("student.predict", _student_predict, needs_models=True),
+    Benchmark("student._calibrate_probability", _student_calibrate, needs_models=True),
+    Benchmark("student._calibrate_probabilities", _student_calibrate_batch, needs_models=True),
+    Benchmark("student.classify_decision_band", _student_decision_band, needs_models=True),
+    Benchmark("student.classify_decision_bands", _student_decision_bands, needs_models=True),
+    Benchmark("request_converter.convert_simple_to_prediction", _convert_simple_to_prediction),
+    Benchmark("loan_limit.calculate_max_loan", _loan_limit_max_loan),
+    Benchmark("loan_limit.calculate_student_loan", _loan_limit_student),
+    Benchmark("loan_limit.calculate_student_loans", _loan_limit_students),
+    Benchmark("loan_terms.calculate_loan_terms", _loan_terms),
+    Benchmark("score_mapper", _score_mappers),
+]
+
+
+# ── Running ──────────────────────────────────────────────────────────────────
+
+
+def time_case(fn: Callable[[], Any], rows: int, min_time: float, min_runs: int) -> Dict[str, Any]:
+    fn()  # warm caches, buffers and lazy imports
+    samples: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_runs or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "rows": rows,
+        "runs": len(samples),
+        "median_s": median,
+        "min_s": samples[0],
+        "p95_s": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "per_row_us": median / rows * 1e6,
+        "rows_per_s": rows / median if median > 0 else float("inf"),
+    }
+
+
+def run_benchmarks(
+    names: Optional[Sequence[str]] = None,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    min_time: float = 0.5,
+    min_runs: int = 5,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Dict[str, Any]]:
+    """Run the selected benchmarks; keys are ``"<name>@<batch size>"``."""
+    selected = [b for b in BENCHMARKS if not names or any(n in b.name for n in names)]
+    if any(b.needs_models for b in selected):
+        from app.services.warmup import warmup
+
+        warmup.load_models()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for benchmark in selected:
+        for rows in batch_sizes:
+            key = f"{benchmark.name}@{rows}"
+            results[key] = time_case(benchmark.setup(rows), rows, min_time, min_runs)
+            log(f"{key:<58} {results[key]['median_s'] * 1e3:>10.3f} ms  {results[key]['per_row_us']:>10.2f} us/row")
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    from app.core.config import settings
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=API_ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    libraries = {"numpy": np.__version__}
+    for name in ("pandas", "xgboost", "lightgbm", "sklearn"):
+        module = sys.modules.get(name)
+        if module is not None:
+            libraries[name] = getattr(module, "__version__", None)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "libraries": libraries,
+        "settings": {
+            "USE_XGBOOST": settings.USE_XGBOOST,
+            "USE_TREE_TABLES": settings.USE_TREE_TABLES,
+            "USE_NATIVE_MODELS": settings.USE_NATIVE_MODELS,
+            "STUDENT_CALIBRATION_ENABLED": settings.STUDENT_CALIBRATION_ENABLED,
+            "METRICS_ENABLED": settings.METRICS_ENABLED,
+        },
+    }
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+    min_delta_s: float = 5e-6,
+) -> List[Dict[str, Any]]:
+    """Per-case median ratio current / baseline for the cases both contain."""
+    rows = []
+    for key, result in current.items():
+        reference = baseline.get(key)
+        if reference is None or reference["median_s"] <= 0:
+            continue
+        ratio = result["median_s"] / reference["median_s"]
+        rows.append({
+            "case": key,
+            "baseline_ms": reference["median_s"] * 1e3,
+            "current_ms": result["median_s"] * 1e3,
+            "ratio": ratio,
+            "regression": ratio > 1.0 + threshold and result["median_s"] - reference["median_s"] > min_delta_s,
+        })
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]], threshold: float) -> str:
+    lines = [f"{'case':<58} {'baseline ms':>12} {'current ms':>12} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['case']:<58} {row['baseline_ms']:>12.3f} {row['current_ms']:>12.3f} "
+            f"{(row['ratio'] - 1) * 100:>+7.1f}%{flag}"
+        )
+    regressions = sum(row["regression"] for row in rows)
+    lines.append(f"{regressions} of {len(rows)} cases slower than baseline by more than {threshold:.0%}")
+    return "\n".join(lines)
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    document = json.loads(Path(path).read_text())
+    if document.get("format") != FORMAT:
+        raise ValueError(f"{path}: not a benchmark result file")
+    return document
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the scoring hot paths")
+    parser.add_argument("--filter", action="append", help="only benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--batch-sizes", default=",".join(map(str, DEFAULT_BATCH_SIZES)))
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent per case")
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help=f"compare against this file (default {DEFAULT_BASELINE.name} if present)")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before a case fails")
+    parser.add_argument("--min-delta-us", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {DEFAULT_BASELINE}")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for benchmark in BENCHMARKS:
+            print(benchmark.name)
+        return 0
+
+    logging.getLogger().setLevel(logging.WARNING)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+    results = run_benchmarks(args.filter, batch_sizes, args.min_time, args.min_runs)
+    document = {"format": FORMAT, "environment": environment(), "results": results}
+
+    for path in filter(None, [args.output, DEFAULT_BASELINE if args.save_baseline else None]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Results written to {path}")
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if DEFAULT_BASELINE.exists() and not args.save_baseline else None)
+    if baseline_path is None:
+        return 0
+    baseline = load_results(baseline_path)
+    rows = compare(results, baseline["results"], args.threshold, args.min_delta_us * 1e-6)
+    print()
+    print(f"Baseline: {baseline_path} ({baseline['environment'].get('git_commit')}, {baseline['environment'].get('timestamp')})")
+    print(format_comparison(rows, args.threshold))
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
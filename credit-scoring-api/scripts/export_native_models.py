@@ -0,0 +1,81 @@
+"""
+Export the served pickled models to native booster files + JSON manifests.
+
+Usage (from credit-scoring-api/):
+    python scripts/export_native_models.py
+    python scripts/export_native_models.py --check
+    python scripts/export_native_models.py --format json
+
+Writes <stem>.ubj (XGBoost) or <stem>.txt (LightGBM) and
+<stem>.manifest.json next to each pickle, the student threshold into the
+student manifest, and the model metadata as JSON. With USE_NATIVE_MODELS
+(default on) the API loads these instead of the pickles; exports whose
+source pickle has changed since are ignored.
+"""
+import argparse
+import pickle
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+API_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.services.native_models import export_metadata, export_native, load_native  # noqa: E402
+
+
+def _check_parity(model, native, rows: int = 2000) -> float:
+    """Max |predict_proba - native| on random inputs with a few missing values."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, native.n_features_in_)).astype(np.float32)
+    X *= rng.choice([1.0, 10.0, 1e3, 1e5], size=(1, native.n_features_in_)).astype(np.float32)
+    X[rng.random(X.shape) < 0.02] = np.nan
+    return float(np.max(np.abs(model.predict_proba(X)[:, 1] - native.predict_positive(X))))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export pickled models to native formats")
+    parser.add_argument("--format", choices=["ubj", "json"], default="ubj", help="XGBoost file format")
+    parser.add_argument("--check", action="store_true", help="verify predictions match the pickles")
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    student_threshold = None
+    if settings.STUDENT_THRESHOLD_PATH.exists():
+        with open(settings.STUDENT_THRESHOLD_PATH, "rb") as f:
+            student_threshold = float(pickle.load(f))
+
+    exports = [
+        (settings.XGB_MODEL_PATH, settings.XGBOOST_THRESHOLD),
+        (settings.LGBM_MODEL_PATH, settings.LIGHTGBM_THRESHOLD),
+        (settings.STUDENT_MODEL_PATH, student_threshold),
+    ]
+
+    failed = False
+    for artifact, threshold in exports:
+        if not artifact.exists():
+            print(f"skip   {artifact} (not found)")
+            continue
+
+        model = joblib.load(artifact)
+        manifest = export_native(model, artifact, threshold=threshold, xgb_format=args.format)
+        print(f"export {artifact.name} -> {manifest.name}")
+
+        if args.check:
+            max_diff = _check_parity(model, load_native(manifest))
+            status = "ok" if max_diff <= args.tolerance else "FAIL"
+            failed |= status == "FAIL"
+            print(f"check  {artifact.name}: max |diff| = {max_diff:.2e} [{status}]")
+
+    if settings.METADATA_PATH.exists():
+        target = export_metadata(joblib.load(settings.METADATA_PATH), settings.METADATA_PATH)
+        print(f"export {settings.METADATA_PATH.name} -> {target.name}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
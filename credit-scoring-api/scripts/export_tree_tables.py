@@ -0,0 +1,73 @@
+"""
+Export the served tree models to flat NumPy node tables.
+
+Usage (from credit-scoring-api/):
+    python scripts/export_tree_tables.py
+    python scripts/export_tree_tables.py --output models/tree_tables --check
+
+Writes one directory per model under TREE_TABLE_DIR (default
+models/tree_tables/<artifact stem>/). Set USE_TREE_TABLES=true to serve
+from them; tables whose source hash no longer matches the pickle are ignored.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+API_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.services.tree_ensemble import TreeEnsemble, describe, file_sha256, from_model  # noqa: E402
+
+
+def _artifacts():
+    return [settings.XGB_MODEL_PATH, settings.LGBM_MODEL_PATH, settings.STUDENT_MODEL_PATH]
+
+
+def _check_parity(model, ensemble: TreeEnsemble, rows: int = 2000) -> float:
+    """Max |predict_proba - table| on random inputs with a few missing values."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, ensemble.n_features_in_)).astype(np.float32)
+    X *= rng.choice([1.0, 10.0, 1e3, 1e5], size=(1, ensemble.n_features_in_)).astype(np.float32)
+    X[rng.random(X.shape) < 0.02] = np.nan
+    return float(np.max(np.abs(model.predict_proba(X)[:, 1] - ensemble.predict_positive(X))))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export tree models to NumPy node tables")
+    parser.add_argument("--output", type=Path, default=settings.TREE_TABLE_DIR,
+                        help="Directory that receives one table per model")
+    parser.add_argument("--check", action="store_true",
+                        help="Verify parity against predict_proba after export")
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    args = parser.parse_args()
+
+    failed = False
+    for artifact in _artifacts():
+        if not artifact.exists():
+            print(f"skip   {artifact} (not found)")
+            continue
+
+        model = joblib.load(artifact)
+        ensemble = from_model(model, source=artifact.name, source_sha256=file_sha256(artifact))
+        target = ensemble.save(args.output / artifact.stem)
+        info = describe(ensemble)
+        print(
+            f"export {artifact.name} -> {target} "
+            f"({info['n_trees']} trees, {info['n_nodes']} nodes, depth {info['max_depth']})"
+        )
+
+        if args.check:
+            max_diff = _check_parity(model, TreeEnsemble.load(target))
+            status = "ok" if max_diff <= args.tolerance else "FAIL"
+            failed |= status == "FAIL"
+            print(f"check  {artifact.name}: max |diff| = {max_diff:.2e} [{status}]")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
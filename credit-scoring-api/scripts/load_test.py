@@ -0,0 +1,549 @@
+"""
+Load test and replay harness.
+
+Replays a JSONL request corpus against the API, in process (the ASGI app
+through httpx, no network) or against a running server, and reports
+throughput, latency percentiles, error rates and a saturation curve.
+
+Usage (from credit-scoring-api/):
+    python scripts/load_test.py --concurrency 1,4,16,64
+    python scripts/load_test.py --rate 25,50,100,200 --duration 20 --slo-ms 250
+    python scripts/load_test.py --base-url http://localhost:8000 --rate 50,100 --token <id_token>
+    python scripts/load_test.py --mix calculate-limit=6,student-calculate-limit=3,batch-predict=1
+    python scripts/load_test.py --generate-corpus 200 --corpus benchmarks/requests.jsonl
+
+Corpus lines look like ``{"endpoint": "calculate-limit", "body": {...}}``;
+endpoints are the keys of ENDPOINTS. The sample corpus in
+benchmarks/requests.jsonl is synthetic and deterministic (--seed).
+
+Two load models, one step per value given:
+- closed loop (--concurrency N): N clients each send their next request as
+  soon as the previous one answers, so throughput at each N is what the
+  server sustains with N requests outstanding
+- open loop (--rate R): requests arrive at R per second (Poisson, or
+  --arrival constant) whether or not earlier ones finished; latency is
+  measured from the scheduled arrival, so queueing delay is not hidden
+  when the server falls behind. More than --max-in-flight outstanding
+  requests are dropped and counted as errors
+
+Each step warms up for --warmup seconds, then measures for --duration. The
+saturation point is the first step where open-loop throughput falls below
+90% of the offered rate, closed-loop throughput gains less than 5% over
+the previous step, p99 exceeds --slo-ms, or the error rate exceeds 1%.
+
+In process the harness turns on DEMO_AUTH_BYPASS_ENABLED (outside
+production), turns off rate limiting and, unless --firestore-logging,
+student application logging; client and server then share one event loop
+and process, so in-process numbers are for comparing builds. Point
+--base-url at uvicorn for capacity numbers, with a bearer --token (or the
+demo bypass enabled on the server) and --api-key for /batch-predict.
+Replayed bodies repeat once the corpus is exhausted and are then served
+from the scoring cache; set SCORING_CACHE_ENABLED=false to measure cold
+scoring only.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+API_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_ROOT))
+
+DEFAULT_CORPUS = API_ROOT / "benchmarks" / "requests.jsonl"
+FORMAT = "credit-scoring-loadtest/1"
+
+ENDPOINTS: Dict[str, str] = {
+    "calculate-limit": "/api/calculate-limit",
+    "apply": "/api/apply",
+    "student-calculate-limit": "/api/student/calculate-limit",
+    "batch-predict": "/api/batch-predict",
+}
+
+SATURATION_EFFICIENCY = 0.90  # open loop: achieved / offered
+SATURATION_GAIN = 0.05  # closed loop: throughput gain over the previous step
+SATURATION_ERROR_RATE = 0.01
+
+
+# ── Corpus ───────────────────────────────────────────────────────────────────
+
+
+def _simple_body(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "full_name": "Load Test",
+        "age": rng.randint(18, 70),
+        "monthly_income": rng.randint(3, 120) * 1_000_000,
+        "employment_status": rng.choice(["EMPLOYED", "EMPLOYED", "SELF_EMPLOYED", "UNEMPLOYED"]),
+        "years_employed": float(rng.randint(0, 30)),
+        "home_ownership": rng.choice(["RENT", "OWN", "MORTGAGE", "LIVING_WITH_PARENTS"]),
+        "years_credit_history": rng.randint(0, 20),
+        "has_previous_defaults": rng.random() < 0.1,
+        "currently_defaulting": rng.random() < 0.03,
+    }
+
+
+def _student_body(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "age": rng.randint(17, 30),
+        "gpa_latest": round(rng.uniform(1.0, 4.0), 2),
+        "academic_year": rng.randint(1, 5),
+        "major": rng.choice(["technology", "engineering", "medicine", "business", "finance", "law", "education", "arts", "other"]),
+        "program_level": "postgraduate" if rng.random() < 0.15 else "undergraduate",
+        "loan_amount": rng.choice([5_000_000, 8_000_000, 10_000_000]),
+        "living_status": rng.choice(["dormitory", "with_parents", "renting"]),
+        "has_buffer": rng.random() < 0.4,
+        "support_sources": [s for s in ("family", "scholarship", "part_time") if rng.random() < 0.4],
+        "monthly_income": rng.randint(0, 10) * 1_000_000,
+        "monthly_expenses": rng.randint(1, 8) * 1_000_000,
+    }
+
+
+def _prediction_body(rng: random.Random) -> Dict[str, Any]:
+    income = rng.randint(12, 250) * 1_000
+    amount = rng.randint(1, 35) * 1_000
+    return {
+        "person_age": rng.randint(20, 70),
+        "person_income": income,
+        "person_home_ownership": rng.choice(["RENT", "OWN", "MORTGAGE", "OTHER"]),
+        "person_emp_length": float(rng.randint(0, 30)),
+        "loan_intent": rng.choice(["EDUCATION", "MEDICAL", "VENTURE", "PERSONAL", "HOMEIMPROVEMENT", "DEBTCONSOLIDATION"]),
+        "loan_grade": rng.choice("ABCDEFG"),
+        "loan_amnt": amount,
+        "loan_int_rate": round(rng.uniform(5.0, 23.0), 2),
+        "loan_percent_income": round(min(amount / income, 0.99), 2),
+        "cb_person_default_on_file": "Y" if rng.random() < 0.15 else "N",
+        "cb_person_cred_hist_length": rng.randint(2, 30),
+        "credit_score": rng.randint(450, 820),
+        "previous_loan_defaults_on_file": "Y" if rng.random() < 0.1 else "N",
+    }
+
+
+def generate_corpus(count: int, seed: int = 0, batch_size: int = 8) -> List[Dict[str, Any]]:
+    """Synthetic corpus: 40% calculate-limit, 20% apply, 30% student, 10% batches."""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        slot = i % 10
+        if slot < 4:
+            entries.append({"endpoint": "calculate-limit", "body": _simple_body(rng)})
+        elif slot < 6:
+            entries.append({"endpoint": "apply", "body": _simple_body(rng)})
+        elif slot < 9:
+            entries.append({"endpoint": "student-calculate-limit", "body": _student_body(rng)})
+        else:
+            entries.append({"endpoint": "batch-predict", "body": [_prediction_body(rng) for _ in range(batch_size)]})
+    return entries
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    entries = []
+    with open(path, encoding="utf-8") as lines:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("endpoint") not in ENDPOINTS or "body" not in entry:
+                raise ValueError(f"{path}:{number}: expected endpoint in {sorted(ENDPOINTS)} and a body")
+            entries.append(entry)
+    if not entries:
+        raise ValueError(f"{path}: empty corpus")
+    return entries
+
+
+def parse_mix(value: Optional[str]) -> Optional[Dict[str, float]]:
+    """``"calculate-limit=6,apply=2"`` -> weights per endpoint."""
+    if not value:
+        return None
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {sorted(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def request_stream(
+    entries: Sequence[Dict[str, Any]], mix: Optional[Dict[str, float]] = None, seed: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """Endless requests: corpus order, or endpoints drawn by ``mix`` weight.
+
+    Each endpoint cycles through its own corpus entries, so a body repeats
+    only after all of that endpoint's entries have been sent.
+    """
+    if mix is None:
+        yield from itertools.cycle(entries)
+        return
+
+    by_endpoint: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for entry in entries:
+        by_endpoint[entry["endpoint"]].append(entry)
+    missing = [name for name, weight in mix.items() if weight > 0 and not by_endpoint[name]]
+    if missing:
+        raise ValueError(f"Corpus has no entries for {missing}")
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    positions = dict.fromkeys(names, 0)
+    rng = random.Random(seed)
+    while True:
+        name = rng.choices(names, weights)[0]
+        pool = by_endpoint[name]
+        yield pool[positions[name] % len(pool)]
+        positions[name] += 1
+
+
+# ── Measurement ──────────────────────────────────────────────────────────────
+
+
+class StepRecorder:
+    """Outcomes of one load step; only requests started inside the window count."""
+
+    def __init__(self) -> None:
+        self.window_start = math.inf
+        self.window_end = math.inf
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def in_window(self, started: float) -> bool:
+        return self.window_start <= started < self.window_end
+
+    def record(self, endpoint: str, started: float, seconds: float, status: Any) -> None:
+        if self.in_window(started):
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+
+
+def _percentiles(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None, "mean_ms": None}
+    values = np.asarray(samples) * 1e3
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+        "mean_ms": float(values.mean()),
+    }
+
+
+def _is_error(status: Any) -> bool:
+    return not (isinstance(status, int) and status < 400)
+
+
+def summarize(recorder: StepRecorder, duration: float) -> Dict[str, Any]:
+    """Throughput, latency percentiles and errors for a finished step."""
+    endpoints = {}
+    all_latencies: List[float] = []
+    all_statuses: Counter = Counter()
+    for endpoint in sorted(recorder.statuses):
+        statuses = recorder.statuses[endpoint]
+        total = sum(statuses.values())
+        errors = sum(n for status, n in statuses.items() if _is_error(status))
+        endpoints[endpoint] = {
+            "requests": total,
+            "throughput_rps": total / duration,
+            "error_rate": errors / total if total else 0.0,
+            **_percentiles(recorder.latencies[endpoint]),
+        }
+        all_latencies.extend(recorder.latencies[endpoint])
+        all_statuses.update(statuses)
+
+    total = sum(all_statuses.values())
+    errors = sum(n for status, n in all_statuses.items() if _is_error(status))
+    return {
+        "requests": total,
+        "throughput_rps": total / duration,
+        "error_rate": errors / total if total else 0.0,
+        **_percentiles(all_latencies),
+        "statuses": {str(status): n for status, n in sorted(all_statuses.items(), key=lambda kv: str(kv[0]))},
+        "endpoints": endpoints,
+    }
+
+
+async def _send(client: Any, entry: Dict[str, Any], headers: Dict[str, str]) -> Any:
+    try:
+        response = await client.post(ENDPOINTS[entry["endpoint"]], json=entry["body"], headers=headers)
+        return response.status_code
+    except Exception as e:
+        return type(e).__name__
+
+
+async def run_closed_loop(
+    client: Any,
+    stream: Iterator[Dict[str, Any]],
+    headers: Dict[str, str],
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+) -> Dict[str, Any]:
+    """``concurrency`` clients, each sending back to back."""
+    recorder = StepRecorder()
+    began = time.perf_counter()
+    recorder.window_start = began + warmup
+    recorder.window_end = recorder.window_start + duration
+
+    async def worker() -> None:
+        while True:
+            started = time.perf_counter()
+            if started >= recorder.window_end:
+                return
+            entry = next(stream)
+            status = await _send(client, entry, headers)
+            recorder.record(entry["endpoint"], started, time.perf_counter() - started, status)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"mode": "closed", "concurrency": concurrency, "duration_s": duration, **summarize(recorder, duration)}
+
+
+async def run_open_loop(
+    client: Any,
+    stream: Iterator[Dict[str, Any]],
+    headers: Dict[str, str],
+    rate: float,
+    duration: float,
+    warmup: float = 0.0,
+    arrival: str = "poisson",
+    max_in_flight: int = 1_000,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Requests arrive at ``rate`` per second regardless of how fast they finish."""
+    recorder = StepRecorder()
+    rng = random.Random(seed)
+    tasks: set = set()
+    dropped = 0
+    began = time.perf_counter()
+    recorder.window_start = began + warmup
+    recorder.window_end = recorder.window_start + duration
+
+    async def one(entry: Dict[str, Any], scheduled: float) -> None:
+        status = await _send(client, entry, headers)
+        recorder.record(entry["endpoint"], scheduled, time.perf_counter() - scheduled, status)
+
+    scheduled = began
+    while True:
+        scheduled += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+        if scheduled >= recorder.window_end:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        entry = next(stream)
+        if len(tasks) >= max_in_flight:
+            if recorder.in_window(scheduled):
+                dropped += 1
+                recorder.statuses[entry["endpoint"]]["dropped"] += 1
+            continue
+        task = asyncio.ensure_future(one(entry, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return {
+        "mode": "open",
+        "offered_rps": rate,
+        "arrival": arrival,
+        "duration_s": duration,
+        "dropped": dropped,
+        **summarize(recorder, duration),
+    }
+
+
+def saturation_point(steps: Sequence[Dict[str, Any]], slo_ms: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """First step where the server stopped keeping up, with the reason; None if it never did."""
+    previous = None
+    for index, step in enumerate(steps):
+        reasons = []
+        if step["mode"] == "open" and step["throughput_rps"] < SATURATION_EFFICIENCY * step["offered_rps"]:
+            reasons.append("throughput below offered rate")
+        if step["mode"] == "closed" and previous is not None and previous["throughput_rps"] > 0:
+            if step["throughput_rps"] < (1 + SATURATION_GAIN) * previous["throughput_rps"]:
+                reasons.append("throughput stopped growing")
+        if slo_ms is not None and step["p99_ms"] is not None and step["p99_ms"] > slo_ms:
+            reasons.append(f"p99 above {slo_ms:g} ms")
+        if step["error_rate"] > SATURATION_ERROR_RATE:
+            reasons.append("error rate above 1%")
+        if reasons:
+            return {"step": index, "load": step.get("offered_rps", step.get("concurrency")), "reasons": reasons}
+        previous = step
+    return None
+
+
+# ── Target ───────────────────────────────────────────────────────────────────
+
+
+def configure_in_process(firestore_logging: bool = False) -> Dict[str, Any]:
+    """Settings the in-process run needs; returns the previous values for ``restore_settings``."""
+    from app.core.config import settings
+
+    overrides = {"DEMO_AUTH_BYPASS_ENABLED": True, "RATE_LIMIT_ENABLED": False}
+    if not firestore_logging:
+        overrides["STUDENT_APP_LOGGING_ENABLED"] = False
+    previous = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    return previous
+
+
+def restore_settings(previous: Dict[str, Any]) -> None:
+    from app.core.config import settings
+
+    for name, value in previous.items():
+        setattr(settings, name, value)
+
+
+async def wait_until_ready(client: Any, timeout: float = 120.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await client.get("/api/ready")).status_code == 200:
+                return
+        except Exception:
+            pass
+        if time.perf_counter() > deadline:
+            raise TimeoutError("API did not report ready")
+        await asyncio.sleep(0.25)
+
+
+async def run_sweep(args: argparse.Namespace, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    import httpx
+
+    headers = {}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+    if args.api_key:
+        headers["X-API-Key"] = args.api_key
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout)
+        lifespan = None
+    else:
+        from app.main import app
+
+        # app.main configured LOG_LEVEL on import; per-request logs would dominate the profile
+        logging.getLogger().setLevel(logging.ERROR)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", limits=limits, timeout=timeout
+        )
+        lifespan = app.router.lifespan_context(app)
+
+    stream = request_stream(entries, parse_mix(args.mix), args.seed)
+    steps = []
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            await wait_until_ready(client)
+            loads = args.rate or args.concurrency
+            for load in loads:
+                if args.rate:
+                    step = await run_open_loop(
+                        client, stream, headers, load, args.duration, args.warmup,
+                        args.arrival, args.max_in_flight, args.seed,
+                    )
+                else:
+                    step = await run_closed_loop(client, stream, headers, int(load), args.duration, args.warmup)
+                steps.append(step)
+                print(format_step(step))
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    return {
+        "format": FORMAT,
+        "target": args.base_url or "in-process",
+        "corpus": str(args.corpus),
+        "mix": parse_mix(args.mix),
+        "steps": steps,
+        "saturation": saturation_point(steps, args.slo_ms),
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+
+
+def format_step(step: Dict[str, Any]) -> str:
+    load = f"{step['offered_rps']:g} rps" if step["mode"] == "open" else f"{step['concurrency']} clients"
+    return (
+        f"{load:>12}  {step['throughput_rps']:8.1f} rps  "
+        f"p50 {_ms(step['p50_ms'])} ms  p95 {_ms(step['p95_ms'])} ms  p99 {_ms(step['p99_ms'])} ms  "
+        f"errors {step['error_rate']:6.2%}  ({step['requests']} requests)"
+    )
+
+
+def _floats(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a request corpus and measure capacity")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--base-url", help="server to load; default runs the app in process")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=_floats, default=None, help="closed-loop steps, e.g. 1,4,16")
+    load.add_argument("--rate", type=_floats, default=None, help="open-loop steps in requests/s, e.g. 25,50,100")
+    parser.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    parser.add_argument("--mix", help="endpoint weights, e.g. calculate-limit=6,apply=2 (default: corpus order)")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each step")
+    parser.add_argument("--max-in-flight", type=int, default=1_000)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--slo-ms", type=float, help="p99 latency target for the saturation point")
+    parser.add_argument("--token", help="Firebase ID token sent as a bearer token")
+    parser.add_argument("--api-key", help="X-API-Key for /batch-predict")
+    parser.add_argument("--firestore-logging", action="store_true", help="in process: keep student application logging on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the report JSON here")
+    parser.add_argument("--generate-corpus", type=int, metavar="N", help="write N synthetic requests to --corpus and exit")
+    args = parser.parse_args()
+
+    if args.generate_corpus:
+        args.corpus.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.corpus, "w", encoding="utf-8") as out:
+            for entry in generate_corpus(args.generate_corpus, args.seed):
+                out.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        print(f"Wrote {args.generate_corpus} requests to {args.corpus}")
+        return 0
+
+    if not args.rate and not args.concurrency:
+        args.concurrency = [1, 4, 16, 64]
+
+    logging.getLogger().setLevel(logging.WARNING)
+    entries = load_corpus(args.corpus)
+    previous = None if args.base_url else configure_in_process(args.firestore_logging)
+    try:
+        report = asyncio.run(run_sweep(args, entries))
+    finally:
+        if previous is not None:
+            restore_settings(previous)
+
+    saturation = report["saturation"]
+    if saturation is None:
+        print("No saturation within the tested load")
+    else:
+        print(f"Saturated at step {saturation['step'] + 1} ({saturation['load']:g}): {', '.join(saturation['reasons'])}")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Profile API startup: import cost per module and initialization phases.
+
+Usage (from credit-scoring-api/):
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --no-warmup --limit 40
+    python scripts/profile_startup.py --json > startup_profile.json
+
+Imports app.main with the import profiler installed (the same hook
+STARTUP_PROFILE_IMPORTS=1 enables under uvicorn), then runs the warm-up
+phase and prints where the time went. "import app.main" is what a worker
+pays before it can bind its port; warm-up is what it pays before it is
+fast.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_ROOT))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile API import and warm-up cost")
+    parser.add_argument("--no-warmup", action="store_true", help="only measure importing app.main")
+    parser.add_argument("--limit", type=int, default=25, help="rows per table")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    os.environ["STARTUP_PROFILE_IMPORTS"] = "1"
+    started = time.perf_counter()
+    import app.main  # noqa: F401  (installs the profiler through app/__init__.py first)
+    import_seconds = time.perf_counter() - started
+
+    from app.core.startup_profile import startup_profile
+    from app.services.warmup import warmup
+
+    warmup_seconds = None
+    if not args.no_warmup:
+        logging.getLogger().setLevel(logging.WARNING)
+        started = time.perf_counter()
+        warmup.run()
+        warmup_seconds = time.perf_counter() - started
+
+    if args.json:
+        report = startup_profile.report(limit=args.limit)
+        report["import_app_main_seconds"] = round(import_seconds, 4)
+        report["warmup_seconds"] = round(warmup_seconds, 4) if warmup_seconds is not None else None
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(startup_profile.format_table(limit=args.limit))
+    print()
+    print(f"import app.main: {import_seconds:.3f}s")
+    if warmup_seconds is not None:
+        print(f"warm-up:         {warmup_seconds:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
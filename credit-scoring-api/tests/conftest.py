@@ -0,0 +1,42 @@
+import importlib.util
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from app.core.rate_limit import rate_limiter
+from app.services.scoring_cache import scoring_cache
+
+
+@contextmanager
+def load_script(path):
+    """Import a stand-alone script (scripts/, pipeline/) as a module named after the file.
+
+    The module is registered in sys.modules while in use, as dataclasses and
+    pickling in the script expect, and removed again afterwards.
+    """
+    path = Path(path)
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        sys.modules.pop(spec.name, None)
+
+
+@pytest.fixture(autouse=True)
+def clear_scoring_cache():
+    """Tests monkeypatch the scoring services; never serve a result cached by another test."""
+    scoring_cache.clear()
+    yield
+    scoring_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Every test starts with full token buckets."""
+    rate_limiter.reset()
+    yield
@@ -0,0 +1,85 @@
+"""
+Redis protocol stand-in for the rate limiter tests.
+
+Speaks the slice of RESP that RedisBucketStore uses, so the client side
+(EVALSHA / NOSCRIPT fallback, reply parsing) runs without a Redis server.
+It re-implements the bucket in Python instead of running TOKEN_BUCKET_LUA;
+the script itself is tested against a real redis-server in test_rate_limit.
+"""
+import hashlib
+import socketserver
+import threading
+from typing import List
+
+from app.core.rate_limit import TOKEN_BUCKET_SHA, MemoryBucketStore, RateLimit, read_reply
+
+
+class LocalRedisStandIn:
+    """Local TCP server speaking the slice of RESP that RedisBucketStore uses.
+
+    Answers PING, SCRIPT LOAD, EVALSHA / EVAL of TOKEN_BUCKET_LUA (evaluated
+    natively against an in-memory bucket store) and FLUSHALL, so the Redis
+    backend can be exercised without a Redis server.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.buckets = MemoryBucketStore(max_keys=1_000_000)
+        self.commands: List[str] = []
+        self._scripts = set()
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        command = read_reply(self.rfile)
+                    except (EOFError, ConnectionError):
+                        return
+                    self.wfile.write(stand_in._dispatch(command))
+
+        class Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((host, port), Handler)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    def start(self) -> "LocalRedisStandIn":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _dispatch(self, command: List[str]) -> bytes:
+        name = command[0].upper()
+        self.commands.append(name)
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name == "FLUSHALL":
+            self.buckets.reset()
+            return b"+OK\r\n"
+        if name == "SCRIPT" and command[1].upper() == "LOAD":
+            sha = hashlib.sha1(command[2].encode("utf-8")).hexdigest()
+            self._scripts.add(sha)
+            return b"$%d\r\n%s\r\n" % (len(sha), sha.encode())
+        if name in ("EVAL", "EVALSHA"):
+            sha = hashlib.sha1(command[1].encode("utf-8")).hexdigest() if name == "EVAL" else command[1]
+            if name == "EVAL":
+                self._scripts.add(sha)
+            if sha not in self._scripts:
+                return b"-NOSCRIPT No matching script. Please use EVAL.\r\n"
+            if sha != TOKEN_BUCKET_SHA:
+                return b"-ERR stand-in only evaluates the rate-limit script\r\n"
+            key, capacity, rate = command[3], int(command[4]), float(command[5])
+            limit = RateLimit(capacity=capacity, period=capacity / rate, text="")
+            allowed, retry_after = self.buckets.hit(key, limit)
+            retry = repr(retry_after).encode()
+            return b"*2\r\n:%d\r\n$%d\r\n%s\r\n" % (int(allowed), len(retry), retry)
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
@@ -16,6 +16,31 @@ class TestHealthEndpoints:
         assert data["status"] == "healthy"
         assert "version" in data
         assert "models_loaded" in data
+
+    def test_health_does_not_touch_artifacts(self, monkeypatch):
+        """Liveness answers from memory; validation stays in the warm-up phase"""
+        from app.services.student_prediction_service import student_prediction_service
+
+        def fail(*args, **kwargs):
+            raise AssertionError("health probe validated artifacts")
+
+        monkeypatch.setattr(student_prediction_service, "validate_runtime_assets", fail)
+        response = client.get("/api/health")
+        assert response.status_code == 200
+
+    def test_ready_waits_for_warmup(self, monkeypatch):
+        """Readiness is 503 until warm-up completes"""
+        from app.services.warmup import warmup
+
+        monkeypatch.setattr(warmup, "state", "running")
+        response = client.get("/api/ready")
+        assert response.status_code == 503
+        assert response.json()["warmup"]["state"] == "running"
+
+        monkeypatch.setattr(warmup, "state", "complete")
+        response = client.get("/api/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
     
     def test_ping(self):
         """Test ping endpoint"""
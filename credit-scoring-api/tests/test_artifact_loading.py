@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services.artifact_loading import ArtifactLoadReport, artifact_load_report, current_rss_bytes
+from app.services.model_loader import ModelBundle, model_loader
+
+
+def test_independent_loaders_run_side_by_side():
+    report = ArtifactLoadReport(max_workers=3)
+    barrier = threading.Barrier(3, timeout=5)
+
+    def loader(value):
+        def load():
+            barrier.wait()  # only passes if all three run at once
+            return value
+        return load
+
+    results = report.load_concurrently({name: loader(name) for name in "abc"}, group="test")
+
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    assert {r.name for r in report.records("test")} == {"a", "b", "c"}
+    assert report.stats()["group_wall_seconds"]["test"] > 0
+
+
+def test_failed_loader_is_recorded_and_raised():
+    report = ArtifactLoadReport(max_workers=2)
+
+    def broken():
+        raise ValueError("corrupt pickle")
+
+    with pytest.raises(ValueError):
+        report.load_concurrently({"ok": lambda: 1, "broken": broken}, group="test")
+
+    errors = {r.name: r.error for r in report.records()}
+    assert errors["ok"] is None
+    assert "corrupt pickle" in errors["broken"]
+
+
+def test_rss_is_reported():
+    assert current_rss_bytes() > 0
+
+
+@pytest.mark.skipif(not settings.LGBM_MODEL_PATH.exists(), reason="model artifacts not available")
+def test_inactive_model_loads_on_first_use():
+    previous = model_loader.bundle
+    bundle = model_loader.load_bundle(
+        settings.XGB_MODEL_PATH,
+        settings.LGBM_MODEL_PATH,
+        settings.METADATA_PATH,
+        version="lazy-test",
+        eager_all=False,
+    )
+    inactive = "lgbm_model" if settings.USE_XGBOOST else "xgb_model"
+    assert getattr(bundle, inactive) is None
+
+    model_loader.swap(bundle)
+    try:
+        assert getattr(model_loader, inactive) is not None
+        assert getattr(model_loader.bundle, inactive) is not None
+        lazy = [r for r in artifact_load_report.records("regular:lazy-test") if r.lazy]
+        assert [r.name for r in lazy] == [inactive]
+    finally:
+        model_loader.swap(previous)
+
+
+def test_deferred_model_without_artifact_stays_none(tmp_path):
+    previous = model_loader.swap(
+        ModelBundle(xgb_model=object(), metadata={}, lgbm_path=tmp_path / "missing.pkl")
+    )
+    try:
+        assert model_loader.lgbm_model is None
+    finally:
+        model_loader.swap(previous)
+
+
+def test_swap_during_lazy_fill_in_is_not_reverted(tmp_path, monkeypatch):
+    """A swap racing the lazy load's compare-and-set must win, not be overwritten."""
+    from app.services import model_loader as module
+
+    artifact = tmp_path / "lgbm.pkl"
+    artifact.write_bytes(b"x")
+    deferred = ModelBundle(xgb_model=object(), metadata={}, lgbm_path=artifact, version="deferred")
+    newer = ModelBundle(xgb_model=object(), lgbm_model=object(), metadata={}, version="newer")
+    monkeypatch.setattr(module.ModelLoader, "_load_model", staticmethod(lambda path, label: object()))
+
+    real_replace = module.replace
+    swapper = threading.Thread(target=model_loader.swap, args=(newer,))
+
+    def replace_while_swapping(bundle, **changes):
+        # Checked and about to assign: let a registry swap run right now
+        swapper.start()
+        swapper.join(0.2)
+        return real_replace(bundle, **changes)
+
+    monkeypatch.setattr(module, "replace", replace_while_swapping)
+    previous = model_loader.swap(deferred)
+    try:
+        assert model_loader.lgbm_model is not None
+        swapper.join(5)
+        assert model_loader.bundle is newer
+    finally:
+        model_loader.swap(previous)
@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import load_script
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "benchmark_scoring.py"
+
+
+@pytest.fixture(scope="module")
+def bench():
+    with load_script(SCRIPT) as module:
+        yield module
+
+
+def test_every_benchmark_runs_at_batch_size_one(bench):
+    results = bench.run_benchmarks(batch_sizes=(1,), min_time=0.0, min_runs=1, log=lambda _: None)
+    assert set(results) == {f"{b.name}@1" for b in bench.BENCHMARKS}
+    assert all(result["median_s"] > 0 and result["rows"] == 1 for result in results.values())
+
+
+def test_compare_flags_only_real_slowdowns(bench):
+    baseline = {"a@1": {"median_s": 1e-3}, "b@1": {"median_s": 1e-3}, "c@1": {"median_s": 1e-6}}
+    current = {
+        "a@1": {"median_s": 1.1e-3},
+        "b@1": {"median_s": 1.5e-3},
+        "c@1": {"median_s": 2e-6},  # doubled, but within timer noise
+        "new@1": {"median_s": 1.0},
+    }
+    rows = {row["case"]: row for row in bench.compare(current, baseline, threshold=0.15)}
+    assert set(rows) == {"a@1", "b@1", "c@1"}
+    assert [case for case, row in rows.items() if row["regression"]] == ["b@1"]
+
+
+def test_committed_baseline_covers_the_suite(bench):
+    document = bench.load_results(bench.DEFAULT_BASELINE)
+    names = {key.rsplit("@", 1)[0] for key in document["results"]}
+    assert names == {b.name for b in bench.BENCHMARKS}
+    assert json.loads(bench.DEFAULT_BASELINE.read_text())["environment"]["python"]
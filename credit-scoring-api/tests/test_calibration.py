@@ -0,0 +1,95 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.isotonic import IsotonicRegression
+
+from app.services.calibration import (
+    CompiledIsotonicCalibrator,
+    compile_calibrator,
+    max_calibration_error,
+    verification_grid,
+)
+from app.services.student_prediction_service import student_prediction_service
+
+CALIBRATOR_PATH = Path(__file__).resolve().parent.parent / "models" / "student_calibrator_isotonic.pkl"
+
+
+@pytest.fixture(scope="module")
+def sklearn_calibrator():
+    with open(CALIBRATOR_PATH, "rb") as f:
+        return pickle.load(f)
+
+
+def test_artifact_compiles_and_matches_sklearn_on_dense_grid(sklearn_calibrator):
+    compiled = compile_calibrator(sklearn_calibrator)
+    assert isinstance(compiled, CompiledIsotonicCalibrator)
+    assert compiled.breakpoints == len(sklearn_calibrator.X_thresholds_)
+
+    grid = verification_grid(compiled.x, points=250_001)
+    assert max_calibration_error(compiled, sklearn_calibrator, grid) <= compiled.tolerance
+    # Out-of-range inputs clip to the end values, like out_of_bounds="clip"
+    outside = np.array([-1.0, 0.0, 1.0, 2.0])
+    np.testing.assert_allclose(compiled.predict(outside), sklearn_calibrator.predict(outside), atol=compiled.tolerance)
+
+
+def test_batch_and_single_paths_agree_exactly(sklearn_calibrator):
+    compiled = compile_calibrator(sklearn_calibrator)
+    grid = verification_grid(compiled.x, points=10_001)
+    single = [compiled.predict_one(p) for p in grid.tolist()]
+    assert compiled.predict(grid).tolist() == single
+
+
+def test_float64_calibrator_matches_sklearn_to_rounding():
+    rng = np.random.default_rng(0)
+    raw = rng.random(5000)
+    labels = (rng.random(5000) < raw).astype(float)
+    calibrator = IsotonicRegression(out_of_bounds="clip").fit(raw, labels)
+
+    compiled = compile_calibrator(calibrator)
+    assert isinstance(compiled, CompiledIsotonicCalibrator)
+    assert compiled.tolerance == pytest.approx(1e-9)
+    grid = verification_grid(compiled.x, points=200_001)
+    assert max_calibration_error(compiled, calibrator, grid) <= 1e-12
+
+
+def test_uncompilable_calibrators_are_returned_unchanged():
+    assert compile_calibrator(None) is None
+
+    nan_mode = IsotonicRegression(out_of_bounds="nan").fit([0.1, 0.5, 0.9], [0.0, 0.5, 1.0])
+    assert compile_calibrator(nan_mode) is nan_mode
+
+    class Disagreeing:
+        out_of_bounds = "clip"
+        X_thresholds_ = np.array([0.0, 1.0])
+        y_thresholds_ = np.array([0.0, 1.0])
+
+        def predict(self, values):
+            return np.zeros(len(values))
+
+    disagreeing = Disagreeing()
+    assert compile_calibrator(disagreeing) is disagreeing
+
+
+def test_non_finite_input_falls_back_to_raw_probability(sklearn_calibrator):
+    compiled = compile_calibrator(sklearn_calibrator)
+    with pytest.raises(ValueError):
+        compiled.predict_one(float("nan"))
+    with pytest.raises(ValueError):
+        compiled.predict(np.array([0.2, np.inf]))
+
+    probabilities = np.array([0.2, np.nan])
+    assert student_prediction_service._calibrate_probabilities(probabilities, compiled) is probabilities
+
+
+def test_loaded_service_uses_compiled_calibrator(sklearn_calibrator):
+    calibrator = student_prediction_service._calibrator
+    assert isinstance(calibrator, CompiledIsotonicCalibrator)
+    assert student_prediction_service.runtime_status()["calibrator_compiled"] is True
+
+    for p in (0.0, 0.05, 0.25, 0.5, 0.75, 1.0):
+        expected = float(np.clip(sklearn_calibrator.predict(np.array([p]))[0], 0.0, 1.0))
+        assert student_prediction_service._calibrate_probability(p, calibrator) == pytest.approx(
+            expected, abs=calibrator.tolerance
+        )
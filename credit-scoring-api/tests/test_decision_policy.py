@@ -0,0 +1,320 @@
+import dataclasses
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.decision_policy import (
+    DecisionPolicy,
+    DecisionPolicySync,
+    InMemoryPolicyDocument,
+    decision_policy_audit,
+    decision_policy_sync,
+)
+from app.services.firestore_sink import BatchedFirestoreSink, InMemoryFirestoreBackend
+from app.services.scoring_cache import student_cache_version
+from app.services.student_prediction_service import student_prediction_service
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def restore_policy():
+    """Tests swap the live policy; put the original back afterwards."""
+    policy = student_prediction_service.decision_policy
+    yield
+    student_prediction_service._policy = policy
+
+
+@pytest.fixture(autouse=True)
+def policy_store(monkeypatch):
+    """Stored policy shared by the 'instances' of a test (Firestore stand-in)."""
+    store = InMemoryPolicyDocument()
+    monkeypatch.setattr(decision_policy_sync, "_document", store)
+    return store
+
+
+@pytest.fixture
+def audit_backend(monkeypatch):
+    backend = InMemoryFirestoreBackend()
+    sink = BatchedFirestoreSink("policy_audit", backend=backend, flush_interval_seconds=0)
+    monkeypatch.setattr(decision_policy_audit, "_sink", sink)
+    yield backend
+    sink.close()
+
+
+@pytest.mark.parametrize(
+    "name, margin, expected",
+    [
+        ("balanced", 0.05, (0.30, 0.35)),
+        ("safe", 0.05, (0.20, 0.40)),  # margin widened to 0.10
+        ("safe", 0.20, (0.10, 0.50)),
+        ("aggressive", 0.05, (0.33, 0.33)),  # margin narrowed to 0.03
+        ("balanced", 0.90, (0.30, 0.55)),  # margin clamped to 0.25
+        (" SAFE ", 0.10, (0.20, 0.40)),
+    ],
+)
+def test_cutoffs_are_precomputed_per_policy(name, margin, expected):
+    policy = DecisionPolicy(name=name, manual_review_margin=margin, model_threshold=0.30)
+    assert (policy.approve_below, policy.review_up_to) == pytest.approx(expected)
+    assert policy.name == name.strip().lower()
+
+
+def test_threshold_override_replaces_model_threshold():
+    policy = DecisionPolicy(name="balanced", model_threshold=0.30, threshold_override=0.40)
+    assert policy.threshold == 0.40
+    assert policy.approve_below == 0.40
+    assert policy.with_model_threshold(0.2).threshold == 0.40
+
+    disabled = DecisionPolicy(name="balanced", model_threshold=0.30, threshold_override=0.0)
+    assert disabled.threshold_override is None
+    assert disabled.threshold == 0.30
+
+
+def test_policy_is_immutable_and_validated():
+    policy = DecisionPolicy(model_threshold=0.3)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        policy.approve_below = 0.9
+    with pytest.raises(ValueError):
+        DecisionPolicy(name="yolo")
+
+    updated = policy.updated(name="safe")
+    assert (updated.revision, updated.source, updated.name) == (1, "admin", "safe")
+    assert policy.name == "balanced"
+
+
+def test_unknown_configured_policy_falls_back_to_balanced(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "STUDENT_DECISION_POLICY", "experimental")
+    assert DecisionPolicy.from_settings(0.3).name == "balanced"
+
+
+@pytest.mark.parametrize("name", ["safe", "balanced", "aggressive"])
+def test_classify_many_matches_classify(name):
+    policy = DecisionPolicy(name=name, manual_review_margin=0.05, model_threshold=0.25)
+    probabilities = np.concatenate([
+        np.linspace(0.0, 1.0, 10_001),
+        [policy.approve_below, policy.review_up_to],
+        np.nextafter([policy.approve_below, policy.review_up_to], 1.0),
+    ])
+    bands, approved, manual_review = policy.classify_many(probabilities)
+    expected = [policy.classify(p) for p in probabilities.tolist()]
+    assert list(zip(bands.tolist(), approved.tolist(), manual_review.tolist())) == expected
+
+
+def test_service_swap_is_atomic_and_follows_model_threshold(restore_policy):
+    previous, current = student_prediction_service.update_decision_policy(name="safe", manual_review_margin=0.12)
+    assert student_prediction_service.decision_policy is current
+    assert current.revision == previous.revision + 1
+
+    threshold = student_prediction_service._artifacts.threshold
+    band, _, _ = student_prediction_service.classify_decision_band(threshold - 0.11)
+    assert band == "manual_review"
+
+    # A model hot swap keeps the policy and rebinds its cutoffs
+    artifacts = student_prediction_service._artifacts
+    student_prediction_service.swap(dataclasses.replace(artifacts, threshold=threshold + 0.1))
+    try:
+        rebound = student_prediction_service.decision_policy
+        assert (rebound.name, rebound.revision) == ("safe", current.revision)
+        assert rebound.approve_below == pytest.approx(threshold + 0.1 - 0.12)
+    finally:
+        student_prediction_service.swap(artifacts)
+
+
+def test_admin_endpoint_swaps_policy_and_audits(restore_policy, audit_backend, policy_store):
+    version_before = student_cache_version()
+    response = client.put(
+        "/api/student/decision-policy",
+        json={"policy": "aggressive", "approval_threshold_override": 0.3, "changed_by": "risk", "reason": "canary"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["policy"] == "aggressive"
+    assert data["threshold"] == 0.3
+    assert data["cutoffs"]["approve_below"] == pytest.approx(0.33)
+    assert data["previous"]["revision"] == data["revision"] - 1
+
+    assert student_prediction_service.threshold == 0.3
+    assert policy_store.read()["revision"] == data["revision"]
+    assert student_prediction_service.classify_decision_band(0.32)[0] == "auto_approve"
+    assert student_cache_version() != version_before
+
+    current = client.get("/api/student/decision-policy").json()
+    assert current["revision"] == data["revision"]
+    assert current["audit"][0]["reason"] == "canary"
+    assert current["audit"][0]["current"]["policy"] == "aggressive"
+
+    assert decision_policy_audit._sink.flush(timeout=5)
+    (audited,) = audit_backend.documents("policy_audit")
+    assert audited["changed_by"] == "risk"
+    assert audited["previous"]["policy"] == data["previous"]["policy"]
+
+
+def test_policy_change_reaches_every_instance(restore_policy, policy_store):
+    receiving = DecisionPolicySync(document=policy_store)
+    previous, current = receiving.publish(changed_by="risk", reason="canary", name="safe", manual_review_margin=0.12)
+    assert student_prediction_service.decision_policy is current
+    assert policy_store.read()["revision"] == current.revision == previous.revision + 1
+    assert policy_store.read()["changed_by"] == "risk"
+
+    # Another (or a restarted) instance starts on the environment defaults...
+    student_prediction_service._policy = None
+    assert student_prediction_service.decision_policy.revision == 0
+    # ...and serves the stored policy after its first poll
+    other = DecisionPolicySync(document=policy_store)
+    assert other.check_once()
+    adopted = student_prediction_service.decision_policy
+    assert (adopted.name, adopted.manual_review_margin, adopted.revision) == ("safe", 0.12, current.revision)
+    assert adopted.key == current.key
+    assert not other.check_once()
+    assert other.stats()["adopted"] == 1
+
+
+def test_changes_build_on_the_stored_policy(restore_policy, policy_store):
+    # Revision 7 was stored by another instance that this one has not polled yet
+    policy_store.doc = {"policy": "aggressive", "manual_review_margin": 0.02, "threshold_override": None, "revision": 7}
+    previous, current = DecisionPolicySync(document=policy_store).publish(manual_review_margin=0.03)
+    assert (previous.name, previous.revision) == ("aggressive", 7)
+    assert (current.name, current.manual_review_margin, current.revision) == ("aggressive", 0.03, 8)
+    assert policy_store.read()["revision"] == 8
+
+
+def test_sync_disabled_changes_only_this_instance(restore_policy, policy_store, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "STUDENT_POLICY_SYNC_ENABLED", False)
+    sync = DecisionPolicySync(document=policy_store)
+    _, current = sync.publish(name="safe")
+    assert student_prediction_service.decision_policy is current
+    assert policy_store.read() is None
+    assert not sync.check_once()
+
+
+def test_invalid_stored_policy_is_not_adopted(restore_policy, policy_store):
+    policy_store.doc = {"policy": "yolo", "revision": 3}
+    serving = student_prediction_service.decision_policy
+    sync = DecisionPolicySync(document=policy_store)
+    assert not sync.check_once()
+    assert student_prediction_service.decision_policy is serving
+    assert "invalid stored policy" in sync.stats()["last_error"]
+
+
+def test_adopting_a_stored_policy_never_loads_the_model(restore_policy, policy_store, monkeypatch):
+    threshold = student_prediction_service.decision_policy.model_threshold
+    policy_store.doc = {"policy": "safe", "manual_review_margin": 0.12, "threshold_override": None, "revision": 4}
+    student_prediction_service._policy = None
+    with monkeypatch.context() as m:
+        m.setattr(
+            type(student_prediction_service),
+            "_artifacts",
+            property(lambda self: pytest.fail("policy sync loaded the student model")),
+        )
+        assert DecisionPolicySync(document=policy_store).check_once()
+    # Bound to the loaded model's threshold on first use
+    adopted = student_prediction_service.decision_policy
+    assert (adopted.name, adopted.revision, adopted.model_threshold) == ("safe", 4, threshold)
+
+
+def test_start_does_not_wait_for_the_store(restore_policy, policy_store):
+    import threading
+    import time
+
+    release = threading.Event()
+
+    class SlowDocument(InMemoryPolicyDocument):
+        def read(self):
+            release.wait(5)
+            return super().read()
+
+    document = SlowDocument()
+    document.doc = {"policy": "safe", "manual_review_margin": 0.1, "threshold_override": None, "revision": 5}
+    sync = DecisionPolicySync(document=document, poll_interval_seconds=60)
+    started = time.perf_counter()
+    sync.start()
+    try:
+        assert time.perf_counter() - started < 0.5
+        release.set()
+        deadline = time.monotonic() + 5
+        while sync.stats()["adopted"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert student_prediction_service.decision_policy.revision == 5
+    finally:
+        release.set()
+        sync.stop()
+
+
+def test_repeated_read_failures_warn_once(policy_store, caplog):
+    class Unreadable(InMemoryPolicyDocument):
+        def read(self):
+            raise ConnectionError("no credentials")
+
+    sync = DecisionPolicySync(document=Unreadable())
+    with caplog.at_level("DEBUG", logger="app.services.decision_policy"):
+        assert not sync.check_once()
+        assert not sync.check_once()
+    levels = [record.levelname for record in caplog.records if "read failed" in record.getMessage()]
+    assert levels == ["WARNING", "DEBUG"]
+    assert sync.stats()["last_error"] == "read failed: no credentials"
+
+
+def test_admin_endpoint_fails_without_changes_when_store_is_down(restore_policy, monkeypatch):
+    class Unavailable(InMemoryPolicyDocument):
+        def update(self, build):
+            raise ConnectionError("firestore unavailable")
+
+    monkeypatch.setattr(decision_policy_sync, "_document", Unavailable())
+    serving = student_prediction_service.decision_policy
+    response = client.put("/api/student/decision-policy", json={"policy": "safe"})
+    assert response.status_code == 503
+    assert student_prediction_service.decision_policy is serving
+
+
+def test_admin_endpoint_rejects_empty_and_invalid_updates(restore_policy):
+    assert client.put("/api/student/decision-policy", json={"reason": "nothing"}).status_code == 422
+    assert client.put("/api/student/decision-policy", json={"policy": "yolo"}).status_code == 422
+    assert client.put("/api/student/decision-policy", json={"manual_review_margin": 0.5}).status_code == 422
+
+
+def test_request_reads_the_policy_once(monkeypatch):
+    """A policy swap mid-request cannot pair one revision's bands with another's threshold."""
+    from app.auth.firebase_auth import verify_firebase_token
+    from app.services.student_application_logger import student_application_logger
+
+    policies = {
+        0.3: DecisionPolicy(name="balanced", model_threshold=0.3, revision=1),
+        0.7: DecisionPolicy(name="balanced", model_threshold=0.3, threshold_override=0.7, revision=2),
+    }
+    reads = []
+
+    def flipping_policy(self):
+        reads.append(1)
+        return policies[0.3] if len(reads) % 2 else policies[0.7]
+
+    service = type(student_prediction_service)
+    monkeypatch.setattr(service, "decision_policy", property(flipping_policy))
+    monkeypatch.setattr(service, "is_ready", property(lambda self: True))
+    monkeypatch.setattr(student_prediction_service, "predict", lambda raw: (0.5, "Medium", 700))
+    monkeypatch.setattr(student_application_logger, "log_application", lambda **kwargs: None)
+    monkeypatch.setitem(app.dependency_overrides, verify_firebase_token, lambda: {"uid": "policy-test"})
+
+    application = {
+        "age": 21,
+        "gpa_latest": 3.2,
+        "academic_year": 3,
+        "major": "technology",
+        "program_level": "undergraduate",
+        "living_status": "dormitory",
+        "has_buffer": True,
+        "support_sources": ["family"],
+    }
+    for path in ("/api/student/credit-score", "/api/student/calculate-limit"):
+        data = client.post(path, json=application).json()
+        policy = policies[data["approval_threshold"]]
+        assert data["decision_band"] == policy.classify(data["default_probability"])[0]
+
+    for data in client.post("/api/student/batch-calculate-limit", json=[application] * 3).json()["results"]:
+        policy = policies[data["approval_threshold"]]
+        assert data["decision_band"] == policy.classify(data["default_probability"])[0]
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import PredictionRequest
+from app.services.feature_engineering import FeatureEngineer
+
+
+def _application(**overrides):
+    row = {
+        "person_age": 30,
+        "person_income": 60000,
+        "person_emp_length": 5.0,
+        "person_home_ownership": "MORTGAGE",
+        "loan_amnt": 15000,
+        "loan_intent": "PERSONAL",
+        "loan_grade": "B",
+        "loan_int_rate": 8.5,
+        "loan_percent_income": 0.25,
+        "cb_person_cred_hist_length": 8,
+        "credit_score": 720,
+        "cb_person_default_on_file": "N",
+        "previous_loan_defaults_on_file": "N",
+    }
+    row.update(overrides)
+    return row
+
+
+def test_transform_returns_model_feature_order():
+    engineer = FeatureEngineer()
+    df = pd.DataFrame([_application()])
+
+    features = engineer.transform(df)
+    assert list(features.columns) == list(engineer.feature_columns)
+    assert features.shape == (1, len(engineer.feature_columns))
+
+
+def test_multi_row_transform_matches_row_by_row():
+    engineer = FeatureEngineer()
+    df = pd.DataFrame([
+        _application(),
+        _application(person_income=20000, person_emp_length=0.0, cb_person_default_on_file="Y"),
+        _application(cb_person_cred_hist_length=0, credit_score=300, previous_loan_defaults_on_file="Y"),
+    ])
+
+    batch = engineer.transform_array(df)
+    assert batch.shape == (3, len(engineer.feature_columns))
+    for i in range(len(df)):
+        single = engineer.transform_array(df.iloc[[i]])
+        np.testing.assert_array_equal(batch[i], single[0])
+
+    # Rows must not share row 0's values
+    assert not np.array_equal(batch[0], batch[1])
+
+
+def test_transform_matches_scalar_formulas():
+    engineer = FeatureEngineer()
+    df = pd.DataFrame([_application(person_emp_length=0.0, cb_person_default_on_file="Y")])
+    features = engineer.transform(df).iloc[0]
+
+    assert features["credit_income_ratio"] == 15000 / 60000
+    assert features["raw_days_employed"] == 0
+    assert features["has_job_flag"] == 0
+    assert features["closed_loans_count"] == 6
+    assert features["ins_raw_on_time_count"] == int(8 * 12 * (1 - 0.2))
+    assert features["ins_raw_late_count"] == int(8 * 12 * 1 * 0.2)
+    assert features["raw_cnt_fam_members"] == 1
+
+
+def test_missing_columns_use_defaults():
+    engineer = FeatureEngineer()
+    features = engineer.transform(pd.DataFrame([{"person_age": 40}, {"person_age": 50}]))
+
+    assert list(features["age_years"]) == [40, 50]
+    assert list(features["raw_income_total"]) == [50000, 50000]
+    assert list(features["raw_credit_amt"]) == [10000, 10000]
+
+
+def test_request_fast_path_matches_dataframe_path():
+    engineer = FeatureEngineer()
+    request = PredictionRequest(**_application(cb_person_default_on_file="Y"))
+
+    row = engineer.transform_request(request)
+    assert row.dtype == np.float32
+    assert row.flags["C_CONTIGUOUS"]
+
+    expected = engineer.transform_array(pd.DataFrame([request.model_dump()]))
+    np.testing.assert_array_equal(row, expected.astype(np.float32))
+
+
+def test_transform_requests_accepts_dicts_and_models():
+    engineer = FeatureEngineer()
+    rows = [_application(), _application(person_income=20000)]
+
+    from_dicts = engineer.transform_requests(rows)
+    from_models = engineer.transform_requests([PredictionRequest(**r) for r in rows])
+    np.testing.assert_array_equal(from_dicts, from_models)
+
+
+def test_failed_feature_name_read_is_retried(monkeypatch):
+    from app.services import feature_engineering as module
+
+    names = list(FeatureEngineer().feature_columns)
+    calls = []
+
+    class FlakyLoader:
+        @property
+        def feature_names(self):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("model still loading")
+            return names
+
+    monkeypatch.setattr(module, "model_loader", FlakyLoader())
+    engineer = FeatureEngineer()
+    assert engineer.feature_columns is None
+    assert engineer.feature_columns == names
+    assert engineer.feature_columns == names
+    assert len(calls) == 2
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+import threading
+
+from app.services.firestore_sink import (
+    BatchedFirestoreSink,
+    InMemoryFirestoreBackend,
+    generate_document_id,
+)
+from app.services.monitoring_aggregates import InMemoryAggregateStore, MonitoringAggregator
+from app.services.student_application_logger import StudentApplicationLogger
+
+
+class BlockingBackend(InMemoryFirestoreBackend):
+    """Holds every commit until released, like a slow Firestore round-trip."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def commit(self, collection, writes):
+        self.release.wait(5)
+        super().commit(collection, writes)
+
+
+class FlakyBackend(InMemoryFirestoreBackend):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def commit(self, collection, writes):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("unavailable")
+        super().commit(collection, writes)
+
+
+def test_document_ids_look_like_firestore_auto_ids():
+    doc_id = generate_document_id()
+    assert len(doc_id) == 20
+    assert doc_id.isalnum()
+    assert doc_id != generate_document_id()
+
+
+def test_batches_are_capped_at_firestore_limit():
+    backend = InMemoryFirestoreBackend()
+    sink = BatchedFirestoreSink("apps", backend=backend, max_queue=2000, batch_size=1000, flush_interval_seconds=60)
+    ids = [sink.enqueue({"n": i}) for i in range(1200)]
+
+    assert sink.close(timeout=5)
+    assert max(backend.batch_sizes) == 500
+    assert sum(backend.batch_sizes) == 1200
+    assert set(backend.collections["apps"]) == set(ids)
+    assert sink.stats()["written"] == 1200
+
+
+def test_time_based_flush_writes_a_partial_batch():
+    backend = InMemoryFirestoreBackend()
+    sink = BatchedFirestoreSink("apps", backend=backend, batch_size=500, flush_interval_seconds=0.05)
+    sink.enqueue({"n": 1})
+
+    assert sink.flush(timeout=5)
+    assert backend.batch_sizes == [1]
+    assert sink.stats()["lag_ms_last"] >= 0
+    sink.close()
+
+
+def test_enqueue_does_not_wait_for_commit_and_drops_when_full():
+    backend = BlockingBackend()
+    sink = BatchedFirestoreSink("apps", backend=backend, max_queue=3, batch_size=1, flush_interval_seconds=0)
+    try:
+        accepted = [sink.enqueue({"n": i}) for i in range(10)]
+        stats = sink.stats()
+        # One record is held by the blocked commit, three wait in the queue
+        assert stats["dropped_queue_full"] == 10 - sum(1 for doc_id in accepted if doc_id)
+        assert stats["dropped_queue_full"] >= 6
+        assert stats["queued"] <= 3
+    finally:
+        backend.release.set()
+        assert sink.close(timeout=5)
+    assert sink.stats()["written"] == sum(1 for doc_id in accepted if doc_id)
+
+
+def test_enqueue_many_queues_under_one_lock_and_drops_overflow():
+    backend = InMemoryFirestoreBackend()
+    sink = BatchedFirestoreSink("apps", backend=backend, max_queue=4, flush_interval_seconds=60)
+    doc_ids = sink.enqueue_many([{"n": i} for i in range(6)])
+
+    assert all(doc_ids[:4]) and doc_ids[4:] == [None, None]
+    assert sink.stats()["dropped_queue_full"] == 2
+    assert sink.flush(timeout=5)
+    assert backend.batch_sizes == [4]
+    assert [backend.collections["apps"][doc_id]["n"] for doc_id in doc_ids[:4]] == [0, 1, 2, 3]
+    sink.close()
+    assert sink.enqueue_many([{"n": 7}]) == [None]
+
+
+def test_failed_commits_are_retried():
+    backend = FlakyBackend(failures=1)
+    sink = BatchedFirestoreSink("apps", backend=backend, flush_interval_seconds=0)
+    sink.enqueue({"n": 1})
+
+    assert sink.close(timeout=5)
+    stats = sink.stats()
+    assert stats["commit_errors"] == 1
+    assert stats["written"] == 1
+    assert stats["dropped_write_failed"] == 0
+
+
+def test_closed_sink_rejects_new_records():
+    sink = BatchedFirestoreSink("apps", backend=InMemoryFirestoreBackend())
+    sink.close()
+    assert sink.enqueue({"n": 1}) is None
+
+
+def test_logger_queues_documents_through_backend():
+    backend = InMemoryFirestoreBackend()
+    app_logger = StudentApplicationLogger(
+        backend=backend, aggregator=MonitoringAggregator(store=InMemoryAggregateStore())
+    )
+
+    doc_id = app_logger.log_application(
+        "user-1",
+        {"age": 20, "gpa_latest": 3.2, "academic_year": 2, "loan_amount": 5_000_000},
+        credit_score=700,
+        loan_limit_vnd=5_000_000,
+        risk_level="Low",
+        approved=True,
+        model_score=0.2,
+        status="scored",
+    )
+    assert app_logger.flush(timeout=5)
+
+    docs = backend.collections["student_applications"]
+    assert list(docs) == [doc_id]
+    assert docs[doc_id]["userId"] == "user-1"
+    assert docs[doc_id]["manual_review"] is False
+    assert app_logger.sink_stats()["written"] == 1
+    app_logger.close()
+
+
+def test_logger_queues_a_batch_with_one_sink_call():
+    backend = InMemoryFirestoreBackend()
+    aggregator = MonitoringAggregator(store=InMemoryAggregateStore())
+    app_logger = StudentApplicationLogger(backend=backend, aggregator=aggregator)
+    payload = {"age": 20, "gpa_latest": 3.2, "academic_year": 2, "loan_amount": 5_000_000}
+
+    doc_ids = app_logger.log_applications("api_batch", [
+        dict(request_payload=payload, credit_score=700, loan_limit_vnd=5_000_000, risk_level="Low",
+             approved=True, model_score=0.2, status="scored", manual_review=False),
+        dict(request_payload=payload, credit_score=600, loan_limit_vnd=0.0, risk_level="Very High",
+             approved=False, model_score=None, status="rejected", reason="hard_gate_year1_low_gpa",
+             manual_review=False),
+    ])
+    assert app_logger.flush(timeout=5)
+
+    docs = backend.collections["student_applications"]
+    assert list(docs) == doc_ids
+    assert [docs[doc_id]["status"] for doc_id in doc_ids] == ["scored", "rejected"]
+    assert backend.batch_sizes == [2]
+    assert aggregator.window_counts(datetime.utcnow() - timedelta(hours=1)) == {
+        "total": 2, "approved": 1, "rejected": 1, "manual_review": 0,
+    }
+    app_logger.close()
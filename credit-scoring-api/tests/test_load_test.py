@@ -0,0 +1,91 @@
+import asyncio
+import itertools
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.schemas import PredictionRequest, SimpleLoanRequest, StudentLoanRequest
+from tests.conftest import load_script
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "load_test.py"
+
+SCHEMAS = {
+    "calculate-limit": SimpleLoanRequest,
+    "apply": SimpleLoanRequest,
+    "student-calculate-limit": StudentLoanRequest,
+}
+
+
+@pytest.fixture(scope="module")
+def harness():
+    with load_script(SCRIPT) as module:
+        yield module
+
+
+def test_sample_corpus_matches_the_request_schemas(harness):
+    entries = harness.load_corpus(harness.DEFAULT_CORPUS)
+    assert {entry["endpoint"] for entry in entries} == set(harness.ENDPOINTS)
+    for entry in entries:
+        if entry["endpoint"] == "batch-predict":
+            for body in entry["body"]:
+                PredictionRequest(**body)
+        else:
+            SCHEMAS[entry["endpoint"]](**entry["body"])
+
+
+def test_mix_weights_endpoints_and_cycles_bodies(harness):
+    entries = harness.generate_corpus(100)
+    stream = harness.request_stream(entries, harness.parse_mix("calculate-limit=3,batch-predict=1"))
+    drawn = list(itertools.islice(stream, 4000))
+    counts = Counter(entry["endpoint"] for entry in drawn)
+    assert set(counts) == {"calculate-limit", "batch-predict"}
+    assert 2.5 < counts["calculate-limit"] / counts["batch-predict"] < 3.5
+
+    pool = [entry for entry in entries if entry["endpoint"] == "batch-predict"]
+    batches = [entry for entry in drawn if entry["endpoint"] == "batch-predict"]
+    assert batches[: len(pool)] == pool
+
+    with pytest.raises(ValueError):
+        harness.parse_mix("calculate-limit=1,unknown=1")
+
+
+def test_saturation_point(harness):
+    def open_step(offered, achieved, p99=10.0, errors=0.0):
+        return {"mode": "open", "offered_rps": offered, "throughput_rps": achieved, "p99_ms": p99, "error_rate": errors}
+
+    steps = [open_step(50, 50), open_step(100, 99), open_step(200, 120)]
+    assert harness.saturation_point(steps) == {"step": 2, "load": 200, "reasons": ["throughput below offered rate"]}
+    assert harness.saturation_point(steps[:2], slo_ms=5.0)["step"] == 0
+    assert harness.saturation_point(steps[:2]) is None
+
+    closed = [
+        {"mode": "closed", "concurrency": n, "throughput_rps": rps, "p99_ms": 1.0, "error_rate": 0.0}
+        for n, rps in ((1, 100), (4, 300), (16, 310))
+    ]
+    assert harness.saturation_point(closed)["load"] == 16
+
+
+def test_in_process_closed_and_open_loop(harness):
+    entries = harness.load_corpus(harness.DEFAULT_CORPUS)[:20]
+    previous = harness.configure_in_process()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            stream = harness.request_stream(entries)
+            closed = await harness.run_closed_loop(client, stream, {}, concurrency=2, duration=0.5)
+            opened = await harness.run_open_loop(client, stream, {}, rate=40, duration=0.5)
+            return closed, opened
+
+    try:
+        closed, opened = asyncio.run(run())
+    finally:
+        harness.restore_settings(previous)
+
+    assert closed["requests"] > 0 and closed["error_rate"] == 0.0, closed["statuses"]
+    assert closed["p50_ms"] <= closed["p95_ms"] <= closed["p99_ms"] <= closed["max_ms"]
+    assert opened["requests"] > 0 and opened["error_rate"] == 0.0, opened["statuses"]
+    assert set(opened["endpoints"]) <= set(harness.ENDPOINTS)
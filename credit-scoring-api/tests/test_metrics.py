@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.firebase_auth import verify_firebase_token
+from app.core.metrics import (
+    STAGE_SECONDS,
+    Histogram,
+    MetricsRegistry,
+    metrics_registry,
+    stage,
+)
+from app.main import app
+from app.models.schemas import SimpleLoanRequest
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def signed_in():
+    previous = app.dependency_overrides.get(verify_firebase_token)
+    app.dependency_overrides[verify_firebase_token] = lambda: {"uid": "metrics-test"}
+    yield
+    if previous is None:
+        app.dependency_overrides.pop(verify_firebase_token, None)
+    else:
+        app.dependency_overrides[verify_firebase_token] = previous
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h", "test", ("stage",), buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.05, 2.0):
+        histogram.observe(value, "a")
+
+    snap = histogram.snapshot("a")
+    assert snap["count"] == 4
+    assert snap["buckets"] == [(0.01, 1), (0.1, 3), (float("inf"), 4)]
+
+
+def test_render_is_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("jobs", "Jobs run.", ("kind",)).inc("a\"b")
+    registry.histogram("latency_seconds", "Latency.", buckets=(1.0,)).observe(0.5)
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a\\"b"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "latency_seconds_count 1" in text
+
+
+def test_stage_outside_a_request_is_background():
+    with stage("metrics_test_stage"):
+        pass
+    assert STAGE_SECONDS.snapshot("background", "metrics_test_stage")["count"] >= 1
+
+
+def test_request_stages_are_labelled_with_the_route(signed_in):
+    example = SimpleLoanRequest.model_config["json_schema_extra"]["example"]
+    response = client.post("/api/calculate-limit", json=example)
+    assert response.status_code == 200
+
+    for name in ("request_conversion", "feature_engineering", "predict_proba", "decision_banding"):
+        assert STAGE_SECONDS.snapshot("/api/calculate-limit", name)["count"] >= 1, name
+
+    text = client.get("/api/metrics").text
+    assert 'credit_api_request_duration_seconds_count{endpoint="/api/calculate-limit",method="POST",status="200"}' in text
+    assert 'credit_api_stage_duration_seconds_bucket{endpoint="/api/calculate-limit",stage="predict_proba"' in text
+    assert "credit_api_executor_queue_depth" in text
+    assert 'credit_api_cache_lookups_total{cache="scoring",result="miss"}' in text
+    assert 'credit_api_model_info{model="regular"' in text
+
+
+def test_unmatched_paths_share_one_label():
+    client.get("/no/such/path/123")
+    client.get("/no/such/path/456")
+    text = metrics_registry.render()
+    assert 'endpoint="unmatched",method="GET",status="404"' in text
+    assert "/no/such/path" not in text
+
+
+def test_recording_overhead_is_negligible():
+    histogram = Histogram("overhead", "test", ("endpoint", "stage"))
+    rounds = 20_000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        histogram.observe(0.001, "/api/x", "y")
+    per_call = (time.perf_counter() - started) / rounds
+    assert per_call < 20e-6
+
+
+def test_concurrent_observations_are_not_lost():
+    histogram = Histogram("concurrent", "test")
+
+    def work():
+        for _ in range(2_000):
+            histogram.observe(0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert histogram.snapshot()["count"] == 8_000
@@ -0,0 +1,172 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.model_loader import model_loader
+from app.services.model_registry import (
+    READY_MARKER,
+    LocalDirectorySource,
+    LocalObjectStore,
+    ModelRegistry,
+    ObjectStoreSource,
+)
+from app.services.student_prediction_service import (
+    WARMUP_STUDENT,
+    StudentModelArtifacts,
+    student_prediction_service,
+)
+
+STUDENT_FILES = {
+    "best_model_phase1.pkl": settings.STUDENT_MODEL_PATH,
+    "best_threshold_phase1.pkl": settings.STUDENT_THRESHOLD_PATH,
+    settings.STUDENT_CALIBRATOR_FILENAME: settings.STUDENT_CALIBRATOR_PATH,
+}
+
+pytestmark = pytest.mark.skipif(
+    not settings.STUDENT_MODEL_PATH.exists(), reason="student model artifact not available"
+)
+
+
+@pytest.fixture
+def restore_models():
+    student, regular = student_prediction_service._artifacts, model_loader.bundle
+    yield
+    student_prediction_service.swap(student)
+    model_loader.swap(regular)
+
+
+class ConstantModel:
+    """predict_proba stand-in that can hold a request mid-flight."""
+
+    def __init__(self, probability, gate=None):
+        self.probability = probability
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def predict_proba(self, features):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return np.array([[1 - self.probability, self.probability]] * len(features))
+
+
+def test_local_directory_version_is_loaded_and_swapped(tmp_path, restore_models):
+    source = LocalDirectorySource(tmp_path)
+    source.publish("20260101T000000Z", STUDENT_FILES)
+    before = student_prediction_service.predict(WARMUP_STUDENT)
+
+    registry = ModelRegistry(source=source, poll_interval_seconds=60)
+    assert registry.check_once()
+    assert student_prediction_service.version == "20260101T000000Z"
+    assert student_prediction_service.predict(WARMUP_STUDENT) == before
+    # Same version again is a no-op
+    assert not registry.check_once()
+    assert registry.stats()["swaps"] == 1
+
+
+def test_incomplete_versions_are_ignored(tmp_path):
+    source = LocalDirectorySource(tmp_path)
+    source.publish("20260101T000000Z", STUDENT_FILES)
+    (tmp_path / "20260102T000000Z").mkdir()
+    assert source.list_ready_versions() == ["20260101T000000Z"]
+
+
+def test_object_store_stand_in(tmp_path, restore_models):
+    store = LocalObjectStore(tmp_path / "bucket")
+    source = ObjectStoreSource(store, prefix="models/student", cache_dir=tmp_path / "cache")
+    source.publish("20260101T000000Z", STUDENT_FILES)
+    assert f"models/student/20260101T000000Z/{READY_MARKER}" in store.list("models/student/")
+
+    registry = ModelRegistry(source=source, poll_interval_seconds=60)
+    assert registry.check_once()
+    assert student_prediction_service.version == "20260101T000000Z"
+    assert (tmp_path / "cache" / "20260101T000000Z" / "best_model_phase1.pkl").exists()
+
+
+def test_broken_version_keeps_serving_model(tmp_path, restore_models):
+    source = LocalDirectorySource(tmp_path)
+    broken = tmp_path / "20260101T000000Z"
+    broken.mkdir()
+    (broken / "best_model_phase1.pkl").write_bytes(b"not a pickle")
+    (broken / READY_MARKER).write_text("x")
+    serving = student_prediction_service.version
+
+    registry = ModelRegistry(source=source, poll_interval_seconds=60)
+    assert not registry.check_once()
+    assert student_prediction_service.version == serving
+    stats = registry.stats()
+    assert stats["failed_versions"] == ["20260101T000000Z"]
+    assert "20260101T000000Z" in stats["last_error"]
+
+
+def test_in_flight_request_finishes_on_old_version(restore_models):
+    gate = threading.Event()
+    old_model = ConstantModel(0.1, gate=gate)
+    student_prediction_service.swap(StudentModelArtifacts(model=old_model, threshold=0.5, version="old"))
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(student_prediction_service.predict(WARMUP_STUDENT)))
+    worker.start()
+    assert old_model.entered.wait(5)
+
+    student_prediction_service.swap(StudentModelArtifacts(model=ConstantModel(0.9), threshold=0.5, version="new"))
+    gate.set()
+    worker.join(5)
+
+    assert results[0][0] == pytest.approx(0.1)
+    assert student_prediction_service.predict(WARMUP_STUDENT)[0] == pytest.approx(0.9)
+
+
+def _reordered_model(columns):
+    """Fitted classifier that records ``columns`` as its feature order."""
+    import pandas as pd
+    from sklearn.dummy import DummyClassifier
+
+    frame = pd.DataFrame(np.zeros((2, len(columns))), columns=columns)
+    return DummyClassifier(strategy="prior").fit(frame, [0, 1])
+
+
+def test_student_version_with_other_feature_order_is_rejected(tmp_path, restore_models):
+    import pickle
+
+    from app.services.student_feature_contract import STUDENT_MODEL_FEATURE_ORDER
+
+    model_file = tmp_path / "reordered.pkl"
+    model_file.write_bytes(pickle.dumps(_reordered_model(list(reversed(STUDENT_MODEL_FEATURE_ORDER)))))
+    source = LocalDirectorySource(tmp_path / "registry")
+    source.publish("20260101T000000Z", {**STUDENT_FILES, "best_model_phase1.pkl": model_file})
+    serving = student_prediction_service.version
+
+    registry = ModelRegistry(source=source, poll_interval_seconds=60)
+    assert not registry.check_once()
+    assert student_prediction_service.version == serving
+    assert "student model expects features" in registry.stats()["last_error"]
+
+
+@pytest.mark.skipif(not settings.XGB_MODEL_PATH.exists(), reason="regular model artifacts not available")
+def test_regular_version_with_other_feature_order_is_rejected(tmp_path, restore_models):
+    import joblib
+
+    from app.services.prediction_service import prediction_service
+
+    served = prediction_service.feature_engineer.feature_columns
+    model_file = tmp_path / "reordered.pkl"
+    joblib.dump(_reordered_model(list(reversed(served))), model_file)
+    active, other = (
+        (settings.XGB_MODEL_PATH, settings.LGBM_MODEL_PATH)
+        if settings.USE_XGBOOST
+        else (settings.LGBM_MODEL_PATH, settings.XGB_MODEL_PATH)
+    )
+    source = LocalDirectorySource(tmp_path / "registry")
+    source.publish(
+        "20260101T000000Z",
+        {active.name: model_file, other.name: other, settings.METADATA_PATH.name: settings.METADATA_PATH},
+    )
+    serving = model_loader.version
+
+    registry = ModelRegistry(source=source, poll_interval_seconds=60)
+    assert not registry.check_once()
+    assert model_loader.version == serving
+    assert "feature order" in registry.stats()["last_error"]
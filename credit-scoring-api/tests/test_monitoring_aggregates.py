@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+
+from app.services.firestore_sink import InMemoryFirestoreBackend
+from app.services.monitoring_aggregates import (
+    InMemoryAggregateStore,
+    MonitoringAggregator,
+    count_window_with_aggregation_queries,
+    hour_start,
+)
+from app.services.student_application_logger import StudentApplicationLogger
+
+
+class FailingStore(InMemoryAggregateStore):
+    def __init__(self):
+        super().__init__()
+        self.fail = True
+
+    def add(self, deltas):
+        if self.fail:
+            raise ConnectionError("unavailable")
+        super().add(deltas)
+
+
+def _logger(store):
+    aggregator = MonitoringAggregator(store=store, persist_interval_seconds=3600)
+    return StudentApplicationLogger(backend=InMemoryFirestoreBackend(), aggregator=aggregator), aggregator
+
+
+def _log(app_logger, approved, manual_review=False):
+    app_logger.log_application(
+        "user-1",
+        {"age": 20, "gpa_latest": 3.0, "academic_year": 2, "loan_amount": 5_000_000},
+        credit_score=700 if approved else 600,
+        loan_limit_vnd=5_000_000 if approved else 0.0,
+        risk_level="Low" if approved else "Very High",
+        approved=approved,
+        model_score=0.2,
+        status="scored",
+        manual_review=manual_review,
+    )
+
+
+def test_summary_reads_hourly_buckets():
+    store = InMemoryAggregateStore()
+    store.mark_coverage(datetime(2000, 1, 1))  # aggregates have covered the whole window
+    app_logger, aggregator = _logger(store)
+    _log(app_logger, approved=True)
+    _log(app_logger, approved=True, manual_review=True)
+    _log(app_logger, approved=False)
+
+    summary = app_logger.get_monitoring_summary(window_hours=24)
+    assert summary["source"] == "hourly_aggregates"
+    assert summary["aggregates_from_utc"] == "2000-01-01T00:00:00Z"
+    assert summary["total_applications"] == 3
+    assert summary["approved_count"] == 2
+    assert summary["rejected_count"] == 1
+    assert summary["manual_review_count"] == 1
+    assert summary["approve_rate"] == round(2 / 3, 4)
+    # Reading persisted the in-process deltas
+    assert sum(bucket["total"] for bucket in store.buckets.values()) == 3
+    app_logger.close()
+
+
+def test_history_before_aggregates_is_counted_with_queries(monkeypatch):
+    """Right after rollout, hours before the first aggregated application come from count queries."""
+    store = InMemoryAggregateStore()
+    app_logger, aggregator = _logger(store)
+    _log(app_logger, approved=True)
+    _log(app_logger, approved=False, manual_review=True)
+
+    queried = []
+
+    def older_applications(db, collection, since, until=None):
+        queried.append((since, until))
+        return {"total": 10, "approved": 6, "rejected": 4, "manual_review": 1}
+
+    monkeypatch.setattr(app_logger, "_get_db", lambda: object())
+    monkeypatch.setattr(
+        "app.services.student_application_logger.count_window_with_aggregation_queries", older_applications
+    )
+
+    summary = app_logger.get_monitoring_summary(window_hours=720)
+    covered_from = store.coverage_start()
+    assert queried == [(hour_start(datetime.utcnow() - timedelta(hours=720)), covered_from)]
+    assert summary["source"] == "hourly_aggregates+count_aggregation"
+    assert summary["aggregates_from_utc"] == covered_from.isoformat() + "Z"
+    assert summary["total_applications"] == 12
+    assert summary["approved_count"] == 7
+    assert summary["manual_review_count"] == 2
+    app_logger.close()
+
+
+def test_coverage_start_is_the_earliest_counted_application():
+    store = InMemoryAggregateStore()
+    first, second = MonitoringAggregator(store=store), MonitoringAggregator(store=store)
+    now = datetime.utcnow()
+    second.record(approved=True, manual_review=False, at=now)
+    first.record(approved=True, manual_review=False, at=now - timedelta(minutes=5))
+    assert second.persist() and store.coverage_start() == now
+    assert first.persist() and store.coverage_start() == now - timedelta(minutes=5)
+    # Later decisions never move it forward
+    first.record(approved=True, manual_review=False, at=now + timedelta(hours=1))
+    assert first.persist() and store.coverage_start() == now - timedelta(minutes=5)
+    first.close()
+    second.close()
+
+
+def test_dropped_records_are_not_counted():
+    from app.services.firestore_sink import BatchedFirestoreSink
+
+    store = InMemoryAggregateStore()
+    app_logger, aggregator = _logger(store)
+    app_logger._sink = BatchedFirestoreSink(
+        "student_applications", backend=InMemoryFirestoreBackend(), max_queue=1, flush_interval_seconds=3600
+    )
+    _log(app_logger, approved=True)
+    _log(app_logger, approved=False)  # queue full: dropped
+    payload = {"age": 20, "gpa_latest": 3.0, "academic_year": 2, "loan_amount": 5_000_000}
+    doc_ids = app_logger.log_applications("api_batch", [
+        dict(request_payload=payload, credit_score=700, loan_limit_vnd=5_000_000, risk_level="Low",
+             approved=True, model_score=0.2, status="scored", manual_review=False),
+    ])
+    assert doc_ids == [None]
+
+    assert aggregator.window_counts(datetime(2000, 1, 1)) == {
+        "total": 1, "approved": 1, "rejected": 0, "manual_review": 0,
+    }
+    assert app_logger.sink_stats()["dropped_queue_full"] == 2
+    app_logger.close()
+
+
+def test_window_excludes_older_buckets():
+    store = InMemoryAggregateStore()
+    aggregator = MonitoringAggregator(store=store, persist_interval_seconds=3600)
+    now = datetime.utcnow()
+    aggregator.record(approved=True, manual_review=False, at=now)
+    aggregator.record(approved=False, manual_review=False, at=now - timedelta(hours=30))
+
+    counts = aggregator.window_counts(hour_start(now - timedelta(hours=24)))
+    assert counts == {"total": 1, "approved": 1, "rejected": 0, "manual_review": 0}
+    aggregator.close()
+
+
+def test_failed_persistence_keeps_deltas():
+    store = FailingStore()
+    aggregator = MonitoringAggregator(store=store, persist_interval_seconds=3600)
+    aggregator.record(approved=True, manual_review=True)
+
+    assert not aggregator.persist()
+    assert aggregator.stats()["persist_errors"] == 1
+    # Unpersisted deltas still count towards summaries
+    assert aggregator.window_counts(datetime(2000, 1, 1))["total"] == 1
+
+    store.fail = False
+    assert aggregator.close()
+    assert sum(bucket["total"] for bucket in store.buckets.values()) == 1
+
+
+def test_summary_falls_back_to_count_queries(monkeypatch):
+    class UnreadableStore(InMemoryAggregateStore):
+        def read(self, since):
+            raise ConnectionError("unavailable")
+
+    app_logger, _ = _logger(UnreadableStore())
+    monkeypatch.setattr(app_logger, "_get_db", lambda: object())
+    monkeypatch.setattr(
+        "app.services.student_application_logger.count_window_with_aggregation_queries",
+        lambda db, collection, since: {"total": 4, "approved": 3, "rejected": 1, "manual_review": 0},
+    )
+
+    summary = app_logger.get_monitoring_summary(window_hours=1)
+    assert summary["source"] == "count_aggregation"
+    assert summary["total_applications"] == 4
+    assert summary["reject_rate"] == 0.25
+    app_logger.close()
+
+
+def test_count_queries_use_server_side_aggregation():
+    class Result:
+        def __init__(self, value):
+            self.value = value
+
+    class Query:
+        def __init__(self, filters=()):
+            self.filters = filters
+
+        def where(self, field, op, value):
+            return Query(self.filters + ((field, value),))
+
+        def count(self, alias):
+            counts = {(): 0, ("createdAt",): 10, ("createdAt", "approved"): 7, ("createdAt", "manual_review"): 2}
+            return Query.Aggregation(counts[tuple(field for field, _ in self.filters)])
+
+        class Aggregation:
+            def __init__(self, value):
+                self.value = value
+
+            def get(self):
+                return [[Result(self.value)]]
+
+    class Db:
+        def collection(self, name):
+            return Query()
+
+    counts = count_window_with_aggregation_queries(Db(), "student_applications", datetime.utcnow())
+    assert counts == {"total": 10, "approved": 7, "rejected": 3, "manual_review": 2}
@@ -0,0 +1,124 @@
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.model_loader import model_loader
+from app.services.model_runtime import model_feature_names, positive_class_probability
+from app.services.native_models import (
+    NativeModel,
+    export_metadata,
+    export_native,
+    load_for_artifact,
+    load_metadata,
+    load_model_artifact,
+    manifest_path,
+    native_files,
+    native_threshold,
+)
+from app.services.student_prediction_service import student_prediction_service
+
+ARTIFACTS = [
+    settings.XGB_MODEL_PATH,
+    settings.LGBM_MODEL_PATH,
+    settings.STUDENT_MODEL_PATH,
+]
+
+
+def _random_features(n_features, rows=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, n_features)).astype(np.float32)
+    X *= rng.choice([1.0, 10.0, 1e3, 1e5], size=(1, n_features)).astype(np.float32)
+    X[rng.random(X.shape) < 0.02] = np.nan
+    return X
+
+
+@pytest.fixture(scope="module", params=ARTIFACTS, ids=lambda p: p.stem)
+def exported(request, tmp_path_factory):
+    source = request.param
+    if not source.exists():
+        pytest.skip(f"{source} not available")
+    artifact = tmp_path_factory.mktemp("native") / source.name
+    shutil.copyfile(source, artifact)
+    model = joblib.load(artifact)
+    export_native(model, artifact, threshold=0.42)
+    return artifact, model
+
+
+def test_native_matches_predict_proba(exported):
+    artifact, model = exported
+    native = load_for_artifact(artifact)
+    assert isinstance(native, NativeModel)
+
+    X = _random_features(native.n_features_in_)
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(native.predict_proba(X), expected, atol=1e-6)
+    np.testing.assert_allclose(positive_class_probability(native, X), expected[:, 1], atol=1e-6)
+    assert model_feature_names(native) == model_feature_names(model)
+
+
+def test_manifest_carries_threshold_and_files(exported):
+    artifact, _ = exported
+    assert native_threshold(artifact) == pytest.approx(0.42)
+    files = native_files(artifact)
+    assert manifest_path(artifact).name in files
+    assert all(path.exists() for path in files.values())
+
+
+def test_stale_export_is_ignored(exported, tmp_path):
+    artifact, model = exported
+    copy = tmp_path / artifact.name
+    for path in [artifact, *native_files(artifact).values()]:
+        shutil.copyfile(path, tmp_path / path.name)
+    assert load_for_artifact(copy) is not None
+
+    joblib.dump({"retrained": True}, copy)
+    assert load_for_artifact(copy) is None
+    assert native_threshold(copy) is None
+    assert load_model_artifact(copy) == {"retrained": True}
+
+
+def test_native_only_directory_is_authoritative(exported, tmp_path):
+    artifact, _ = exported
+    for path in native_files(artifact).values():
+        shutil.copyfile(path, tmp_path / path.name)
+    assert isinstance(load_model_artifact(tmp_path / artifact.name), NativeModel)
+
+
+def test_metadata_round_trips_as_json(tmp_path):
+    metadata_path = tmp_path / "metadata.pkl"
+    joblib.dump({"feature_names": ["a", "b"]}, metadata_path)
+    export_metadata({"feature_names": ["a", "b"], "auc": np.float64(0.8)}, metadata_path)
+    assert load_metadata(metadata_path) == {"feature_names": ["a", "b"], "auc": 0.8}
+
+
+@pytest.mark.skipif(not settings.STUDENT_MODEL_PATH.exists(), reason="student model artifact not available")
+def test_services_load_native_only_artifacts(tmp_path):
+    model = joblib.load(settings.STUDENT_MODEL_PATH)
+    export_native(model, tmp_path / settings.STUDENT_MODEL_PATH.name, threshold=0.5)
+
+    artifacts = student_prediction_service.load_artifacts(
+        tmp_path / settings.STUDENT_MODEL_PATH.name,
+        tmp_path / "missing_threshold.pkl",
+        tmp_path / "missing_calibrator.pkl",
+        version="native-test",
+    )
+    assert isinstance(artifacts.model, NativeModel)
+    assert artifacts.threshold == 0.5
+
+    regular = tmp_path / "regular"
+    regular.mkdir()
+    for source in (settings.XGB_MODEL_PATH, settings.LGBM_MODEL_PATH):
+        export_native(joblib.load(source), regular / source.name)
+    bundle = model_loader.load_bundle(
+        regular / settings.XGB_MODEL_PATH.name,
+        regular / settings.LGBM_MODEL_PATH.name,
+        settings.METADATA_PATH,
+        version="native-test",
+    )
+    active = bundle.xgb_model if settings.USE_XGBOOST else bundle.lgbm_model
+    assert isinstance(active, NativeModel)
+    assert bundle.model_fingerprint
+
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
@@ -6,6 +7,7 @@ from app.auth.firebase_auth import verify_firebase_token
 from app.services.student_prediction_service import student_prediction_service
 from app.services.student_application_logger import student_application_logger
 from app.services.loan_limit_calculator import loan_limit_calculator
+from app.core.config import settings
 
 # Override Firebase token verification for all tests — no real token needed
 app.dependency_overrides[verify_firebase_token] = lambda: {"uid": "test-user", "email": "test@example.com"}
@@ -151,6 +153,75 @@ class TestPredictionEdgeCases:
         assert response.status_code == 200
 
 
+class TestBatchEndpoints:
+    """Batch endpoints must score every row independently in one call"""
+
+    @pytest.fixture
+    def batch_requests(self):
+        base = {
+            "person_age": 30,
+            "person_income": 60000,
+            "person_emp_length": 5.0,
+            "loan_amnt": 15000,
+            "loan_int_rate": 8.5,
+            "loan_percent_income": 0.25,
+            "cb_person_cred_hist_length": 8,
+            "credit_score": 720,
+            "person_home_ownership": "MORTGAGE",
+            "loan_intent": "PERSONAL",
+            "loan_grade": "B",
+            "cb_person_default_on_file": "N",
+            "previous_loan_defaults_on_file": "N"
+        }
+        risky = dict(base, person_income=20000, person_emp_length=0.5, loan_amnt=25000,
+                     loan_percent_income=0.8, credit_score=550, cb_person_default_on_file="Y",
+                     previous_loan_defaults_on_file="Y")
+        return [base, risky, base]
+
+    # Scores of the fixture rows (base, risky) from the row-at-a-time implementation
+    # that predates batch scoring; the batch paths must reproduce them exactly.
+    EXPECTED_PREDICTIONS = [
+        (0.04681762680411339, "Low"),
+        (0.057357463985681534, "Low"),
+        (0.04681762680411339, "Low"),
+    ]
+    EXPECTED_OFFERS = [
+        {"loan_amount_vnd": 375000000.0, "max_amount_vnd": 1935000000.0,
+         "monthly_payment_vnd": 11837826.53, "credit_score": 720},
+        {"loan_amount_vnd": 625000000.0, "max_amount_vnd": 644999999.9999999,
+         "monthly_payment_vnd": 19729710.89, "credit_score": 550},
+        {"loan_amount_vnd": 375000000.0, "max_amount_vnd": 1935000000.0,
+         "monthly_payment_vnd": 11837826.53, "credit_score": 720},
+    ]
+
+    def test_batch_predict_matches_single_predictions(self, batch_requests):
+        response = client.post("/api/batch-predict", json=batch_requests)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 3
+
+        for row, (probability, risk_level) in zip(data["predictions"], self.EXPECTED_PREDICTIONS):
+            assert row["probability"] == pytest.approx(probability, abs=1e-9)
+            assert row["risk_level"] == risk_level
+            assert row["prediction"] == 0
+
+    def test_batch_loan_offers_match_single_offers(self, batch_requests):
+        response = client.post("/api/batch-loan-offers", json=batch_requests)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 3
+
+        for row, expected in zip(data["offers"], self.EXPECTED_OFFERS):
+            assert row["approved"] is True
+            assert row["risk_level"] == "Low"
+            assert row["interest_rate"] == 8.5
+            assert row["loan_term_months"] == 36
+            assert row["loan_amount_vnd"] == pytest.approx(expected["loan_amount_vnd"])
+            assert row["max_amount_vnd"] == pytest.approx(expected["max_amount_vnd"])
+            assert row["monthly_payment_vnd"] == pytest.approx(expected["monthly_payment_vnd"])
+            assert row["credit_score"] == expected["credit_score"]
+
+
 class TestCalculateLimitEndpoint:
     """Integration tests for /calculate-limit — ML-derived credit score"""
 
@@ -432,6 +503,103 @@ class TestStudentCalculateLimitEndpoint:
         assert data["credit_score"] == 745
 
 
+class TestStudentBatchCalculateLimitEndpoint:
+    """/student/batch-calculate-limit must match /student/calculate-limit row by row"""
+
+    @pytest.fixture
+    def cohort(self):
+        base = {
+            "age": 21,
+            "gpa_latest": 3.6,
+            "academic_year": 3,
+            "major": "technology",
+            "program_level": "undergraduate",
+            "loan_amount": 8000000,
+            "living_status": "dormitory",
+            "has_buffer": True,
+            "support_sources": ["family", "part_time"],
+            "monthly_income": 2500000,
+            "monthly_expenses": 3000000,
+        }
+        risky = dict(base, gpa_latest=2.1, academic_year=2, major="arts", living_status="renting",
+                     has_buffer=False, support_sources=[], monthly_income=0, monthly_expenses=8000000)
+        gated = dict(base, gpa_latest=1.8, academic_year=1)
+        middling = dict(base, gpa_latest=2.8, academic_year=2, has_buffer=False,
+                        support_sources=["scholarship"], monthly_income=1000000, monthly_expenses=4000000)
+        return [base, risky, gated, middling, base]
+
+    def test_batch_matches_single_results(self, cohort, monkeypatch):
+        batches = []
+        monkeypatch.setattr(
+            student_application_logger,
+            "log_applications",
+            lambda user_id, applications: batches.append(applications) or [],
+        )
+        monkeypatch.setattr(student_application_logger, "log_application", lambda *args, **kwargs: "doc")
+
+        response = client.post("/api/student/batch-calculate-limit", json=cohort)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == len(cohort)
+
+        for row, item in zip(data["results"], cohort):
+            single = client.post("/api/student/calculate-limit", json=item)
+            assert single.status_code == 200
+            assert row == pytest.approx(single.json())
+
+        assert data["results"][2]["decision_band"] == "auto_reject"
+        assert data["results"][2]["default_probability"] is None
+        assert data["summary"]["hard_gate_rejected"] == 1
+        assert sum(data["summary"][k] for k in ("approved", "manual_review", "rejected")) == len(cohort)
+
+        # One bulk logging call covering every row
+        assert len(batches) == 1
+        assert len(batches[0]) == len(cohort)
+        assert [r["reason"] for r in batches[0] if r["status"] == "rejected"] == ["hard_gate_year1_low_gpa"]
+
+    def test_batch_matches_single_results_in_every_band(self, cohort, monkeypatch):
+        threshold = student_prediction_service.threshold
+        prob_by_gpa = {3.6: 0.05, 2.8: threshold, 2.1: 0.7}
+        monkeypatch.setattr(
+            student_prediction_service,
+            "predict",
+            lambda raw: student_prediction_service._score_probability(prob_by_gpa[raw["gpa_latest"]]),
+        )
+        monkeypatch.setattr(
+            student_prediction_service,
+            "predict_arrays",
+            lambda raws: student_prediction_service._score_probabilities(
+                np.array([prob_by_gpa[raw["gpa_latest"]] for raw in raws])
+            ),
+        )
+        monkeypatch.setattr(student_application_logger, "log_applications", lambda *args: [])
+        monkeypatch.setattr(student_application_logger, "log_application", lambda *args, **kwargs: "doc")
+
+        data = client.post("/api/student/batch-calculate-limit", json=cohort).json()
+        for row, item in zip(data["results"], cohort):
+            assert row == pytest.approx(client.post("/api/student/calculate-limit", json=item).json())
+
+        bands = [row["decision_band"] for row in data["results"]]
+        assert bands == ["auto_approve", "auto_reject", "auto_reject", "manual_review", "auto_approve"]
+        assert data["results"][0]["loan_limit_vnd"] > 0
+        assert data["summary"] == {"approved": 2, "manual_review": 1, "rejected": 2, "hard_gate_rejected": 1}
+
+    def test_batch_over_max_size_is_rejected(self, cohort, monkeypatch):
+        monkeypatch.setattr(settings, "STUDENT_BATCH_MAX_SIZE", 2)
+        response = client.post("/api/student/batch-calculate-limit", json=cohort)
+        assert response.status_code == 413
+
+    def test_batch_logging_failure_does_not_break_response(self, cohort, monkeypatch):
+        def fail_log(user_id, applications):
+            raise RuntimeError("firestore unavailable")
+
+        monkeypatch.setattr(student_application_logger, "log_applications", fail_log)
+
+        response = client.post("/api/student/batch-calculate-limit", json=cohort[:2])
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+
+
 class TestStudentCreditScoreEndpoint:
     """Integration tests for /api/student/credit-score endpoint."""
 
@@ -0,0 +1,235 @@
+import os
+import shutil
+import socket
+import subprocess
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.auth.firebase_auth import verify_firebase_token
+from app.core.rate_limit import (
+    MemoryBucketStore,
+    RateLimit,
+    RateLimiter,
+    RateLimitExceeded,
+    RedisBucketStore,
+    RespConnection,
+    SharedMemoryBucketStore,
+)
+from app.main import app
+from tests.redis_stand_in import LocalRedisStandIn
+
+PER_MINUTE_3 = RateLimit.parse("3/minute")
+
+
+def _request(ip="10.0.0.1"):
+    return Request({"type": "http", "headers": [], "client": (ip, 1234)})
+
+
+def test_parse_matches_slowapi_wording():
+    limit = RateLimit.parse("10/minute")
+    assert (limit.capacity, limit.period) == (10, 60)
+    assert limit.text == "10 per 1 minute"
+    with pytest.raises(ValueError):
+        RateLimit.parse("ten per minute")
+
+
+def test_memory_bucket_allows_capacity_then_rejects():
+    store = MemoryBucketStore(max_keys=10)
+    results = [store.hit("k", PER_MINUTE_3) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(20.0, abs=0.5)  # one token per 20 s
+
+
+def test_memory_store_is_bounded():
+    store = MemoryBucketStore(max_keys=5)
+    for i in range(50):
+        store.hit(f"client-{i}", PER_MINUTE_3)
+    stats = store.stats()
+    assert stats["keys"] == 5
+    assert stats["evicted"] == 45
+
+
+def test_refilled_buckets_expire_first(monkeypatch):
+    store = MemoryBucketStore(max_keys=100)
+    clock = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: clock[0])
+    store.hit("old", PER_MINUTE_3)
+    clock[0] += 60
+    store.hit("new", PER_MINUTE_3)
+
+    assert store.stats()["keys"] == 1
+    assert store.stats()["expired"] == 1
+
+
+def test_shared_memory_table_is_shared_between_instances():
+    name = f"rl_test_{uuid.uuid4().hex[:8]}"
+    first = SharedMemoryBucketStore(name=name, max_keys=64)
+    second = SharedMemoryBucketStore(name=name, max_keys=64)
+    try:
+        assert first.hit("k", PER_MINUTE_3)[0]
+        assert second.hit("k", PER_MINUTE_3)[0]
+        assert first.hit("k", PER_MINUTE_3)[0]
+        assert not second.hit("k", PER_MINUTE_3)[0]
+        assert first.stats()["live_buckets"] == 1
+    finally:
+        second.close()
+        first.unlink()
+
+
+def test_shared_memory_table_reuses_slots_when_full():
+    name = f"rl_test_{uuid.uuid4().hex[:8]}"
+    store = SharedMemoryBucketStore(name=name, max_keys=8)
+    try:
+        for i in range(100):
+            assert store.hit(f"client-{i}", PER_MINUTE_3)[0]
+        assert store.stats()["occupied_slots"] == 8
+    finally:
+        store.unlink()
+
+
+def test_redis_backend_against_local_stand_in():
+    server = LocalRedisStandIn().start()
+    store = RedisBucketStore(url=server.url)
+    try:
+        results = [store.hit("k", PER_MINUTE_3)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+        # First call loads the script via EVAL after NOSCRIPT, later calls use EVALSHA
+        assert server.commands[:3] == ["EVALSHA", "EVAL", "EVALSHA"]
+    finally:
+        store.close()
+        server.stop()
+
+
+@pytest.fixture(scope="module")
+def redis_url(tmp_path_factory):
+    """Real Redis for TOKEN_BUCKET_LUA: RATE_LIMIT_TEST_REDIS_URL, or a redis-server on PATH."""
+    url = os.environ.get("RATE_LIMIT_TEST_REDIS_URL")
+    if url:
+        yield url
+        return
+    binary = shutil.which("redis-server")
+    if binary is None:
+        pytest.skip("redis-server not available (set RATE_LIMIT_TEST_REDIS_URL or install redis-server)")
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [binary, "--bind", "127.0.0.1", "--port", str(port), "--save", "", "--appendonly", "no",
+         "--dir", str(tmp_path_factory.mktemp("redis"))],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"redis://127.0.0.1:{port}/0"
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            RespConnection(url).execute("PING")
+            break
+        except OSError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                server.kill()
+                pytest.skip("redis-server did not start")
+            time.sleep(0.05)
+    yield url
+    server.terminate()
+    server.wait(5)
+
+
+def test_token_bucket_script_on_real_redis(redis_url):
+    store = RedisBucketStore(url=redis_url, key_prefix=f"test:{uuid.uuid4().hex}:")
+    admin = RespConnection(redis_url)
+    try:
+        admin.execute("SCRIPT", "FLUSH")
+        results = [store.hit("k", PER_MINUTE_3) for _ in range(4)]
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert 19.0 < results[-1][1] <= 20.0
+        # NOSCRIPT on the first call, EVALSHA afterwards
+        assert store.stats()["round_trips"] == 5
+
+        key = store.key_prefix + "k"
+        tokens, last = admin.execute("HMGET", key, "tokens", "last")
+        assert 0.0 <= float(tokens) < 0.01
+        assert abs(float(last) - time.time()) < 5
+        # Key lives until the bucket has refilled (3 tokens at 1 per 20 s), plus 1 s
+        assert 59_000 < admin.execute("PTTL", key) <= 61_000
+    finally:
+        store.close()
+        admin.close()
+
+
+def test_token_bucket_script_refills_with_server_clock(redis_url):
+    limit = RateLimit.parse("5/second")
+    store = RedisBucketStore(url=redis_url, key_prefix=f"test:{uuid.uuid4().hex}:")
+    try:
+        assert all(store.hit("k", limit)[0] for _ in range(5))
+        allowed, retry_after = store.hit("k", limit)
+        assert not allowed and 0 < retry_after <= 0.2
+        time.sleep(retry_after + 0.05)
+        assert store.hit("k", limit)[0]
+        # Separate keys have separate buckets
+        assert store.hit("other", limit)[0]
+    finally:
+        store.close()
+
+
+def test_backend_errors_fail_open():
+    class BrokenStore(MemoryBucketStore):
+        def hit(self, key, limit):
+            raise ConnectionError("down")
+
+    limiter = RateLimiter(store=BrokenStore())
+    limiter.check("scope", "ip:1", PER_MINUTE_3)
+    stats = limiter.stats()
+    assert stats["backend_errors"] == 1
+    assert stats["rejected"] == 0
+
+
+def test_client_key_uses_uid_when_enabled():
+    user = {"uid": "abc"}
+    assert RateLimiter(store=MemoryBucketStore(), key_by_uid=True).client_key(_request(), user) == "uid:abc"
+    assert RateLimiter(store=MemoryBucketStore(), key_by_uid=False).client_key(_request(), user) == "ip:10.0.0.1"
+    assert RateLimiter(store=MemoryBucketStore(), key_by_uid=True).client_key(_request(), None) == "ip:10.0.0.1"
+
+
+def test_limiter_counts_rejections():
+    limiter = RateLimiter(store=MemoryBucketStore())
+    for _ in range(3):
+        limiter.check("scope", "ip:1", PER_MINUTE_3)
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.check("scope", "ip:1", PER_MINUTE_3)
+
+    assert exc.value.headers["Retry-After"] == "20"
+    stats = limiter.stats()
+    assert stats["checks"] == 4
+    assert stats["rejected"] == 1
+    assert stats["overhead_us_max"] > 0
+
+
+def test_route_returns_slowapi_shaped_429():
+    previous = app.dependency_overrides.get(verify_firebase_token)
+    app.dependency_overrides[verify_firebase_token] = lambda: {"uid": "test-user"}
+    try:
+        client = TestClient(app)
+        statuses = [
+            client.post(
+                "/api/calculate-terms",
+                json={"loan_amount": 50_000_000, "loan_purpose": "PERSONAL", "credit_score": 700},
+            )
+            for _ in range(11)
+        ]
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(verify_firebase_token, None)
+        else:
+            app.dependency_overrides[verify_firebase_token] = previous
+
+    assert all(response.status_code != 429 for response in statuses[:10])
+    assert statuses[10].status_code == 429
+    assert statuses[10].json() == {"error": "Rate limit exceeded: 10 per 1 minute"}
+    assert "Retry-After" in statuses[10].headers
@@ -0,0 +1,112 @@
+from fastapi.testclient import TestClient
+
+from app.auth.firebase_auth import verify_firebase_token
+from app.main import app
+from app.services.loan_limit_calculator import loan_limit_calculator
+from app.services.scoring_cache import ScoringCache, canonical_digest, scoring_cache
+from app.services.student_application_logger import student_application_logger
+from app.services.student_prediction_service import student_prediction_service
+
+app.dependency_overrides[verify_firebase_token] = lambda: {"uid": "test-user", "email": "test@example.com"}
+client = TestClient(app)
+
+VERSION = ("model-a", 0.5, "balanced")
+
+
+def test_digest_ignores_key_order():
+    assert canonical_digest({"a": 1, "b": [1, 2]}) == canonical_digest({"b": [1, 2], "a": 1})
+    assert canonical_digest({"a": 1}) != canonical_digest({"a": 2})
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = ScoringCache(max_entries=2, ttl_seconds=60, enabled=True)
+    cache.put("ns", {"x": 1}, VERSION, "one")
+    cache.put("ns", {"x": 2}, VERSION, "two")
+
+    assert cache.get("ns", {"x": 1}, VERSION) == "one"  # x=1 becomes most recent
+    cache.put("ns", {"x": 3}, VERSION, "three")
+
+    assert cache.get("ns", {"x": 2}, VERSION) is None
+    assert cache.get("ns", {"x": 3}, VERSION) == "three"
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_expired_entries_miss():
+    cache = ScoringCache(max_entries=10, ttl_seconds=0, enabled=True)
+    cache.put("ns", {"x": 1}, VERSION, "one")
+    assert cache.get("ns", {"x": 1}, VERSION) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_version_change_invalidates_only_that_namespace():
+    cache = ScoringCache(max_entries=10, ttl_seconds=60, enabled=True)
+    cache.put("prediction", {"x": 1}, VERSION, "old")
+    cache.put("student", {"x": 1}, VERSION, "student")
+
+    retrained = ("model-b",) + VERSION[1:]
+    assert cache.get("prediction", {"x": 1}, retrained) is None
+    assert cache.get("student", {"x": 1}, VERSION) == "student"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ScoringCache(enabled=False)
+    cache.put("ns", {"x": 1}, VERSION, "one")
+    assert cache.get("ns", {"x": 1}, VERSION) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_repeat_credit_score_ignores_full_name():
+    application = {
+        "full_name": "Nguyen Van A",
+        "age": 35,
+        "monthly_income": 20_000_000,
+        "employment_status": "EMPLOYED",
+        "years_employed": 5.0,
+        "home_ownership": "MORTGAGE",
+        "years_credit_history": 5,
+    }
+    hits_before = scoring_cache.stats()["hits"]
+    first = client.post("/api/credit-score", json=application)
+    second = client.post("/api/credit-score", json={**application, "full_name": "Tran Thi B"})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["credit_score"] == first.json()["credit_score"]
+    assert second.json()["full_name"] == "Tran Thi B"
+    assert scoring_cache.stats()["hits"] == hits_before + 1
+
+
+def test_repeat_student_request_skips_model(monkeypatch):
+    calls = []
+
+    def predict(raw):
+        calls.append(raw)
+        return 0.2, "Low", 760
+
+    monkeypatch.setattr(type(student_prediction_service), "is_ready", property(lambda self: True))
+    monkeypatch.setattr(student_prediction_service, "predict", predict)
+    monkeypatch.setattr(
+        loan_limit_calculator,
+        "calculate_student_loan",
+        lambda credit_score, risk_level: (10_000_000, "Approved up to maximum tier"),
+    )
+    monkeypatch.setattr(student_application_logger, "log_application", lambda **kwargs: "doc")
+
+    application = {
+        "age": 21,
+        "gpa_latest": 3.6,
+        "academic_year": 3,
+        "major": "technology",
+        "loan_amount": 8_000_000,
+        "has_buffer": True,
+    }
+    first = client.post("/api/student/credit-score", json=application)
+    second = client.post("/api/student/calculate-limit", json={**application, "loan_amount": 6_000_000})
+
+    assert first.status_code == second.status_code == 200
+    assert len(calls) == 1
+    assert second.json()["default_probability"] == 0.2
@@ -0,0 +1,83 @@
+import pytest
+
+from app.models.schemas import PredictionResponse, SimpleLoanRequest
+from app.services.request_converter import request_converter
+from app.services.score_mapper import probability_to_credit_score
+from app.services.scoring_context import ScoringContext, apply_hard_caps
+
+
+def _application(**overrides):
+    data = {
+        "full_name": "Nguyen Van A",
+        "age": 35,
+        "monthly_income": 20_000_000,
+        "employment_status": "EMPLOYED",
+        "years_employed": 5.0,
+        "home_ownership": "MORTGAGE",
+        "years_credit_history": 5,
+        "has_previous_defaults": False,
+        "currently_defaulting": False,
+    }
+    data.update(overrides)
+    return SimpleLoanRequest(**data)
+
+
+def _prediction(probability, risk_level="Low"):
+    return PredictionResponse(
+        prediction=0, probability=probability, risk_level=risk_level, confidence=0.5, message=""
+    )
+
+
+def test_context_matches_separate_converter_calls():
+    application = _application(has_previous_defaults=True, years_credit_history=0)
+    context = ScoringContext.build(application)
+
+    assert context.internal_request == request_converter.convert_simple_to_prediction(application)
+    assert context.score_breakdown["final_score"] == context.internal_request.credit_score
+    assert context.loan_grade == context.internal_request.loan_grade
+    assert context.reference_loan_amount_vnd == application.monthly_income * 24
+
+
+def test_breakdown_is_computed_once(monkeypatch):
+    calls = []
+    original = request_converter.calculate_credit_score_with_breakdown
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(request_converter, "calculate_credit_score_with_breakdown", counting)
+    ScoringContext.build(_application())
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "overrides, cap, risk",
+    [
+        ({"currently_defaulting": True}, 580, "Very High"),
+        ({"has_previous_defaults": True}, 650, "Low"),
+        ({"age": 22}, 680, "Low"),
+        ({"employment_status": "UNEMPLOYED"}, 680, "Low"),
+        ({"years_credit_history": 0}, 700, "Low"),
+        ({"monthly_income": 9_000_000}, 720, "Low"),
+        ({}, 850, "Low"),
+    ],
+)
+def test_hard_caps(overrides, cap, risk):
+    score, risk_level = apply_hard_caps(_application(**overrides), 850, "Low")
+    assert score == cap
+    assert risk_level == risk
+
+
+def test_apply_prediction_derives_capped_score():
+    context = ScoringContext.build(_application(has_previous_defaults=True))
+    context.apply_prediction(_prediction(0.01))
+
+    assert context.probability == 0.01
+    assert context.credit_score == min(probability_to_credit_score(0.01), 650)
+    assert context.risk_level == "Low"
+
+
+def test_probability_requires_prediction():
+    with pytest.raises(RuntimeError):
+        ScoringContext.build(_application()).probability
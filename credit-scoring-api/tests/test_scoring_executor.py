@@ -0,0 +1,139 @@
+import asyncio
+import operator
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.scoring_executor import ScoringExecutor, ScoringQueueFull, scoring_executor
+
+client = TestClient(app)
+
+
+def test_thread_mode_runs_off_the_event_loop_thread():
+    executor = ScoringExecutor(mode="thread", workers=2, max_queue=4)
+    try:
+        async def main():
+            loop_thread = threading.get_ident()
+            worker_thread = await executor.run(threading.get_ident)
+            return loop_thread, worker_thread
+
+        loop_thread, worker_thread = asyncio.run(main())
+        assert loop_thread != worker_thread
+
+        stats = executor.stats()
+        assert stats["completed"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["queue_depth"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_full_queue_rejects_and_recovers():
+    executor = ScoringExecutor(mode="thread", workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        async def main():
+            blocked = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert executor.queue_depth() == 1
+
+            with pytest.raises(ScoringQueueFull):
+                await executor.run(operator.add, 1, 2)
+
+            release.set()
+            await asyncio.gather(*blocked)
+            return await executor.run(operator.add, 1, 2)
+
+        assert asyncio.run(main()) == 3
+        stats = executor.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 3
+        assert stats["wait_ms_max"] > 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_cancelled_requests_keep_their_slot_until_the_pool_is_done():
+    executor = ScoringExecutor(mode="thread", workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        async def main():
+            abandoned = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            # Clients disconnect: the running task keeps its worker, the queued one is dropped
+            for task in abandoned:
+                task.cancel()
+            await asyncio.gather(*abandoned, return_exceptions=True)
+            assert executor.stats()["in_flight"] == 1
+
+            admitted = asyncio.ensure_future(executor.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            with pytest.raises(ScoringQueueFull):
+                await executor.run(operator.add, 1, 2)
+
+            release.set()
+            await admitted
+
+        asyncio.run(main())
+        stats = executor.stats()
+        assert stats["rejected"] == 1
+        assert stats["cancelled"] == 1
+        assert stats["completed"] == 2
+        assert stats["in_flight"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_task_errors_propagate():
+    executor = ScoringExecutor(mode="thread", workers=1, max_queue=0)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(executor.run(operator.truediv, 1, 0))
+        assert executor.stats()["failed"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_process_mode_keeps_models_resident():
+    executor = ScoringExecutor(mode="process", workers=1, max_queue=2)
+    try:
+        async def main():
+            return [await executor.run(operator.mul, 6, 7) for _ in range(2)]
+
+        assert asyncio.run(main()) == [42, 42]
+        assert executor.stats()["completed"] == 2
+    finally:
+        executor.shutdown()
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        ScoringExecutor(mode="fiber")
+
+
+def test_saturated_executor_returns_503(monkeypatch):
+    async def reject(*args, **kwargs):
+        raise ScoringQueueFull("full")
+
+    monkeypatch.setattr(scoring_executor, "run", reject)
+    response = client.post("/api/predict", json={
+        "person_age": 25,
+        "person_income": 50000,
+        "person_emp_length": 3.0,
+        "loan_amnt": 10000,
+        "loan_int_rate": 10.5,
+        "loan_percent_income": 0.2,
+        "cb_person_cred_hist_length": 5,
+        "credit_score": 700,
+        "person_home_ownership": "RENT",
+        "loan_intent": "PERSONAL",
+        "loan_grade": "B",
+        "cb_person_default_on_file": "N",
+        "previous_loan_defaults_on_file": "N",
+    })
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
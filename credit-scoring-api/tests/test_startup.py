@@ -0,0 +1,79 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from app.core.startup_profile import ImportProfiler, StartupProfile
+from app.services.warmup import Warmup
+
+API_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_importing_the_app_defers_heavy_initialization():
+    code = textwrap.dedent(
+        """
+        import sys
+        import app.main
+        from app.services.model_loader import model_loader
+        from app.services.student_prediction_service import student_prediction_service
+        heavy = [m for m in ("xgboost", "lightgbm", "sklearn", "pandas", "firebase_admin") if m in sys.modules]
+        print(heavy, model_loader.is_loaded(), student_prediction_service.artifacts_loaded)
+        """
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=API_ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[] False False"
+
+
+def test_import_profiler_separates_self_time(tmp_path, monkeypatch):
+    package = tmp_path / "profiled_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("import time\ntime.sleep(0.02)\nfrom profiled_pkg import child\n")
+    (package / "child.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = ImportProfiler().install()
+    try:
+        import profiled_pkg  # noqa: F401
+    finally:
+        profiler.uninstall()
+        for name in ("profiled_pkg", "profiled_pkg.child"):
+            sys.modules.pop(name, None)
+
+    assert profiler.inclusive["profiled_pkg"] >= profiler.inclusive["profiled_pkg.child"] >= 0.05
+    assert 0.02 <= profiler.self_time["profiled_pkg"] < 0.05
+    assert [name for name, _, _ in profiler.top(prefixes=("profiled_pkg",))] == ["profiled_pkg", "profiled_pkg.child"]
+
+
+def test_phases_are_recorded_with_errors():
+    profile = StartupProfile()
+    with profile.phase("ok"):
+        pass
+    try:
+        with profile.phase("broken"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    phases = {p["name"]: p for p in profile.phases()}
+    assert phases["ok"]["error"] is None
+    assert "boom" in phases["broken"]["error"]
+    assert "broken" in profile.format_table()
+
+
+def test_warmup_loads_and_primes_once():
+    warmup = Warmup()
+    assert warmup.run()
+    assert warmup.wait(0) and warmup.status()["state"] == "complete"
+    assert warmup.preflight is not None
+    # Second call is a no-op
+    assert warmup.run()
+
+
+def test_services_share_one_feature_engineer():
+    from app.services.prediction_service import prediction_service
+    from app.services.smart_loan_offer import smart_loan_offer_service
+
+    assert prediction_service.feature_engineer is smart_loan_offer_service.feature_engineer
@@ -1,8 +1,11 @@
+import numpy as np
+import pytest
 import pickle
 from pathlib import Path
 
 from app.services.student_feature_contract import STUDENT_MODEL_FEATURE_ORDER
 from app.services.student_prediction_service import student_prediction_service
+from tests.conftest import load_script
 
 
 def test_student_engineered_feature_order_matches_contract():
@@ -43,3 +46,123 @@ def test_student_preflight_reports_ok_with_current_artifacts():
     assert "ok" in status
     assert "threshold" in status
     assert isinstance(status["threshold"], float)
+
+
+def test_student_engineered_vector_matches_dataframe():
+    payload = {
+        "age": 20,
+        "gpa_latest": 2.7,
+        "academic_year": 2,
+        "major": "arts",
+        "program_level": "undergraduate",
+        "loan_amount": 5_000_000,
+        "living_status": "renting",
+        "has_buffer": False,
+        "support_sources": [],
+        "monthly_income": None,
+        "monthly_expenses": 4_000_000,
+    }
+
+    vector = student_prediction_service._engineer_vector(payload)
+    df = student_prediction_service._engineer(payload)
+    assert vector.shape == (1, len(STUDENT_MODEL_FEATURE_ORDER))
+    assert vector.dtype == np.float32
+    np.testing.assert_array_equal(vector, df.to_numpy(dtype=np.float32))
+
+
+def _students(n, seed=0):
+    rng = np.random.default_rng(seed)
+    majors = ["technology", "arts", "law", "unknown"]
+    living = ["dormitory", "with_parents", "renting"]
+    return [
+        {
+            "age": int(rng.integers(17, 30)),
+            "gpa_latest": round(float(rng.uniform(0.0, 4.0)), 2),
+            "academic_year": int(rng.integers(1, 6)),
+            "major": majors[i % len(majors)],
+            "program_level": "postgraduate" if i % 7 == 0 else "undergraduate",
+            "loan_amount": None if i % 3 == 0 else 8_000_000,
+            "living_status": living[i % len(living)],
+            "has_buffer": bool(i % 2),
+            "support_sources": [["family"], [], [" Family ", "part_time"], ["scholarship", ""]][i % 4],
+            "monthly_income": None if i % 5 == 0 else float(rng.uniform(0, 12_000_000)),
+            "monthly_expenses": None if i % 6 == 0 else float(rng.uniform(0, 8_000_000)),
+        }
+        for i in range(n)
+    ]
+
+
+def test_student_batch_features_match_row_by_row():
+    raws = _students(257)
+    batch = student_prediction_service._engineer_matrix(raws)
+    assert batch.shape == (len(raws), len(STUDENT_MODEL_FEATURE_ORDER))
+    for i, raw in enumerate(raws):
+        np.testing.assert_array_equal(batch[i:i + 1], student_prediction_service._engineer_vector(raw))
+
+
+def test_student_features_known_values():
+    payload = {
+        "age": 20,
+        "gpa_latest": 2.7,
+        "academic_year": 2,
+        "major": "arts",
+        "program_level": "undergraduate",
+        "loan_amount": 5_000_000,
+        "living_status": "renting",
+        "has_buffer": False,
+        "support_sources": [],
+        "monthly_income": None,
+        "monthly_expenses": 4_000_000,
+    }
+    row = student_prediction_service._engineer(payload).iloc[0]
+    assert row["support_numeric"] == 0.1
+    assert row["debt_ratio"] == 0.99
+    assert row["maturity_score"] == 0.4
+    assert row["severe_behavior_flag"] == 1
+    assert row["risk_compounding"] == 3
+    expense_pressure = 4_000_000 / 4_000_001
+    expected = 4.6 + 1.6 * expense_pressure + 0.5 / 2.2 + 0.8 * 0.9 + 0.6 * 0.5 + 0.5 * 1.0
+    assert row["behavior_risk_score"] == pytest.approx(expected)
+    assert row["loan_to_maturity_ratio"] == 5_000_000 / 0.5
+
+
+def test_retrain_script_engineers_with_the_serving_engine():
+    import pandas as pd
+
+    script = Path(__file__).resolve().parent.parent / "pipeline" / "student_retrain.py"
+    df = pd.DataFrame({
+        "age": [19, 24],
+        "program_level": ["university", "postgraduate"],
+        "living_status": ["rent", "family"],
+        "academic_year": [1, 4],
+        "gpa_latest": [1.8, 3.6],
+        "major_income_potential": ["low", "High"],
+        "loan_amount": [5_000_000, 10_000_000],
+        "expected_income": [36_000_000, 120_000_000],
+        "debt_ratio": [0.8, 0.25],
+        "saving_asset_status": [0, 1],
+        "parental_support": ["none", "high"],
+        "bnpl_repayment_hist": ["poor", "good"],
+    })
+    with load_script(script) as retrain:
+        trained = retrain.engineer_features(df)
+    assert list(trained.columns) == STUDENT_MODEL_FEATURE_ORDER
+
+    # The same applicants as API requests score to the same features
+    served = student_prediction_service._engineer_matrix([
+        {
+            "age": 19, "gpa_latest": 1.8, "academic_year": 1, "major": "arts",
+            "program_level": "undergraduate", "loan_amount": 5_000_000, "living_status": "renting",
+            "has_buffer": False, "support_sources": [],
+            "monthly_income": 3_000_000, "monthly_expenses": 0.8 * 3_000_000 / 0.2,
+        },
+        {
+            "age": 24, "gpa_latest": 3.6, "academic_year": 4, "major": "medicine",
+            "program_level": "postgraduate", "loan_amount": 10_000_000, "living_status": "with_parents",
+            "has_buffer": True, "support_sources": ["family", "part_time", "scholarship"],
+            "monthly_income": 10_000_000, "monthly_expenses": 0.25 * 10_000_000 / 0.75,
+        },
+    ])
+    skip = [STUDENT_MODEL_FEATURE_ORDER.index("major_income_potential")]  # encoded differently in the raw CSVs
+    keep = [i for i in range(len(STUDENT_MODEL_FEATURE_ORDER)) if i not in skip]
+    np.testing.assert_allclose(trained.to_numpy(dtype=np.float32)[:, keep], served[:, keep], rtol=1e-6)
@@ -0,0 +1,224 @@
+import asyncio
+import datetime
+import json
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from google.auth import crypt, jwt
+
+from app.auth import firebase_auth
+from app.auth.token_verifier import (
+    CertificateStore,
+    FirebaseTokenVerifier,
+    InvalidTokenError,
+    TokenExpiredError,
+    local_certificate_fetcher,
+)
+
+PROJECT = "test-project"
+
+
+def _fake_key(kid):
+    """Offline stand-in for one entry of Google's securetoken key set."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode()
+    return crypt.RSASigner.from_string(private_pem, key_id=kid), cert_pem
+
+
+@pytest.fixture(scope="module")
+def key_set():
+    signer, cert_pem = _fake_key("kid-1")
+    return signer, {"kid-1": cert_pem}
+
+
+def _token(signer, **overrides):
+    now = int(time.time())
+    payload = {
+        "aud": PROJECT,
+        "iss": f"https://securetoken.google.com/{PROJECT}",
+        "sub": "user-123",
+        "email": "student@example.com",
+        "iat": now - 10,
+        "exp": now + 3600,
+    }
+    payload.update(overrides)
+    return jwt.encode(signer, payload).decode()
+
+
+def _verifier(certs, fetches=None, cache_size=8):
+    def fetch():
+        if fetches is not None:
+            fetches.append(1)
+        return certs, 600
+
+    return FirebaseTokenVerifier(
+        project_id=PROJECT,
+        certificates=CertificateStore(fetcher=fetch),
+        cache_size=cache_size,
+    )
+
+
+def test_valid_token_is_verified_once_then_cached(key_set):
+    signer, certs = key_set
+    fetches = []
+    verifier = _verifier(certs, fetches)
+    token = _token(signer)
+
+    decoded = verifier.verify(token)
+    assert decoded["uid"] == "user-123"
+    assert decoded["email"] == "student@example.com"
+
+    assert verifier.cached(token) == decoded
+    assert verifier.verify(token) == decoded
+    assert len(fetches) == 1
+    stats = verifier.stats()
+    assert stats["cached_tokens"] == 1
+    assert stats["hits"] == 2
+
+
+def test_cached_claims_expire_with_the_token(key_set, monkeypatch):
+    signer, certs = key_set
+    verifier = _verifier(certs)
+    token = _token(signer, exp=int(time.time()) + 60)
+    verifier.verify(token)
+
+    monkeypatch.setattr(time, "time", lambda: 10**10)
+    assert verifier.cached(token) is None
+    with pytest.raises(TokenExpiredError):
+        verifier.verify(token)
+
+
+def test_cache_is_bounded(key_set):
+    signer, certs = key_set
+    verifier = _verifier(certs, cache_size=2)
+    tokens = [_token(signer, sub=f"user-{i}") for i in range(3)]
+    for token in tokens:
+        verifier.verify(token)
+
+    assert verifier.stats()["cached_tokens"] == 2
+    assert verifier.cached(tokens[0]) is None
+    assert verifier.cached(tokens[2])["uid"] == "user-2"
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"aud": "other-project"},
+        {"iss": "https://securetoken.google.com/other-project"},
+        {"sub": ""},
+    ],
+)
+def test_claim_checks(key_set, overrides):
+    signer, certs = key_set
+    with pytest.raises(InvalidTokenError):
+        _verifier(certs).verify(_token(signer, **overrides))
+
+
+def test_unknown_key_triggers_one_refresh_then_rejects(key_set):
+    _, certs = key_set
+    other_signer, _ = _fake_key("kid-2")
+    fetches = []
+    verifier = _verifier(certs, fetches)
+
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(_token(other_signer))
+    assert len(fetches) == 2
+
+
+def test_forced_refreshes_are_rate_limited(key_set, monkeypatch):
+    from app.auth import token_verifier as module
+
+    signer, certs = key_set
+    fetches = []
+    verifier = _verifier(certs, fetches, cache_size=0)
+    verifier.verify(_token(signer))
+
+    # Tokens with made-up kids cannot force a fetch per request
+    forgers = [_fake_key("made-up-1")[0], _fake_key("made-up-2")[0]]
+    for i in range(20):
+        with pytest.raises(InvalidTokenError):
+            verifier.verify(_token(forgers[i % 2]))
+    assert len(fetches) == 2
+    assert verifier.stats()["certificates"]["forced_refreshes_skipped"] == 19
+
+    # Once the interval has passed, a rotated key can be picked up again
+    monkeypatch.setattr(module, "CERT_FORCED_REFRESH_INTERVAL_SECONDS", 0)
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(_token(forgers[0]))
+    assert len(fetches) == 3
+    assert verifier.verify(_token(signer))["uid"] == "user-123"
+
+
+def test_tampered_signature_is_rejected(key_set):
+    signer, certs = key_set
+    header, payload, signature = _token(signer).split(".")
+    forged_payload = _token(signer, sub="admin").split(".")[1]
+    with pytest.raises(InvalidTokenError):
+        _verifier(certs).verify(".".join([header, forged_payload, signature]))
+
+
+def test_failed_refresh_keeps_previous_certificates(key_set):
+    _, certs = key_set
+    responses = [(certs, 0)]
+
+    def fetch():
+        if not responses:
+            raise ConnectionError("offline")
+        return responses.pop()
+
+    store = CertificateStore(fetcher=fetch)
+    assert store.refresh()
+    assert not store.refresh()
+    assert store.certificates() == certs
+    assert store.stats()["fetch_errors"] >= 1
+
+
+def test_local_key_set_file(key_set, tmp_path):
+    signer, certs = key_set
+    path = tmp_path / "certs.json"
+    path.write_text(json.dumps(certs))
+    verifier = FirebaseTokenVerifier(
+        project_id=PROJECT,
+        certificates=CertificateStore(fetcher=local_certificate_fetcher(path)),
+    )
+    assert verifier.verify(_token(signer))["uid"] == "user-123"
+
+
+def test_dependency_maps_errors_to_401(key_set, monkeypatch):
+    signer, certs = key_set
+    monkeypatch.setattr(firebase_auth, "token_verifier", _verifier(certs))
+
+    def call(token):
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return asyncio.run(firebase_auth.verify_firebase_token(credentials))
+
+    assert call(_token(signer))["uid"] == "user-123"
+    with pytest.raises(HTTPException) as expired:
+        call(_token(signer, iat=int(time.time()) - 7200, exp=int(time.time()) - 3600))
+    assert expired.value.detail == "Token expired"
+    with pytest.raises(HTTPException) as invalid:
+        call(_token(signer, aud="other-project"))
+    assert invalid.value.detail == "Invalid token"
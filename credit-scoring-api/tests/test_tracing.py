@@ -0,0 +1,131 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.core.metrics as metrics
+from app.auth.firebase_auth import verify_firebase_token
+from app.core.config import settings
+from app.core.tracing import SpanExporter
+from app.main import app
+from app.models.schemas import SimpleLoanRequest
+
+client = TestClient(app)
+EXAMPLE = SimpleLoanRequest.model_config["json_schema_extra"]["example"]
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest.fixture
+def signed_in():
+    previous = app.dependency_overrides.get(verify_firebase_token)
+    app.dependency_overrides[verify_firebase_token] = lambda: {"uid": "tracing-test"}
+    yield
+    if previous is None:
+        app.dependency_overrides.pop(verify_firebase_token, None)
+    else:
+        app.dependency_overrides[verify_firebase_token] = previous
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    exporter = SpanExporter(path=str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(metrics, "span_exporter", exporter)
+    yield exporter
+    exporter.close()
+
+
+def _timings(header):
+    return {part.split(";")[0].strip(): float(part.split("dur=")[1]) for part in header.split(",")}
+
+
+def test_server_timing_only_when_asked(signed_in):
+    timed = client.post("/api/calculate-limit", json=EXAMPLE, headers={"X-Server-Timing": "1"})
+    timings = _timings(timed.headers["server-timing"])
+    for name in ("request_conversion", "prediction", "feature_engineering", "predict_proba", "loan_limit"):
+        assert name in timings, name
+    assert timings["total"] >= timings["prediction"] >= timings["predict_proba"]
+    assert len(timed.headers["x-trace-id"]) == 32
+
+    plain = client.post("/api/calculate-limit", json=EXAMPLE)
+    assert plain.status_code == 200
+    assert "server-timing" not in plain.headers
+
+
+def test_server_timing_can_be_disabled(signed_in, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SERVER_TIMING", "off")
+    response = client.post("/api/calculate-limit", json=EXAMPLE, headers={"X-Server-Timing": "1"})
+    assert "server-timing" not in response.headers
+
+
+def test_sampled_traceparent_is_exported_as_otlp(signed_in, exporter, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_RESPECT_PARENT_SAMPLED", True)
+    traceparent = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+    response = client.post("/api/calculate-limit", json=EXAMPLE, headers={"traceparent": traceparent})
+    assert response.headers["x-trace-id"] == TRACE_ID
+    exporter.close()
+
+    document = json.loads(exporter.path.read_text().splitlines()[-1])
+    spans = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, stages = spans[0], spans[1:]
+    assert root["kind"] == "SPAN_KIND_SERVER"
+    assert root["name"] == "POST /api/calculate-limit"
+    assert root["parentSpanId"] == "00f067aa0ba902b7"
+    assert all(span["traceId"] == TRACE_ID for span in spans)
+
+    by_name = {span["name"]: span for span in stages}
+    ids = {span["spanId"] for span in spans}
+    assert all(span["parentSpanId"] in ids for span in stages)
+    # Stages inside PredictionService.predict nest under it, across the executor thread
+    assert by_name["feature_engineering"]["parentSpanId"] == by_name["prediction"]["spanId"]
+    assert by_name["request_conversion"]["parentSpanId"] == root["spanId"]
+    assert int(by_name["prediction"]["startTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+
+
+def test_unsampled_requests_are_not_exported(signed_in, exporter):
+    client.post("/api/calculate-limit", json=EXAMPLE)
+    client.post("/api/calculate-limit", json=EXAMPLE, headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-00"})
+    exporter.close()
+    assert exporter.stats()["exported"] == 0
+
+
+def test_sampled_traceparent_is_ignored_unless_export_is_enabled(signed_in, exporter):
+    """Any caller can set the sampled flag; at TRACE_SAMPLE_RATE=0 it must not write to disk."""
+    traceparent = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+    response = client.post("/api/calculate-limit", json=EXAMPLE, headers={"traceparent": traceparent})
+    assert response.headers["x-trace-id"] == TRACE_ID  # the trace id is still reused
+    exporter.close()
+    assert exporter.stats()["exported"] == 0
+    assert not exporter.path.exists()
+
+
+def test_sample_rate_exports_every_request(signed_in, exporter, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    for _ in range(3):
+        client.post("/api/calculate-limit", json=EXAMPLE)
+    exporter.close()
+    assert len(exporter.path.read_text().splitlines()) == 3
+
+
+def test_full_queue_drops_and_counts(exporter):
+    from app.core.tracing import RequestTrace
+
+    small = SpanExporter(path=str(exporter.path), max_queue=1)
+    small._ensure_started = lambda: None  # no writer: the queue stays full
+    assert small.submit(RequestTrace(), "GET /x", {}, 0.001, False)
+    assert not small.submit(RequestTrace(), "GET /x", {}, 0.001, False)
+    assert small.stats()["dropped_queue_full"] == 1
+
+
+def test_export_file_is_capped(tmp_path):
+    from app.core.tracing import RequestTrace
+
+    capped = SpanExporter(path=str(tmp_path / "capped.jsonl"), max_bytes=2048)
+    for _ in range(20):
+        assert capped.submit(RequestTrace(), "GET /x", {}, 0.001, False)
+    capped.close()
+
+    stats = capped.stats()
+    assert 0 < stats["exported"] < 20
+    assert stats["dropped_size_cap"] == 20 - stats["exported"]
+    assert capped.path.stat().st_size <= 2048
+    assert len(capped.path.read_text().splitlines()) == stats["exported"]
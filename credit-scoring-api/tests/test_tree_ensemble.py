@@ -0,0 +1,72 @@
+import joblib
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.model_runtime import positive_class_probability
+from app.services.tree_ensemble import TreeEnsemble, file_sha256, from_model, load_for_artifact
+
+ARTIFACTS = [
+    settings.XGB_MODEL_PATH,
+    settings.LGBM_MODEL_PATH,
+    settings.STUDENT_MODEL_PATH,
+]
+
+
+def _random_features(n_features, rows=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, n_features)).astype(np.float32)
+    X *= rng.choice([1.0, 10.0, 1e3, 1e5], size=(1, n_features)).astype(np.float32)
+    X[rng.random(X.shape) < 0.02] = np.nan
+    X[:5] = 0.0
+    return X
+
+
+@pytest.fixture(scope="module", params=ARTIFACTS, ids=lambda p: p.stem)
+def exported(request, tmp_path_factory):
+    artifact = request.param
+    if not artifact.exists():
+        pytest.skip(f"{artifact} not available")
+    model = joblib.load(artifact)
+    ensemble = from_model(model, source=artifact.name, source_sha256=file_sha256(artifact))
+    table_dir = ensemble.save(tmp_path_factory.mktemp("tables") / artifact.stem)
+    return artifact, model, table_dir
+
+
+def test_table_matches_predict_proba(exported):
+    _, model, table_dir = exported
+    ensemble = TreeEnsemble.load(table_dir)
+    X = _random_features(ensemble.n_features_in_)
+
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(ensemble.predict_proba(X), expected, atol=1e-6)
+    np.testing.assert_allclose(positive_class_probability(ensemble, X), expected[:, 1], atol=1e-6)
+
+
+def test_table_single_row_matches_batch(exported):
+    _, _, table_dir = exported
+    ensemble = TreeEnsemble.load(table_dir)
+    X = _random_features(ensemble.n_features_in_, rows=20, seed=1)
+
+    batch = ensemble.predict_positive(X)
+    for i in range(len(X)):
+        assert ensemble.predict_positive(X[i:i + 1])[0] == batch[i]
+
+
+def test_loaded_table_is_memory_mapped_and_keeps_feature_order(exported):
+    _, model, table_dir = exported
+    ensemble = TreeEnsemble.load(table_dir)
+
+    assert isinstance(ensemble.feature, np.memmap)
+    expected = getattr(model, "feature_name_", None) or list(model.get_booster().feature_names)
+    assert ensemble.feature_name_ == list(expected)
+
+
+def test_stale_table_is_ignored(exported, tmp_path):
+    artifact, _, table_dir = exported
+    assert load_for_artifact(table_dir, artifact) is not None
+
+    other = tmp_path / artifact.name
+    other.write_bytes(b"retrained")
+    assert load_for_artifact(table_dir, other) is None
+    assert load_for_artifact(tmp_path / "missing", artifact) is None